@@ -104,6 +104,12 @@ class Settings(BaseSettings):
     # ============================================================
     # Qwen2.5-1.5B - English NLP (grammar, fluency, vocabulary, tutor response)
     QWEN_MODEL_NAME: str = os.getenv("QWEN_MODEL_NAME", "")
+    # Per-request limit for local generation on the inference worker (seconds)
+    QWEN_GENERATION_TIMEOUT: float = float(os.getenv("QWEN_GENERATION_TIMEOUT", "120"))
+    # KV cache of templated system prompts reused across requests (0 = disabled)
+    QWEN_PREFIX_CACHE_MB: float = float(os.getenv("QWEN_PREFIX_CACHE_MB", "256"))
+    # Ollama chat sessions whose context token array is kept between turns
+    OLLAMA_SESSION_CONTEXTS: int = int(os.getenv("OLLAMA_SESSION_CONTEXTS", "1024"))
     
     # LLaMA3-8B-VI - Vietnamese explanations (lazy load)
     LLAMA_MODEL_NAME: str = os.getenv("LLAMA_MODEL_NAME", "vilm/vinallama-7b-chat")
@@ -122,12 +128,28 @@ class Settings(BaseSettings):
     STT_BEAM_SIZE: int = int(os.getenv("STT_BEAM_SIZE", "5"))
     STT_VAD: bool = os.getenv("STT_VAD", "true").lower() == "true"
     STT_LANGUAGE: str = os.getenv("STT_LANGUAGE", "en")
+    # Silero VAD ONNX file (empty = download via torch.hub)
+    VAD_MODEL_PATH: str = os.getenv("VAD_MODEL_PATH", "")
+    # Shared streaming-STT inference pool (finals before partials)
+    STT_INFERENCE_WORKERS: int = int(os.getenv("STT_INFERENCE_WORKERS", "2"))
+    STT_MAX_PENDING_JOBS: int = int(os.getenv("STT_MAX_PENDING_JOBS", "64"))
     
     # Piper VITS - Text-to-Speech
     TTS_MODEL_PATH: str = os.getenv("TTS_MODEL_PATH", "en_US-lessac-medium")
     TTS_CONFIG_PATH: str = os.getenv("TTS_CONFIG_PATH", "")
     TTS_SPEAKER_ID: int = int(os.getenv("TTS_SPEAKER_ID", "0"))
     TTS_VOICE: str = os.getenv("TTS_VOICE", "en_US-lessac-medium")
+    # Shared phrase cache: byte-bounded memory LRU + optional disk/Redis tiers
+    TTS_CACHE_MAX_MB: float = float(os.getenv("TTS_CACHE_MAX_MB", "64"))
+    TTS_CACHE_MAX_ENTRY_KB: int = int(os.getenv("TTS_CACHE_MAX_ENTRY_KB", "512"))
+    TTS_CACHE_MAX_TEXT_CHARS: int = int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "100"))
+    TTS_CACHE_DIR: str = os.getenv(
+        "TTS_CACHE_DIR",
+        os.path.join(os.path.dirname(__file__), "..", "data", "tts_cache")
+    )
+    TTS_CACHE_DISK_MAX_MB: float = float(os.getenv("TTS_CACHE_DISK_MAX_MB", "512"))
+    TTS_CACHE_REDIS: bool = os.getenv("TTS_CACHE_REDIS", "false").lower() == "true"
+    TTS_CACHE_REDIS_TTL_S: int = int(os.getenv("TTS_CACHE_REDIS_TTL_S", str(7 * 24 * 3600)))
 
     # ============================================================
     # Knowledge Graph (KuzuDB) & Embeddings
@@ -141,6 +163,31 @@ class Settings(BaseSettings):
         "sentence-transformers/all-MiniLM-L6-v2"
     )
     EMBEDDING_DEVICE: str = os.getenv("EMBEDDING_DEVICE", "cpu")
+    # Content-addressed, memory-mapped embedding store (empty = disabled)
+    EMBEDDING_CACHE_DIR: str = os.getenv(
+        "EMBEDDING_CACHE_DIR",
+        os.path.join(os.path.dirname(__file__), "..", "data", "embeddings")
+    )
+    EMBEDDING_CACHE_DTYPE: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+    # Query embeddings are never persisted; this bounds the per-worker LRU
+    EMBEDDING_QUERY_CACHE_SIZE: int = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", "2048"))
+    # Async embed calls are coalesced for up to MAX_WAIT_MS or MAX_SIZE texts
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    # Directory for persisted concept embedding matrices (empty = memory only)
+    VECTOR_STORE_CACHE_DIR: str = os.getenv("VECTOR_STORE_CACHE_DIR", "")
+    # Concept ANN index: backend "auto" | "hnsw" | "exact", optional save path
+    ANN_INDEX_BACKEND: str = os.getenv("ANN_INDEX_BACKEND", "auto")
+    ANN_INDEX_PATH: str = os.getenv("ANN_INDEX_PATH", "")
+    
+    # ============================================================
+    # Provider Health (circuit breakers for Ollama / Gemini / DL-Model API)
+    # ============================================================
+    PROVIDER_FAILURE_THRESHOLD: int = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+    PROVIDER_RESET_TIMEOUT_S: float = float(os.getenv("PROVIDER_RESET_TIMEOUT_S", "30"))
+    PROVIDER_HEALTH_INTERVAL_S: float = float(os.getenv("PROVIDER_HEALTH_INTERVAL_S", "15"))
+    # Latency samples older than this no longer reorder providers
+    PROVIDER_LATENCY_MAX_AGE_S: float = float(os.getenv("PROVIDER_LATENCY_MAX_AGE_S", "120"))
     
     # ============================================================
     # Rate Limiting
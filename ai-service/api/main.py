@@ -70,12 +70,25 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Redis connection failed: {e}. Continuing without cache...")
     
+    # Open the process-wide Knowledge Graph once (schema check + idempotent seed)
+    try:
+        from api.services.kg_service_v3 import get_kg_service
+        kg = get_kg_service()
+        logger.info(f"Knowledge Graph ready: {kg.get_concept_count()} concepts")
+    except Exception as e:
+        logger.warning(f"Knowledge Graph unavailable: {e}")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down LexiLingo Backend API...")
     await mongodb_manager.disconnect()
     await RedisClient.close()
+    try:
+        from api.services.kg_service_v3 import close_kg_service
+        close_kg_service()
+    except Exception as e:
+        logger.warning(f"Failed to close Knowledge Graph: {e}")
     logger.info("Shutdown complete")
 
 
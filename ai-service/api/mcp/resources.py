@@ -130,10 +130,10 @@ class MCPResourceHandler:
 
     async def _read_grammar_concepts(self, level: str) -> Dict[str, Any]:
         """Read grammar concepts for a level."""
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+        from api.services.kg_service_v3 import get_kg_service
 
         try:
-            kg = KnowledgeGraphServiceV3()
+            kg = get_kg_service()
             # Filter concepts by level from all concepts
             all_concepts = kg.get_concepts()
             concepts = [
@@ -154,10 +154,10 @@ class MCPResourceHandler:
 
     async def _read_vocabulary_concepts(self, category: str) -> Dict[str, Any]:
         """Read vocabulary concepts by category."""
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+        from api.services.kg_service_v3 import get_kg_service
 
         try:
-            kg = KnowledgeGraphServiceV3()
+            kg = get_kg_service()
             # Filter concepts by category from all concepts
             all_concepts = kg.get_concepts()
             concepts = [
@@ -220,10 +220,10 @@ class MCPToolHandler:
 
     async def _handle_expand_concepts(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Handle expand_concepts tool call."""
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+        from api.services.kg_service_v3 import get_kg_service
 
         input_data = ExpandConceptsInput(**args)
-        kg = KnowledgeGraphServiceV3()
+        kg = get_kg_service()
 
         # Use 'expand' method, not 'expand_concepts'
         result = await kg.expand(input_data.concepts, hops=input_data.hops)
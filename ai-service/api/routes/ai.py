@@ -194,9 +194,9 @@ async def get_community_concepts(community_id: int):
     """Get all concepts belonging to a specific community."""
     try:
         from api.services.graph_analytics import get_graph_analytics
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+        from api.services.kg_service_v3 import get_kg_service
         
-        kg = KnowledgeGraphServiceV3()
+        kg = get_kg_service()
         analytics = get_graph_analytics(kg)
         
         concepts = analytics.get_community_concepts(community_id)
@@ -1,14 +1,20 @@
 """
 Chat routes
 
-Endpoints for chat functionality with Google Gemini integration
+Endpoints for chat functionality with Google Gemini integration.
+Gemini is called through its async API so a reply never blocks the worker;
+/messages/stream (SSE) and /ws (WebSocket) push tokens as they arrive.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import google.generativeai as genai
 import os
 from datetime import datetime
+import logging
+import time
 import uuid
 
 from api.core.database import get_database
@@ -21,7 +27,15 @@ from api.models.schemas import (
     ChatMessage,
     MessageRole
 )
+from api.services.chat_streaming import (
+    ChatEvent,
+    gemini_generate,
+    gemini_stream,
+    send_events,
+    sse_response,
+)
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Configure Gemini API
@@ -96,7 +110,6 @@ async def send_message(
         )
     
     try:
-        import time
         start_time = time.time()
         
         # Save user message to MongoDB
@@ -111,8 +124,7 @@ async def send_message(
         await db["chat_messages"].insert_one(user_message)
         
         # Get AI response from Gemini
-        response = model.generate_content(request.message)
-        ai_response = response.text
+        ai_response = await gemini_generate(model, request.message)
         
         # Save AI message
         ai_message = {
@@ -149,6 +161,110 @@ async def send_message(
         )
 
 
+async def _stream_reply(
+    request: SendMessageRequest,
+    db: AsyncIOMotorDatabase,
+) -> AsyncIterator[ChatEvent]:
+    """Stream Gemini tokens, then store both messages in one write."""
+    start_time = time.time()
+    received_at = datetime.utcnow()
+    
+    parts = []
+    try:
+        async for text in gemini_stream(model, request.message):
+            parts.append(text)
+            yield "token", {"text": text}
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e}")
+        yield "error", {"detail": f"Failed to generate response: {str(e)}"}
+        return
+    ai_response = "".join(parts)
+    
+    user_message = {
+        "message_id": str(uuid.uuid4()),
+        "session_id": request.session_id,
+        "user_id": request.user_id,
+        "content": request.message,
+        "role": MessageRole.USER,
+        "timestamp": received_at
+    }
+    ai_message = {
+        "message_id": str(uuid.uuid4()),
+        "session_id": request.session_id,
+        "content": ai_response,
+        "role": MessageRole.AI,
+        "timestamp": datetime.utcnow()
+    }
+    try:
+        await db["chat_messages"].insert_many([user_message, ai_message])
+        await db["chat_sessions"].update_one(
+            {"session_id": request.session_id},
+            {
+                "$set": {"last_activity": ai_message["timestamp"]},
+                "$inc": {"message_count": 2}
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to save streamed messages: {e}")
+        yield "error", {"detail": f"Failed to save message: {str(e)}"}
+        return
+    
+    yield "done", {
+        "message_id": ai_message["message_id"],
+        "ai_response": ai_response,
+        "processing_time_ms": int((time.time() - start_time) * 1000),
+    }
+
+
+@router.post(
+    "/messages/stream",
+    summary="Send chat message (streamed)"
+)
+async def send_message_stream(
+    request: SendMessageRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Send message and stream the AI response as Server-Sent Events.
+    
+    Events: `token` ({"text"}) per chunk, then `done` ({"message_id",
+    "ai_response", "processing_time_ms"}) once saved, or `error`.
+    """
+    if not model:
+        raise HTTPException(
+            status_code=503,
+            detail="Gemini API not configured"
+        )
+    
+    return sse_response(_stream_reply(request, db))
+
+
+@router.websocket("/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    WebSocket chat: send {"session_id", "user_id", "message"} frames and
+    receive {"type": "token" | "done" | "error", ...} frames per reply.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if not model:
+                await websocket.send_json({"type": "error", "detail": "Gemini API not configured"})
+                continue
+            try:
+                request = SendMessageRequest(**data)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid message: {str(e)}"})
+                continue
+            await send_events(websocket, _stream_reply(request, db))
+    except WebSocketDisconnect:
+        logger.info("Chat WebSocket client disconnected")
+
+
 @router.get(
     "/sessions/{session_id}/messages",
     response_model=list[ChatMessage],
@@ -3,9 +3,12 @@ Topic Chat Routes
 
 Endpoints for topic-based conversation feature.
 Includes starting topic sessions and sending messages within topic context.
+Replies can also be streamed token by token over SSE or a WebSocket.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator, Dict, List, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import google.generativeai as genai
 from datetime import datetime
@@ -28,7 +31,14 @@ from api.models.story_schemas import (
     VocabularyHint,
     DifficultyLevel,
 )
+from api.services.chat_streaming import (
+    ChatEvent,
+    gemini_stream,
+    send_events,
+    sse_response,
+)
 from api.services.story_service import StoryService
+from api.services.topic_llm_gateway import get_topic_llm_gateway
 from api.services.topic_prompt_builder import TopicPromptBuilder
 
 logger = logging.getLogger(__name__)
@@ -201,57 +211,27 @@ async def send_topic_message(
     
     The AI will respond in character based on the story's role persona,
     and provide educational hints (grammar/vocabulary) when appropriate.
+    Replies come from the TopicLLMGateway (Qwen via Ollama, Gemini fallback);
+    the session id lets Ollama continue its cached context.
     """
-    if not gemini_model:
-        raise HTTPException(
-            status_code=503,
-            detail="AI service not configured (Gemini API key missing)"
-        )
-    
     try:
         start_time = time.time()
         
-        # Get session
-        session = await db["chat_sessions"].find_one({"session_id": session_id})
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+        system_prompt, history = await _load_topic_session(db, session_id)
         
-        if session.get("session_type") != "topic_based":
+        # Get AI response
+        reply = await get_topic_llm_gateway().generate(
+            system_prompt=system_prompt,
+            user_message=request.message,
+            conversation_history=history,
+            session_id=session_id,
+        )
+        if reply.error:
             raise HTTPException(
-                status_code=400, 
-                detail="This endpoint is only for topic-based sessions"
+                status_code=503,
+                detail=f"AI service unavailable: {reply.error}"
             )
-        
-        # Get conversation history
-        history_cursor = db["chat_messages"].find(
-            {"session_id": session_id}
-        ).sort("timestamp", 1).limit(10)
-        history = await history_cursor.to_list(length=10)
-        
-        # Build prompt with context
-        system_prompt = session.get("system_prompt", "")
-        
-        # Format conversation for Gemini
-        conversation_text = ""
-        for msg in history:
-            role_label = "User" if msg.get("role") == "user" else "Assistant"
-            conversation_text += f"{role_label}: {msg.get('content', '')}\n"
-        
-        conversation_text += f"User: {request.message}\n"
-        
-        # Create the full prompt
-        full_prompt = f"""[SYSTEM INSTRUCTIONS]
-{system_prompt}
-
-[CONVERSATION SO FAR]
-{conversation_text}
-
-[YOUR RESPONSE]
-Respond as your character. Include [💡 Tip] or [📘] notes if the user made errors or asked about vocabulary."""
-        
-        # Get AI response
-        response = gemini_model.generate_content(full_prompt)
-        ai_response = response.text
+        ai_response = reply.content
         
         # Save user message
         user_message = {
@@ -306,6 +286,178 @@ Respond as your character. Include [💡 Tip] or [📘] notes if the user made e
         )
 
 
+async def _load_topic_session(
+    db: AsyncIOMotorDatabase,
+    session_id: str,
+) -> Tuple[str, List[Dict[str, str]]]:
+    """Validate the topic session; return its system prompt and latest messages."""
+    # Get session
+    session = await db["chat_sessions"].find_one({"session_id": session_id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if session.get("session_type") != "topic_based":
+        raise HTTPException(
+            status_code=400, 
+            detail="This endpoint is only for topic-based sessions"
+        )
+    
+    # Get conversation history (last 10 messages, oldest first)
+    history_cursor = db["chat_messages"].find(
+        {"session_id": session_id}
+    ).sort("timestamp", -1).limit(10)
+    history = await history_cursor.to_list(length=10)
+    history.reverse()
+    
+    return session.get("system_prompt", ""), [
+        {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+        for msg in history
+    ]
+
+
+async def _build_topic_prompt(
+    db: AsyncIOMotorDatabase,
+    session_id: str,
+    message: str,
+) -> str:
+    """Validate the topic session and build the Gemini prompt for a new user message."""
+    system_prompt, history = await _load_topic_session(db, session_id)
+    
+    # Format conversation for Gemini
+    conversation_text = ""
+    for msg in history:
+        role_label = "User" if msg["role"] == "user" else "Assistant"
+        conversation_text += f"{role_label}: {msg['content']}\n"
+    
+    conversation_text += f"User: {message}\n"
+    
+    # Create the full prompt
+    return f"""[SYSTEM INSTRUCTIONS]
+{system_prompt}
+
+[CONVERSATION SO FAR]
+{conversation_text}
+
+[YOUR RESPONSE]
+Respond as your character. Include [💡 Tip] or [📘] notes if the user made errors or asked about vocabulary."""
+
+
+async def _stream_topic_reply(
+    db: AsyncIOMotorDatabase,
+    session_id: str,
+    request: TopicChatRequest,
+    full_prompt: str,
+) -> AsyncIterator[ChatEvent]:
+    """Stream Gemini tokens, then store both messages in one write."""
+    start_time = time.time()
+    received_at = datetime.utcnow()
+    
+    parts = []
+    try:
+        async for text in gemini_stream(gemini_model, full_prompt):
+            parts.append(text)
+            yield "token", {"text": text}
+    except Exception as e:
+        logger.error(f"Topic chat stream failed: {e}")
+        yield "error", {"detail": f"Failed to send message: {str(e)}"}
+        return
+    ai_response = "".join(parts)
+    
+    user_message = {
+        "message_id": str(uuid.uuid4()),
+        "session_id": session_id,
+        "user_id": request.user_id,
+        "content": request.message,
+        "role": "user",
+        "timestamp": received_at
+    }
+    ai_message_doc = {
+        "message_id": str(uuid.uuid4()),
+        "session_id": session_id,
+        "content": ai_response,
+        "role": "assistant",
+        "timestamp": datetime.utcnow()
+    }
+    try:
+        await db["chat_messages"].insert_many([user_message, ai_message_doc])
+        await db["chat_sessions"].update_one(
+            {"session_id": session_id},
+            {
+                "$set": {"last_activity": ai_message_doc["timestamp"]},
+                "$inc": {"message_count": 2}
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to save streamed topic messages: {e}")
+        yield "error", {"detail": f"Failed to send message: {str(e)}"}
+        return
+    
+    educational_hints = _extract_educational_hints(ai_response)
+    yield "done", {
+        "message_id": ai_message_doc["message_id"],
+        "ai_response": ai_response,
+        "educational_hints": educational_hints.model_dump() if educational_hints else None,
+        "processing_time_ms": int((time.time() - start_time) * 1000),
+    }
+
+
+@router.post(
+    "/topic-sessions/{session_id}/messages/stream",
+    summary="Send message in topic session (streamed)"
+)
+async def send_topic_message_stream(
+    session_id: str,
+    request: TopicChatRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Send a message in a topic-based conversation and stream the reply as
+    Server-Sent Events.
+    
+    Events: `token` ({"text"}) per chunk, then `done` (the TopicChatResponse
+    fields) once saved, or `error`.
+    """
+    if not gemini_model:
+        raise HTTPException(
+            status_code=503,
+            detail="AI service not configured (Gemini API key missing)"
+        )
+    
+    full_prompt = await _build_topic_prompt(db, session_id, request.message)
+    return sse_response(_stream_topic_reply(db, session_id, request, full_prompt))
+
+
+@router.websocket("/topic-sessions/{session_id}/ws")
+async def topic_chat_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    WebSocket topic chat: send {"user_id", "message"} frames and receive
+    {"type": "token" | "done" | "error", ...} frames per reply.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if not gemini_model:
+                await websocket.send_json({"type": "error", "detail": "AI service not configured (Gemini API key missing)"})
+                continue
+            try:
+                request = TopicChatRequest(**data)
+                full_prompt = await _build_topic_prompt(db, session_id, request.message)
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "detail": e.detail})
+                continue
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid message: {str(e)}"})
+                continue
+            await send_events(websocket, _stream_topic_reply(db, session_id, request, full_prompt))
+    except WebSocketDisconnect:
+        logger.info(f"Topic chat WebSocket disconnected: {session_id}")
+
+
 def _extract_educational_hints(response: str) -> EducationalHints | None:
     """
     Extract educational hints from AI response.
@@ -0,0 +1,225 @@
+"""In-memory audio decoding shared by the STT and pronunciation handlers.
+
+Uploaded clips never touch disk:
+- the container is sniffed from magic bytes
+- WAV and headerless PCM are parsed directly with ``np.frombuffer``
+- compressed formats (ogg/flac/mp3/webm/mp4) are decoded from ``BytesIO``
+  via soundfile, falling back to PyAV (bundled with faster-whisper)
+- resampling uses a polyphase filter whose FIR taps are cached per ratio
+
+All decoders return mono float32 arrays in [-1, 1] at the requested rate.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import logging
+import os
+import struct
+from functools import lru_cache
+from math import gcd
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 16000
+
+# WAVE format tags
+_WAVE_PCM = 0x0001
+_WAVE_FLOAT = 0x0003
+_WAVE_EXTENSIBLE = 0xFFFE
+
+
+def sniff_format(data: bytes) -> str:
+    """Guess the container from magic bytes ("pcm" when nothing matches)."""
+    head = data[:16]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    return "pcm"
+
+
+def coerce_audio_input(audio: Union[str, bytes, bytearray, memoryview]) -> Union[str, bytes]:
+    """
+    Normalise handler input to raw bytes or a file path.
+
+    Strings that look like base64 (data URLs or long payloads) are decoded;
+    anything else is treated as a path.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return bytes(audio)
+    if not isinstance(audio, str):
+        raise ValueError(f"Unsupported audio type: {type(audio)}")
+
+    if audio.startswith("data:audio") or len(audio) > 500:
+        try:
+            payload = audio.split("base64,", 1)[1] if "base64," in audio else audio
+            return base64.b64decode(payload)
+        except Exception:
+            pass
+    return audio
+
+
+# ----------------------------------------------------------------------
+# Resampling
+# ----------------------------------------------------------------------
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """FIR taps for an up/down ratio (same design as scipy's resample_poly default)."""
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    taps.setflags(write=False)
+    return taps
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Resample mono float audio with a cached polyphase filter."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr or audio.size == 0:
+        return audio
+
+    divisor = gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // divisor, int(orig_sr) // divisor
+    try:
+        from scipy.signal import resample_poly
+    except ImportError:
+        # Linear interpolation keeps the pipeline working without scipy
+        n_out = int(round(audio.size * target_sr / orig_sr))
+        positions = np.arange(n_out, dtype=np.float64) * (orig_sr / target_sr)
+        return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+    return resample_poly(audio, up, down, window=_polyphase_filter(up, down)).astype(np.float32)
+
+
+# ----------------------------------------------------------------------
+# Decoders
+# ----------------------------------------------------------------------
+
+def _to_mono(samples: np.ndarray, channels: int) -> np.ndarray:
+    if channels <= 1:
+        return samples
+    frames = samples.size // channels
+    return samples[: frames * channels].reshape(frames, channels).mean(axis=1)
+
+
+def _pcm_to_float(raw: bytes, bits: int, is_float: bool) -> np.ndarray:
+    if is_float:
+        dtype = "<f4" if bits == 32 else "<f8"
+        return np.frombuffer(raw, dtype=dtype).astype(np.float32)
+    if bits == 8:
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if bits == 16:
+        return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    if bits == 24:
+        usable = len(raw) - len(raw) % 3
+        b = np.frombuffer(raw[:usable], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        values = np.where(values & 0x800000, values - (1 << 24), values)
+        return values.astype(np.float32) / 8388608.0
+    if bits == 32:
+        return np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    raise ValueError(f"Unsupported WAV bit depth: {bits}")
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Parse a RIFF/WAVE buffer without copying it to disk."""
+    view = memoryview(data)
+    pos = 12
+    fmt: Optional[Tuple[int, int, int, int]] = None
+    while pos + 8 <= len(data):
+        chunk_id = bytes(view[pos:pos + 4])
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag == _WAVE_EXTENSIBLE and size >= 40:
+                (tag,) = struct.unpack_from("<H", data, body + 24)
+            fmt = (tag, channels, rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            tag, channels, rate, bits = fmt
+            if tag not in (_WAVE_PCM, _WAVE_FLOAT):
+                raise ValueError(f"Unsupported WAV encoding tag: {tag:#x}")
+            # Streamed WAVs may carry a placeholder size; clamp to the buffer
+            raw = bytes(view[body:min(body + size, len(data))])
+            frame = (bits // 8) * max(channels, 1)
+            raw = raw[: len(raw) - len(raw) % frame] if frame else raw
+            samples = _pcm_to_float(raw, bits, tag == _WAVE_FLOAT)
+            return _to_mono(samples, channels), rate
+        pos = body + size + (size & 1)
+    raise ValueError("WAV buffer has no data chunk")
+
+
+def decode_pcm16(data: bytes, sample_rate: int = DEFAULT_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Headerless little-endian int16 mono PCM (the streaming wire format)."""
+    usable = len(data) - len(data) % 2
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0, sample_rate
+
+
+def _decode_compressed(data: bytes, target_sr: int) -> Tuple[np.ndarray, int]:
+    try:
+        import soundfile as sf
+
+        samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        return samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0], rate
+    except Exception as sf_error:
+        try:
+            from faster_whisper.audio import decode_audio as av_decode
+        except ImportError:
+            raise ValueError(f"Cannot decode compressed audio: {sf_error}") from sf_error
+        # PyAV decodes, downmixes and resamples in one pass
+        return np.asarray(av_decode(io.BytesIO(data), sampling_rate=target_sr), dtype=np.float32), target_sr
+
+
+def decode_audio_bytes(
+    data: bytes,
+    target_sr: int = DEFAULT_SAMPLE_RATE,
+    pcm_sample_rate: int = DEFAULT_SAMPLE_RATE,
+) -> np.ndarray:
+    """Decode any supported buffer to mono float32 at target_sr."""
+    kind = sniff_format(data)
+    if kind == "wav":
+        samples, rate = decode_wav(data)
+    elif kind == "pcm":
+        samples, rate = decode_pcm16(data, pcm_sample_rate)
+    else:
+        samples, rate = _decode_compressed(data, target_sr)
+    return resample(samples, rate, target_sr)
+
+
+def load_audio(
+    audio: Union[str, bytes, bytearray, memoryview, np.ndarray],
+    target_sr: int = DEFAULT_SAMPLE_RATE,
+) -> np.ndarray:
+    """
+    Decode handler input (bytes, base64 string, file path or array) to mono
+    float32 at target_sr. Arrays are assumed to already be at target_sr.
+    """
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32, copy=False)
+
+    source = coerce_audio_input(audio)
+    if isinstance(source, str):
+        if not os.path.exists(source):
+            raise ValueError(f"Audio file not found: {source}")
+        with open(source, "rb") as f:
+            source = f.read()
+    return decode_audio_bytes(source, target_sr=target_sr)
@@ -0,0 +1,66 @@
+"""
+Chat Streaming Helpers
+
+Non-blocking Gemini calls and SSE / WebSocket plumbing shared by the chat
+routes. ``generate_content`` is synchronous and would block the event loop
+for the whole round trip, so routes use the SDK's async API instead.
+
+A streaming reply is an async iterator of ``(event, data)`` pairs:
+``("token", {"text": ...})`` for each chunk, then ``("done", {...})`` once
+the reply has been persisted, or ``("error", {"detail": ...})``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from fastapi import WebSocket
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+ChatEvent = Tuple[str, Dict[str, Any]]
+
+
+async def gemini_generate(model, prompt: str) -> str:
+    """Full Gemini reply without blocking the event loop."""
+    response = await model.generate_content_async(prompt)
+    return response.text
+
+
+async def gemini_stream(model, prompt: str) -> AsyncIterator[str]:
+    """Yield Gemini reply text chunks as they arrive."""
+    response = await model.generate_content_async(prompt, stream=True)
+    async for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunk without text parts (e.g. a safety-only candidate)
+            continue
+        if text:
+            yield text
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[ChatEvent]) -> StreamingResponse:
+    """Server-Sent Events response for a chat event stream."""
+    async def body():
+        async for event, data in events:
+            yield sse_event(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def send_events(websocket: WebSocket, events: AsyncIterator[ChatEvent]) -> None:
+    """Forward a chat event stream to a WebSocket as {"type": event, **data} frames."""
+    async for event, data in events:
+        await websocket.send_text(json.dumps({"type": event, **data}, ensure_ascii=False, default=str))
@@ -0,0 +1,208 @@
+"""Compiled seed-concept matcher for KG expansion.
+
+Replaces the per-request nested loop over every concept keyword with:
+- an Aho-Corasick automaton over all concept keywords (one pass over input)
+- a sorted keyword-suffix index for input that is part of a keyword
+- one combined regex for grammar error patterns
+
+The matcher is built from ``KnowledgeGraphServiceV3.get_concepts()`` and only
+rebuilt when the KG concept table changes (``concepts_version``).
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+
+
+logger = logging.getLogger(__name__)
+
+
+# Grammar error patterns -> concept they indicate
+GRAMMAR_ERROR_PATTERNS: Dict[str, str] = {
+    r"\bi goes\b": "concept:grammar.subject_verb_agreement",
+    r"\bhe go\b": "concept:grammar.third_person_s",
+    r"\byesterday\b.*\b(?:go|want|need)\b": "concept:grammar.past_time_markers",
+    r"\bhave went\b": "concept:grammar.present_perfect",
+    r"\bmore better\b": "concept:grammar.comparatives",
+}
+
+
+class ConceptMatcher:
+    """
+    One-pass keyword and grammar-pattern matcher.
+
+    Keyword semantics match the previous loop (``kw in text or text in kw``):
+    a concept is a seed when any of its keywords occurs as a substring of
+    the lower-cased input, or the whole input occurs inside one of its
+    keywords (e.g. "past" for "past_simple"). Unlike the loop, empty input
+    seeds nothing rather than every concept. Seeds are returned in
+    concept-table order, followed by grammar-pattern concepts in pattern
+    order.
+    """
+
+    def __init__(
+        self,
+        concepts: Dict[str, Dict[str, str]],
+        grammar_patterns: Optional[Dict[str, str]] = None,
+        version: Tuple[int, int] = (0, 0),
+    ):
+        self.version = version
+        self._concept_ids: List[str] = list(concepts.keys())
+
+        # Automaton: goto transitions, failure links, outputs, dict links
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._dict_link: List[int] = [-1]
+        self._build_automaton(concepts)
+
+        # Keyword suffixes, sorted: text is inside a keyword iff it prefixes a suffix
+        self._suffixes: List[str] = []
+        self._suffix_concepts: List[Tuple[int, ...]] = []
+        self._build_suffix_index(concepts)
+
+        patterns = grammar_patterns if grammar_patterns is not None else GRAMMAR_ERROR_PATTERNS
+        self._pattern_concepts: List[str] = list(patterns.values())
+        self._pattern_regex: Optional[re.Pattern] = None
+        if patterns:
+            # Zero-width lookahead per alternative so matches may overlap
+            alternation = "|".join(
+                f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns.keys())
+            )
+            self._pattern_regex = re.compile(f"(?=(?:{alternation}))", re.IGNORECASE)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def _build_automaton(self, concepts: Dict[str, Dict[str, str]]) -> None:
+        outputs: List[Set[int]] = [set()]
+
+        for index, concept_id in enumerate(self._concept_ids):
+            keywords = (concepts[concept_id].get("keywords") or "").lower()
+            for keyword in set(keywords.split()):
+                state = 0
+                for ch in keyword:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        outputs.append(set())
+                    state = nxt
+                outputs[state].add(index)
+
+        size = len(self._goto)
+        self._fail = [0] * size
+        self._dict_link = [-1] * size
+        self._out = [tuple(sorted(o)) for o in outputs]
+
+        # BFS to compute failure and dictionary-suffix links
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fail_state = self._fail[nxt]
+                self._dict_link[nxt] = (
+                    fail_state if self._out[fail_state] else self._dict_link[fail_state]
+                )
+                pending.append(nxt)
+
+    def _build_suffix_index(self, concepts: Dict[str, Dict[str, str]]) -> None:
+        owners: Dict[str, Set[int]] = {}
+        for index, concept_id in enumerate(self._concept_ids):
+            keywords = (concepts[concept_id].get("keywords") or "").lower()
+            for keyword in set(keywords.split()):
+                for start in range(len(keyword)):
+                    owners.setdefault(keyword[start:], set()).add(index)
+        self._suffixes = sorted(owners)
+        self._suffix_concepts = [tuple(owners[suffix]) for suffix in self._suffixes]
+
+    def _keywords_containing(self, text: str) -> Set[int]:
+        """Concept indexes with a keyword that contains the whole text."""
+        matched: Set[int] = set()
+        position = bisect.bisect_left(self._suffixes, text)
+        while position < len(self._suffixes) and self._suffixes[position].startswith(text):
+            matched.update(self._suffix_concepts[position])
+            position += 1
+        return matched
+
+    def match_keywords(self, text: str) -> List[str]:
+        """Return concepts whose keywords occur in text or contain all of it."""
+        text = (text or "").lower()
+        if not text or len(self._goto) == 1:
+            return []
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        dict_link = self._dict_link
+
+        matched = self._keywords_containing(text)
+        visited: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            # Report this state and its dictionary-suffix chain once
+            report = state if out[state] else dict_link[state]
+            while report > 0 and report not in visited:
+                visited.add(report)
+                matched.update(out[report])
+                report = dict_link[report]
+
+        return [self._concept_ids[i] for i in sorted(matched)]
+
+    def match_patterns(self, text: str) -> List[str]:
+        """Return concepts indicated by grammar error patterns."""
+        if not text or self._pattern_regex is None:
+            return []
+
+        hit: Set[int] = set()
+        for match in self._pattern_regex.finditer(text):
+            for group, value in match.groupdict().items():
+                if value is not None:
+                    hit.add(int(group[1:]))
+        return [self._pattern_concepts[i] for i in sorted(hit)]
+
+    def match(self, text: str) -> List[str]:
+        """Return deduplicated seed concepts for user input."""
+        seeds = self.match_keywords(text)
+        seen = set(seeds)
+        for concept in self.match_patterns(text):
+            if concept not in seen:
+                seeds.append(concept)
+                seen.add(concept)
+        return seeds
+
+
+# Cached matcher (rebuilt when the concept table changes)
+_matcher: Optional[ConceptMatcher] = None
+
+
+def get_concept_matcher(kg: "KnowledgeGraphServiceV3") -> ConceptMatcher:
+    """Get the compiled matcher for the KG's current concept table."""
+    global _matcher
+    version = (id(kg), kg.concepts_version)
+    if _matcher is None or _matcher.version != version:
+        concepts = kg.get_concepts()
+        _matcher = ConceptMatcher(concepts, version=version)
+        logger.info(
+            f"Built concept matcher: {len(concepts)} concepts, "
+            f"{_matcher.state_count} automaton states"
+        )
+    return _matcher
@@ -6,6 +6,10 @@ Following architecture.md:
 - Qwen2.5-1.5B + Unified LoRA Adapter
 - HuBERT for pronunciation
 - LLaMA3-8B-VI for Vietnamese explanations (lazy load)
+
+Calls go through the shared "dl_model" circuit breaker (ProviderHealth), so
+while the API is down requests degrade to the fallbacks immediately instead
+of waiting for a timeout each time.
 """
 
 import httpx
@@ -14,6 +18,7 @@ from datetime import datetime
 import asyncio
 
 from api.core.config import settings
+from api.services.provider_health import get_provider_health
 
 
 class DLModelService:
@@ -31,6 +36,8 @@ class DLModelService:
         self.api_key = settings.DL_MODEL_API_KEY
         self.timeout = settings.AI_MODEL_TIMEOUT
         self.client: Optional[httpx.AsyncClient] = None
+        self.health = get_provider_health()
+        self.health.register("dl_model", probe=self._probe)
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
@@ -46,6 +53,22 @@ class DLModelService:
             )
         return self.client
     
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the circuit breaker; 5xx counts as a failure."""
+        async def send() -> httpx.Response:
+            client = await self._get_client()
+            response = await client.request(method, path, **kwargs)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+        
+        return await self.health.call("dl_model", send)
+    
+    async def _probe(self) -> bool:
+        client = await self._get_client()
+        response = await client.get("/health", timeout=5.0)
+        return response.status_code == 200
+    
     async def close(self):
         """Close HTTP client."""
         if self.client:
@@ -80,8 +103,6 @@ class DLModelService:
             }
         """
         try:
-            client = await self._get_client()
-            
             start_time = asyncio.get_event_loop().time()
             
             payload = {
@@ -92,7 +113,8 @@ class DLModelService:
             if settings.QWEN_MODEL_NAME:
                 payload["model"] = settings.QWEN_MODEL_NAME
 
-            response = await client.post(
+            response = await self._request(
+                "POST",
                 "/api/v1/analyze",
                 json=payload
             )
@@ -139,15 +161,14 @@ class DLModelService:
             }
         """
         try:
-            client = await self._get_client()
-            
             start_time = asyncio.get_event_loop().time()
             
             # Upload audio file
             files = {"audio": ("audio.wav", audio_data, "audio/wav")}
             data = {"transcript": transcript}
             
-            response = await client.post(
+            response = await self._request(
+                "POST",
                 "/api/v1/pronunciation",
                 files=files,
                 data=data
@@ -188,13 +209,12 @@ class DLModelService:
             Vietnamese explanation string
         """
         try:
-            client = await self._get_client()
-            
             payload = {
                 "text": user_text,
                 "analysis": english_analysis,
             }
-            response = await client.post(
+            response = await self._request(
+                "POST",
                 "/api/v1/explain-vi",
                 json=payload,
                 timeout=10.0  # Vietnamese explanation may take longer
@@ -256,13 +276,8 @@ class DLModelService:
         }
     
     async def health_check(self) -> bool:
-        """Check if DL Model API is available."""
-        try:
-            client = await self._get_client()
-            response = await client.get("/health", timeout=5.0)
-            return response.status_code == 200
-        except Exception:
-            return False
+        """Check if DL Model API is available (cached circuit state, no request)."""
+        return self.health.is_available("dl_model")
 
 
 # Singleton instance
@@ -27,6 +27,7 @@ from api.services.dual_stream.protocol import (
     create_message,
 )
 from api.services.dual_stream.streaming_stt_service import (
+    STTSession,
     StreamingSTTService,
     get_streaming_stt_service,
 )
@@ -60,6 +61,7 @@ __all__ = [
     "StreamMessage",
     "create_message",
     # STT
+    "STTSession",
     "StreamingSTTService",
     "get_streaming_stt_service",
     # TTS
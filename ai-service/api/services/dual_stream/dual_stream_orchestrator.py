@@ -163,6 +163,7 @@ class DualStreamOrchestrator:
         
         # Initialize services
         self.stt = get_streaming_stt_service()
+        self.stt_session = self.stt.create_session(session_id)
         self.tts = get_streaming_tts_service()
         self.thinking_buffer = ThinkingBuffer(
             ThinkingConfig(
@@ -260,7 +261,7 @@ class DualStreamOrchestrator:
                 task.cancel()
         
         # Stop TTS immediately
-        self.tts.stop()
+        self.tts.stop(self.session_id)
         
         self._is_running = False
         logger.info("[Orchestrator] Stop requested")
@@ -299,6 +300,7 @@ class DualStreamOrchestrator:
             async for result in self.stt.stream_transcribe(
                 audio_input,
                 on_interruption=on_interruption,
+                session=self.stt_session,
             ):
                 if self._stop_requested:
                     break
@@ -523,7 +525,7 @@ class DualStreamOrchestrator:
                     self.state["speaking_status"] = StreamStatus.ACTIVE.value
                 
                 # Inform STT that AI is speaking (for interruption detection)
-                self.stt.set_ai_speaking(True)
+                self.stt_session.set_ai_speaking(True)
                 
                 if self._on_message:
                     await self._on_message(msg_audio_start(stream_id=stream_id))
@@ -534,7 +536,7 @@ class DualStreamOrchestrator:
                 first_audio_sent = False
                 
                 try:
-                    async for chunk in self.tts.stream_speak(response):
+                    async for chunk in self.tts.stream_speak(response, stream_id=self.session_id):
                         if self._stop_requested:
                             break
                         
@@ -573,7 +575,7 @@ class DualStreamOrchestrator:
                         )
                 
                 finally:
-                    self.stt.set_ai_speaking(False)
+                    self.stt_session.set_ai_speaking(False)
                     async with self._state_lock:
                         self.state["is_speaking"] = False
                         self.state["speaking_status"] = StreamStatus.IDLE.value
@@ -594,7 +596,7 @@ class DualStreamOrchestrator:
         logger.info("[Orchestrator] Handling interruption")
         
         # Stop TTS immediately
-        self.tts.stop()
+        self.tts.stop(self.session_id)
         
         # Mark thinking as interrupted
         async with self._state_lock:
@@ -0,0 +1,214 @@
+"""
+Shared Inference Runner
+
+Bounded worker pool with a priority queue for streaming model calls:
+- Final jobs run before partial jobs
+- Within a class, older sessions run first
+- A newer partial for a session replaces its still-queued older partial
+- When the queue is full, new partials are dropped (finals are always admitted)
+
+Dropped jobs resolve to ``None`` so callers can simply skip the update.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: tuple
+    fn: Callable[[], Any] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False)
+    session_key: Optional[Hashable] = field(compare=False, default=None)
+    is_partial: bool = field(compare=False, default=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    state: str = field(compare=False, default="queued")  # queued | running | dropped
+
+
+class InferenceRunner:
+    """
+    Dedicated thread pool executing blocking inference in priority order.
+
+    Usage:
+        runner = InferenceRunner(workers=2)
+        text = await runner.submit(fn, session_key=sid, session_started=t0, is_partial=True)
+        if text is None:
+            ...  # superseded or shed under load
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, name: str = "inference"):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.name = name
+
+        self._heap: List[_Job] = []
+        self._queued = 0
+        self._latest_partial: Dict[Hashable, _Job] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+
+        # Metrics
+        self._completed = 0
+        self._dropped_stale = 0
+        self._dropped_overload = 0
+        self._failed = 0
+        self._total_wait_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        fn: Callable[[], Any],
+        *,
+        session_key: Optional[Hashable] = None,
+        session_started: float = 0.0,
+        is_partial: bool = False,
+    ) -> Optional[Any]:
+        """Run fn on a worker; returns None if the job was dropped."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        job = _Job(
+            priority=(1 if is_partial else 0, session_started, next(self._seq)),
+            fn=fn,
+            future=future,
+            loop=loop,
+            session_key=session_key,
+            is_partial=is_partial,
+        )
+
+        with self._cond:
+            self._ensure_workers()
+            if is_partial:
+                previous = self._latest_partial.get(session_key)
+                if previous is not None and previous.state == "queued":
+                    self._drop(previous)
+                    self._dropped_stale += 1
+                if self._queued >= self.max_pending:
+                    self._dropped_overload += 1
+                    return None
+                self._latest_partial[session_key] = job
+            heapq.heappush(self._heap, job)
+            self._queued += 1
+            self._cond.notify()
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            with self._cond:
+                if job.state == "queued":
+                    self._drop(job)
+            raise
+
+    def _drop(self, job: _Job) -> None:
+        """Mark a queued job as dropped (caller holds the lock)."""
+        job.state = "dropped"
+        self._queued -= 1
+        if self._latest_partial.get(job.session_key) is job:
+            del self._latest_partial[job.session_key]
+        job.loop.call_soon_threadsafe(_resolve, job.future, None, None)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"{self.name}-worker-{i}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while True:
+                while self._heap:
+                    job = heapq.heappop(self._heap)
+                    if job.state != "queued":
+                        continue
+                    job.state = "running"
+                    self._queued -= 1
+                    if self._latest_partial.get(job.session_key) is job:
+                        del self._latest_partial[job.session_key]
+                    return job
+                if self._shutdown:
+                    return None
+                self._cond.wait()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._total_wait_ms += (time.monotonic() - job.enqueued_at) * 1000
+            try:
+                result, error = job.fn(), None
+                self._completed += 1
+            except Exception as e:  # surfaced to the awaiting coroutine
+                result, error = None, e
+                self._failed += 1
+            try:
+                job.loop.call_soon_threadsafe(_resolve, job.future, result, error)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+    # ------------------------------------------------------------------
+    # Introspection / lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def get_stats(self) -> Dict[str, Any]:
+        started = self._completed + self._failed
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queued,
+            "max_pending": self.max_pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "dropped_stale_partials": self._dropped_stale,
+            "dropped_overload_partials": self._dropped_overload,
+            "avg_queue_wait_ms": round(self._total_wait_ms / started, 2) if started else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Drop queued jobs and stop workers after their current job."""
+        with self._cond:
+            self._shutdown = True
+            for job in self._heap:
+                if job.state == "queued":
+                    self._drop(job)
+            self._heap.clear()
+            self._cond.notify_all()
+        self._threads = []
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -6,24 +6,29 @@ Real-time STT with Voice Activity Detection (VAD) for:
 - Utterance boundary detection
 - Interruption detection (user speaks while AI is talking)
 
-Uses Faster-Whisper with Silero VAD for optimal latency.
+Uses Faster-Whisper with Silero VAD for optimal latency. Partials are decoded
+incrementally (LocalAgreement-2): words confirmed by two consecutive passes
+are committed and their audio trimmed, so each pass only decodes a bounded
+window instead of the whole utterance.
 """
 
 from __future__ import annotations
 
 import asyncio
-import io
 import logging
+import re
+import threading
 import time
-import wave
-from collections import deque
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import AsyncGenerator, Callable, Optional, List, Tuple
+from typing import AsyncGenerator, Callable, Dict, Optional, List, Tuple, Union
 
 import numpy as np
 
 from api.core.config import settings
 from api.services.dual_stream.dual_stream_state import TranscriptResult
+from api.services.dual_stream.inference_runner import InferenceRunner
 
 logger = logging.getLogger(__name__)
 
@@ -52,39 +57,142 @@ class STTConfig:
     min_speech_duration_ms: int = 250
     min_silence_duration_ms: int = 500
     speech_pad_ms: int = 30
+    vad_model_path: str = ""  # Silero ONNX file; empty = torch.hub download
+    vad_batch_wait_ms: float = 2.0  # Tick for batching frames across sessions
+    vad_max_batch: int = 256  # Max sessions per ONNX call
     
     # Streaming settings
     chunk_duration_ms: int = 100  # Process every 100ms
     partial_update_interval_ms: int = 300  # Update partials every 300ms
     max_buffer_duration_s: float = 30.0  # Max buffer size
+    
+    # Incremental decoding (LocalAgreement-2)
+    incremental_decoding: bool = True
+    trim_window_s: float = 8.0  # Trim committed audio once the window exceeds this
+    max_window_s: float = 15.0  # Hard cap: force-commit older words beyond this
+    prompt_chars: int = 200  # Committed text passed as initial_prompt
+    
+    # Shared inference pool
+    inference_workers: int = 2
+    max_pending_jobs: int = 64  # queued partials beyond this are dropped
 
 
 # ============================================================
 # AUDIO BUFFER
 # ============================================================
 
+class PCMRingBuffer:
+    """
+    Bounded int16 sample buffer over one preallocated contiguous array.
+
+    Samples are addressed by absolute index since the last ``clear()`` so
+    callers can trim and re-read windows. Retained samples always stay
+    contiguous (compacted on wrap), so ``view`` never copies.
+    """
+
+    def __init__(self, capacity_samples: int):
+        self._data = np.zeros(max(1, int(capacity_samples)), dtype=np.int16)
+        self._head = 0  # array offset of the oldest retained sample
+        self._len = 0
+        self._first = 0  # absolute index of the oldest retained sample
+
+    @property
+    def capacity(self) -> int:
+        return self._data.size
+
+    @property
+    def start_index(self) -> int:
+        return self._first
+
+    @property
+    def end_index(self) -> int:
+        return self._first + self._len
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, chunk: Union[bytes, np.ndarray]) -> None:
+        if isinstance(chunk, np.ndarray):
+            samples = chunk.astype(np.int16, copy=False).ravel()
+        else:
+            samples = np.frombuffer(chunk, dtype=np.int16, count=len(chunk) // 2)
+        n = samples.size
+        if n == 0:
+            return
+
+        cap = self._data.size
+        if n >= cap:
+            self._first += self._len + n - cap
+            self._data[:] = samples[-cap:]
+            self._head, self._len = 0, cap
+            return
+
+        overflow = self._len + n - cap
+        if overflow > 0:
+            # Drop the oldest samples (ring behaviour)
+            self._head += overflow
+            self._len -= overflow
+            self._first += overflow
+        if self._head + self._len + n > cap:
+            self._data[:self._len] = self._data[self._head:self._head + self._len]
+            self._head = 0
+        tail = self._head + self._len
+        self._data[tail:tail + n] = samples
+        self._len += n
+
+    def view(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Read-only view of samples in [start, end) (absolute indices)."""
+        lo = self._first if start is None else min(max(start, self._first), self.end_index)
+        hi = self.end_index if end is None else min(max(end, lo), self.end_index)
+        out = self._data[self._head + lo - self._first:self._head + hi - self._first]
+        out.flags.writeable = False
+        return out
+
+    def trim(self, before: int) -> None:
+        """Drop samples with absolute index < before."""
+        drop = min(max(0, before - self._first), self._len)
+        self._head += drop
+        self._len -= drop
+        self._first += drop
+        if self._len == 0:
+            self._head = 0
+
+    def to_bytes(self) -> bytes:
+        return self.view().tobytes()
+
+    def clear(self) -> None:
+        self._head = 0
+        self._len = 0
+        self._first = 0
+
+
 @dataclass
 class AudioBuffer:
     """
-    Ring buffer for audio chunks with VAD state tracking.
+    Audio buffer with VAD state tracking.
     
     Maintains:
-    - Raw audio bytes
+    - Raw audio and speech audio in preallocated int16 ring buffers
     - Speech/silence state
     - Timestamps for boundary detection
     """
     config: STTConfig = field(default_factory=STTConfig)
     
-    _chunks: deque = field(default_factory=lambda: deque(maxlen=1000))
-    _speech_chunks: List[bytes] = field(default_factory=list)
+    _audio: PCMRingBuffer = field(init=False)
+    _speech: PCMRingBuffer = field(init=False)
     _is_speaking: bool = False
     _speech_start_time: float = 0.0
     _last_speech_time: float = 0.0
     _total_duration_ms: int = 0
     
+    def __post_init__(self) -> None:
+        capacity = int(self.config.max_buffer_duration_s * self.config.sample_rate * self.config.channels)
+        self._audio = PCMRingBuffer(capacity)
+        self._speech = PCMRingBuffer(capacity)
+    
     def add(self, chunk: bytes) -> None:
         """Add audio chunk to buffer."""
-        self._chunks.append(chunk)
+        self._audio.append(chunk)
         chunk_duration = len(chunk) / (
             self.config.sample_rate * 
             self.config.channels * 
@@ -94,7 +202,7 @@ class AudioBuffer:
     
     def add_speech_chunk(self, chunk: bytes) -> None:
         """Add chunk identified as speech."""
-        self._speech_chunks.append(chunk)
+        self._speech.append(chunk)
         self._last_speech_time = time.time()
         if not self._is_speaking:
             self._is_speaking = True
@@ -107,24 +215,29 @@ class AudioBuffer:
             if silence_duration >= self.config.min_silence_duration_ms:
                 self._is_speaking = False
     
+    @property
+    def speech(self) -> PCMRingBuffer:
+        """Speech samples (absolute indices reset by clear_speech)."""
+        return self._speech
+    
     def get_speech_audio(self) -> bytes:
         """Get accumulated speech audio."""
-        return b"".join(self._speech_chunks)
+        return self._speech.to_bytes()
     
     def get_all_audio(self) -> bytes:
         """Get all buffered audio."""
-        return b"".join(self._chunks)
+        return self._audio.to_bytes()
     
     def clear_speech(self) -> None:
         """Clear speech buffer after processing."""
-        self._speech_chunks.clear()
+        self._speech.clear()
         self._is_speaking = False
         self._speech_start_time = 0.0
     
     def clear(self) -> None:
         """Clear all buffers."""
-        self._chunks.clear()
-        self._speech_chunks.clear()
+        self._audio.clear()
+        self._speech.clear()
         self._is_speaking = False
         self._speech_start_time = 0.0
         self._last_speech_time = 0.0
@@ -136,9 +249,11 @@ class AudioBuffer:
     
     @property
     def speech_duration_ms(self) -> int:
-        if not self._is_speaking:
+        if not self._speech_start_time:
             return 0
-        return int((time.time() - self._speech_start_time) * 1000)
+        # After speech stops, report the finished utterance's length
+        end = time.time() if self._is_speaking else self._last_speech_time
+        return int((end - self._speech_start_time) * 1000)
     
     @property
     def total_duration_ms(self) -> int:
@@ -149,10 +264,182 @@ class AudioBuffer:
         return self.speech_duration_ms >= self.config.min_speech_duration_ms
 
 
+# ============================================================
+# INCREMENTAL DECODING
+# ============================================================
+
+@dataclass
+class TimedWord:
+    """Decoded word with absolute sample bounds in the speech buffer."""
+    start: int
+    end: int
+    text: str
+    
+    @property
+    def key(self) -> str:
+        return _normalize_word(self.text)
+
+
+_WORD_STRIP = re.compile(r"[^\w']+")
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD_STRIP.sub("", word.lower())
+
+
+def _join_words(words: List[TimedWord]) -> str:
+    return "".join(w.text for w in words).strip()
+
+
+class IncrementalTranscript:
+    """
+    LocalAgreement-2 state for one utterance.
+    
+    Each pass decodes only the uncommitted window of the speech buffer.
+    Words on which two consecutive passes agree become committed; once the
+    window is longer than ``trim_window_s`` the buffer is trimmed to the end
+    of the last committed word, so per-pass cost stays bounded however long
+    the learner speaks.
+    """
+    
+    def __init__(self, config: STTConfig):
+        self.config = config
+        self.committed: List[TimedWord] = []
+        self._tentative: List[TimedWord] = []
+        self._window_start = 0
+    
+    @property
+    def committed_end(self) -> int:
+        return self.committed[-1].end if self.committed else self._window_start
+    
+    @property
+    def window_start(self) -> int:
+        return self._window_start
+    
+    def prompt(self) -> str:
+        """Committed text used as Whisper's initial_prompt for context."""
+        text = _join_words(self.committed)
+        return text[-self.config.prompt_chars:] if text else ""
+    
+    def window(self, ring: PCMRingBuffer) -> Tuple[np.ndarray, int]:
+        """Float32 audio still to decode, and its absolute start index."""
+        start = max(self._window_start, ring.start_index)
+        samples = ring.view(start)
+        return samples.astype(np.float32) / 32768.0, start
+    
+    def _new_words(self, words: List[TimedWord]) -> List[TimedWord]:
+        """Drop words that re-decode already committed audio."""
+        slack = int(0.1 * self.config.sample_rate)
+        fresh = [w for w in words if w.start >= self.committed_end - slack]
+        # Whisper often repeats the tail of the prompt; drop matching n-grams
+        tail = [w.key for w in self.committed[-5:]]
+        for n in range(min(len(tail), len(fresh)), 0, -1):
+            if [w.key for w in fresh[:n]] == tail[-n:]:
+                return fresh[n:]
+        return fresh
+    
+    def update(self, words: List[TimedWord], ring: PCMRingBuffer) -> str:
+        """Apply one partial pass; returns committed + tentative text."""
+        words = self._new_words(words)
+        
+        agreed = 0
+        for new, old in zip(words, self._tentative):
+            if new.key != old.key:
+                break
+            agreed += 1
+        self.committed.extend(words[:agreed])
+        self._tentative = words[agreed:]
+        
+        sr = self.config.sample_rate
+        window_len = ring.end_index - self._window_start
+        if window_len > self.config.max_window_s * sr:
+            # No agreement for too long: commit words well behind the live edge
+            horizon = ring.end_index - sr
+            forced = [w for w in self._tentative if w.end <= horizon]
+            self.committed.extend(forced)
+            self._tentative = self._tentative[len(forced):]
+            if not forced and not self.committed:
+                self._window_start = ring.end_index - int(self.config.trim_window_s * sr)
+        
+        if self.committed and ring.end_index - self._window_start > self.config.trim_window_s * sr:
+            self._window_start = max(self._window_start, self.committed[-1].end)
+            ring.trim(self._window_start)
+        
+        return self.text()
+    
+    def finalize(self, words: List[TimedWord]) -> str:
+        """Apply the final pass over the remaining window."""
+        self.committed.extend(self._new_words(words))
+        self._tentative = []
+        return _join_words(self.committed)
+    
+    def text(self) -> str:
+        return _join_words(self.committed + self._tentative)
+    
+    def reset(self) -> None:
+        self.committed = []
+        self._tentative = []
+        self._window_start = 0
+
+
 # ============================================================
 # VAD WRAPPER
 # ============================================================
 
+class VADStream:
+    """
+    Per-session VAD state.
+    
+    Reslices arbitrary client chunk sizes into fixed model frames and keeps
+    the Silero recurrent state (and v5 context samples) for this session,
+    so sessions can be batched together without interfering.
+    """
+    
+    def __init__(
+        self,
+        frame_size: int,
+        context_size: int = 0,
+        state: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.frame_size = frame_size
+        self._initial_state = {k: v.copy() for k, v in (state or {}).items()}
+        self.state: Dict[str, np.ndarray] = {k: v.copy() for k, v in self._initial_state.items()}
+        self.context = np.zeros(context_size, dtype=np.float32)
+        self.last_prob = 0.0
+        self._buf = np.zeros(frame_size * 8, dtype=np.int16)
+        self._start = 0  # unframed samples live in _buf[_start:_end]
+        self._end = 0
+    
+    def push(self, chunk: bytes) -> np.ndarray:
+        """
+        Append a chunk and return the complete frames it produced as an
+        int16 (n_frames, frame_size) view, valid until the next push.
+        """
+        tail = self._end - self._start
+        if self._start:
+            self._buf[:tail] = self._buf[self._start:self._end]
+            self._start, self._end = 0, tail
+        
+        new = np.frombuffer(chunk, dtype=np.int16, count=len(chunk) // 2)
+        total = tail + new.size
+        if total > self._buf.size:
+            grown = np.zeros(max(total, self._buf.size * 2), dtype=np.int16)
+            grown[:tail] = self._buf[:tail]
+            self._buf = grown
+        self._buf[tail:total] = new
+        self._end = total
+        
+        n_frames = total // self.frame_size
+        self._start = n_frames * self.frame_size
+        return self._buf[:self._start].reshape(n_frames, self.frame_size)
+    
+    def reset(self) -> None:
+        self.state = {k: v.copy() for k, v in self._initial_state.items()}
+        self.context[:] = 0.0
+        self.last_prob = 0.0
+        self._start = self._end = 0
+
+
 class VADProcessor:
     """
     Voice Activity Detection using Silero VAD.
@@ -161,77 +448,290 @@ class VADProcessor:
     - Frame-level speech probability
     - Utterance boundary detection
     - Interruption detection
+    
+    Frames from all sessions that arrive within one tick
+    (``vad_batch_wait_ms``) are evaluated in a single batched ONNX call on a
+    dedicated thread; each session keeps its own recurrent state in a
+    ``VADStream``. Without the model, a vectorised energy detector is used.
     """
     
+    ENERGY_SPEECH_LEVEL = 0.1  # normalised RMS above which energy VAD reports speech
+    
     def __init__(self, config: STTConfig):
         self.config = config
-        self._model = None
+        self._session = None  # onnxruntime.InferenceSession
         self._is_loaded = False
+        self._load_lock = threading.Lock()
+        
+        self.frame_size = 512 if config.sample_rate == 16000 else 256
+        self._context_size = 0
+        self._state_inputs: List[str] = []
+        self._state_template: Dict[str, np.ndarray] = {}
+        self._sr = np.array(config.sample_rate, dtype=np.int64)
+        
+        # Cross-session batching
+        self._pending: List[Tuple[VADStream, np.ndarray, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vad")
+        
+        # Reusable scratch buffer for the energy fallback
+        self._scratch = np.zeros(self.frame_size * 8, dtype=np.float32)
+        
+        # Metrics
+        self._batches = 0
+        self._batched_frames = 0
     
     def _load_model(self):
-        """Lazy load Silero VAD model."""
+        """Lazy load the Silero VAD ONNX session."""
         if self._is_loaded:
             return
         
-        try:
-            import torch
-            
-            model, utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=True,  # Use ONNX for faster inference
-            )
-            self._model = model
-            self._get_speech_timestamps = utils[0]
+        with self._load_lock:
+            if self._is_loaded:
+                return
+            try:
+                self._session = self._open_session()
+                self._configure_session()
+                logger.info(f"✓ Silero VAD loaded (ONNX, batched, frame={self.frame_size})")
+            except Exception as e:
+                logger.warning(f"Silero VAD not available: {e}, using energy-based VAD")
+                self._session = None
             self._is_loaded = True
-            logger.info("✓ Silero VAD loaded (ONNX)")
+    
+    def _open_session(self):
+        if self.config.vad_model_path:
+            import onnxruntime
             
-        except Exception as e:
-            logger.warning(f"Silero VAD not available: {e}, using energy-based VAD")
-            self._model = None
-            self._is_loaded = True
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = 1
+            options.inter_op_num_threads = 1
+            return onnxruntime.InferenceSession(
+                self.config.vad_model_path,
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+        
+        import torch
+        
+        model, _ = torch.hub.load(
+            repo_or_dir='snakers4/silero-vad',
+            model='silero_vad',
+            force_reload=False,
+            onnx=True,  # Use ONNX for faster inference
+        )
+        return model.session
+    
+    def _configure_session(self) -> None:
+        """Detect Silero v4 (h/c) vs v5 (state + context) input layout."""
+        inputs = {i.name: i for i in self._session.get_inputs()}
+        if "state" in inputs:
+            self._state_inputs = ["state"]
+            self._context_size = 64 if self.config.sample_rate == 16000 else 32
+        else:
+            self._state_inputs = ["h", "c"]
+            self._context_size = 0
+        for name in self._state_inputs:
+            shape = inputs[name].shape
+            layers = shape[0] if isinstance(shape[0], int) else 2
+            width = shape[-1] if isinstance(shape[-1], int) else (128 if name == "state" else 64)
+            self._state_template[name] = np.zeros((layers, width), dtype=np.float32)
+    
+    def create_stream(self) -> VADStream:
+        """Per-session VAD state."""
+        self._load_model()
+        return VADStream(self.frame_size, self._context_size, self._state_template)
+    
+    # ------------------------------------------------------------------
+    # Streaming API
+    # ------------------------------------------------------------------
     
-    def is_speech(self, audio_bytes: bytes) -> Tuple[bool, float]:
+    async def process(self, stream: VADStream, chunk: bytes) -> Tuple[bool, float]:
         """
-        Detect if audio chunk contains speech.
+        Detect speech in a chunk for one session.
+        
+        Returns:
+            Tuple of (is_speech, confidence); the max over the chunk's frames,
+            or the previous decision if the chunk did not complete a frame
+        """
+        frames = stream.push(chunk)
+        if frames.shape[0] == 0:
+            return self._decision(stream.last_prob)
+        
+        if self._session is None:
+            probs = self._energy_probs(frames)
+        else:
+            x = frames.astype(np.float32)
+            x *= 1.0 / 32768.0
+            try:
+                probs = await self._submit(stream, x)
+            except Exception as e:
+                logger.warning(f"VAD error: {e}")
+                probs = self._energy_probs(frames)
+        
+        stream.last_prob = float(probs[-1])
+        return self._decision(float(probs.max()))
+    
+    def is_speech(self, audio_bytes: bytes, stream: Optional[VADStream] = None) -> Tuple[bool, float]:
+        """
+        Synchronous, unbatched detection (stateless unless a stream is given).
         
         Returns:
             Tuple of (is_speech, confidence)
         """
         self._load_model()
+        stateful = stream is not None
+        stream = stream or self.create_stream()
+        frames = stream.push(audio_bytes)
+        if frames.shape[0] == 0:
+            if stateful:
+                return self._decision(stream.last_prob)
+            # Shorter than one frame: zero-pad a single frame
+            padded = np.zeros((1, self.frame_size), dtype=np.int16)
+            samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
+            padded[0, :samples.size] = samples[:self.frame_size]
+            frames = padded
+        
+        if self._session is None:
+            probs = self._energy_probs(frames)
+        else:
+            try:
+                x = frames.astype(np.float32) / 32768.0
+                probs = self._infer_batch([(stream, x, None)])[0]
+            except Exception as e:
+                logger.warning(f"VAD error: {e}")
+                probs = self._energy_probs(frames)
+        stream.last_prob = float(probs[-1])
+        return self._decision(float(probs.max()))
+    
+    def _decision(self, prob: float) -> Tuple[bool, float]:
+        threshold = self.config.vad_threshold if self._session is not None else self.ENERGY_SPEECH_LEVEL
+        return prob >= threshold, prob
+    
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "vad_batches": self._batches,
+            "vad_frames": self._batched_frames,
+            "vad_avg_rows": round(self._batched_frames / self._batches, 2) if self._batches else 0.0,
+            "vad_queue_depth": len(self._pending),
+        }
+    
+    # ------------------------------------------------------------------
+    # Batched inference
+    # ------------------------------------------------------------------
+    
+    def _ensure_worker(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._pending = []
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        return loop
+    
+    async def _submit(self, stream: VADStream, frames: np.ndarray) -> np.ndarray:
+        loop = self._ensure_worker()
+        future = loop.create_future()
+        self._pending.append((stream, frames, future))
+        self._wakeup.set()
+        return await future
+    
+    def _take_batch(self) -> List[Tuple[VADStream, np.ndarray, asyncio.Future]]:
+        """Up to vad_max_batch requests, at most one per stream (state is sequential)."""
+        batch, rest, seen = [], [], set()
+        for item in self._pending:
+            if item[2].done():
+                continue
+            if len(batch) < self.config.vad_max_batch and id(item[0]) not in seen:
+                seen.add(id(item[0]))
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._pending = rest
+        if not rest:
+            self._wakeup.clear()
+        return batch
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if self.config.vad_batch_wait_ms > 0:
+                # Let other sessions' chunks for this tick arrive
+                await asyncio.sleep(self.config.vad_batch_wait_ms / 1000.0)
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self._executor, self._infer_batch, batch)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), probs in zip(batch, results):
+                if not future.done():
+                    future.set_result(probs)
+    
+    def _infer_batch(self, batch) -> List[np.ndarray]:
+        """
+        Run Silero over every stream's frames.
         
-        if self._model is None:
-            # Fallback: energy-based VAD
-            return self._energy_vad(audio_bytes)
+        Step t feeds frame t of every stream that has one, so each ONNX call
+        is batched across sessions while frames within a stream stay ordered.
+        """
+        probs = [np.zeros(frames.shape[0], dtype=np.float32) for _, frames, _ in batch]
+        steps = max(frames.shape[0] for _, frames, _ in batch)
+        ctx = self._context_size
         
-        try:
-            import torch
-            
-            # Convert bytes to tensor
-            audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-            audio_tensor = torch.from_numpy(audio_np)
+        for t in range(steps):
+            rows = [i for i, (_, frames, _) in enumerate(batch) if frames.shape[0] > t]
+            streams = [batch[i][0] for i in rows]
+            x = np.stack([batch[i][1][t] for i in rows])
+            if ctx:
+                x = np.concatenate([np.stack([s.context for s in streams]), x], axis=1)
             
-            # Get speech probability
-            speech_prob = self._model(audio_tensor, self.config.sample_rate).item()
-            is_speech = speech_prob >= self.config.vad_threshold
+            feeds = {"input": x, "sr": self._sr}
+            for name in self._state_inputs:
+                feeds[name] = np.stack([s.state[name] for s in streams], axis=1)
+            outputs = self._session.run(None, feeds)
             
-            return is_speech, speech_prob
+            out = np.asarray(outputs[0]).reshape(len(rows), -1)[:, 0]
+            for j, (i, s) in enumerate(zip(rows, streams)):
+                probs[i][t] = out[j]
+                for k, name in enumerate(self._state_inputs):
+                    s.state[name] = np.ascontiguousarray(outputs[1 + k][:, j])
+                if ctx:
+                    s.context = x[j, -ctx:].copy()
             
-        except Exception as e:
-            logger.warning(f"VAD error: {e}")
-            return self._energy_vad(audio_bytes)
+            self._batches += 1
+            self._batched_frames += len(rows)
+        return probs
     
-    def _energy_vad(self, audio_bytes: bytes) -> Tuple[bool, float]:
-        """Simple energy-based VAD as fallback."""
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
-        energy = np.sqrt(np.mean(audio_np ** 2))
+    # ------------------------------------------------------------------
+    # Energy fallback
+    # ------------------------------------------------------------------
+    
+    def _energy_probs(self, frames: np.ndarray) -> np.ndarray:
+        """Normalised per-frame RMS in one vectorised pass over a reusable buffer."""
+        n = frames.size
+        if self._scratch.size < n:
+            self._scratch = np.zeros(max(n, self._scratch.size * 2), dtype=np.float32)
+        x = self._scratch[:n].reshape(frames.shape)
+        np.copyto(x, frames, casting="unsafe")
+        energy = np.sqrt(np.einsum("ij,ij->i", x, x) / frames.shape[1])
         
         # Normalize to 0-1 range (assuming 16-bit audio)
-        normalized_energy = min(energy / 3000.0, 1.0)
-        is_speech = normalized_energy > 0.1
-        
-        return is_speech, normalized_energy
+        return np.minimum(energy / 3000.0, 1.0)
+    
+    def _energy_vad(self, audio_bytes: bytes) -> Tuple[bool, float]:
+        """Simple energy-based VAD as fallback."""
+        samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
+        if samples.size == 0:
+            return False, 0.0
+        normalized_energy = float(self._energy_probs(samples.reshape(1, -1))[0])
+        return normalized_energy > self.ENERGY_SPEECH_LEVEL, normalized_energy
     
     def detect_utterance_end(
         self,
@@ -255,6 +755,42 @@ class VADProcessor:
         return silence_ms >= self.config.min_silence_duration_ms
 
 
+# ============================================================
+# PER-SESSION STATE
+# ============================================================
+
+class STTSession:
+    """
+    Streaming state for one WebSocket session.
+    
+    The Whisper model, VAD and inference runner are shared by the service;
+    everything that changes per utterance lives here.
+    """
+    
+    def __init__(
+        self,
+        config: STTConfig,
+        session_id: Optional[str] = None,
+        vad_stream: Optional[VADStream] = None,
+    ):
+        self.session_id = session_id or f"stt-{id(self):x}"
+        self.started_at = time.monotonic()
+        self.buffer = AudioBuffer(config)
+        self.vad_stream = vad_stream
+        self.transcript = IncrementalTranscript(config) if config.incremental_decoding else None
+        self.is_ai_speaking = False
+        self.last_partial_time = 0.0
+    
+    def set_ai_speaking(self, is_speaking: bool) -> None:
+        """Update AI speaking state for interruption detection."""
+        self.is_ai_speaking = is_speaking
+    
+    def end_utterance(self) -> None:
+        self.buffer.clear_speech()
+        if self.transcript is not None:
+            self.transcript.reset()
+
+
 # ============================================================
 # STREAMING STT SERVICE
 # ============================================================
@@ -268,10 +804,13 @@ class StreamingSTTService:
     - Final transcripts when utterance complete
     - Interruption detection
     - Optimized for low latency
+    - Shared bounded inference pool: finals before partials, stale
+      partials dropped, state kept per session
     
     Usage:
         stt = StreamingSTTService()
-        async for result in stt.stream_transcribe(audio_chunks):
+        session = stt.create_session(session_id)
+        async for result in stt.stream_transcribe(audio_chunks, session=session):
             if result.is_partial:
                 update_ui(result.text)
             elif result.is_final:
@@ -285,11 +824,19 @@ class StreamingSTTService:
             model_name=getattr(settings, "STT_MODEL_NAME", "base"),
             device=getattr(settings, "STT_DEVICE", "cuda"),
             compute_type=getattr(settings, "STT_COMPUTE_TYPE", "float16"),
+            vad_model_path=getattr(settings, "VAD_MODEL_PATH", ""),
+            inference_workers=getattr(settings, "STT_INFERENCE_WORKERS", 2),
+            max_pending_jobs=getattr(settings, "STT_MAX_PENDING_JOBS", 64),
         )
         self._model = None
+        self._model_lock = threading.Lock()
         self._vad = VADProcessor(self.config)
-        self._is_ai_speaking = False
-        self._last_partial_time = 0.0
+        self._runner = InferenceRunner(
+            workers=self.config.inference_workers,
+            max_pending=self.config.max_pending_jobs,
+            name="stt",
+        )
+        self._sessions: "weakref.WeakSet[STTSession]" = weakref.WeakSet()
     
     def _load_model(self):
         """Lazy load Whisper model."""
@@ -301,23 +848,42 @@ class StreamingSTTService:
         except ImportError:
             raise RuntimeError("faster-whisper not installed")
         
-        logger.info(f"Loading Whisper: {self.config.model_name} on {self.config.device}")
-        self._model = WhisperModel(
-            self.config.model_name,
-            device=self.config.device,
-            compute_type=self.config.compute_type,
-        )
-        logger.info("✓ Whisper loaded")
+        with self._model_lock:
+            if self._model is None:
+                logger.info(f"Loading Whisper: {self.config.model_name} on {self.config.device}")
+                self._model = WhisperModel(
+                    self.config.model_name,
+                    device=self.config.device,
+                    compute_type=self.config.compute_type,
+                    num_workers=self.config.inference_workers,
+                )
+                logger.info("✓ Whisper loaded")
         return self._model
     
+    def create_session(self, session_id: Optional[str] = None) -> STTSession:
+        """Create streaming state for one client session."""
+        session = STTSession(self.config, session_id, self._vad.create_stream())
+        self._sessions.add(session)
+        return session
+    
     def set_ai_speaking(self, is_speaking: bool) -> None:
-        """Update AI speaking state for interruption detection."""
-        self._is_ai_speaking = is_speaking
+        """Update AI speaking state on every live session (prefer STTSession.set_ai_speaking)."""
+        for session in list(self._sessions):
+            session.set_ai_speaking(is_speaking)
+    
+    def get_stats(self) -> dict:
+        """Inference pool metrics plus number of live sessions."""
+        return {
+            **self._runner.get_stats(),
+            **self._vad.get_stats(),
+            "sessions": len(self._sessions),
+        }
     
     async def stream_transcribe(
         self,
         audio_chunks: AsyncGenerator[bytes, None],
         on_interruption: Optional[Callable[[], None]] = None,
+        session: Optional[STTSession] = None,
     ) -> AsyncGenerator[TranscriptResult, None]:
         """
         Stream transcription from audio chunks.
@@ -325,69 +891,113 @@ class StreamingSTTService:
         Args:
             audio_chunks: Async generator yielding audio bytes
             on_interruption: Callback when user interrupts AI
+            session: Per-session state (a fresh one is created if omitted)
             
         Yields:
             TranscriptResult with partial, final, or interruption
         """
-        model = self._load_model()
-        buffer = AudioBuffer(self.config)
+        self._load_model()
+        session = session or self.create_session()
+        if session.vad_stream is None:
+            session.vad_stream = self._vad.create_stream()
+        buffer = session.buffer
         
-        async for chunk in audio_chunks:
-            # Add to buffer
-            buffer.add(chunk)
-            
-            # VAD check
-            is_speech, confidence = self._vad.is_speech(chunk)
-            
-            if is_speech:
-                buffer.add_speech_chunk(chunk)
+        # Partials run in the background so audio keeps flowing; only the
+        # newest one is reported (older queued ones are dropped by the runner)
+        latest_partial: Optional[asyncio.Task] = None
+        partial_confidence = 0.0
+        in_flight: set = set()
+        
+        def cancel_partials() -> None:
+            for task in in_flight:
+                task.cancel()
+        
+        try:
+            async for chunk in audio_chunks:
+                if latest_partial is not None and latest_partial.done():
+                    partial_text = "" if latest_partial.cancelled() else latest_partial.result()
+                    latest_partial = None
+                    if partial_text:
+                        yield TranscriptResult.partial(partial_text, partial_confidence)
                 
-                # Check for interruption
-                if self._is_ai_speaking:
-                    self._is_ai_speaking = False
-                    if on_interruption:
-                        on_interruption()
-                    yield TranscriptResult.interruption()
+                # Add to buffer
+                buffer.add(chunk)
                 
-                # Check if should send partial
-                now = time.time()
-                if (now - self._last_partial_time) * 1000 >= self.config.partial_update_interval_ms:
-                    if buffer.has_minimum_speech():
-                        partial_text = await self._transcribe_buffer(buffer, is_partial=True)
-                        if partial_text:
-                            self._last_partial_time = now
-                            yield TranscriptResult.partial(partial_text, confidence)
-            else:
-                buffer.mark_silence()
+                # VAD check (batched across sessions)
+                is_speech, confidence = await self._vad.process(session.vad_stream, chunk)
                 
-                # Check for utterance end
-                if self._vad.detect_utterance_end(buffer):
-                    if buffer.has_minimum_speech():
-                        final_text = await self._transcribe_buffer(buffer, is_partial=False)
-                        if final_text:
-                            yield TranscriptResult.final(
-                                final_text,
-                                confidence=0.9,
-                            )
-                    buffer.clear_speech()
+                if is_speech:
+                    buffer.add_speech_chunk(chunk)
+                    
+                    # Check for interruption
+                    if session.is_ai_speaking:
+                        session.is_ai_speaking = False
+                        if on_interruption:
+                            on_interruption()
+                        yield TranscriptResult.interruption()
+                    
+                    # Check if should send partial
+                    now = time.time()
+                    if (now - session.last_partial_time) * 1000 >= self.config.partial_update_interval_ms:
+                        if buffer.has_minimum_speech():
+                            session.last_partial_time = now
+                            partial_confidence = confidence
+                            if session.transcript is not None:
+                                latest_partial = asyncio.create_task(self._transcribe_incremental(session))
+                            else:
+                                latest_partial = asyncio.create_task(
+                                    self._transcribe_buffer(session, is_partial=True)
+                                )
+                            in_flight.add(latest_partial)
+                            latest_partial.add_done_callback(in_flight.discard)
+                else:
+                    buffer.mark_silence()
+                    
+                    # Check for utterance end
+                    if self._vad.detect_utterance_end(buffer):
+                        cancel_partials()
+                        latest_partial = None
+                        if buffer.has_minimum_speech():
+                            if session.transcript is not None:
+                                final_text = await self._transcribe_incremental(session, is_final=True)
+                            else:
+                                final_text = await self._transcribe_buffer(session, is_partial=False)
+                            if final_text:
+                                yield TranscriptResult.final(
+                                    final_text,
+                                    confidence=0.9,
+                                )
+                        session.end_utterance()
+        finally:
+            cancel_partials()
+    
+    async def _run(self, session: STTSession, fn: Callable[[], object], is_partial: bool):
+        """Run blocking inference on the shared pool (None if the job was dropped)."""
+        try:
+            return await self._runner.submit(
+                fn,
+                session_key=session.session_id,
+                session_started=session.started_at,
+                is_partial=is_partial,
+            )
+        except Exception as e:
+            logger.warning(f"Transcription error: {e}")
+            return None
     
     async def _transcribe_buffer(
         self,
-        buffer: AudioBuffer,
+        session: STTSession,
         is_partial: bool = False,
     ) -> str:
-        """Transcribe audio buffer."""
+        """Transcribe the whole speech buffer."""
         model = self._model
         
-        audio_bytes = buffer.get_speech_audio()
-        if not audio_bytes:
+        speech = session.buffer.speech
+        if not len(speech):
             return ""
         
         # Convert to format Whisper expects
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-        
-        # Run in thread pool to not block
-        loop = asyncio.get_event_loop()
+        audio_np = speech.view().astype(np.float32) / 32768.0
         
         def transcribe():
             segments, _ = model.transcribe(
@@ -399,12 +1009,53 @@ class StreamingSTTService:
             )
             return "".join(segment.text for segment in segments).strip()
         
-        try:
-            text = await loop.run_in_executor(None, transcribe)
-            return text
-        except Exception as e:
-            logger.warning(f"Transcription error: {e}")
-            return ""
+        text = await self._run(session, transcribe, is_partial)
+        return text or ""
+    
+    async def _transcribe_incremental(
+        self,
+        session: STTSession,
+        is_final: bool = False,
+    ) -> str:
+        """Decode only the uncommitted window and merge it into the transcript."""
+        model = self._model
+        transcript = session.transcript
+        buffer = session.buffer
+        audio_np, offset = transcript.window(buffer.speech)
+        if audio_np.size == 0:
+            return transcript.finalize([]) if is_final else transcript.text()
+        
+        prompt = transcript.prompt() or None
+        sr = self.config.sample_rate
+        
+        def transcribe() -> List[TimedWord]:
+            segments, _ = model.transcribe(
+                audio_np,
+                beam_size=self.config.beam_size if is_final else 1,
+                language=self.config.language,
+                vad_filter=False,  # We handle VAD ourselves
+                initial_prompt=prompt,
+                condition_on_previous_text=False,
+                word_timestamps=True,
+            )
+            words: List[TimedWord] = []
+            for segment in segments:
+                for word in segment.words or []:
+                    words.append(TimedWord(
+                        start=offset + int(word.start * sr),
+                        end=offset + int(word.end * sr),
+                        text=word.word,
+                    ))
+            return words
+        
+        words = await self._run(session, transcribe, is_partial=not is_final)
+        if words is None:
+            # Superseded by a newer partial, shed under load, or failed
+            return transcript.finalize([]) if is_final else ""
+        
+        if is_final:
+            return transcript.finalize(words)
+        return transcript.update(words, buffer.speech)
     
     async def transcribe_audio(self, audio_bytes: bytes) -> TranscriptResult:
         """
@@ -416,8 +1067,6 @@ class StreamingSTTService:
         
         audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
         
-        loop = asyncio.get_event_loop()
-        
         def transcribe():
             segments, info = model.transcribe(
                 audio_np,
@@ -426,8 +1075,12 @@ class StreamingSTTService:
             )
             return "".join(segment.text for segment in segments).strip()
         
-        text = await loop.run_in_executor(None, transcribe)
+        text = await self._runner.submit(transcribe, session_started=time.monotonic())
         return TranscriptResult.final(text)
+    
+    def shutdown(self) -> None:
+        """Stop the inference pool."""
+        self._runner.shutdown()
 
 
 # ============================================================
@@ -438,7 +1091,7 @@ _streaming_stt_service: Optional[StreamingSTTService] = None
 
 
 def get_streaming_stt_service() -> StreamingSTTService:
-    """Get or create StreamingSTTService singleton."""
+    """Get or create StreamingSTTService singleton (shared model + inference pool)."""
     global _streaming_stt_service
     if _streaming_stt_service is None:
         _streaming_stt_service = StreamingSTTService()
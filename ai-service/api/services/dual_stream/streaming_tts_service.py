@@ -3,7 +3,8 @@ Streaming Text-to-Speech Service
 
 Chunked TTS output for real-time speech generation with:
 - Sentence-level chunking for fast first output
-- Interruptible playback
+- Pipelined synthesis: chunk i+1 is synthesized while chunk i is sent
+- Interruptible playback (look-ahead is cancelled on stop)
 - Pre-caching common phrases
 - Smooth audio concatenation
 
@@ -14,14 +15,17 @@ from __future__ import annotations
 
 import asyncio
 import io
+import itertools
 import logging
 import re
 import time
 import wave
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import AsyncGenerator, List, Optional, Callable
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Callable, Set, Tuple
 
 from api.core.config import settings
+from api.services.tts_cache import TTSCache, get_tts_cache
 from api.services.dual_stream.dual_stream_state import AudioChunk
 
 logger = logging.getLogger(__name__)
@@ -48,11 +52,14 @@ class TTSConfig:
     speed: float = 0.95           # Slightly slower for learners
     min_chunk_chars: int = 10     # Minimum chars per chunk
     max_chunk_chars: int = 200    # Maximum chars per chunk
-    sentence_pause_ms: int = 300  # Pause between sentences
+    sentence_pause_ms: int = 300  # Pause between sentences (rendered as trailing silence)
+    
+    # Pipelining
+    lookahead_chunks: int = 1     # Chunks synthesized ahead of the one being sent (0 = none)
+    synthesis_workers: int = 1    # Piper's espeak phonemizer is not thread-safe
     
     # Caching
-    enable_cache: bool = True
-    cache_size: int = 100
+    enable_cache: bool = True     # Shared phrase cache (see api.services.tts_cache)
 
 
 # ============================================================
@@ -74,6 +81,38 @@ class TextChunker:
     # Sentence ending patterns
     SENTENCE_END = re.compile(r'([.!?]+)\s*')
     CLAUSE_END = re.compile(r'([,;:]+)\s*')
+    # A sentence end followed by whitespace is final in a token stream
+    STREAM_SENTENCE_END = re.compile(r'[.!?]+\s+')
+    
+    @classmethod
+    def split_complete(
+        cls,
+        text: str,
+        min_chars: int = 20,
+        max_chars: int = 200,
+    ) -> Tuple[List[str], str]:
+        """
+        Split streamed text into chunks that can be spoken now and a remainder.
+        
+        Complete sentences are released as soon as they reach min_chars;
+        text without a sentence end is held until it exceeds max_chars.
+        """
+        split_pos = 0
+        for match in cls.STREAM_SENTENCE_END.finditer(text):
+            if match.end() >= min_chars:
+                split_pos = match.end()
+        
+        ready: List[str] = []
+        if split_pos:
+            ready = cls.chunk(text[:split_pos], min_chars=min_chars, max_chars=max_chars)
+            text = text[split_pos:]
+        
+        if len(text) > max_chars:
+            overflow = cls.chunk(text, min_chars=min_chars, max_chars=max_chars)
+            ready.extend(overflow[:-1])
+            text = overflow[-1] if overflow else ""
+        
+        return ready, text
     
     @classmethod
     def chunk(
@@ -163,51 +202,47 @@ class TextChunker:
         return text[:max_chars], text[max_chars:]
 
 
+_PENDING = object()  # queue peek sentinel: next chunk not produced yet
+
+
 # ============================================================
-# AUDIO CACHE
+# PIPELINE METRICS
 # ============================================================
 
-class AudioCache:
-    """
-    LRU cache for common TTS phrases.
+@dataclass
+class TTSStreamMetrics:
+    """Latency metrics for one streamed response."""
+    started_at: float = field(default_factory=time.perf_counter)
+    first_audio_ms: Optional[float] = None
+    gaps_ms: List[float] = field(default_factory=list)  # time spent waiting on synthesis per chunk
+    chunks: int = 0
+    cached_chunks: int = 0
+    cancelled_lookahead: int = 0
     
-    Caches audio for phrases like:
-    - "Great job!"
-    - "Let me help you..."
-    - Common corrections
-    """
+    def to_dict(self) -> Dict[str, Any]:
+        gaps = self.gaps_ms[1:]  # the first wait is time-to-first-audio
+        return {
+            "time_to_first_audio_ms": round(self.first_audio_ms, 1) if self.first_audio_ms is not None else None,
+            "chunks": self.chunks,
+            "cached_chunks": self.cached_chunks,
+            "max_gap_ms": round(max(gaps), 1) if gaps else 0.0,
+            "avg_gap_ms": round(sum(gaps) / len(gaps), 1) if gaps else 0.0,
+            "cancelled_lookahead": self.cancelled_lookahead,
+        }
+
+
+@dataclass
+class _TTSStream:
+    """Stop flag and in-flight tasks of one streamed response."""
+    stream_id: str
+    should_stop: bool = False
+    current_chunk_index: int = 0
+    tasks: Set[asyncio.Task] = field(default_factory=set)
     
-    def __init__(self, max_size: int = 100):
-        self._cache: dict = {}
-        self._max_size = max_size
-        self._access_order: List[str] = []
-    
-    def get(self, text: str) -> Optional[bytes]:
-        """Get cached audio for text."""
-        key = text.strip().lower()
-        if key in self._cache:
-            # Move to end (most recently used)
-            self._access_order.remove(key)
-            self._access_order.append(key)
-            return self._cache[key]
-        return None
-    
-    def put(self, text: str, audio: bytes) -> None:
-        """Cache audio for text."""
-        key = text.strip().lower()
-        
-        # Evict if full
-        while len(self._cache) >= self._max_size and self._access_order:
-            oldest = self._access_order.pop(0)
-            self._cache.pop(oldest, None)
-        
-        self._cache[key] = audio
-        self._access_order.append(key)
-    
-    def clear(self) -> None:
-        """Clear cache."""
-        self._cache.clear()
-        self._access_order.clear()
+    def stop(self) -> None:
+        self.should_stop = True
+        for task in list(self.tasks):
+            task.cancel()
 
 
 # ============================================================
@@ -220,7 +255,10 @@ class StreamingTTSService:
     
     Features:
     - Sentence-level chunking for fast first audio
-    - Interruptible: can stop mid-stream
+    - Pipelined: synthesizes up to ``lookahead_chunks`` ahead while sending
+    - Interruptible: a stream can be stopped mid-way, cancelling its
+      look-ahead work without touching other sessions' streams
+    - Time-to-first-audio and inter-chunk gap metrics
     - Pre-caching common phrases
     - Smooth audio concatenation
     - Optimized for English learning (slightly slower)
@@ -228,10 +266,10 @@ class StreamingTTSService:
     Usage:
         tts = StreamingTTSService()
         
-        async for chunk in tts.stream_speak(text_generator):
+        async for chunk in tts.stream_speak(text, stream_id=session_id):
             send_audio(chunk.audio_bytes)
             if interrupted:
-                tts.stop()
+                tts.stop(session_id)
                 break
     """
     
@@ -243,10 +281,16 @@ class StreamingTTSService:
         )
         
         self._voice = None
-        self._cache = AudioCache(self.config.cache_size) if self.config.enable_cache else None
-        self._is_speaking = False
-        self._should_stop = False
-        self._current_chunk_index = 0
+        self._cache: Optional[TTSCache] = get_tts_cache() if self.config.enable_cache else None
+        # Active streams by id (the service is shared by all sessions)
+        self._streams: Dict[str, _TTSStream] = {}
+        self._stream_ids = itertools.count(1)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.synthesis_workers),
+            thread_name_prefix="tts",
+        )
+        self.last_metrics: Optional[TTSStreamMetrics] = None
     
     def _load_voice(self):
         """Lazy load Piper voice."""
@@ -271,18 +315,50 @@ class StreamingTTSService:
     
     @property
     def is_speaking(self) -> bool:
-        return self._is_speaking
+        return bool(self._streams)
     
-    def stop(self) -> None:
-        """Stop current TTS output immediately."""
-        self._should_stop = True
-        self._is_speaking = False
-        logger.info("[TTS] Stop requested")
+    def stop(self, stream_id: Optional[str] = None) -> None:
+        """
+        Stop a stream immediately, cancelling its look-ahead synthesis.
+        
+        Args:
+            stream_id: Stream to stop; None stops every active stream
+        """
+        if stream_id is None:
+            streams = list(self._streams.values())
+        else:
+            streams = [self._streams[stream_id]] if stream_id in self._streams else []
+        for stream in streams:
+            stream.stop()
+        logger.info(f"[TTS] Stop requested ({stream_id or 'all streams'})")
+    
+    def _open_stream(self, stream_id: Optional[str]) -> _TTSStream:
+        if stream_id is None:
+            stream_id = f"tts-{next(self._stream_ids)}"
+        previous = self._streams.get(stream_id)
+        if previous is not None:
+            # A new response for the same session supersedes the old one
+            previous.stop()
+        stream = _TTSStream(stream_id=stream_id)
+        self._streams[stream_id] = stream
+        return stream
+    
+    def _close_stream(self, stream: _TTSStream) -> None:
+        if self._streams.get(stream.stream_id) is stream:
+            del self._streams[stream.stream_id]
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrics of the most recent streamed response."""
+        metrics = self.last_metrics.to_dict() if self.last_metrics else {}
+        if self._cache:
+            metrics["cache"] = self._cache.get_stats()
+        return metrics
     
     async def stream_speak(
         self,
         text: str,
         on_chunk: Optional[Callable[[AudioChunk], None]] = None,
+        stream_id: Optional[str] = None,
     ) -> AsyncGenerator[AudioChunk, None]:
         """
         Stream audio chunks from text.
@@ -290,16 +366,11 @@ class StreamingTTSService:
         Args:
             text: Text to synthesize
             on_chunk: Optional callback for each chunk
+            stream_id: Id for stop() (e.g. the session id); generated if omitted
             
         Yields:
             AudioChunk objects with audio data
         """
-        self._is_speaking = True
-        self._should_stop = False
-        self._current_chunk_index = 0
-        
-        voice = self._load_voice()
-        
         # Split text into chunks
         chunks = TextChunker.chunk(
             text,
@@ -307,100 +378,263 @@ class StreamingTTSService:
             max_chars=self.config.max_chunk_chars,
         )
         
-        total_chunks = len(chunks)
+        async def source() -> AsyncIterator[str]:
+            for text_chunk in chunks:
+                yield text_chunk
         
-        for i, text_chunk in enumerate(chunks):
-            if self._should_stop:
-                logger.info(f"[TTS] Stopped at chunk {i}/{total_chunks}")
-                break
-            
-            # Check cache
-            cached_audio = None
-            if self._cache:
-                cached_audio = self._cache.get(text_chunk)
-            
-            if cached_audio:
-                audio_bytes = cached_audio
-            else:
-                # Synthesize
-                audio_bytes = await self._synthesize(voice, text_chunk)
-                
-                # Cache short phrases
-                if self._cache and len(text_chunk) < 50:
-                    self._cache.put(text_chunk, audio_bytes)
-            
-            # Calculate duration
-            duration_ms = self._calculate_duration_ms(audio_bytes)
-            
-            # Create chunk
-            chunk = AudioChunk(
-                audio_bytes=audio_bytes,
-                chunk_index=i,
-                is_final=(i == total_chunks - 1),
-                text_spoken=text_chunk,
-                duration_ms=duration_ms,
-                sample_rate=self.config.sample_rate,
-            )
-            
-            self._current_chunk_index = i
-            
-            if on_chunk:
-                on_chunk(chunk)
-            
+        stream = self._open_stream(stream_id)
+        async for chunk in self._pipeline(stream, source(), on_chunk):
             yield chunk
-            
-            # Small pause between chunks for natural speech
-            if not chunk.is_final and not self._should_stop:
-                await asyncio.sleep(self.config.sentence_pause_ms / 1000)
-        
-        self._is_speaking = False
     
     async def stream_speak_generator(
         self,
         text_generator: AsyncGenerator[str, None],
+        on_chunk: Optional[Callable[[AudioChunk], None]] = None,
+        stream_id: Optional[str] = None,
     ) -> AsyncGenerator[AudioChunk, None]:
         """
         Stream audio from text generator.
         
-        Useful when LLM is generating text progressively.
+        Useful when LLM is generating text progressively: complete sentences
+        enter the same synthesis pipeline as soon as they are generated.
+        ``is_final`` is set on the last chunk if the generator has already
+        finished when that chunk is sent; otherwise an empty final chunk
+        follows.
         """
-        text_buffer = ""
-        
-        async for text_chunk in text_generator:
-            if self._should_stop:
-                break
+        stream = self._open_stream(stream_id)
+        
+        async def source() -> AsyncIterator[str]:
+            text_buffer = ""
+            async for text_chunk in text_generator:
+                if stream.should_stop:
+                    return
+                text_buffer += text_chunk
+                ready, text_buffer = TextChunker.split_complete(
+                    text_buffer,
+                    min_chars=20,
+                    max_chars=self.config.max_chunk_chars,
+                )
+                for chunk_text in ready:
+                    yield chunk_text
             
-            text_buffer += text_chunk
+            # Speak remaining text
+            if text_buffer.strip() and not stream.should_stop:
+                for chunk_text in TextChunker.chunk(
+                    text_buffer,
+                    min_chars=self.config.min_chunk_chars,
+                    max_chars=self.config.max_chunk_chars,
+                ):
+                    yield chunk_text
+        
+        async for chunk in self._pipeline(stream, source(), on_chunk):
+            yield chunk
+    
+    async def _pipeline(
+        self,
+        stream: _TTSStream,
+        texts: AsyncIterator[str],
+        on_chunk: Optional[Callable[[AudioChunk], None]] = None,
+    ) -> AsyncGenerator[AudioChunk, None]:
+        """
+        Synthesize text chunks with bounded look-ahead and yield them in order.
+        
+        A producer task turns text into synthesis tasks while at most
+        ``1 + lookahead_chunks`` chunks are in flight; the slot of a chunk is
+        released only after the caller has consumed it.
+        
+        A chunk is final when the ready queue already holds the end marker.
+        If that was not known in time (the text source was still running, or
+        the chunks after it failed), an empty final chunk closes the stream,
+        so every stream that is not stopped ends with ``is_final=True``.
+        """
+        try:
+            voice = self._load_voice()
+        except Exception:
+            self._close_stream(stream)
+            raise
+        metrics = TTSStreamMetrics()
+        self.last_metrics = metrics
+        
+        slots = asyncio.Semaphore(1 + max(0, self.config.lookahead_chunks))
+        ready: asyncio.Queue = asyncio.Queue()
+        synth_tasks: Set[asyncio.Task] = set()
+        
+        async def produce() -> None:
+            try:
+                async for text_chunk in texts:
+                    await slots.acquire()
+                    if stream.should_stop:
+                        break
+                    task = asyncio.create_task(self._synthesize_cached(voice, text_chunk))
+                    synth_tasks.add(task)
+                    stream.tasks.add(task)
+                    task.add_done_callback(synth_tasks.discard)
+                    task.add_done_callback(stream.tasks.discard)
+                    ready.put_nowait((text_chunk, task))
+            except Exception as e:
+                logger.warning(f"[TTS] Text source failed: {e}")
+            finally:
+                ready.put_nowait(None)
+        
+        producer = asyncio.create_task(produce())
+        stream.tasks.add(producer)
+        producer.add_done_callback(stream.tasks.discard)
+        
+        index = 0
+        sent_final = False
+        try:
+            item = await ready.get()
+            while item is not None and not stream.should_stop:
+                text_chunk, task = item
+                wait_start = time.perf_counter()
+                try:
+                    audio_bytes, from_cache = await task
+                except asyncio.CancelledError:
+                    if stream.should_stop:
+                        break
+                    raise
+                except Exception as e:
+                    logger.warning(f"[TTS] Synthesis failed for chunk {index}: {e}")
+                    slots.release()
+                    item = await ready.get()
+                    continue
+                metrics.gaps_ms.append((time.perf_counter() - wait_start) * 1000)
+                
+                # Peek so the last chunk can be flagged without waiting
+                next_item = ready.get_nowait() if not ready.empty() else _PENDING
+                is_final = next_item is None
+                
+                if not is_final and self.config.sentence_pause_ms > 0:
+                    # Pause between chunks for natural speech, without a wall-clock gap
+                    audio_bytes = self._append_silence(audio_bytes, self.config.sentence_pause_ms)
+                
+                # Create chunk
+                chunk = AudioChunk(
+                    audio_bytes=audio_bytes,
+                    chunk_index=index,
+                    is_final=is_final,
+                    text_spoken=text_chunk,
+                    duration_ms=self._calculate_duration_ms(audio_bytes),
+                    sample_rate=self.config.sample_rate,
+                )
+                
+                stream.current_chunk_index = index
+                metrics.chunks += 1
+                metrics.cached_chunks += int(from_cache)
+                if metrics.first_audio_ms is None:
+                    metrics.first_audio_ms = (time.perf_counter() - metrics.started_at) * 1000
+                
+                if on_chunk:
+                    on_chunk(chunk)
+                
+                yield chunk
+                sent_final = is_final
+                slots.release()
+                index += 1
+                
+                item = next_item if next_item is not _PENDING else await ready.get()
             
-            # Check if we have enough for a sentence
-            chunks = TextChunker.chunk(text_buffer, min_chars=20)
+            if stream.should_stop:
+                logger.info(f"[TTS] Stream {stream.stream_id} stopped at chunk {index}")
+            elif not sent_final:
+                chunk = AudioChunk(
+                    audio_bytes=self._silent_wav(),
+                    chunk_index=index,
+                    is_final=True,
+                    text_spoken="",
+                    duration_ms=0,
+                    sample_rate=self.config.sample_rate,
+                )
+                if on_chunk:
+                    on_chunk(chunk)
+                yield chunk
+        finally:
+            producer.cancel()
+            for task in list(synth_tasks):
+                if not task.done():
+                    task.cancel()
+                    metrics.cancelled_lookahead += 1
+            self._close_stream(stream)
+            self._record_metrics(metrics)
+    
+    def _cache_key(self, text: str) -> str:
+        return TTSCache.make_key(self.config.model_path, self.config.speaker_id, self.config.speed, text)
+    
+    async def _synthesize_cached(self, voice, text: str) -> Tuple[bytes, bool]:
+        """Synthesize a chunk, using the shared phrase cache. Returns (audio, from_cache)."""
+        if not self._cache or not self._cache.cacheable(text):
+            return await self._synthesize(voice, text), False
+        
+        key = self._cache_key(text)
+        cached_audio = self._cache.get(key, local_only=True)
+        if cached_audio:
+            return cached_audio, True
+        
+        # Disk/Redis lookup and synthesis both block, so run them off the loop
+        def lookup_or_synthesize() -> Tuple[bytes, bool]:
+            audio = self._cache.get(key)
+            if audio:
+                return audio, True
+            audio = self._synthesize_sync(voice, text)
+            self._cache.put(key, audio)
+            return audio, False
+        
+        return await asyncio.get_event_loop().run_in_executor(self._executor, lookup_or_synthesize)
+    
+    def _record_metrics(self, metrics: TTSStreamMetrics) -> None:
+        try:
+            from api.services.telemetry import get_telemetry
             
-            if len(chunks) > 1:
-                # Speak complete chunks, keep last partial
-                for chunk_text in chunks[:-1]:
-                    async for audio_chunk in self.stream_speak(chunk_text):
-                        yield audio_chunk
-                text_buffer = chunks[-1]
-        
-        # Speak remaining text
-        if text_buffer and not self._should_stop:
-            async for audio_chunk in self.stream_speak(text_buffer):
-                yield audio_chunk
+            telemetry = get_telemetry()
+            if metrics.first_audio_ms is not None:
+                telemetry.record_metric("tts_time_to_first_audio_ms", metrics.first_audio_ms)
+            for gap in metrics.gaps_ms[1:]:
+                telemetry.record_metric("tts_chunk_gap_ms", gap)
+            if metrics.cancelled_lookahead:
+                telemetry.increment_counter("tts_lookahead_cancelled", metrics.cancelled_lookahead)
+        except Exception:
+            pass
     
-    async def _synthesize(self, voice, text: str) -> bytes:
-        """Synthesize text to audio bytes."""
-        loop = asyncio.get_event_loop()
-        
-        def do_synthesize():
-            wav_io = io.BytesIO()
+    def _synthesize_sync(self, voice, text: str) -> bytes:
+        wav_io = io.BytesIO()
+        with wave.open(wav_io, "wb") as wav_file:
             voice.synthesize(
                 text,
-                wav_io,
+                wav_file,
                 speaker_id=self.config.speaker_id,
+                length_scale=1.0 / (self.config.speed or 1.0),  # Invert for piper
             )
-            return wav_io.getvalue()
-        
-        return await loop.run_in_executor(None, do_synthesize)
+        return wav_io.getvalue()
+    
+    async def _synthesize(self, voice, text: str) -> bytes:
+        """Synthesize text to audio bytes."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, self._synthesize_sync, voice, text)
+    
+    def _silent_wav(self) -> bytes:
+        """Return a WAV with no frames (closes a stream whose last chunk failed)."""
+        out = io.BytesIO()
+        with wave.open(out, "wb") as wav:
+            wav.setnchannels(self.config.channels)
+            wav.setsampwidth(self.config.sample_width)
+            wav.setframerate(self.config.sample_rate)
+            wav.writeframes(b"")
+        return out.getvalue()
+    
+    def _append_silence(self, audio_bytes: bytes, pause_ms: int) -> bytes:
+        """Return WAV bytes with pause_ms of trailing silence."""
+        try:
+            with io.BytesIO(audio_bytes) as src, wave.open(src, "rb") as wav:
+                params = wav.getparams()
+                frames = wav.readframes(params.nframes)
+        except Exception:
+            return audio_bytes
+        silence = b"\x00" * (int(params.framerate * pause_ms / 1000) * params.sampwidth * params.nchannels)
+        out = io.BytesIO()
+        with wave.open(out, "wb") as wav:
+            wav.setparams(params)
+            wav.writeframes(frames + silence)
+        return out.getvalue()
     
     def _calculate_duration_ms(self, audio_bytes: bytes) -> int:
         """Calculate audio duration from WAV bytes."""
@@ -446,9 +680,7 @@ class StreamingTTSService:
         voice = self._load_voice()
         
         for phrase in phrases:
-            if not self._cache.get(phrase):
-                audio = await self._synthesize(voice, phrase)
-                self._cache.put(phrase, audio)
+            await self._synthesize_cached(voice, phrase)
         
         logger.info(f"[TTS] Preloaded {len(phrases)} phrases")
 
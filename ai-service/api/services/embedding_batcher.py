@@ -0,0 +1,203 @@
+"""Micro-batching dispatcher for embedding requests.
+
+Concurrent ``embed`` calls from different requests are collected for a short
+window (``max_wait_ms``) or until ``max_batch_size`` texts are pending, then
+encoded with one batched call in a worker thread. Results are fanned back out
+to the waiting coroutines, so the event loop never blocks on the model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+class EmbeddingBatcher:
+    """
+    Async front-end that coalesces embedding calls into batches.
+
+    One batcher serves one event loop; it is rebound automatically if used
+    from a different loop (e.g. in tests). Encoding runs on a dedicated
+    single-thread executor so model calls are serialised.
+    """
+
+    def __init__(
+        self,
+        encode_fn: EncodeFn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        name: str = "embedding",
+    ):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-batcher")
+        self._pending: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._encoded = 0
+        self._max_queue_depth = 0
+        self._last_batch_size = 0
+        self._last_batch_ms = 0.0
+        self._total_batch_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text, sharing a model call with concurrent callers."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts; large inputs are split across several batches."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        loop = self._ensure_worker()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        depth = len(self._pending)
+        self._max_queue_depth = max(self._max_queue_depth, depth)
+        self._wakeup.set()
+        if depth >= self.max_batch_size:
+            self._full.set()
+
+        vectors = await asyncio.gather(*futures)
+        return np.stack(vectors)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching metrics for monitoring."""
+        return {
+            "queue_depth": len(self._pending),
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "items": self._items,
+            "encoded": self._encoded,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "last_batch_ms": round(self._last_batch_ms, 2),
+            "avg_batch_ms": round(self._total_batch_ms / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    async def close(self) -> None:
+        """Stop the worker, failing anything still queued."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        while self._pending:
+            _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher closed"))
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            if self._loop is not loop:
+                # Futures from another loop can never be resolved here
+                self._pending.clear()
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._full = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        return loop
+
+    def _take_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch: List[Tuple[str, asyncio.Future]] = []
+        while self._pending and len(batch) < self.max_batch_size:
+            text, future = self._pending.popleft()
+            if not future.done():  # skip callers that were cancelled
+                batch.append((text, future))
+        if len(self._pending) < self.max_batch_size:
+            self._full.clear()
+        if not self._pending:
+            self._wakeup.clear()
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if self.max_wait and len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._take_batch()
+            if not batch:
+                continue
+
+            # Identical texts in one window are encoded once
+            unique = list(dict.fromkeys(text for text, _ in batch))
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode_fn, unique)
+            except Exception as e:
+                logger.warning(f"{self.name} batch of {len(unique)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._record_batch(len(batch), len(unique), (time.perf_counter() - start) * 1000)
+            row_of = {text: i for i, text in enumerate(unique)}
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(vectors[row_of[text]])
+
+    def _record_batch(self, items: int, encoded: int, elapsed_ms: float) -> None:
+        self._batches += 1
+        self._items += items
+        self._encoded += encoded
+        self._last_batch_size = items
+        self._last_batch_ms = elapsed_ms
+        self._total_batch_ms += elapsed_ms
+
+        try:
+            from api.services.telemetry import get_telemetry
+
+            telemetry = get_telemetry()
+            telemetry.record_metric(f"{self.name}_batch_size", items, unit="items")
+            telemetry.record_metric(f"{self.name}_batch_latency_ms", elapsed_ms)
+            telemetry.set_gauge(f"{self.name}_queue_depth", len(self._pending))
+        except Exception:
+            pass
@@ -1,17 +1,26 @@
 """Embedding service for V3 retrieval.
 
-Uses Sentence-Transformers to encode text into embeddings.
+Uses Sentence-Transformers to encode text into embeddings. Concept/corpus
+vectors (``persist=True``) are read from / written to the shared on-disk
+``EmbeddingStore`` so only texts never seen by any worker are encoded.
+Query vectors are only kept in a bounded in-process LRU, so learner input is
+never written to disk. Async callers go through an ``EmbeddingBatcher`` that
+coalesces concurrent requests into one encode call off the event loop.
 """
 
 from __future__ import annotations
 
 import logging
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from api.core.config import settings
+from api.services.embedding_batcher import EmbeddingBatcher
+from api.services.embedding_store import get_embedding_store
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +30,10 @@ class EmbeddingServiceV3:
         self._model = None
         self._model_name = getattr(settings, "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
         self._device = getattr(settings, "EMBEDDING_DEVICE", "cpu")
+        self._batcher: Optional[EmbeddingBatcher] = None
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = int(getattr(settings, "EMBEDDING_QUERY_CACHE_SIZE", 2048))
+        self._query_lock = threading.Lock()
 
     def _load_model(self) -> SentenceTransformer:
         if self._model is None:
@@ -28,10 +41,75 @@ class EmbeddingServiceV3:
             self._model = SentenceTransformer(self._model_name, device=self._device)
         return self._model
 
-    def embed_texts(self, texts: List[str]) -> np.ndarray:
+    def _encode(self, texts: List[str]) -> np.ndarray:
         model = self._load_model()
         embeddings = model.encode(texts, normalize_embeddings=True)
-        return np.asarray(embeddings)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def embed_texts(self, texts: List[str], persist: bool = False) -> np.ndarray:
+        """
+        Embed texts, reusing stored vectors.
+
+        Only ``persist=True`` callers (concept/corpus indexing) append new
+        vectors to the on-disk store; other texts go to the query LRU.
+        """
+        if not texts:
+            return self._encode(texts)
+
+        cached: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not persist:
+            with self._query_lock:
+                for i, text in enumerate(texts):
+                    vec = self._query_cache.get(text)
+                    if vec is not None:
+                        self._query_cache.move_to_end(text)
+                        cached[i] = vec
+
+        store = get_embedding_store(self._model_name)
+        missing = [i for i, vec in enumerate(cached) if vec is None]
+        if store is not None and missing:
+            for i, vec in zip(missing, store.get_many([texts[i] for i in missing])):
+                cached[i] = vec
+            missing = [i for i in missing if cached[i] is None]
+
+        if missing:
+            encoded = self._encode([texts[i] for i in missing])
+            if persist and store is not None:
+                store.put_many([texts[i] for i in missing], encoded)
+            for i, vec in zip(missing, encoded):
+                cached[i] = vec
+
+        if not persist and self._query_cache_size > 0:
+            with self._query_lock:
+                for text, vec in zip(texts, cached):
+                    self._query_cache[text] = vec
+                    self._query_cache.move_to_end(text)
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return np.stack(cached)
 
     def embed_text(self, text: str) -> np.ndarray:
         return self.embed_texts([text])[0]
+
+    # ------------------------------------------------------------------
+    # Async (micro-batched) API
+    # ------------------------------------------------------------------
+
+    @property
+    def batcher(self) -> EmbeddingBatcher:
+        if self._batcher is None:
+            self._batcher = EmbeddingBatcher(
+                self.embed_texts,
+                max_batch_size=getattr(settings, "EMBEDDING_BATCH_MAX_SIZE", 64),
+                max_wait_ms=getattr(settings, "EMBEDDING_BATCH_MAX_WAIT_MS", 5.0),
+            )
+        return self._batcher
+
+    async def aembed_texts(self, texts: List[str]) -> np.ndarray:
+        return await self.batcher.embed_many(texts)
+
+    async def aembed_text(self, text: str) -> np.ndarray:
+        return await self.batcher.embed(text)
+
+    def get_batch_stats(self) -> Dict[str, Any]:
+        return self._batcher.get_stats() if self._batcher is not None else {}
@@ -0,0 +1,246 @@
+"""Persistent, content-addressed embedding store.
+
+Embeddings are keyed by (model name, normalised text hash) and stored on disk
+so restarts and every uvicorn worker reuse the same vectors instead of
+re-encoding the concept set.
+
+Layout per model (``<EMBEDDING_CACHE_DIR>/<model>/``):
+- ``vectors.bin``: raw float16/float32 rows, memory-mapped read-only
+- ``index.bin``:   append-only records of (16-byte key, uint64 row)
+- ``meta.json``:   model name, dimension, dtype
+
+Writers append under an exclusive file lock; readers pick up rows written by
+other processes by reading new index records on a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from api.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process writes only
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 16
+RECORD_DTYPE = np.dtype([("key", f"S{KEY_BYTES}"), ("row", "<u8")])
+
+
+def normalise_text(text: str) -> str:
+    """Collapse whitespace so trivially different strings share a vector."""
+    return " ".join((text or "").split())
+
+
+class EmbeddingStore:
+    """Memory-mapped embedding cache for one model."""
+
+    def __init__(self, root_dir: str, model_name: str, dtype: str = "float16"):
+        self.model_name = model_name
+        self.directory = os.path.join(root_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.directory, "vectors.bin")
+        self._index_path = os.path.join(self.directory, "index.bin")
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._lock_path = os.path.join(self.directory, ".lock")
+
+        self._dtype = np.dtype(dtype)
+        self._dim: Optional[int] = None
+        self._load_meta()
+
+        self._rows: Dict[bytes, int] = {}
+        self._index_offset = 0
+        self._mmap: Optional[np.memmap] = None
+        self._mmap_rows = 0
+        self._thread_lock = threading.Lock()
+
+        self._sync_index()
+
+    # ------------------------------------------------------------------
+    # Metadata / index
+    # ------------------------------------------------------------------
+
+    def _load_meta(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._dim = int(meta["dim"])
+        # An existing store keeps the dtype it was created with
+        self._dtype = np.dtype(meta.get("dtype", self._dtype.name))
+
+    def _write_meta(self) -> None:
+        tmp = f"{self._meta_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self._dim, "dtype": self._dtype.name}, f)
+        os.replace(tmp, self._meta_path)
+
+    def _sync_index(self) -> None:
+        """Read index records appended since the last sync."""
+        if not os.path.exists(self._index_path):
+            return
+        size = os.path.getsize(self._index_path)
+        complete = (size // RECORD_DTYPE.itemsize) * RECORD_DTYPE.itemsize
+        if complete <= self._index_offset:
+            return
+        if self._dim is None:
+            self._load_meta()
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read(complete - self._index_offset)
+        records = np.frombuffer(data, dtype=RECORD_DTYPE)
+        for key, row in zip(records["key"].tolist(), records["row"].tolist()):
+            self._rows.setdefault(key, int(row))
+        self._index_offset = complete
+
+    def _vectors(self, needed_row: int) -> Optional[np.memmap]:
+        """Return a memmap covering needed_row, remapping if the file grew."""
+        if self._mmap is not None and needed_row < self._mmap_rows:
+            return self._mmap
+        if self._dim is None or not os.path.exists(self._vectors_path):
+            return None
+        row_bytes = self._dim * self._dtype.itemsize
+        rows = os.path.getsize(self._vectors_path) // row_bytes
+        if rows == 0:
+            return None
+        self._mmap = np.memmap(self._vectors_path, dtype=self._dtype, mode="r", shape=(rows, self._dim))
+        self._mmap_rows = rows
+        return self._mmap if needed_row < rows else None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def key(self, text: str) -> bytes:
+        digest = hashlib.sha1(f"{self.model_name}\x00{normalise_text(text)}".encode("utf-8"))
+        return digest.digest()[:KEY_BYTES]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return float32 vectors for texts, None where not stored."""
+        keys = [self.key(t) for t in texts]
+        with self._thread_lock:
+            if any(k not in self._rows for k in keys):
+                self._sync_index()
+            rows = [self._rows.get(k) for k in keys]
+            present = [r for r in rows if r is not None]
+            mmap = self._vectors(max(present)) if present else None
+
+        if mmap is None:
+            return [None] * len(texts)
+        return [
+            np.asarray(mmap[r], dtype=np.float32) if r is not None and r < self._mmap_rows else None
+            for r in rows
+        ]
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> int:
+        """Append vectors for texts not yet stored. Returns rows written."""
+        vectors = np.asarray(vectors)
+        if not len(texts):
+            return 0
+
+        with self._thread_lock, self._file_lock():
+            self._sync_index()
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._write_meta()
+            elif vectors.shape[1] != self._dim:
+                logger.warning(
+                    f"Embedding dim {vectors.shape[1]} != store dim {self._dim} for {self.model_name}"
+                )
+                return 0
+
+            keys: List[bytes] = []
+            picks: List[int] = []
+            seen = set()
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                keys.append(key)
+                picks.append(i)
+            if not keys:
+                return 0
+
+            row_bytes = self._dim * self._dtype.itemsize
+            start_row = 0
+            if os.path.exists(self._vectors_path):
+                # Round up past any torn row left by a crashed writer
+                start_row = -(-os.path.getsize(self._vectors_path) // row_bytes)
+
+            block = np.ascontiguousarray(vectors[picks], dtype=self._dtype)
+            with open(self._vectors_path, "r+b" if start_row else "wb") as f:
+                f.seek(start_row * row_bytes)
+                f.write(block.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Index records are written after the vectors they point to
+            records = np.empty(len(keys), dtype=RECORD_DTYPE)
+            records["key"] = keys
+            records["row"] = np.arange(start_row, start_row + len(keys), dtype=np.uint64)
+            with open(self._index_path, "ab") as f:
+                f.write(records.tobytes())
+                f.flush()
+
+            self._sync_index()
+            return len(keys)
+
+
+# Stores per model name
+_stores: Dict[str, Optional[EmbeddingStore]] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name: str) -> Optional[EmbeddingStore]:
+    """Get the shared store for a model, or None if the cache is disabled."""
+    if model_name in _stores:
+        return _stores[model_name]
+    with _stores_lock:
+        if model_name not in _stores:
+            root = getattr(settings, "EMBEDDING_CACHE_DIR", "")
+            store: Optional[EmbeddingStore] = None
+            if root:
+                try:
+                    store = EmbeddingStore(
+                        root,
+                        model_name,
+                        dtype=getattr(settings, "EMBEDDING_CACHE_DTYPE", "float16"),
+                    )
+                    logger.info(f"Embedding store for {model_name}: {len(store)} vectors")
+                except Exception as e:
+                    logger.warning(f"Embedding store disabled for {model_name}: {e}")
+            _stores[model_name] = store
+    return _stores[model_name]
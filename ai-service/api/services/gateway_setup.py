@@ -64,6 +64,10 @@ async def _register_qwen(gateway: ModelGateway) -> None:
             model_path=os.getenv("QWEN_MODEL_PATH", "models/qwen3-1.7b"),
             model_id=os.getenv("QWEN_MODEL_ID", "Qwen/Qwen2.5-1.5B-Instruct"),
             device=os.getenv("MODEL_DEVICE", "auto"),
+            generation_timeout=float(os.getenv("QWEN_GENERATION_TIMEOUT", "120")),
+            continuous_batching=os.getenv("QWEN_CONTINUOUS_BATCHING", "true").lower() == "true",
+            max_batch_size=int(os.getenv("QWEN_MAX_BATCH_SIZE", "8")),
+            prefix_cache_mb=float(os.getenv("QWEN_PREFIX_CACHE_MB", "256")),
         )
         handler = QwenHandler(config)
         await handler.load()
@@ -129,6 +133,8 @@ async def _register_piper(gateway: ModelGateway) -> None:
         config = PiperConfig(
             model_path=os.getenv("PIPER_MODEL_PATH", "models/piper/en_US-lessac-medium.onnx"),
             voice=os.getenv("PIPER_VOICE", "en_US-lessac-medium"),
+            pool_size=int(os.getenv("PIPER_POOL_SIZE", "2")),
+            persistent_process=os.getenv("PIPER_PERSISTENT", "true").lower() == "true",
         )
         handler = PiperHandler(config)
         await handler.load()
@@ -0,0 +1,622 @@
+"""Continuous batching scheduler for local Hugging Face causal LMs.
+
+Concurrent generation requests share one decode loop instead of each
+running ``model.generate`` at batch size 1:
+
+- waiting prompts are tokenized, left-padded and prefilled together
+- the decode loop advances every active sequence by one token per step
+- new requests are prefilled and merged into the running batch between
+  decode steps (KV caches are left-padded to a common length)
+- each sequence stops on its own (EOS, max_new_tokens, cancel/timeout)
+  and is removed from the batch immediately
+- with a ``PrefixKVCache``, a prompt that starts with a cached prefix (e.g.
+  the templated system message) is prefilled from that prefix's KV cache,
+  so only the tokens after it are encoded
+
+The loop runs on its own thread; callers await ``generate`` or iterate
+``stream``. Queue depth, batch size and tokens/sec are exposed through
+``get_stats`` and telemetry gauges.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from api.services.llm_worker import CancelToken, GenerationCancelled, LLMWorkerBusy
+from api.services.prompt_cache import CachedPrefix, PrefixKVCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    prompt: str
+    max_new_tokens: int
+    temperature: float
+    top_p: float
+    token: CancelToken
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    emit: Optional[Callable[[str], None]] = None
+    max_prompt_tokens: Optional[int] = None
+    prefix: Optional[str] = None
+    generated: List[int] = field(default_factory=list)
+    # Incremental detokenization window: generated[prefix_offset:read_offset]
+    # was already streamed and is re-decoded only for spacing context
+    prefix_offset: int = 0
+    read_offset: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+_STREAM_END = object()
+
+
+class GenerationScheduler:
+    """
+    Iteration-level batching in front of one model/tokenizer pair.
+
+    Usage:
+        scheduler = GenerationScheduler(model, tokenizer, max_batch_size=8)
+        text = await scheduler.generate(prompt, max_new_tokens=256)
+    """
+
+    _ids = itertools.count()
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue: int = 64,
+        name: str = "generation",
+        prefix_cache: Optional[PrefixKVCache] = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue = max(1, max_queue)
+        self.name = name
+        self.prefix_cache = prefix_cache
+
+        self._eos_ids = self._collect_eos_ids()
+        self._pad_id = tokenizer.pad_token_id
+        if self._pad_id is None:
+            self._pad_id = next(iter(self._eos_ids), 0)
+
+        self._pending: Deque[_Request] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._shutdown = False
+
+        # Running batch (only touched by the scheduler thread)
+        self._active: List[_Request] = []
+        self._past = None
+        self._mask = None
+        self._last_tokens = None
+
+        # Metrics
+        self._requests = 0
+        self._steps = 0
+        self._step_rows = 0
+        self._tokens = 0
+        self._busy_s = 0.0
+        self._last_batch_size = 0
+        self._max_batch_seen = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def generate(
+        self,
+        prompt: str,
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[float] = None,
+        max_prompt_tokens: Optional[int] = None,
+        prefix: Optional[str] = None,
+    ) -> str:
+        """
+        Generate a completion for prompt (raw text, chat template already applied).
+
+        prefix is the leading part of prompt worth caching across requests
+        (typically the templated system message).
+        """
+        request = self._make_request(prompt, max_new_tokens, temperature, top_p, timeout, max_prompt_tokens, prefix)
+        self._submit(request)
+        try:
+            return await _await_request(request, self.name)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            self._withdraw(request)
+            raise
+
+    async def stream(
+        self,
+        prompt: str,
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[float] = None,
+        max_prompt_tokens: Optional[int] = None,
+        prefix: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield generated text as it is decoded; closing the iterator cancels the request.
+
+        The timeout covers time spent queued as well as decoding.
+        """
+        request = self._make_request(prompt, max_new_tokens, temperature, top_p, timeout, max_prompt_tokens, prefix)
+        pieces: asyncio.Queue = asyncio.Queue()
+        loop = request.loop
+        request.emit = lambda piece: loop.call_soon_threadsafe(pieces.put_nowait, piece)
+        request.future.add_done_callback(lambda _: pieces.put_nowait(_STREAM_END))
+
+        self._submit(request)
+        try:
+            while True:
+                if request.token.deadline is None:
+                    piece = await pieces.get()
+                else:
+                    remaining = request.token.deadline - time.monotonic()
+                    try:
+                        piece = await asyncio.wait_for(pieces.get(), max(0.0, remaining))
+                    except asyncio.TimeoutError:
+                        raise asyncio.TimeoutError(f"{self.name} generation timed out") from None
+                if piece is _STREAM_END:
+                    break
+                yield piece
+            await _await_request(request, self.name)
+        finally:
+            self._withdraw(request)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._pending),
+            "active": len(self._active),
+            "requests": self._requests,
+            "decode_steps": self._steps,
+            "avg_batch_size": round(self._step_rows / self._steps, 2) if self._steps else 0.0,
+            "last_batch_size": self._last_batch_size,
+            "max_batch_size_seen": self._max_batch_seen,
+            "max_batch_size": self.max_batch_size,
+            "tokens_generated": self._tokens,
+            "tokens_per_sec": round(self._tokens / self._busy_s, 1) if self._busy_s else 0.0,
+            "prefix_cache": self.prefix_cache.get_stats() if self.prefix_cache else None,
+        }
+
+    def shutdown(self) -> None:
+        """Cancel queued and running requests and stop the scheduler thread."""
+        with self._cond:
+            self._shutdown = True
+            while self._pending:
+                _resolve(self._pending.popleft(), error=GenerationCancelled("scheduler shut down"))
+            self._cond.notify_all()
+        for request in list(self._active):
+            request.token.cancel()
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def _make_request(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        timeout: Optional[float],
+        max_prompt_tokens: Optional[int],
+        prefix: Optional[str] = None,
+    ) -> _Request:
+        loop = asyncio.get_running_loop()
+        return _Request(
+            prompt=prompt,
+            max_new_tokens=max(1, max_new_tokens),
+            temperature=temperature or 0.0,
+            top_p=top_p if top_p is not None else 1.0,
+            token=CancelToken(timeout),
+            future=loop.create_future(),
+            loop=loop,
+            max_prompt_tokens=max_prompt_tokens,
+            prefix=prefix if prefix and prompt.startswith(prefix) else None,
+        )
+
+    def _submit(self, request: _Request) -> None:
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError(f"{self.name} scheduler is shut down")
+            if len(self._pending) >= self.max_queue:
+                raise LLMWorkerBusy(f"{self.name} queue is full ({len(self._pending)} pending)")
+            self._pending.append(request)
+            self._requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._serve,
+                    name=f"{self.name}-scheduler-{next(self._ids)}",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _withdraw(self, request: _Request) -> None:
+        """Cancel a request; if it is still queued, free its slot right away."""
+        request.token.cancel()
+        with self._cond:
+            try:
+                self._pending.remove(request)
+            except ValueError:
+                return  # already running or finished; the decode loop drops it
+        _resolve(request, error=GenerationCancelled("cancelled before start"))
+
+    def _take_pending(self, limit: int) -> List[_Request]:
+        """Pop up to limit live requests, dropping cancelled / timed-out ones anywhere in the queue."""
+        taken: List[_Request] = []
+        with self._cond:
+            waiting: Deque[_Request] = deque()
+            for request in self._pending:
+                if request.token.cancelled:
+                    reason = "timed out while queued" if request.token.timed_out else "cancelled before start"
+                    _resolve(request, error=GenerationCancelled(reason))
+                elif len(taken) < limit:
+                    taken.append(request)
+                else:
+                    waiting.append(request)
+            self._pending = waiting
+        return taken
+
+    # ------------------------------------------------------------------
+    # Scheduler loop
+    # ------------------------------------------------------------------
+
+    def _serve(self) -> None:
+        import torch
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._active and not self._shutdown:
+                    self._cond.wait()
+                if self._shutdown and not self._active:
+                    self._thread = None
+                    return
+                idle = not self._active
+
+            if idle and self.max_wait:
+                # Give concurrent callers a moment to join the first batch
+                deadline = time.monotonic() + self.max_wait
+                with self._cond:
+                    while len(self._pending) < self.max_batch_size and not self._shutdown:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+
+            started = time.perf_counter()
+            try:
+                with torch.no_grad():
+                    joining = self._take_pending(self.max_batch_size - len(self._active))
+                    if joining:
+                        self._admit(joining)
+                    if self._active:
+                        self._decode_step()
+            except Exception as e:
+                logger.error(f"[{self.name}] Batch step failed: {e}", exc_info=True)
+                for request in self._active:
+                    _resolve(request, error=e)
+                self._reset_batch()
+            self._busy_s += time.perf_counter() - started
+            self._publish()
+
+    def _admit(self, requests: List[_Request]) -> None:
+        """Prefill new prompts and merge them into the running batch."""
+        import torch
+
+        plain: List[_Request] = []
+        plain_ids: List[List[int]] = []
+        groups = []
+        for request in requests:
+            ids = self.tokenizer(request.prompt)["input_ids"]
+            if request.max_prompt_tokens:
+                ids = ids[: request.max_prompt_tokens]
+            ids = ids or [self._pad_id]
+            cached = self._cached_prefix(request, ids)
+            if cached is not None:
+                groups.append(([request], *self._prefill_from_prefix(ids, cached)))
+            else:
+                plain.append(request)
+                plain_ids.append(ids)
+        if plain:
+            groups.insert(0, (plain, *self._prefill(plain_ids)))
+
+        for group, past, mask, logits in groups:
+            next_tokens = self._sample(logits, group)
+            start = len(self._active)
+            if self._active:
+                self._past, self._mask = _merge_caches(self._past, self._mask, past, mask)
+                self._last_tokens = torch.cat([self._last_tokens, next_tokens])
+            else:
+                self._past, self._mask, self._last_tokens = past, mask, next_tokens
+            self._active.extend(group)
+            self._accept(next_tokens, start)
+
+    def _prefill(self, encoded: List[List[int]]):
+        """Prefill prompts as one left-padded batch; returns (past, mask, last logits)."""
+        import torch
+
+        device = self.model.device
+        width = max(len(ids) for ids in encoded)
+        input_ids = torch.full((len(encoded), width), self._pad_id, dtype=torch.long, device=device)
+        mask = torch.zeros((len(encoded), width), dtype=torch.long, device=device)
+        for row, ids in enumerate(encoded):
+            input_ids[row, width - len(ids):] = torch.tensor(ids, dtype=torch.long, device=device)
+            mask[row, width - len(ids):] = 1
+        positions = (mask.cumsum(-1) - 1).clamp(min=0)
+
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=mask,
+            position_ids=positions,
+            use_cache=True,
+        )
+        return outputs.past_key_values, mask, outputs.logits[:, -1, :]
+
+    def _cached_prefix(self, request: _Request, ids: List[int]) -> Optional[CachedPrefix]:
+        """Look up (or compute and store) the KV cache for the request's prefix."""
+        if self.prefix_cache is None or not request.prefix:
+            return None
+        cached = self.prefix_cache.get(request.prefix)
+        if cached is None:
+            prefix_ids = self.tokenizer(request.prefix)["input_ids"]
+            # The prefix must tokenize identically inside the full prompt
+            if len(prefix_ids) < self.prefix_cache.min_tokens or ids[: len(prefix_ids)] != prefix_ids:
+                return None
+            past, _, _ = self._prefill([prefix_ids])
+            cached = self.prefix_cache.put(request.prefix, prefix_ids, _to_legacy(past))
+            if cached is None:
+                return None
+        if len(ids) <= len(cached.ids) or tuple(ids[: len(cached.ids)]) != cached.ids:
+            return None
+        return cached
+
+    def _prefill_from_prefix(self, ids: List[int], cached: CachedPrefix):
+        """Prefill only the tokens after a cached prefix (batch of one)."""
+        import torch
+
+        device = self.model.device
+        start = len(cached.ids)
+        outputs = self.model(
+            input_ids=torch.tensor([ids[start:]], dtype=torch.long, device=device),
+            attention_mask=torch.ones((1, len(ids)), dtype=torch.long, device=device),
+            position_ids=torch.arange(start, len(ids), dtype=torch.long, device=device).unsqueeze(0),
+            past_key_values=_as_past(cached.past),
+            use_cache=True,
+        )
+        mask = torch.ones((1, len(ids)), dtype=torch.long, device=device)
+        return outputs.past_key_values, mask, outputs.logits[:, -1, :]
+
+    def _decode_step(self) -> None:
+        import torch
+
+        self._mask = torch.cat([self._mask, self._mask.new_ones((self._mask.shape[0], 1))], dim=-1)
+        positions = (self._mask.sum(-1, keepdim=True) - 1)
+        outputs = self.model(
+            input_ids=self._last_tokens.unsqueeze(-1),
+            attention_mask=self._mask,
+            position_ids=positions,
+            past_key_values=self._past,
+            use_cache=True,
+        )
+        self._past = outputs.past_key_values
+        self._last_tokens = self._sample(outputs.logits[:, -1, :], self._active)
+
+        rows = len(self._active)
+        self._steps += 1
+        self._step_rows += rows
+        self._last_batch_size = rows
+        self._max_batch_seen = max(self._max_batch_seen, rows)
+        self._accept(self._last_tokens)
+
+    def _accept(self, next_tokens, start: int = 0) -> None:
+        """Record tokens sampled for rows start.., stream text and drop finished sequences."""
+        keep: List[int] = list(range(start))
+        for row, (request, token_id) in enumerate(zip(self._active[start:], next_tokens.tolist()), start):
+            finished = token_id in self._eos_ids
+            if not finished:
+                request.generated.append(token_id)
+                self._tokens += 1
+                self._emit(request)
+            finished = finished or len(request.generated) >= request.max_new_tokens
+
+            if request.token.cancelled:
+                _resolve(request, error=GenerationCancelled("timed out" if request.token.timed_out else "cancelled"))
+            elif finished:
+                self._emit(request, final=True)
+                _resolve(request, result=self._decode(request).strip())
+            else:
+                keep.append(row)
+
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._reset_batch()
+            return
+        self._active = [self._active[row] for row in keep]
+        self._past, self._mask = _select_rows(self._past, self._mask, keep)
+        self._last_tokens = self._last_tokens[keep]
+
+    def _reset_batch(self) -> None:
+        self._active = []
+        self._past = self._mask = self._last_tokens = None
+
+    # ------------------------------------------------------------------
+    # Sampling / decoding
+    # ------------------------------------------------------------------
+
+    def _sample(self, logits, requests: List[_Request]):
+        """Per-row temperature / top-p sampling (greedy where temperature is 0)."""
+        import torch
+
+        next_tokens = logits.argmax(dim=-1)
+        temps = torch.tensor([r.temperature for r in requests], dtype=torch.float32, device=logits.device)
+        sampled_rows = temps > 0
+        if not bool(sampled_rows.any()):
+            return next_tokens
+
+        top_ps = torch.tensor([r.top_p for r in requests], dtype=torch.float32, device=logits.device)
+        probs = torch.softmax(logits.float() / temps.clamp(min=1e-5).unsqueeze(-1), dim=-1)
+        sorted_probs, sorted_ids = probs.sort(dim=-1, descending=True)
+        # Keep the smallest prefix whose mass reaches top_p (always at least one token)
+        outside = (sorted_probs.cumsum(dim=-1) - sorted_probs) > top_ps.unsqueeze(-1)
+        sorted_probs = sorted_probs.masked_fill(outside, 0.0)
+        choice = torch.multinomial(sorted_probs, num_samples=1)
+        sampled = sorted_ids.gather(-1, choice).squeeze(-1)
+        return torch.where(sampled_rows, sampled, next_tokens)
+
+    def _decode(self, request: _Request) -> str:
+        return self.tokenizer.decode(request.generated, skip_special_tokens=True)
+
+    def _emit(self, request: _Request, final: bool = False) -> None:
+        """Stream newly decoded text, decoding only the tokens since the last emit."""
+        if request.emit is None:
+            return
+        tokens = request.generated
+        prefix_text = self.tokenizer.decode(
+            tokens[request.prefix_offset:request.read_offset], skip_special_tokens=True
+        )
+        text = self.tokenizer.decode(tokens[request.prefix_offset:], skip_special_tokens=True)
+        # Hold back incomplete multi-byte characters until the next token
+        if not final and text.endswith("\ufffd"):
+            return
+        if len(text) > len(prefix_text):
+            request.emit(text[len(prefix_text):])
+            request.prefix_offset = request.read_offset
+            request.read_offset = len(tokens)
+
+    def _collect_eos_ids(self) -> set:
+        ids = set()
+        for source in (
+            getattr(getattr(self.model, "generation_config", None), "eos_token_id", None),
+            self.tokenizer.eos_token_id,
+        ):
+            if isinstance(source, int):
+                ids.add(source)
+            elif source:
+                ids.update(source)
+        return ids
+
+    def _publish(self) -> None:
+        try:
+            from api.services.telemetry import get_telemetry
+
+            telemetry = get_telemetry()
+            telemetry.set_gauge(f"{self.name}_queue_depth", len(self._pending))
+            telemetry.set_gauge(f"{self.name}_batch_size", self._last_batch_size)
+            if self._busy_s:
+                telemetry.set_gauge(f"{self.name}_tokens_per_sec", self._tokens / self._busy_s)
+        except Exception:
+            pass
+
+
+# ----------------------------------------------------------------------
+# KV cache helpers (legacy tuple or DynamicCache)
+# ----------------------------------------------------------------------
+
+def _to_legacy(past):
+    return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else past
+
+
+def _like(legacy, template):
+    if isinstance(template, tuple):
+        return tuple(legacy)
+    from transformers import DynamicCache
+
+    return DynamicCache.from_legacy_cache(tuple(legacy))
+
+
+def _as_past(legacy):
+    """Fresh cache object over shared prefix tensors (the model never writes into them)."""
+    try:
+        from transformers import DynamicCache
+    except ImportError:
+        return tuple(legacy)
+    return DynamicCache.from_legacy_cache(tuple(legacy))
+
+
+def _left_pad(tensor, width: int):
+    """Left-pad the sequence dim (-2 for K/V, -1 for masks) with zeros."""
+    import torch.nn.functional as F
+
+    pad = width - tensor.shape[-2 if tensor.dim() == 4 else -1]
+    if pad <= 0:
+        return tensor
+    return F.pad(tensor, (0, 0, pad, 0)) if tensor.dim() == 4 else F.pad(tensor, (pad, 0))
+
+
+def _merge_caches(past_a, mask_a, past_b, mask_b):
+    """Concatenate two batches along the batch dim after aligning their lengths."""
+    import torch
+
+    width = max(mask_a.shape[-1], mask_b.shape[-1])
+    legacy = [
+        (
+            torch.cat([_left_pad(ka, width), _left_pad(kb, width)]),
+            torch.cat([_left_pad(va, width), _left_pad(vb, width)]),
+        )
+        for (ka, va), (kb, vb) in zip(_to_legacy(past_a), _to_legacy(past_b))
+    ]
+    mask = torch.cat([_left_pad(mask_a, width), _left_pad(mask_b, width)])
+    return _like(legacy, past_a), mask
+
+
+def _select_rows(past, mask, rows: List[int]):
+    """Keep batch rows and drop leading columns that are padding for every row."""
+    mask = mask[rows]
+    used = (mask.sum(dim=0) > 0).nonzero()
+    start = int(used[0]) if len(used) else 0
+    legacy = [(k[rows][:, :, start:], v[rows][:, :, start:]) for k, v in _to_legacy(past)]
+    return _like(legacy, past), mask[:, start:]
+
+
+# ----------------------------------------------------------------------
+# Async bridging
+# ----------------------------------------------------------------------
+
+def _resolve(request: _Request, result: Any = None, error: Optional[BaseException] = None) -> None:
+    def resolve() -> None:
+        if request.future.done():
+            return
+        if error is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
+
+    try:
+        request.loop.call_soon_threadsafe(resolve)
+    except RuntimeError:
+        # Event loop already closed
+        pass
+
+
+async def _await_request(request: _Request, name: str) -> str:
+    try:
+        if request.token.deadline is not None:
+            remaining = max(0.0, request.token.deadline - time.monotonic()) + 1.0
+            return await asyncio.wait_for(asyncio.shield(request.future), remaining)
+        return await request.future
+    except GenerationCancelled as e:
+        if request.token.timed_out:
+            raise asyncio.TimeoutError(f"{name} generation timed out") from e
+        raise
@@ -90,48 +90,61 @@ class GraphAnalyticsService:
         self._centrality_cache: Dict[str, float] = {}
         self._community_cache: Dict[str, int] = {}
         self._analytics_computed = False
+        self._snapshot_version: Optional[int] = None
         
     def _build_networkx_graph(self) -> nx.DiGraph:
         """
-        Build NetworkX DiGraph from KuzuDB.
+        Build NetworkX DiGraph from the KG snapshot.
+        
+        Nodes carry no attribute dicts; titles/keywords are read from the
+        CSR snapshot instead, which keeps the object graph small. Falls
+        back to querying KuzuDB when no snapshot is available.
         
         Returns:
             NetworkX directed graph for analytics
         """
-        if self._nx_graph is not None:
+        snap = self.kg.snapshot()
+        snapshot_version = snap.version if snap is not None else None
+        if self._nx_graph is not None and snapshot_version == self._snapshot_version:
             return self._nx_graph
+        if self._nx_graph is not None:
+            self.invalidate_cache()
             
         G = nx.DiGraph()
         
-        # Get all concepts from KG
-        concepts = self.kg.get_concepts()
-        
-        # Add nodes with attributes
-        for concept_id, meta in concepts.items():
-            G.add_node(
-                concept_id,
-                title=meta.get("title", ""),
-                keywords=meta.get("keywords", ""),
-            )
-        
-        # Get edges by querying KG
-        try:
-            result = self.kg._conn.execute(
-                "MATCH (a:Concept)-[e:Edge]->(b:Concept) "
-                "RETURN a.id, b.id, e.relation"
+        if snap is not None:
+            G.add_nodes_from(snap.ids)
+            G.add_edges_from(
+                (from_id, to_id, {"relation": relation})
+                for from_id, to_id, relation in snap.edges()
             )
-            while result.has_next():
-                row = result.get_next()
-                from_id, to_id, relation = row
+        else:
+            # Get all concepts from KG
+            concepts = self.kg.get_concepts()
+            G.add_nodes_from(concepts.keys())
+            
+            # Get edges from KG (borrows a pooled connection)
+            for from_id, to_id, relation in self.kg.get_edges():
                 G.add_edge(from_id, to_id, relation=relation)
-        except Exception as e:
-            logger.warning(f"Failed to load edges: {e}")
         
         self._nx_graph = G
+        self._snapshot_version = snapshot_version
         logger.info(f"Built NetworkX graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
         
         return G
     
+    def _concept_title(self, concept_id: str) -> str:
+        snap = self.kg.snapshot()
+        if snap is not None:
+            return snap.title_of(concept_id)
+        return self.kg.get_concepts().get(concept_id, {}).get("title", "")
+    
+    def _concept_keywords(self, concept_id: str) -> str:
+        snap = self.kg.snapshot()
+        if snap is not None:
+            return snap.keywords_of(concept_id)
+        return self.kg.get_concepts().get(concept_id, {}).get("keywords", "")
+    
     def compute_centrality(self, top_k: int = 10) -> Dict[str, ConceptImportance]:
         """
         Compute centrality scores for all concepts.
@@ -175,7 +188,6 @@ class GraphAnalyticsService:
         importance: Dict[str, ConceptImportance] = {}
         
         for node_id in G.nodes():
-            node_data = G.nodes[node_id]
             
             # Combined score (weighted average)
             combined = (
@@ -186,7 +198,7 @@ class GraphAnalyticsService:
             
             importance[node_id] = ConceptImportance(
                 concept_id=node_id,
-                title=node_data.get("title", node_id),
+                title=self._concept_title(node_id) or node_id,
                 degree_centrality=degree_cent.get(node_id, 0),
                 betweenness_centrality=betweenness_cent.get(node_id, 0),
                 pagerank=pagerank.get(node_id, 0),
@@ -272,8 +284,7 @@ class GraphAnalyticsService:
             # Extract keywords from all concepts in community
             all_keywords: Set[str] = set()
             for c in concepts:
-                node_data = G.nodes.get(c, {})
-                keywords = node_data.get("keywords", "").split()
+                keywords = self._concept_keywords(c).split()
                 all_keywords.update(keywords)
             
             # Generate community name from central concept
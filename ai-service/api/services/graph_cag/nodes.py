@@ -93,34 +93,13 @@ async def kg_expand_node(state: GraphCAGState) -> Dict[str, Any]:
     start_time = time.time()
     
     try:
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+        from api.services.concept_matcher import get_concept_matcher
+        from api.services.kg_service_v3 import get_kg_service
         
-        kg = KnowledgeGraphServiceV3()
+        kg = get_kg_service()
         
-        # Simple keyword matching to find seed concepts
-        user_text = state["user_input"].lower()
-        all_concepts = kg.get_concepts()
-        
-        seed_concepts = []
-        for concept_id, meta in all_concepts.items():
-            keywords = meta.get("keywords", "").lower()
-            # Check if any keyword matches
-            for kw in keywords.split():
-                if kw in user_text or user_text in kw:
-                    seed_concepts.append(concept_id)
-                    break
-        
-        # Also check for grammar error patterns
-        grammar_patterns = {
-            r"\bi goes\b": "concept:grammar.subject_verb_agreement",
-            r"\bhe go\b": "concept:grammar.third_person_s",
-            r"\byesterday\b.*\b(go|want|need)\b": "concept:grammar.past_time_markers",
-        }
-        
-        for pattern, concept in grammar_patterns.items():
-            if re.search(pattern, user_text, re.IGNORECASE):
-                if concept not in seed_concepts:
-                    seed_concepts.append(concept)
+        # One-pass keyword + grammar-pattern matching to find seed concepts
+        seed_concepts = get_concept_matcher(kg).match(state["user_input"])
         
         # Expand via graph hops
         expanded_nodes = []
@@ -41,6 +41,46 @@ async def get_gateway():
     return _gateway_instance
 
 
+# ============================================================
+# SYSTEM PROMPTS
+# ============================================================
+# Constant instructions live in the system message so local models can
+# reuse its KV cache (prompt prefix caching); per-turn data goes in the
+# user message.
+
+DIAGNOSE_SYSTEM_PROMPT = """You are an English grammar analyzer. Return only valid JSON.
+
+For the learner's sentence, provide a JSON response with:
+{
+    "errors": [
+        {
+            "span": "the incorrect text",
+            "type": "error_type (grammar, spelling, vocabulary, etc.)",
+            "correction": "the correct text",
+            "explanation": "brief explanation in simple English"
+        }
+    ],
+    "intent": "correct|explain|practice|ask",
+    "fluency_score": 0.0-1.0,
+    "grammar_score": 0.0-1.0,
+    "confidence": 0.0-1.0
+}
+
+If no errors, return empty errors array with high scores.
+Be encouraging and focus on the most important errors first."""
+
+GENERATE_SYSTEM_PROMPT = """You are a friendly, encouraging English tutor. Be warm and supportive.
+
+Task: Generate a helpful, encouraging response to the student that:
+1. Acknowledges their effort
+2. Gently corrects the errors with clear explanations, or praises their good work if there are none
+3. Provides a corrected version if needed
+4. Suggests what to practice next
+5. Uses simple language appropriate for the learner's level
+
+Be warm, supportive, and concise (2-3 sentences for correction, more for explanation if asked)."""
+
+
 # ============================================================
 # NODE 1: INPUT NODE
 # ============================================================
@@ -118,35 +158,14 @@ async def kg_expand_node(state: GraphCAGState) -> Dict[str, Any]:
     start_time = time.time()
     
     try:
-        from api.services.kg_service_v3 import KnowledgeGraphServiceV3
-        
-        kg = KnowledgeGraphServiceV3()
-        
-        # Simple keyword matching to find seed concepts
-        user_text = state.get("user_input", "").lower()
-        all_concepts = kg.get_concepts()
-        
-        seed_concepts = []
-        for concept_id, meta in all_concepts.items():
-            keywords = meta.get("keywords", "").lower()
-            for kw in keywords.split():
-                if kw in user_text or user_text in kw:
-                    seed_concepts.append(concept_id)
-                    break
-        
-        # Grammar error patterns
-        grammar_patterns = {
-            r"\bi goes\b": "concept:grammar.subject_verb_agreement",
-            r"\bhe go\b": "concept:grammar.third_person_s",
-            r"\byesterday\b.*\b(go|want|need)\b": "concept:grammar.past_time_markers",
-            r"\bhave went\b": "concept:grammar.present_perfect",
-            r"\bmore better\b": "concept:grammar.comparatives",
-        }
+        from api.services.concept_matcher import get_concept_matcher
+        from api.services.kg_service_v3 import get_kg_service
+        
+        kg = get_kg_service()
         
-        for pattern, concept in grammar_patterns.items():
-            if re.search(pattern, user_text, re.IGNORECASE):
-                if concept not in seed_concepts:
-                    seed_concepts.append(concept)
+        # One-pass keyword + grammar-pattern matching to find seed concepts
+        user_text = state.get("user_input", "")
+        seed_concepts = get_concept_matcher(kg).match(user_text)
         
         # Expand via graph hops
         expanded_nodes = []
@@ -211,32 +230,14 @@ async def diagnose_node(state: GraphCAGState) -> Dict[str, Any]:
         diagnosis_prompt = f"""Analyze this English sentence from a {learner_level} level learner:
 
 Sentence: "{user_text}"
-
-Provide a JSON response with:
-{{
-    "errors": [
-        {{
-            "span": "the incorrect text",
-            "type": "error_type (grammar, spelling, vocabulary, etc.)",
-            "correction": "the correct text",
-            "explanation": "brief explanation in simple English"
-        }}
-    ],
-    "intent": "correct|explain|practice|ask",
-    "fluency_score": 0.0-1.0,
-    "grammar_score": 0.0-1.0,
-    "confidence": 0.0-1.0
-}}
-
-If no errors, return empty errors array with high scores.
-Be encouraging and focus on the most important errors first."""
+"""
 
         # Call Qwen via ModelGateway (lazy loads if needed)
         result = await gateway.execute_task(
             "chat",
             {
                 "message": diagnosis_prompt,
-                "system": "You are an English grammar analyzer. Return only valid JSON.",
+                "system": DIAGNOSE_SYSTEM_PROMPT,
                 "max_tokens": 500,
             }
         )
@@ -439,31 +440,21 @@ async def generate_node(state: GraphCAGState) -> Dict[str, Any]:
             ])
         # Build grammar issues text (avoiding backslash in f-string)
         grammar_section = f"Grammar issues found:\n{errors_text}" if errors_text else "No grammar issues found!"
-        correction_instruction = "Gently corrects the errors with clear explanations" if errors else "Praises their good work"
         
-        generation_prompt = f"""You are a friendly English tutor helping a {level} level learner.
+        generation_prompt = f"""Learner level: {level}
 
 Student said: "{user_input}"
 
 {grammar_section}
 
-Context: {context if context else "General conversation practice"}
-
-Task: Generate a helpful, encouraging response that:
-1. Acknowledges their effort
-2. {correction_instruction}
-3. Provides a corrected version if needed
-4. Suggests what to practice next
-5. Uses simple language appropriate for {level} level
-
-Be warm, supportive, and concise (2-3 sentences for correction, more for explanation if asked)."""
+Context: {context if context else "General conversation practice"}"""
 
         # Call Qwen via ModelGateway (reuses loaded model!)
         result = await gateway.execute_task(
             "chat",
             {
                 "message": generation_prompt,
-                "system": f"You are an encouraging English tutor for {level} level students. Be warm and supportive.",
+                "system": GENERATE_SYSTEM_PROMPT,
                 "max_tokens": 300,
             }
         )
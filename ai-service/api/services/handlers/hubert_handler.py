@@ -8,9 +8,8 @@ import logging
 import asyncio
 from typing import Optional, Dict, Any, Union, List
 from dataclasses import dataclass
-import os
-import tempfile
-import base64
+
+from api.services.audio_decoding import load_audio
 
 logger = logging.getLogger(__name__)
 
@@ -353,54 +352,14 @@ class HuBERTHandler:
         return feedback[:3]  # Limit to 3 tips
     
     async def _load_audio(self, audio: Union[str, bytes]) -> any:
-        """Load audio and resample if needed."""
-        import numpy as np
-        
-        # Handle different input types
-        if isinstance(audio, str):
-            if audio.startswith("data:audio") or len(audio) > 500:
-                # Try base64
-                try:
-                    if "base64," in audio:
-                        audio = audio.split("base64,")[1]
-                    audio = base64.b64decode(audio)
-                except:
-                    pass
-        
-        # Load with librosa or soundfile
-        if isinstance(audio, bytes):
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                f.write(audio)
-                audio_path = f.name
-            
-            try:
-                waveform = await self._load_audio_file(audio_path)
-            finally:
-                os.remove(audio_path)
-        else:
-            waveform = await self._load_audio_file(audio)
-        
-        return waveform
-    
-    async def _load_audio_file(self, path: str):
-        """Load audio file."""
-        import numpy as np
-        
-        try:
-            import librosa
-            waveform, sr = librosa.load(path, sr=self.config.sample_rate)
-        except ImportError:
-            import soundfile as sf
-            waveform, sr = sf.read(path)
-            if sr != self.config.sample_rate:
-                # Simple resampling (not ideal but works)
-                import scipy.signal as signal
-                waveform = signal.resample(
-                    waveform,
-                    int(len(waveform) * self.config.sample_rate / sr),
-                )
-        
-        return waveform
+        """Decode audio in memory to mono float32 at the model sample rate."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            load_audio,
+            audio,
+            self.config.sample_rate,
+        )
     
     async def invoke(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
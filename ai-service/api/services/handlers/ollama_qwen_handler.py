@@ -8,6 +8,12 @@ Uses local Ollama server with qwen3-lexi model for:
 - Text completion
 
 NO HuggingFace dependency - pure Ollama API.
+
+Chat calls with a session_id keep Ollama's context token array per session
+(/api/generate), so follow-up turns don't re-encode the whole conversation;
+history without a stored context goes to /api/chat as messages.
+Requests go through the shared "ollama" circuit breaker (ProviderHealth):
+while Ollama is down they fail fast with CircuitOpenError.
 """
 
 import logging
@@ -17,6 +23,9 @@ import httpx
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 
+from api.services.prompt_cache import OllamaSessionContexts
+from api.services.provider_health import CircuitOpenError, get_provider_health
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +40,7 @@ class OllamaQwenConfig:
     context_length: int = 2048
     num_threads: int = 8
     keep_alive: str = "24h"
+    session_contexts: int = 1024  # chat sessions whose context is kept (0 = disabled)
 
 
 class OllamaQwenHandler:
@@ -48,6 +58,13 @@ class OllamaQwenHandler:
         self.config = config or OllamaQwenConfig()
         self.client: Optional[httpx.AsyncClient] = None
         self._loaded = False
+        self.health = get_provider_health()
+        self.sessions: Optional[OllamaSessionContexts] = None
+        if self.config.session_contexts > 0:
+            self.sessions = OllamaSessionContexts(
+                max_sessions=self.config.session_contexts,
+                max_context_tokens=self.config.context_length * 3 // 4,
+            )
         
     @property
     def is_loaded(self) -> bool:
@@ -67,6 +84,9 @@ class OllamaQwenHandler:
         """
         if self._loaded:
             return True
+        if not self.health.is_available("ollama"):
+            # Recently failed; don't wait on another connect timeout
+            return False
         
         try:
             logger.info(f"[OllamaQwenHandler] Connecting to Ollama at {self.config.base_url}...")
@@ -92,6 +112,7 @@ class OllamaQwenHandler:
                         f"Available: {model_names}"
                     )
                 
+                self.health.register("ollama", probe=self._probe)
                 self._loaded = True
                 logger.info(f"[OllamaQwenHandler] ✓ Connected to Ollama")
                 return True
@@ -101,8 +122,26 @@ class OllamaQwenHandler:
                 
         except Exception as e:
             logger.error(f"[OllamaQwenHandler] Failed to connect: {e}")
+            self.health.record_failure("ollama", e)
             return False
     
+    async def _probe(self) -> bool:
+        if self.client is None:
+            return False
+        response = await self.client.get("/api/tags", timeout=5.0)
+        return response.status_code == 200
+    
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to Ollama through the shared circuit breaker."""
+        async def request() -> Dict[str, Any]:
+            # Use longer timeout for inference
+            timeout = httpx.Timeout(300.0, connect=30.0)
+            response = await self.client.post(path, json=payload, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        
+        return await self.health.call("ollama", request)
+    
     async def unload(self) -> None:
         """Close HTTP client."""
         if self.client:
@@ -119,6 +158,7 @@ class OllamaQwenHandler:
         system_prompt: Optional[str] = None,
         message: Optional[str] = None,
         system: Optional[str] = None,
+        session_id: Optional[str] = None,
         **kwargs,
     ) -> str:
         """
@@ -130,6 +170,7 @@ class OllamaQwenHandler:
             max_tokens: Maximum tokens to generate
             system_prompt: System prompt (alias: system)
             message: Simple message string (will be wrapped)
+            session_id: Reuse the Ollama context of this conversation
             
         Returns:
             Generated response text
@@ -152,33 +193,32 @@ class OllamaQwenHandler:
         else:
             full_messages = messages or []
         
+        options = {
+            "temperature": temperature or self.config.temperature,
+            "top_p": self.config.top_p,
+            "num_ctx": self.config.context_length,
+            "num_thread": self.config.num_threads,
+            "num_predict": max_tokens,
+        }
+        if session_id and self.sessions is not None:
+            plan = self.sessions.prepare(session_id, full_messages)
+            if plan is not None:
+                return await self._session_chat(session_id, full_messages, plan, options)
+        
         payload = {
             "model": self.config.model,
             "messages": full_messages,
             "stream": False,
-            "options": {
-                "temperature": temperature or self.config.temperature,
-                "top_p": self.config.top_p,
-                "num_ctx": self.config.context_length,
-                "num_thread": self.config.num_threads,
-                "num_predict": max_tokens,
-            },
+            "options": options,
             "keep_alive": self.config.keep_alive,
         }
         
         try:
-            # Use longer timeout for inference
-            timeout = httpx.Timeout(300.0, connect=30.0)
-            response = await self.client.post(
-                "/api/chat",
-                json=payload,
-                timeout=timeout,
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._post("/api/chat", payload)
             return data.get("message", {}).get("content", "")
             
+        except CircuitOpenError:
+            raise
         except httpx.TimeoutException:
             logger.error("[OllamaQwenHandler] Request timeout")
             raise RuntimeError("Ollama request timeout")
@@ -186,6 +226,44 @@ class OllamaQwenHandler:
             logger.error(f"[OllamaQwenHandler] Chat failed: {e}")
             raise
     
+    async def _session_chat(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        plan: tuple,
+        options: Dict[str, Any],
+    ) -> str:
+        """One chat turn via /api/generate, continuing the session's context."""
+        system, prompt, context = plan
+        payload = {
+            "model": self.config.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": options,
+            "keep_alive": self.config.keep_alive,
+        }
+        if system:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        
+        try:
+            data = await self._post("/api/generate", payload)
+        except CircuitOpenError:
+            raise
+        except httpx.TimeoutException:
+            self.sessions.invalidate(session_id)
+            logger.error("[OllamaQwenHandler] Request timeout")
+            raise RuntimeError("Ollama request timeout")
+        except Exception as e:
+            self.sessions.invalidate(session_id)
+            logger.error(f"[OllamaQwenHandler] Session chat failed: {e}")
+            raise
+        
+        reply = data.get("response", "")
+        self.sessions.update(session_id, messages, system, reply, data.get("context"))
+        return reply
+    
     async def analyze_grammar(
         self,
         text: str,
@@ -343,6 +421,7 @@ Guidelines:
                     system_prompt=params.get("system_prompt") or params.get("system"),
                     temperature=params.get("temperature"),
                     max_tokens=params.get("max_tokens", 512),
+                    session_id=params.get("session_id"),
                 )
             }
 
@@ -2,16 +2,30 @@
 Piper Handler - Text-to-Speech
 
 Manages Piper TTS for speech synthesis.
+
+Loaded voices (Python package) and long-running ``piper --output_raw``
+processes (CLI) are kept resident in bounded pools keyed by model/speaker,
+so a synthesis never pays the model load and audio never touches disk.
 """
 
 import logging
 import asyncio
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Callable, Hashable, Iterator, List, Union
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
+import io
+import json
 import os
+import selectors
 import tempfile
 import subprocess
 import shutil
+import threading
+import time
+import wave
+
+from api.services.tts_cache import TTSCache, get_tts_cache
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +41,217 @@ class PiperConfig:
     noise_w: float = 0.8
     sentence_silence: float = 0.2
     output_format: str = "wav"  # wav, mp3, ogg
-    sample_rate: int = 22050
+    sample_rate: int = 22050  # fallback when the voice's .onnx.json is missing
+    pool_size: int = 2  # resident voices / piper processes per model+speaker
+    max_pools: int = 4  # resident pools (CLI pools are per speed); least recently used is closed
+    persistent_process: bool = True  # CLI: keep piper running, stream over pipes
+    process_timeout: float = 30.0  # seconds per utterance before the process is recycled
+    use_cache: bool = True  # shared phrase cache (api.services.tts_cache)
+
+
+def _wav_duration(wav_bytes: bytes) -> float:
+    """Duration in seconds of in-memory WAV audio."""
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except Exception:
+        return 0.0
+
+
+def _model_sample_rate(model_path: str) -> Optional[int]:
+    """Sample rate from the voice config (``<model>.onnx.json``), if present."""
+    try:
+        with open(f"{model_path}.json", "r", encoding="utf-8") as f:
+            return int(json.load(f)["audio"]["sample_rate"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container (in memory)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class _ResourcePool:
+    """
+    Bounded pool of reusable, non-thread-safe synthesis resources.
+
+    At most ``size`` resources exist; callers beyond that wait for one to be
+    released. A resource that raised during use is closed instead of reused.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        close: Optional[Callable[[Any], None]] = None,
+    ):
+        self._factory = factory
+        self._size = max(1, size)
+        self._close = close
+        self._idle: List[Any] = []
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        with self._cond:
+            while not self._idle and self._created >= self._size:
+                self._cond.wait()
+            item = self._idle.pop() if self._idle else None
+            if item is None:
+                self._created += 1
+
+        if item is None:
+            try:
+                item = self._factory()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+
+        try:
+            yield item
+        except Exception:
+            self._discard(item)
+            raise
+        else:
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(item)
+                    self._cond.notify()
+                    return
+            self._discard(item)
+
+    def _discard(self, item: Any) -> None:
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+        if self._close is not None:
+            try:
+                self._close(item)
+            except Exception as e:
+                logger.debug(f"[PiperHandler] Error closing pooled resource: {e}")
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for item in idle:
+            self._discard(item)
+
+
+class PiperProcess:
+    """
+    Long-running ``piper --output_raw`` process.
+
+    Each stdin line is one utterance; raw 16-bit PCM streams back on stdout.
+    Piper logs "Real-time factor" on stderr only after the utterance's audio
+    has been written and flushed, which marks the end of a response.
+    """
+
+    DONE_MARKER = b"Real-time factor"
+
+    def __init__(self, cmd: List[str], timeout: float = 30.0):
+        self.timeout = timeout
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        self._stdout = self._proc.stdout.fileno()
+        self._stderr = self._proc.stderr.fileno()
+        os.set_blocking(self._stdout, False)
+        os.set_blocking(self._stderr, False)
+        self._stderr_buf = b""
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    @staticmethod
+    def _read(fd: int) -> Optional[bytes]:
+        """Non-blocking read: None if no data yet, b"" on EOF."""
+        try:
+            return os.read(fd, 65536)
+        except BlockingIOError:
+            return None
+
+    def synthesize_raw(
+        self,
+        text: str,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+    ) -> bytes:
+        """Synthesize one utterance, returning raw PCM (optionally streamed to on_chunk)."""
+        line = " ".join(text.split())
+        if not line:
+            return b""
+        if not self.alive:
+            raise RuntimeError("piper process has exited")
+
+        self._proc.stdin.write(line.encode("utf-8") + b"\n")
+        self._proc.stdin.flush()
+
+        pcm = bytearray()
+        deadline = time.monotonic() + self.timeout
+        done = False
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._stdout, selectors.EVENT_READ)
+            selector.register(self._stderr, selectors.EVENT_READ)
+            while not done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"piper produced no end marker within {self.timeout}s")
+                for key, _ in selector.select(remaining):
+                    chunk = self._read(key.fd)
+                    if chunk is None:
+                        continue
+                    if chunk == b"":
+                        raise RuntimeError("piper process closed its output")
+                    if key.fd == self._stdout:
+                        pcm += chunk
+                        if on_chunk is not None:
+                            on_chunk(chunk)
+                        continue
+                    self._stderr_buf += chunk
+                    while b"\n" in self._stderr_buf:
+                        log_line, _, self._stderr_buf = self._stderr_buf.partition(b"\n")
+                        if self.DONE_MARKER in log_line:
+                            done = True
+
+        # Audio written before the marker may still sit in the pipe
+        while True:
+            chunk = self._read(self._stdout)
+            if not chunk:
+                break
+            pcm += chunk
+            if on_chunk is not None:
+                on_chunk(chunk)
+        return bytes(pcm)
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=2)
+            except Exception:
+                self._proc.kill()
+                self._proc.wait()
+        for stream in (self._proc.stdout, self._proc.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
 
 
 class PiperHandler:
@@ -44,11 +268,24 @@ class PiperHandler:
         self._loaded = False
         self._loading = False
         self._lock = asyncio.Lock()
+        self._sample_rate: Optional[int] = None
+        # Resident voices / piper processes, keyed by model + speaker (+ speed for CLI),
+        # least recently used first
+        self._pools: "OrderedDict[Hashable, _ResourcePool]" = OrderedDict()
+        self._pools_lock = threading.Lock()
         
     @property
     def is_loaded(self) -> bool:
         return self._loaded
     
+    @property
+    def sample_rate(self) -> int:
+        """Output sample rate of the loaded voice."""
+        if self._sample_rate is None and self._model_path:
+            # Cached once found; the model may only be downloaded on first use
+            self._sample_rate = _model_sample_rate(self._model_path)
+        return self._sample_rate or self.config.sample_rate
+
     @property
     def memory_usage_mb(self) -> float:
         """Piper models are typically small."""
@@ -109,8 +346,9 @@ class PiperHandler:
                         # Will download on first use
                         self._model_path = self.config.model_path
                 
+                self._sample_rate = _model_sample_rate(self._model_path)
                 self._loaded = True
-                logger.info(f"[PiperHandler] ✓ Piper initialized")
+                logger.info(f"[PiperHandler] ✓ Piper initialized ({self.sample_rate} Hz)")
                 return True
                 
             except Exception as e:
@@ -141,10 +379,34 @@ class PiperHandler:
                 
         return None
     
+    def _get_pool(self, key: Hashable, factory: Callable[[], Any], close=None) -> _ResourcePool:
+        evicted = []
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _ResourcePool(factory, self.config.pool_size, close)
+                self._pools[key] = pool
+                while len(self._pools) > max(1, self.config.max_pools):
+                    evicted.append(self._pools.popitem(last=False)[1])
+            else:
+                self._pools.move_to_end(key)
+        # In-use resources of an evicted pool are closed when released
+        for old in evicted:
+            old.close()
+        return pool
+
+    def _close_pools(self) -> None:
+        with self._pools_lock:
+            pools, self._pools = list(self._pools.values()), OrderedDict()
+        for pool in pools:
+            pool.close()
+
     async def unload(self) -> None:
         """Unload/cleanup resources."""
         self._loaded = False
+        await asyncio.get_event_loop().run_in_executor(None, self._close_pools)
         self._piper_path = None
+        self._sample_rate = None
         logger.info("[PiperHandler] Handler unloaded")
     
     async def synthesize(
@@ -175,22 +437,33 @@ class PiperHandler:
         output_format = output_format or self.config.output_format
         length_scale = 1.0 / (speed or 1.0)  # Invert for piper
         
-        # Generate audio
-        loop = asyncio.get_event_loop()
-        
-        if hasattr(self, "_use_python") and self._use_python:
-            audio_bytes, duration = await loop.run_in_executor(
-                None,
-                self._synthesize_python,
+        # Generate audio (WAV), served from the shared phrase cache when possible
+        cache = get_tts_cache() if self.config.use_cache else None
+        key = None
+        audio_bytes = None
+        if cache is not None and cache.cacheable(text):
+            key = TTSCache.make_key(
+                self._model_path or self.config.model_path,
+                self.config.speaker_id,
+                speed or 1.0,
                 text,
-                length_scale,
+                noise_scale=self.config.noise_scale,
+                noise_w=self.config.noise_w,
+                sentence_silence=self.config.sentence_silence,
             )
+            audio_bytes = cache.get(key, local_only=True)
+        
+        if audio_bytes is not None:
+            duration = _wav_duration(audio_bytes)
         else:
+            loop = asyncio.get_event_loop()
             audio_bytes, duration = await loop.run_in_executor(
                 None,
-                self._synthesize_cli,
+                self._synthesize_wav,
                 text,
                 length_scale,
+                cache if key is not None else None,
+                key,
             )
         
         # Convert format if needed
@@ -204,85 +477,126 @@ class PiperHandler:
         return {
             "audio_bytes": audio_bytes,
             "format": output_format,
-            "sample_rate": self.config.sample_rate,
+            "sample_rate": self.sample_rate,
             "duration": duration,
         }
     
-    def _synthesize_python(
+    def _synthesize_wav(
         self,
         text: str,
         length_scale: float,
+        cache: Optional[TTSCache] = None,
+        key: Optional[str] = None,
     ) -> tuple:
-        """Synthesize using Python package."""
-        from piper import PiperVoice
-        import wave
-        import io
+        """Blocking synthesis on the active backend, via the cache if given."""
+        if cache is not None:
+            cached = cache.get(key)
+            if cached:
+                return cached, _wav_duration(cached)
         
-        # Load voice
-        voice = PiperVoice.load(self._model_path)
+        if hasattr(self, "_use_python") and self._use_python:
+            audio_bytes, duration = self._synthesize_python(text, length_scale)
+        elif self.config.persistent_process:
+            audio_bytes, duration = self._synthesize_persistent(text, length_scale)
+        else:
+            audio_bytes, duration = self._synthesize_cli(text, length_scale)
         
-        # Generate audio
+        if cache is not None:
+            cache.put(key, audio_bytes)
+        return audio_bytes, duration
+    
+    def _load_voice(self):
+        from piper import PiperVoice
+
+        logger.info(f"[PiperHandler] Loading voice {self._model_path}")
+        return PiperVoice.load(self._model_path)
+
+    def _synthesize_python(
+        self,
+        text: str,
+        length_scale: float,
+    ) -> tuple:
+        """Synthesize using Python package with a pooled, already-loaded voice."""
+        pool = self._get_pool(("voice", self._model_path, self.config.speaker_id), self._load_voice)
+
+        extra = {}
+        if self.config.speaker_id is not None:
+            extra["speaker_id"] = self.config.speaker_id
+
         buffer = io.BytesIO()
-        with wave.open(buffer, "wb") as wav_file:
-            voice.synthesize(
-                text,
-                wav_file,
-                length_scale=length_scale,
-                noise_scale=self.config.noise_scale,
-                noise_w=self.config.noise_w,
-                sentence_silence=self.config.sentence_silence,
-            )
-        
+        with pool.acquire() as voice:
+            with wave.open(buffer, "wb") as wav_file:
+                voice.synthesize(
+                    text,
+                    wav_file,
+                    length_scale=length_scale,
+                    noise_scale=self.config.noise_scale,
+                    noise_w=self.config.noise_w,
+                    sentence_silence=self.config.sentence_silence,
+                    **extra,
+                )
+
         audio_bytes = buffer.getvalue()
         
-        # Calculate duration
-        duration = len(audio_bytes) / (self.config.sample_rate * 2)  # 16-bit
-        
-        return audio_bytes, duration
+        return audio_bytes, _wav_duration(audio_bytes)
     
+    def _cli_command(self, length_scale: float) -> List[str]:
+        cmd = [
+            self._piper_path,
+            "--model", self._model_path,
+            "--output_raw",
+            "--length_scale", str(length_scale),
+            "--noise_scale", str(self.config.noise_scale),
+            "--noise_w", str(self.config.noise_w),
+            "--sentence_silence", str(self.config.sentence_silence),
+        ]
+        if self.config.speaker_id is not None:
+            cmd.extend(["--speaker", str(self.config.speaker_id)])
+        return cmd
+
+    def _synthesize_persistent(
+        self,
+        text: str,
+        length_scale: float,
+    ) -> tuple:
+        """Synthesize on a resident piper process, falling back to a one-shot run."""
+        key = ("process", self._model_path, self.config.speaker_id, round(length_scale, 3))
+        cmd = self._cli_command(length_scale)
+        pool = self._get_pool(
+            key,
+            lambda: PiperProcess(cmd, timeout=self.config.process_timeout),
+            PiperProcess.close,
+        )
+        try:
+            with pool.acquire() as process:
+                pcm = process.synthesize_raw(text)
+        except Exception as e:
+            logger.warning(f"[PiperHandler] Persistent piper failed ({e}), using one-shot CLI")
+            return self._synthesize_cli(text, length_scale)
+
+        sample_rate = self.sample_rate
+        duration = len(pcm) / (sample_rate * 2)
+        return _pcm_to_wav(pcm, sample_rate), duration
+
     def _synthesize_cli(
         self,
         text: str,
         length_scale: float,
     ) -> tuple:
-        """Synthesize using CLI."""
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            output_path = f.name
+        """Synthesize using a one-shot CLI run, reading raw PCM from stdout."""
+        process = subprocess.run(
+            self._cli_command(length_scale),
+            input=text.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+        pcm = process.stdout
         
-        try:
-            cmd = [
-                self._piper_path,
-                "--model", self._model_path,
-                "--output_file", output_path,
-                "--length_scale", str(length_scale),
-                "--noise_scale", str(self.config.noise_scale),
-                "--noise_w", str(self.config.noise_w),
-                "--sentence_silence", str(self.config.sentence_silence),
-            ]
-            
-            if self.config.speaker_id is not None:
-                cmd.extend(["--speaker", str(self.config.speaker_id)])
-            
-            # Run piper
-            process = subprocess.run(
-                cmd,
-                input=text.encode("utf-8"),
-                capture_output=True,
-                check=True,
-            )
-            
-            # Read output
-            with open(output_path, "rb") as f:
-                audio_bytes = f.read()
-            
-            # Calculate duration
-            duration = len(audio_bytes) / (self.config.sample_rate * 2)
-            
-            return audio_bytes, duration
-            
-        finally:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+        # Calculate duration
+        sample_rate = self.sample_rate
+        duration = len(pcm) / (sample_rate * 2)
+        
+        return _pcm_to_wav(pcm, sample_rate), duration
     
     async def _convert_audio(
         self,
@@ -6,14 +6,31 @@ Manages Qwen3-1.7B model for:
 - Grammar analysis
 - Fluency scoring
 - Text completion
+
+Tokenization and generation run on a dedicated LLMWorker thread that owns
+the model, so the event loop stays responsive; timeouts and cancellation
+(e.g. from ModelGateway.invoke) stop generation at the next token. With
+continuous batching enabled, concurrent requests share one decode loop
+(GenerationScheduler) instead of queueing behind each other, and the KV
+cache of each system prompt is kept (PrefixKVCache) so repeat turns only
+prefill the conversation after it.
 """
 
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+from typing import AsyncIterator, Callable, Optional, Dict, Any, List
 from dataclasses import dataclass
 import os
 
+from api.services.generation_scheduler import GenerationScheduler
+from api.services.llm_worker import (
+    CancelToken,
+    LLMWorker,
+    hf_stopping_criteria,
+    hf_text_streamer,
+)
+from api.services.prompt_cache import PrefixKVCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +45,13 @@ class QwenConfig:
     temperature: float = 0.7
     top_p: float = 0.9
     use_flash_attention: bool = False
+    generation_timeout: float = 120.0  # seconds per request, enforced on the worker
+    max_queue: int = 16  # requests waiting for the model before rejecting
+    continuous_batching: bool = True  # batch concurrent requests between decode steps
+    max_batch_size: int = 8
+    batch_wait_ms: float = 10.0  # how long an idle scheduler waits for more prompts
+    prefix_cache_mb: float = 256.0  # KV cache of system prompts (0 = disabled)
+    prefix_min_tokens: int = 32  # shorter system prompts are not worth caching
 
 
 class QwenHandler:
@@ -44,6 +68,8 @@ class QwenHandler:
         self._loaded = False
         self._loading = False
         self._lock = asyncio.Lock()
+        self._worker = LLMWorker("qwen", max_queue=self.config.max_queue)
+        self._scheduler: Optional[GenerationScheduler] = None
         
     @property
     def is_loaded(self) -> bool:
@@ -80,42 +106,17 @@ class QwenHandler:
             self._loading = True
             try:
                 logger.info("[QwenHandler] Loading Qwen model...")
-                
-                # Import here to avoid loading at startup
-                from transformers import AutoModelForCausalLM, AutoTokenizer
-                import torch
-                
-                # Detect device
-                device = self._detect_device()
-                
-                # Check local model first
-                model_path = self.config.model_path
-                if not os.path.exists(model_path):
-                    model_path = self.config.model_id
-                    logger.info(f"[QwenHandler] Local model not found, using HuggingFace: {model_path}")
-                
-                # Load tokenizer
-                self.tokenizer = AutoTokenizer.from_pretrained(
-                    model_path,
-                    trust_remote_code=True,
-                )
-                
-                # Load model with appropriate dtype
-                dtype = torch.float16 if device != "cpu" else torch.float32
-                
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    model_path,
-                    torch_dtype=dtype,
-                    device_map=device if device != "mps" else "auto",
-                    trust_remote_code=True,
-                    low_cpu_mem_usage=True,
-                )
-                
-                if device == "mps":
-                    self.model = self.model.to("mps")
-                
-                self.model.eval()
-                
+                device = await self._worker.run(lambda token: self._load_sync())
+                if self.config.continuous_batching:
+                    self._scheduler = GenerationScheduler(
+                        self.model,
+                        self.tokenizer,
+                        max_batch_size=self.config.max_batch_size,
+                        max_wait_ms=self.config.batch_wait_ms,
+                        max_queue=self.config.max_queue,
+                        name="qwen_generation",
+                        prefix_cache=self._make_prefix_cache(),
+                    )
                 self._loaded = True
                 logger.info(f"[QwenHandler] ✓ Qwen model loaded on {device}")
                 return True
@@ -127,6 +128,53 @@ class QwenHandler:
             finally:
                 self._loading = False
     
+    def _make_prefix_cache(self) -> Optional[PrefixKVCache]:
+        if self.config.prefix_cache_mb <= 0:
+            return None
+        return PrefixKVCache(
+            max_bytes=int(self.config.prefix_cache_mb * 1024 * 1024),
+            min_tokens=self.config.prefix_min_tokens,
+            name="qwen_prefix_cache",
+        )
+    
+    def _load_sync(self) -> str:
+        """Load tokenizer and model (runs on the worker thread)."""
+        # Import here to avoid loading at startup
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        import torch
+        
+        # Detect device
+        device = self._detect_device()
+        
+        # Check local model first
+        model_path = self.config.model_path
+        if not os.path.exists(model_path):
+            model_path = self.config.model_id
+            logger.info(f"[QwenHandler] Local model not found, using HuggingFace: {model_path}")
+        
+        # Load tokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            trust_remote_code=True,
+        )
+        
+        # Load model with appropriate dtype
+        dtype = torch.float16 if device != "cpu" else torch.float32
+        
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_path,
+            torch_dtype=dtype,
+            device_map=device if device != "mps" else "auto",
+            trust_remote_code=True,
+            low_cpu_mem_usage=True,
+        )
+        
+        if device == "mps":
+            self.model = self.model.to("mps")
+        
+        self.model.eval()
+        return device
+    
     def _detect_device(self) -> str:
         """Detect best available device."""
         import torch
@@ -141,15 +189,21 @@ class QwenHandler:
         return "cpu"
     
     async def unload(self) -> None:
-        """Unload model to free memory."""
+        """Unload model to free memory (after in-flight generations finish)."""
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+            self._scheduler = None
+        await self._worker.run(lambda token: self._unload_sync())
+        self._loaded = False
+        logger.info("[QwenHandler] Model unloaded")
+    
+    def _unload_sync(self) -> None:
         if self.model is not None:
             del self.model
             self.model = None
         if self.tokenizer is not None:
             del self.tokenizer
             self.tokenizer = None
-            
-        self._loaded = False
         
         # Force garbage collection
         import gc
@@ -161,8 +215,15 @@ class QwenHandler:
                 torch.cuda.empty_cache()
         except:
             pass
-            
-        logger.info("[QwenHandler] Model unloaded")
+    
+    @staticmethod
+    def _build_messages(
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str],
+    ) -> List[Dict[str, str]]:
+        if system_prompt:
+            return [{"role": "system", "content": system_prompt}, *messages]
+        return messages
     
     async def chat(
         self,
@@ -170,6 +231,7 @@ class QwenHandler:
         temperature: Optional[float] = None,
         max_tokens: int = 512,
         system_prompt: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> str:
         """
         Generate chat response.
@@ -179,6 +241,7 @@ class QwenHandler:
             temperature: Override config temperature
             max_tokens: Maximum tokens to generate
             system_prompt: Optional system prompt
+            timeout: Override config generation_timeout (seconds)
             
         Returns:
             Generated response text
@@ -186,24 +249,92 @@ class QwenHandler:
         if not await self.load():
             raise RuntimeError("Failed to load Qwen model")
         
-        # Build conversation
-        if system_prompt:
-            full_messages = [{"role": "system", "content": system_prompt}]
-            full_messages.extend(messages)
-        else:
-            full_messages = messages
+        full_messages = self._build_messages(messages, system_prompt)
+        if self._scheduler is not None:
+            return await self._scheduler.generate(
+                self._chat_prompt(full_messages),
+                max_new_tokens=max_tokens,
+                temperature=temperature or self.config.temperature,
+                top_p=self.config.top_p,
+                timeout=timeout or self.config.generation_timeout,
+                prefix=self._system_prefix(full_messages),
+            )
+        return await self._worker.run(
+            lambda token: self._generate_sync(full_messages, temperature, max_tokens, token),
+            timeout=timeout or self.config.generation_timeout,
+        )
+    
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: int = 512,
+        system_prompt: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat response text as it is generated.
         
-        # Apply chat template
-        text = self.tokenizer.apply_chat_template(
-            full_messages,
+        Stopping iteration early cancels the generation.
+        """
+        if not await self.load():
+            raise RuntimeError("Failed to load Qwen model")
+        
+        full_messages = self._build_messages(messages, system_prompt)
+        if self._scheduler is not None:
+            pieces = self._scheduler.stream(
+                self._chat_prompt(full_messages),
+                max_new_tokens=max_tokens,
+                temperature=temperature or self.config.temperature,
+                top_p=self.config.top_p,
+                timeout=timeout or self.config.generation_timeout,
+                prefix=self._system_prefix(full_messages),
+            )
+        else:
+            pieces = self._worker.stream(
+                lambda emit, token: self._generate_sync(full_messages, temperature, max_tokens, token, emit),
+                timeout=timeout or self.config.generation_timeout,
+            )
+        async for piece in pieces:
+            yield piece
+    
+    def _chat_prompt(self, messages: List[Dict[str, str]]) -> str:
+        return self.tokenizer.apply_chat_template(
+            messages,
             tokenize=False,
             add_generation_prompt=True,
         )
+    
+    def _system_prefix(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Templated system message, the part of the prompt shared across turns."""
+        if not messages or messages[0].get("role") != "system":
+            return None
+        return self.tokenizer.apply_chat_template(
+            messages[:1],
+            tokenize=False,
+            add_generation_prompt=False,
+        )
+    
+    def _generate_sync(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: int,
+        token: CancelToken,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Tokenize and generate (runs on the worker thread)."""
+        # Apply chat template
+        text = self._chat_prompt(messages)
         
         # Tokenize
         inputs = self.tokenizer(text, return_tensors="pt")
         inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
         
+        extra: Dict[str, Any] = {"stopping_criteria": hf_stopping_criteria(token)}
+        if emit is not None:
+            extra["streamer"] = hf_text_streamer(self.tokenizer, emit)
+        
         # Generate
         import torch
         with torch.no_grad():
@@ -214,7 +345,10 @@ class QwenHandler:
                 top_p=self.config.top_p,
                 do_sample=True,
                 pad_token_id=self.tokenizer.eos_token_id,
+                **extra,
             )
+        # A cancelled generation is truncated; don't pass it off as complete
+        token.raise_if_cancelled()
         
         # Decode only the new tokens
         new_tokens = outputs[0][inputs["input_ids"].shape[1]:]
@@ -222,6 +356,13 @@ class QwenHandler:
         
         return response.strip()
     
+    def get_worker_stats(self) -> Dict[str, Any]:
+        """Inference worker and batching scheduler metrics."""
+        stats = self._worker.get_stats()
+        if self._scheduler is not None:
+            stats["batching"] = self._scheduler.get_stats()
+        return stats
+    
     async def analyze_grammar(
         self,
         text: str,
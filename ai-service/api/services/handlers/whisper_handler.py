@@ -8,9 +8,10 @@ import logging
 import asyncio
 from typing import Optional, Dict, Any, Union
 from dataclasses import dataclass
-import os
-import tempfile
-import base64
+
+import numpy as np
+
+from api.services.audio_decoding import coerce_audio_input, load_audio
 
 logger = logging.getLogger(__name__)
 
@@ -157,36 +158,24 @@ class WhisperHandler:
         if not await self.load():
             raise RuntimeError("Failed to load Whisper model")
         
-        # Handle different audio input types
-        audio_path = await self._prepare_audio(audio)
-        
-        try:
-            # Run transcription in executor to not block
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._transcribe_sync,
-                audio_path,
-                language,
-            )
-            return result
-            
-        finally:
-            # Clean up temp file if created
-            if audio_path.startswith(tempfile.gettempdir()):
-                try:
-                    os.remove(audio_path)
-                except:
-                    pass
+        # Decode + transcribe in executor to not block
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(
+            None,
+            self._transcribe_sync,
+            audio,
+            language,
+        )
+        return result
     
     def _transcribe_sync(
         self,
-        audio_path: str,
+        audio: Union[str, bytes],
         language: Optional[str],
     ) -> Dict[str, Any]:
         """Synchronous transcription."""
         segments, info = self.model.transcribe(
-            audio_path,
+            self._prepare_audio(audio),
             beam_size=self.config.beam_size,
             language=language or self.config.language,
             task=self.config.task,
@@ -221,42 +210,16 @@ class WhisperHandler:
             "confidence": confidence,
         }
     
-    async def _prepare_audio(self, audio: Union[str, bytes]) -> str:
-        """Prepare audio input for transcription."""
-        if isinstance(audio, str):
-            # Check if it's base64
-            if audio.startswith("data:audio") or len(audio) > 500:
-                try:
-                    # Try to decode as base64
-                    if "base64," in audio:
-                        audio = audio.split("base64,")[1]
-                    audio_bytes = base64.b64decode(audio)
-                    return await self._save_temp_audio(audio_bytes)
-                except:
-                    pass
-            # Assume it's a file path
-            return audio
-            
-        elif isinstance(audio, bytes):
-            return await self._save_temp_audio(audio)
-            
-        else:
-            raise ValueError(f"Unsupported audio type: {type(audio)}")
-    
-    async def _save_temp_audio(self, audio_bytes: bytes) -> str:
-        """Save audio bytes to temp file."""
-        # Detect format from magic bytes
-        ext = ".wav"
-        if audio_bytes[:4] == b"OggS":
-            ext = ".ogg"
-        elif audio_bytes[:3] == b"ID3" or audio_bytes[:2] == b"\xff\xfb":
-            ext = ".mp3"
-        elif audio_bytes[:4] == b"fLaC":
-            ext = ".flac"
-        
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as f:
-            f.write(audio_bytes)
-            return f.name
+    def _prepare_audio(self, audio: Union[str, bytes]) -> Union[str, np.ndarray]:
+        """Decode audio input in memory to 16 kHz mono float32."""
+        source = coerce_audio_input(audio)
+        try:
+            return load_audio(source, target_sr=16000)
+        except ValueError:
+            if isinstance(source, str):
+                # Let faster-whisper try formats we cannot decode in memory
+                return source
+            raise
     
     async def invoke(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -235,12 +235,10 @@ class HuBERTService:
         orig_sr: int,
         target_sr: int,
     ) -> np.ndarray:
-        """Resample audio to target sample rate using scipy."""
-        from scipy import signal
+        """Resample audio to target sample rate (cached polyphase filter)."""
+        from api.services.audio_decoding import resample
         
-        num_samples = int(len(audio) * target_sr / orig_sr)
-        resampled = signal.resample(audio, num_samples)
-        return resampled.astype(np.float32)
+        return resample(audio, orig_sr, target_sr)
     
     def _calculate_phoneme_scores(
         self,
@@ -1,61 +1,181 @@
-"""V3 Knowledge Graph service (skeleton).
+"""V3 Knowledge Graph service.
 
 This is a thin interface for:
 - Expanding concepts (graph hops)
 - Writing/learning edges after each interaction
 
-Replace internals with KuzuDB/Neo4j/NetworkX later.
+The service is process-wide: the Kuzu database is opened once, the schema is
+checked once and the default curriculum is seeded idempotently (guarded by
+``SEED_VERSION``). Callers borrow connections from a small pool instead of
+constructing their own service per request - use ``get_kg_service()``.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
 import os
+import queue
+import threading
+import time
 
 import kuzu
 
 from api.core.config import settings
 from api.models.v3_schemas import KGHits, KGExpandedNode, KGPath
+from api.services.kg_snapshot import PREREQUISITE_RELATION, GraphSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the curriculum in _seed_default_graph changes so existing
+# databases pick up the new concepts/edges on the next startup.
+SEED_VERSION = "2026.10.1"
+
+DEFAULT_POOL_SIZE = 4
+
+# Expansion limits (variable-length paths are bounded in the query itself)
+MAX_EXPAND_HOPS = 4
+DEFAULT_MAX_FANOUT = 25
 
 
 class KnowledgeGraphServiceV3:
     """KuzuDB-backed KG service for V3 pipeline."""
 
-    def __init__(self) -> None:
-        db_path = getattr(settings, "KUZU_DB_PATH", None) or os.path.join(
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        db_path = db_path or getattr(settings, "KUZU_DB_PATH", None) or os.path.join(
             os.path.dirname(__file__), "..", "..", "data", "kuzu"
         )
         db_path = os.path.abspath(db_path)
+        self.db_path = db_path
         
         # Create parent directory if doesn't exist
         parent_dir = os.path.dirname(db_path)
         os.makedirs(parent_dir, exist_ok=True)
         
-        # Remove if it's a directory (Kuzu needs the path to not exist or be a valid DB)
-        if os.path.isdir(db_path):
-            import shutil
-            shutil.rmtree(db_path)
+        try:
+            self._db = kuzu.Database(db_path)
+        except RuntimeError:
+            if not os.path.isdir(db_path):
+                raise
+            # Directory layout from Kuzu < 0.11, which the single-file format
+            # cannot open: move it aside (never delete it) and start fresh.
+            legacy_path = f"{db_path}.legacy-{int(time.time())}"
+            logger.warning(f"Cannot open legacy Kuzu directory {db_path}; moved to {legacy_path}")
+            os.replace(db_path, legacy_path)
+            self._db = kuzu.Database(db_path)
+
+        # Connection pool shared by nodes, retrieval and analytics
+        self._pool_size = max(1, pool_size)
+        self._pool: "queue.LifoQueue[kuzu.Connection]" = queue.LifoQueue(maxsize=self._pool_size)
+        for _ in range(self._pool_size):
+            self._pool.put(kuzu.Connection(self._db))
+
+        # Concept table cache (invalidated on writes to Concept/Edge)
+        self._cache_lock = threading.Lock()
+        self._concepts_cache: Optional[Dict[str, Dict[str, str]]] = None
+        self._concepts_version = 0
+
+        # Immutable CSR snapshot of Concept/Edge for hot-path traversal
+        self._snapshot: Optional[GraphSnapshot] = None
 
-        self._db = kuzu.Database(db_path)
-        self._conn = kuzu.Connection(self._db)
         self._ensure_schema()
         self._seed_default_graph()
 
+    # ------------------------------------------------------------------
+    # Connection pool
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def connection(self) -> Iterator[kuzu.Connection]:
+        """Borrow a pooled connection.
+
+        Never blocks: if every pooled connection is in use (e.g. threads
+        running analytics), a temporary connection is opened and discarded
+        afterwards.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = kuzu.Connection(self._db)
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                pass
+
+    def _query(self, statement: str, params: Optional[Dict[str, Any]] = None) -> List[List[Any]]:
+        """Run a read query on a pooled connection and return all rows."""
+        rows: List[List[Any]] = []
+        with self.connection() as conn:
+            result = conn.execute(statement, params or {})
+            while result.has_next():
+                rows.append(result.get_next())
+        return rows
+
+    def _execute(self, statement: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Run a write statement on a pooled connection."""
+        with self.connection() as conn:
+            conn.execute(statement, params or {})
+
+    def close(self) -> None:
+        """Close pooled connections and the database handle."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception:
+                pass
+        try:
+            self._db.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Schema & seeding
+    # ------------------------------------------------------------------
+
     def _ensure_schema(self) -> None:
         # Create tables if they do not exist.
         statements = [
             "CREATE NODE TABLE IF NOT EXISTS Concept(id STRING, title STRING, keywords STRING, PRIMARY KEY(id))",
             "CREATE NODE TABLE IF NOT EXISTS User(id STRING, PRIMARY KEY(id))",
+            "CREATE NODE TABLE IF NOT EXISTS GraphMeta(key STRING, value STRING, PRIMARY KEY(key))",
             "CREATE REL TABLE IF NOT EXISTS Edge(FROM Concept TO Concept, relation STRING)",
             "CREATE REL TABLE IF NOT EXISTS Mastery(FROM User TO Concept, score DOUBLE)",
         ]
         for stmt in statements:
             try:
-                self._conn.execute(stmt)
+                self._execute(stmt)
             except Exception:
                 # Ignore schema creation errors if already exists
                 continue
 
+    def _get_meta(self, key: str) -> Optional[str]:
+        try:
+            rows = self._query(
+                "MATCH (m:GraphMeta) WHERE m.key = $key RETURN m.value",
+                {"key": key},
+            )
+        except Exception:
+            return None
+        return rows[0][0] if rows else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        try:
+            self._execute(
+                "MERGE (m:GraphMeta {key: $key}) SET m.value = $value",
+                {"key": key, "value": value},
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write graph meta {key}: {e}")
+
     def _seed_default_graph(self) -> None:
         """
         Seed comprehensive curriculum concepts for English learning.
@@ -65,7 +185,14 @@ class KnowledgeGraphServiceV3:
         - Vocabulary domains
         - Pronunciation patterns
         - Common error patterns for Vietnamese learners
+
+        Idempotent: skipped entirely when the stored seed version matches
+        ``SEED_VERSION``; otherwise concepts/edges are upserted.
         """
+        if self._get_meta("seed_version") == SEED_VERSION:
+            logger.info(f"KG seed v{SEED_VERSION} already applied, skipping")
+            return
+
         nodes: Dict[str, Dict[str, str]] = {
             # ============================================
             # GRAMMAR - Level A1 (Beginner)
@@ -310,8 +437,8 @@ class KnowledgeGraphServiceV3:
             title = meta.get("title", "")
             keywords = meta.get("keywords", "")
             try:
-                self._conn.execute(
-                    "MERGE (c:Concept {id: $id, title: $title, keywords: $keywords})",
+                self._execute(
+                    "MERGE (c:Concept {id: $id}) SET c.title = $title, c.keywords = $keywords",
                     {"id": node_id, "title": title, "keywords": keywords},
                 )
             except Exception:
@@ -321,7 +448,7 @@ class KnowledgeGraphServiceV3:
         for from_id, rels in edges.items():
             for to_id, relation in rels:
                 try:
-                    self._conn.execute(
+                    self._execute(
                         "MATCH (a:Concept), (b:Concept) WHERE a.id = $from AND b.id = $to "
                         "MERGE (a)-[:Edge {relation: $relation}]->(b)",
                         {"from": from_id, "to": to_id, "relation": relation},
@@ -329,42 +456,182 @@ class KnowledgeGraphServiceV3:
                 except Exception:
                     continue
 
+        self._set_meta("seed_version", SEED_VERSION)
+        self.invalidate_concepts()
+        logger.info(f"KG seeded to v{SEED_VERSION}: {len(nodes)} concepts")
+
+    # ------------------------------------------------------------------
+    # Concept table
+    # ------------------------------------------------------------------
+
+    @property
+    def concepts_version(self) -> int:
+        """Monotonic counter bumped whenever the concept table may have changed."""
+        return self._concepts_version
+
+    def invalidate_concepts(self) -> None:
+        """Drop the cached concept table (call after imports/admin edits).
+
+        The graph snapshot is rebuilt on next use; readers keep using the
+        previous snapshot until the new one is swapped in.
+        """
+        with self._cache_lock:
+            self._concepts_cache = None
+            self._concepts_version += 1
+
+    def snapshot(self) -> Optional[GraphSnapshot]:
+        """Return the current CSR snapshot, rebuilding it if the graph changed.
+
+        Returns None if the snapshot cannot be built; callers then fall back
+        to Kuzu queries.
+        """
+        snap = self._snapshot
+        if snap is not None and snap.version == self._concepts_version:
+            return snap
+        try:
+            return self.refresh_snapshot()
+        except Exception as e:
+            logger.warning(f"Failed to build KG snapshot: {e}")
+            return None
+
+    def refresh_snapshot(self) -> GraphSnapshot:
+        """Build a new snapshot from Kuzu and swap it in atomically."""
+        version = self._concepts_version
+        snap = GraphSnapshot(self.get_concepts(), self.get_edges(), version=version)
+        self._snapshot = snap
+        logger.info(f"KG snapshot v{version}: {len(snap)} concepts, {snap.num_edges} edges")
+        return snap
+
     def get_concepts(self) -> Dict[str, Dict[str, str]]:
+        """Return all concepts keyed by id.
+
+        The mapping is cached until ``invalidate_concepts()``; treat it as
+        read-only.
+        """
+        cached = self._concepts_cache
+        if cached is not None:
+            return cached
+
         concepts: Dict[str, Dict[str, str]] = {}
         try:
-            result = self._conn.execute("MATCH (c:Concept) RETURN c.id, c.title, c.keywords")
-            while result.has_next():
-                row = result.get_next()
-                concepts[row[0]] = {
-                    "title": row[1],
-                    "keywords": row[2] or "",
-                }
+            rows = self._query("MATCH (c:Concept) RETURN c.id, c.title, c.keywords")
         except Exception:
             return concepts
+        for row in rows:
+            concepts[row[0]] = {
+                "title": row[1],
+                "keywords": row[2] or "",
+            }
+
+        with self._cache_lock:
+            self._concepts_cache = concepts
         return concepts
 
-    async def expand(self, seed_nodes: List[str], hops: int = 1) -> KGHits:
-        expanded_nodes: List[KGExpandedNode] = []
-        paths: List[KGPath] = []
+    def get_edges(self) -> List[Tuple[str, str, str]]:
+        """Return all concept edges as (from_id, to_id, relation)."""
+        try:
+            rows = self._query(
+                "MATCH (a:Concept)-[e:Edge]->(b:Concept) "
+                "RETURN a.id, b.id, e.relation"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load edges: {e}")
+            return []
+        return [(row[0], row[1], row[2]) for row in rows]
 
-        if not seed_nodes:
+    async def expand(
+        self,
+        seed_nodes: List[str],
+        hops: int = 1,
+        relations: Optional[List[str]] = None,
+        max_per_seed: int = DEFAULT_MAX_FANOUT,
+    ) -> KGHits:
+        """
+        Expand all seed concepts in a single Kuzu query.
+        
+        Follows outgoing edges up to ``hops`` away (shortest path per
+        seed/target pair), optionally restricted to edge ``relations``.
+        
+        Args:
+            seed_nodes: Concept IDs to expand from
+            hops: Maximum path length (clamped to 1..MAX_EXPAND_HOPS)
+            relations: Only traverse edges with these relation labels
+            max_per_seed: Fan-out cap per seed (closest nodes kept first)
+            
+        Returns:
+            KGHits with expanded nodes deduplicated by id (relation of the
+            closest path) and one path per seed/target with its hop count
+        """
+        seeds = list(dict.fromkeys(s for s in seed_nodes if s))
+        if not seeds:
             return KGHits(seed_nodes=[], expanded_nodes=[], paths=[])
 
-        try:
-            for seed in seed_nodes:
-                result = self._conn.execute(
-                    "MATCH (a:Concept)-[e:Edge]->(b:Concept) "
-                    "WHERE a.id = $seed RETURN b.id, e.relation",
-                    {"seed": seed},
-                )
-                while result.has_next():
-                    row = result.get_next()
-                    expanded_nodes.append(KGExpandedNode(id=row[0], relation=row[1]))
-                    paths.append(KGPath(from_id=seed, to_id=row[0], hops=1))
-        except Exception:
-            return KGHits(seed_nodes=seed_nodes, expanded_nodes=[], paths=[])
+        hops = max(1, min(int(hops), MAX_EXPAND_HOPS))
+        max_per_seed = max(1, max_per_seed)
 
-        return KGHits(seed_nodes=seed_nodes, expanded_nodes=expanded_nodes, paths=paths)
+        snap = self.snapshot()
+        if snap is not None:
+            rows = snap.k_hop(seeds, hops=hops, relations=relations, max_per_seed=max_per_seed)
+        else:
+            try:
+                rows = self._expand_query(seeds, hops, relations, max_per_seed)
+            except Exception as e:
+                logger.warning(f"KG expand failed: {e}")
+                return KGHits(seed_nodes=seeds, expanded_nodes=[], paths=[])
+
+        # rows are ordered by distance, so the first hit per node is closest
+        per_seed: Dict[str, int] = {}
+        node_relation: Dict[str, str] = {}
+        paths: List[KGPath] = []
+        for seed, target, dist, relation in rows:
+            if per_seed.get(seed, 0) >= max_per_seed:
+                continue
+            per_seed[seed] = per_seed.get(seed, 0) + 1
+            paths.append(KGPath(from_id=seed, to_id=target, hops=int(dist)))
+            if target not in node_relation:
+                node_relation[target] = relation
+
+        expanded_nodes = [
+            KGExpandedNode(id=node_id, relation=relation)
+            for node_id, relation in node_relation.items()
+        ]
+        return KGHits(seed_nodes=seeds, expanded_nodes=expanded_nodes, paths=paths)
+
+    def _expand_query(
+        self,
+        seeds: List[str],
+        hops: int,
+        relations: Optional[List[str]],
+        max_per_seed: int,
+    ) -> List[Tuple[str, str, int, str]]:
+        """
+        Batched expansion in Kuzu (used when no snapshot is available).
+
+        Rows come back ordered by distance and are capped at max_per_seed
+        per seed here; a global LIMIT would let one well-connected seed
+        crowd out the others.
+        """
+        params: Dict[str, Any] = {"seeds": seeds}
+        rel_filter = ""
+        if relations:
+            rel_filter = " (r, _ | WHERE r.relation IN $relations)"
+            params["relations"] = list(relations)
+
+        rows = self._query(
+            f"MATCH (a:Concept)-[e:Edge* SHORTEST 1..{hops}{rel_filter}]->(b:Concept) "
+            "WHERE a.id IN $seeds AND a.id <> b.id "
+            "RETURN a.id, b.id, length(e) AS dist, properties(rels(e), 'relation') "
+            "ORDER BY dist",
+            params,
+        )
+        per_seed: Dict[str, int] = {}
+        expanded: List[Tuple[str, str, int, str]] = []
+        for seed, target, dist, path_relations in rows:
+            if per_seed.get(seed, 0) >= max_per_seed:
+                continue
+            per_seed[seed] = per_seed.get(seed, 0) + 1
+            expanded.append((seed, target, int(dist), path_relations[-1] if path_relations else ""))
+        return expanded
 
     async def record_interaction(
         self,
@@ -378,7 +645,7 @@ class KnowledgeGraphServiceV3:
 
         # Ensure user node exists
         try:
-            self._conn.execute(
+            self._execute(
                 "MERGE (u:User {id: $id})",
                 {"id": user_id},
             )
@@ -389,7 +656,7 @@ class KnowledgeGraphServiceV3:
             # Simple mastery update: decrease on errors, increase otherwise
             delta = -0.05 if error_types else 0.03
             try:
-                self._conn.execute(
+                self._execute(
                     "MATCH (u:User), (c:Concept) "
                     "WHERE u.id = $uid AND c.id = $cid "
                     "MERGE (u)-[m:Mastery]->(c) "
@@ -415,13 +682,12 @@ class KnowledgeGraphServiceV3:
             return mastery
         
         try:
-            result = self._conn.execute(
+            rows = self._query(
                 "MATCH (u:User)-[m:Mastery]->(c:Concept) "
                 "WHERE u.id = $uid RETURN c.id, m.score",
                 {"uid": user_id},
             )
-            while result.has_next():
-                row = result.get_next()
+            for row in rows:
                 mastery[row[0]] = row[1]
         except Exception:
             pass
@@ -443,8 +709,6 @@ class KnowledgeGraphServiceV3:
         Returns:
             List of recommended concept dicts with id, title, reason
         """
-        from typing import Any
-        
         recommendations: List[Dict[str, Any]] = []
         level_order = ["A1", "A2", "B1", "B2", "C1", "C2"]
         
@@ -496,54 +760,137 @@ class KnowledgeGraphServiceV3:
         Returns:
             List of prerequisite concept IDs
         """
-        prerequisites: List[str] = []
+        bulk = await self.get_prerequisites_bulk([concept_id])
+        return bulk.get(concept_id, [])
+
+    async def get_next_concepts(self, concept_id: str) -> List[str]:
+        """
+        Get concepts that this concept is a prerequisite for.
+        
+        Returns:
+            List of concept IDs that build on this concept
+        """
+        bulk = await self.get_next_concepts_bulk([concept_id])
+        return bulk.get(concept_id, [])
+
+    async def get_prerequisites_bulk(self, concept_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Get prerequisites for many concepts in one query.
+        
+        Returns:
+            Dict mapping concept_id -> prerequisite concept IDs
+            (every requested id is present, possibly with an empty list)
+        """
+        prerequisites: Dict[str, List[str]] = {cid: [] for cid in concept_ids}
+        if not prerequisites:
+            return prerequisites
+        
+        snap = self.snapshot()
+        if snap is not None:
+            for cid in prerequisites:
+                prerequisites[cid] = snap.predecessors(cid, relations=[PREREQUISITE_RELATION])
+            return prerequisites
         
         try:
-            result = self._conn.execute(
+            rows = self._query(
                 "MATCH (a:Concept)-[e:Edge]->(b:Concept) "
-                "WHERE b.id = $cid AND e.relation = 'prerequisite_of' "
-                "RETURN a.id",
-                {"cid": concept_id},
+                "WHERE b.id IN $cids AND e.relation = 'prerequisite_of' "
+                "RETURN b.id, a.id",
+                {"cids": list(prerequisites)},
             )
-            while result.has_next():
-                row = result.get_next()
-                prerequisites.append(row[0])
+            for concept_id, prerequisite_id in rows:
+                prerequisites[concept_id].append(prerequisite_id)
         except Exception:
             pass
         
         return prerequisites
 
-    async def get_next_concepts(self, concept_id: str) -> List[str]:
+    async def get_next_concepts_bulk(self, concept_ids: List[str]) -> Dict[str, List[str]]:
         """
-        Get concepts that this concept is a prerequisite for.
+        Get follow-up concepts for many concepts in one query.
         
         Returns:
-            List of concept IDs that build on this concept
+            Dict mapping concept_id -> IDs of concepts that build on it
+            (every requested id is present, possibly with an empty list)
         """
-        next_concepts: List[str] = []
+        next_concepts: Dict[str, List[str]] = {cid: [] for cid in concept_ids}
+        if not next_concepts:
+            return next_concepts
+        
+        snap = self.snapshot()
+        if snap is not None:
+            for cid in next_concepts:
+                next_concepts[cid] = snap.neighbors(cid, relations=[PREREQUISITE_RELATION])
+            return next_concepts
         
         try:
-            result = self._conn.execute(
+            rows = self._query(
                 "MATCH (a:Concept)-[e:Edge]->(b:Concept) "
-                "WHERE a.id = $cid AND e.relation = 'prerequisite_of' "
-                "RETURN b.id",
-                {"cid": concept_id},
+                "WHERE a.id IN $cids AND e.relation = 'prerequisite_of' "
+                "RETURN a.id, b.id",
+                {"cids": list(next_concepts)},
             )
-            while result.has_next():
-                row = result.get_next()
-                next_concepts.append(row[0])
+            for concept_id, next_id in rows:
+                next_concepts[concept_id].append(next_id)
         except Exception:
             pass
         
         return next_concepts
 
+    async def get_prerequisite_closure(self, concept_id: str) -> List[str]:
+        """
+        Get all transitive prerequisites of a concept (nearest first).
+        
+        Returns:
+            List of prerequisite concept IDs
+        """
+        snap = self.snapshot()
+        if snap is not None:
+            return snap.prerequisite_closure(concept_id)
+        
+        closure: List[str] = []
+        seen = {concept_id}
+        frontier = [concept_id]
+        while frontier:
+            bulk = await self.get_prerequisites_bulk(frontier)
+            frontier = []
+            for prereqs in bulk.values():
+                for prereq in prereqs:
+                    if prereq not in seen:
+                        seen.add(prereq)
+                        closure.append(prereq)
+                        frontier.append(prereq)
+        return closure
+
     def get_concept_count(self) -> int:
         """Get total number of concepts in the graph."""
         try:
-            result = self._conn.execute("MATCH (c:Concept) RETURN count(c)")
-            if result.has_next():
-                return result.get_next()[0]
+            rows = self._query("MATCH (c:Concept) RETURN count(c)")
+            if rows:
+                return rows[0][0]
         except Exception:
             pass
         return 0
 
+
+# Process-wide instance
+_kg_service: Optional[KnowledgeGraphServiceV3] = None
+_kg_service_lock = threading.Lock()
+
+
+def get_kg_service() -> KnowledgeGraphServiceV3:
+    """Get or create the process-wide knowledge graph service."""
+    global _kg_service
+    if _kg_service is None:
+        with _kg_service_lock:
+            if _kg_service is None:
+                _kg_service = KnowledgeGraphServiceV3()
+    return _kg_service
+
+
+def close_kg_service() -> None:
+    """Close the process-wide knowledge graph service (app shutdown)."""
+    global _kg_service
+    if _kg_service is not None:
+        _kg_service.close()
+        _kg_service = None
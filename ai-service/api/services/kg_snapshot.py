@@ -0,0 +1,258 @@
+"""Immutable in-memory snapshot of the concept graph.
+
+The Concept/Edge tables are loaded once from Kuzu into CSR (compressed sparse
+row) arrays with integer node IDs. Hot-path traversal (neighbours, k-hop
+expansion, prerequisite closure) then runs without any query round trips.
+
+Snapshots are never mutated: ``KnowledgeGraphServiceV3`` builds a new one
+when the concept table changes and swaps the reference.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+PREREQUISITE_RELATION = "prerequisite_of"
+
+
+class GraphSnapshot:
+    """
+    Array-backed directed concept graph.
+
+    Outgoing edges of node ``i`` are ``out_indices[out_indptr[i]:out_indptr[i + 1]]``
+    with relation codes in ``out_rel``; the reverse (incoming) CSR is kept
+    for prerequisite lookups.
+    """
+
+    __slots__ = (
+        "version",
+        "ids",
+        "titles",
+        "keywords",
+        "relation_names",
+        "_index",
+        "_relation_codes",
+        "out_indptr",
+        "out_indices",
+        "out_rel",
+        "in_indptr",
+        "in_indices",
+        "in_rel",
+    )
+
+    def __init__(
+        self,
+        concepts: Dict[str, Dict[str, str]],
+        edges: Iterable[Tuple[str, str, str]],
+        version: int = 0,
+    ):
+        self.version = version
+        self.ids: List[str] = list(concepts.keys())
+        self.titles: List[str] = [concepts[c].get("title", "") or "" for c in self.ids]
+        self.keywords: List[str] = [concepts[c].get("keywords", "") or "" for c in self.ids]
+        self._index: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+
+        self.relation_names: List[str] = []
+        self._relation_codes: Dict[str, int] = {}
+
+        src: List[int] = []
+        dst: List[int] = []
+        rel: List[int] = []
+        for from_id, to_id, relation in edges:
+            a = self._index.get(from_id)
+            b = self._index.get(to_id)
+            if a is None or b is None:
+                continue
+            src.append(a)
+            dst.append(b)
+            rel.append(self._relation_code(relation or ""))
+
+        n = len(self.ids)
+        src_arr = np.asarray(src, dtype=np.int32)
+        dst_arr = np.asarray(dst, dtype=np.int32)
+        rel_arr = np.asarray(rel, dtype=np.int16)
+
+        self.out_indptr, self.out_indices, self.out_rel = self._to_csr(n, src_arr, dst_arr, rel_arr)
+        self.in_indptr, self.in_indices, self.in_rel = self._to_csr(n, dst_arr, src_arr, rel_arr)
+
+        for array in (
+            self.out_indptr, self.out_indices, self.out_rel,
+            self.in_indptr, self.in_indices, self.in_rel,
+        ):
+            array.setflags(write=False)
+
+    def _relation_code(self, relation: str) -> int:
+        code = self._relation_codes.get(relation)
+        if code is None:
+            code = len(self.relation_names)
+            self._relation_codes[relation] = code
+            self.relation_names.append(relation)
+        return code
+
+    @staticmethod
+    def _to_csr(
+        n: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        rel: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        if rows.size:
+            np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return indptr, cols[order], rel[order]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, concept_id: str) -> bool:
+        return concept_id in self._index
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.out_indices.size)
+
+    def index_of(self, concept_id: str) -> Optional[int]:
+        return self._index.get(concept_id)
+
+    def title_of(self, concept_id: str) -> str:
+        i = self._index.get(concept_id)
+        return self.titles[i] if i is not None else ""
+
+    def keywords_of(self, concept_id: str) -> str:
+        i = self._index.get(concept_id)
+        return self.keywords[i] if i is not None else ""
+
+    def _relation_mask_codes(self, relations: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if not relations:
+            return None
+        codes = [self._relation_codes[r] for r in relations if r in self._relation_codes]
+        return np.asarray(codes, dtype=np.int16)
+
+    def _slice(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        rel: np.ndarray,
+        node: int,
+        codes: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = indptr[node], indptr[node + 1]
+        targets = indices[start:end]
+        relations = rel[start:end]
+        if codes is not None:
+            keep = np.isin(relations, codes)
+            targets = targets[keep]
+            relations = relations[keep]
+        return targets, relations
+
+    def neighbors(self, concept_id: str, relations: Optional[Sequence[str]] = None) -> List[str]:
+        """Concepts reachable by one outgoing edge."""
+        i = self._index.get(concept_id)
+        if i is None:
+            return []
+        targets, _ = self._slice(
+            self.out_indptr, self.out_indices, self.out_rel, i, self._relation_mask_codes(relations)
+        )
+        return [self.ids[t] for t in targets.tolist()]
+
+    def predecessors(self, concept_id: str, relations: Optional[Sequence[str]] = None) -> List[str]:
+        """Concepts with an edge pointing at this concept."""
+        i = self._index.get(concept_id)
+        if i is None:
+            return []
+        sources, _ = self._slice(
+            self.in_indptr, self.in_indices, self.in_rel, i, self._relation_mask_codes(relations)
+        )
+        return [self.ids[s] for s in sources.tolist()]
+
+    def edges(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate all edges as (from_id, to_id, relation)."""
+        for a in range(len(self.ids)):
+            start, end = self.out_indptr[a], self.out_indptr[a + 1]
+            for b, r in zip(self.out_indices[start:end].tolist(), self.out_rel[start:end].tolist()):
+                yield self.ids[a], self.ids[b], self.relation_names[r]
+
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+
+    def k_hop(
+        self,
+        seeds: Sequence[str],
+        hops: int = 1,
+        relations: Optional[Sequence[str]] = None,
+        max_per_seed: Optional[int] = None,
+    ) -> List[Tuple[str, str, int, str]]:
+        """
+        Breadth-first expansion from each seed along outgoing edges.
+
+        Returns:
+            (seed, target, distance, relation of the last edge) rows ordered
+            by distance, at most ``max_per_seed`` per seed
+        """
+        codes = self._relation_mask_codes(relations)
+        if relations and codes is not None and codes.size == 0:
+            return []
+
+        rows: List[Tuple[str, str, int, str]] = []
+        for seed in seeds:
+            start = self._index.get(seed)
+            if start is None:
+                continue
+
+            visited = {start}
+            frontier = [start]
+            found = 0
+            for dist in range(1, hops + 1):
+                next_frontier: List[int] = []
+                for node in frontier:
+                    targets, rels = self._slice(
+                        self.out_indptr, self.out_indices, self.out_rel, node, codes
+                    )
+                    for t, r in zip(targets.tolist(), rels.tolist()):
+                        if t in visited:
+                            continue
+                        visited.add(t)
+                        next_frontier.append(t)
+                        rows.append((seed, self.ids[t], dist, self.relation_names[r]))
+                        found += 1
+                        if max_per_seed is not None and found >= max_per_seed:
+                            break
+                    if max_per_seed is not None and found >= max_per_seed:
+                        break
+                if not next_frontier or (max_per_seed is not None and found >= max_per_seed):
+                    break
+                frontier = next_frontier
+
+        rows.sort(key=lambda row: row[2])
+        return rows
+
+    def prerequisite_closure(self, concept_id: str) -> List[str]:
+        """All transitive prerequisites of a concept, nearest first."""
+        start = self._index.get(concept_id)
+        code = self._relation_codes.get(PREREQUISITE_RELATION)
+        if start is None or code is None:
+            return []
+
+        codes = np.asarray([code], dtype=np.int16)
+        visited = {start}
+        order: List[str] = []
+        pending = deque([start])
+        while pending:
+            node = pending.popleft()
+            sources, _ = self._slice(self.in_indptr, self.in_indices, self.in_rel, node, codes)
+            for s in sources.tolist():
+                if s not in visited:
+                    visited.add(s)
+                    order.append(self.ids[s])
+                    pending.append(s)
+        return order
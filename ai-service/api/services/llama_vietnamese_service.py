@@ -9,6 +9,7 @@ Features:
 - GGUF quantized format for CPU inference
 - Context-aware grammar explanations
 - Optimized for Vietnamese ESL learners
+- Inference on a dedicated LLMWorker thread (cancellable, with timeouts)
 """
 
 from __future__ import annotations
@@ -16,7 +17,9 @@ from __future__ import annotations
 import logging
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from api.services.llm_worker import CancelToken, LLMWorker
 
 logger = logging.getLogger(__name__)
 
@@ -148,13 +151,16 @@ class LLaMAVietnameseService:
         self,
         model_path: Optional[str] = None,
         use_predefined: bool = True,
+        generation_timeout: float = 60.0,
     ):
         self.model_path = model_path
         self.use_predefined = use_predefined
+        self.generation_timeout = generation_timeout
         
         # Model components (lazy loaded)
         self.model = None
         self.is_loaded = False
+        self._worker = LLMWorker("llama-vi")
         
         logger.info(
             f"LLaMAVietnameseService initialized "
@@ -188,12 +194,14 @@ class LLaMAVietnameseService:
             # Try to load with llama-cpp-python
             from llama_cpp import Llama
             
-            self.model = Llama(
-                model_path=str(model_file),
-                n_ctx=2048,
-                n_threads=4,
-                n_gpu_layers=0,  # CPU only
-                verbose=False,
+            self.model = await self._worker.run(
+                lambda token: Llama(
+                    model_path=str(model_file),
+                    n_ctx=2048,
+                    n_threads=4,
+                    n_gpu_layers=0,  # CPU only
+                    verbose=False,
+                )
             )
             
             self.is_loaded = True
@@ -272,28 +280,15 @@ class LLaMAVietnameseService:
         start_time: float,
     ) -> VietnameseExplanation:
         """Generate explanation using LLaMA model."""
-        prompt = f"""Bạn là một giáo viên tiếng Anh cho người Việt.
-Giải thích ngữ pháp "{concept}" cho học viên trình độ {user_level}.
-
-{"Ngữ cảnh: " + context if context else ""}
-
-Trả lời bằng tiếng Việt, đơn giản và dễ hiểu.
-Bao gồm:
-1. Giải thích ngắn gọn
-2. 2-3 ví dụ có nghĩa tiếng Việt
-3. 1-2 mẹo nhớ
-
-Trả lời:"""
+        prompt = self._explanation_prompt(concept, user_level, context)
 
         try:
-            output = self.model(
+            response_text = (await self._complete(
                 prompt,
                 max_tokens=512,
                 temperature=0.7,
                 stop=["---", "\n\n\n"],
-            )
-            
-            response_text = output["choices"][0]["text"].strip()
+            )).strip()
             
             # Parse response (simplified)
             duration_ms = (time.time() - start_time) * 1000
@@ -318,6 +313,71 @@ Trả lời:"""
                 duration_ms=duration_ms,
             )
     
+    @staticmethod
+    def _explanation_prompt(concept: str, user_level: str, context: Optional[str]) -> str:
+        return f"""Bạn là một giáo viên tiếng Anh cho người Việt.
+Giải thích ngữ pháp "{concept}" cho học viên trình độ {user_level}.
+
+{"Ngữ cảnh: " + context if context else ""}
+
+Trả lời bằng tiếng Việt, đơn giản và dễ hiểu.
+Bao gồm:
+1. Giải thích ngắn gọn
+2. 2-3 ví dụ có nghĩa tiếng Việt
+3. 1-2 mẹo nhớ
+
+Trả lời:"""
+    
+    async def stream_explanation(
+        self,
+        concept: str,
+        user_level: str = "A2",
+        context: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a generated Vietnamese explanation as it is produced.
+        
+        Yields nothing if no model is loaded; stopping iteration cancels generation.
+        """
+        if not self.is_loaded:
+            await self.initialize()
+        if self.model is None:
+            return
+        
+        prompt = self._explanation_prompt(concept, user_level, context)
+        async for piece in self._worker.stream(
+            lambda emit, token: self._complete_sync(
+                prompt, token, emit, max_tokens=512, temperature=0.7, stop=["---", "\n\n\n"],
+            ),
+            timeout=self.generation_timeout,
+        ):
+            yield piece
+    
+    async def _complete(self, prompt: str, **kwargs: Any) -> str:
+        """Run a completion on the worker thread."""
+        return await self._worker.run(
+            lambda token: self._complete_sync(prompt, token, None, **kwargs),
+            timeout=self.generation_timeout,
+        )
+    
+    def _complete_sync(
+        self,
+        prompt: str,
+        token: CancelToken,
+        emit: Optional[Callable[[str], None]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Streamed llama.cpp completion, checking the cancel token between chunks."""
+        pieces: List[str] = []
+        for chunk in self.model(prompt, stream=True, **kwargs):
+            token.raise_if_cancelled()
+            text = chunk["choices"][0]["text"]
+            if text:
+                pieces.append(text)
+                if emit is not None:
+                    emit(text)
+        return "".join(pieces)
+    
     async def translate_with_context(
         self,
         text: str,
@@ -346,13 +406,11 @@ Trả lời:"""
 Dịch nghĩa:"""
 
             try:
-                output = self.model(
+                translation = (await self._complete(
                     prompt,
                     max_tokens=256,
                     temperature=0.3,
-                )
-                
-                translation = output["choices"][0]["text"].strip()
+                )).strip()
                 
                 return {
                     "original": text,
@@ -405,10 +463,16 @@ async def get_llama_vietnamese_service() -> LLaMAVietnameseService:
             "LLAMA_VI_USE_PREDEFINED",
             True
         )
+        generation_timeout = getattr(
+            settings,
+            "LLAMA_VI_GENERATION_TIMEOUT",
+            60.0
+        )
         
         _llama_vi_service = LLaMAVietnameseService(
             model_path=model_path,
             use_predefined=use_predefined,
+            generation_timeout=generation_timeout,
         )
     
     return _llama_vi_service
@@ -0,0 +1,298 @@
+"""Off-event-loop inference worker for local LLMs.
+
+Each model is owned by one ``LLMWorker`` thread that runs jobs from a queue,
+so tokenization and ``generate`` never block the event loop. Jobs receive a
+``CancelToken`` that trips when the awaiting coroutine is cancelled (e.g.
+``asyncio.wait_for`` in ``ModelGateway.invoke``) or the job deadline passes;
+HF generation checks it every token through a stopping criterion, llama.cpp
+streams check it between chunks.
+
+Usage:
+    worker = LLMWorker("qwen")
+    text = await worker.run(lambda token: generate(..., token), timeout=60)
+    async for piece in worker.stream(lambda emit, token: generate(..., emit, token)):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMWorkerBusy(RuntimeError):
+    """Raised when the worker queue is full."""
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a job that observed its cancel token."""
+
+
+class CancelToken:
+    """Cancellation flag with an optional deadline, checked from the worker thread."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self.deadline = time.monotonic() + timeout if timeout else None
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def timed_out(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or self.timed_out
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise GenerationCancelled("timed out" if self.timed_out else "cancelled")
+
+
+@dataclass
+class _Job:
+    fn: Callable[[CancelToken], Any]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    token: CancelToken
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+_STREAM_END = object()
+
+
+class LLMWorker:
+    """Single thread that owns a model and executes jobs in FIFO order."""
+
+    _ids = itertools.count()
+
+    def __init__(self, name: str = "llm", max_queue: int = 16):
+        self.name = name
+        self.max_queue = max(1, max_queue)
+
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # Metrics
+        self._completed = 0
+        self._cancelled = 0
+        self._timed_out = 0
+        self._failed = 0
+        self._total_wait_ms = 0.0
+        self._total_run_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(self, fn: Callable[[CancelToken], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(token) on the worker thread.
+
+        Raises asyncio.TimeoutError if the deadline passes; cancelling the
+        caller cancels the job (skipped if queued, stopped if running).
+        """
+        loop = asyncio.get_running_loop()
+        job = _Job(fn=fn, future=loop.create_future(), loop=loop, token=CancelToken(timeout))
+        self._submit(job)
+        try:
+            if timeout:
+                # Small grace period so the job can observe the deadline itself
+                return await asyncio.wait_for(asyncio.shield(job.future), timeout + 1.0)
+            return await job.future
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            job.token.cancel()
+            raise
+        except GenerationCancelled as e:
+            if job.token.timed_out:
+                raise asyncio.TimeoutError(f"{self.name} generation timed out") from e
+            raise
+
+    async def stream(
+        self,
+        fn: Callable[[Callable[[str], None], CancelToken], Any],
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run fn(emit, token) on the worker thread and yield every emitted piece.
+
+        Closing the iterator early (or cancelling the consumer) cancels the job.
+        """
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+
+        def emit(piece: str) -> None:
+            loop.call_soon_threadsafe(pieces.put_nowait, piece)
+
+        def job_fn(token: CancelToken) -> Any:
+            try:
+                return fn(emit, token)
+            finally:
+                loop.call_soon_threadsafe(pieces.put_nowait, _STREAM_END)
+
+        job = _Job(fn=job_fn, future=loop.create_future(), loop=loop, token=CancelToken(timeout))
+        self._submit(job)
+        try:
+            while True:
+                remaining = None
+                if job.token.deadline is not None:
+                    remaining = max(0.0, job.token.deadline - time.monotonic()) + 1.0
+                piece = await asyncio.wait_for(pieces.get(), remaining)
+                if piece is _STREAM_END:
+                    break
+                yield piece
+            await job.future
+        except GenerationCancelled as e:
+            if job.token.timed_out:
+                raise asyncio.TimeoutError(f"{self.name} generation timed out") from e
+            raise
+        finally:
+            job.token.cancel()
+            if not job.future.done():
+                # Retrieve the eventual exception so it is not logged as unhandled
+                job.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        started = self._completed + self._failed + self._cancelled + self._timed_out
+        return {
+            "queue_depth": self._pending,
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "cancelled": self._cancelled,
+            "timed_out": self._timed_out,
+            "failed": self._failed,
+            "avg_queue_wait_ms": round(self._total_wait_ms / started, 2) if started else 0.0,
+            "avg_run_ms": round(self._total_run_ms / started, 2) if started else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the thread after the current job; queued jobs are cancelled."""
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                # A later submit starts a fresh thread on a fresh queue
+                self._queue = queue.Queue()
+                self._thread = None
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _submit(self, job: _Job) -> None:
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise LLMWorkerBusy(f"{self.name} worker queue is full ({self._pending} pending)")
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop,
+                    args=(self._queue,),
+                    name=f"{self.name}-worker-{next(self._ids)}",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._queue.put(job)
+
+    def _loop(self, jobs: "queue.Queue[Optional[_Job]]") -> None:
+        while True:
+            job = jobs.get()
+            if job is None:
+                self._drain(jobs)
+                return
+            with self._lock:
+                self._pending -= 1
+            self._execute(job)
+
+    def _execute(self, job: _Job) -> None:
+        started = time.monotonic()
+        self._total_wait_ms += (started - job.enqueued_at) * 1000
+        result, error = None, None
+        try:
+            job.token.raise_if_cancelled()
+            result = job.fn(job.token)
+            self._completed += 1
+        except GenerationCancelled as e:
+            error = e
+            if job.token.timed_out:
+                self._timed_out += 1
+            else:
+                self._cancelled += 1
+        except Exception as e:  # surfaced to the awaiting coroutine
+            error = e
+            self._failed += 1
+            logger.error(f"[{self.name}] Job failed: {e}")
+        self._total_run_ms += (time.monotonic() - started) * 1000
+        _resolve_threadsafe(job, result, error)
+
+    def _drain(self, jobs: "queue.Queue[Optional[_Job]]") -> None:
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                with self._lock:
+                    self._pending -= 1
+                _resolve_threadsafe(job, None, GenerationCancelled("worker shut down"))
+
+
+def _resolve_threadsafe(job: _Job, result: Any, error: Optional[BaseException]) -> None:
+    def resolve() -> None:
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    try:
+        job.loop.call_soon_threadsafe(resolve)
+    except RuntimeError:
+        # Event loop already closed
+        pass
+
+
+# ----------------------------------------------------------------------
+# Hugging Face helpers
+# ----------------------------------------------------------------------
+
+def hf_stopping_criteria(token: CancelToken):
+    """StoppingCriteriaList that ends ``generate`` once the token is cancelled."""
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class _CancelCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            return token.cancelled
+
+    return StoppingCriteriaList([_CancelCriteria()])
+
+
+def hf_text_streamer(tokenizer, emit: Callable[[str], None]):
+    """
+    TextIteratorStreamer that pushes decoded text straight to ``emit``
+    instead of its internal queue, so no extra consumer thread is needed.
+    """
+    from transformers import TextIteratorStreamer
+
+    class _EmitStreamer(TextIteratorStreamer):
+        def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+            if text:
+                emit(text)
+
+    return _EmitStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
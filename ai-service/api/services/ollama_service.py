@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any, AsyncIterator
 import httpx
 import asyncio
 
+from api.services.prompt_cache import OllamaSessionContexts
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,11 @@ class OllamaService:
     - POST /api/generate - Generate completion
     - POST /api/chat - Chat completion
     - GET /api/tags - List models
+    
+    Chat calls that pass a session_id go through /api/generate and keep the
+    returned ``context`` per session, so later turns send only the new
+    message instead of re-encoding the whole conversation. History that no
+    stored context covers is sent to /api/chat as messages.
     """
     
     def __init__(
@@ -31,6 +38,7 @@ class OllamaService:
         base_url: str = "http://localhost:11434",
         model: str = "qwen2.5:8b",
         timeout: float = 120.0,
+        session_contexts: int = 1024,
     ):
         """
         Initialize Ollama service.
@@ -39,11 +47,16 @@ class OllamaService:
             base_url: Ollama server URL
             model: Model name (e.g., "qwen2.5:8b", "qwen3:8b")
             timeout: Request timeout in seconds
+            session_contexts: Max chat sessions whose context is kept (0 = disabled)
         """
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
         self.client = httpx.AsyncClient(timeout=timeout)
+        self.sessions: Optional[OllamaSessionContexts] = None
+        if session_contexts > 0:
+            # num_ctx is 2048; leave room for the reply
+            self.sessions = OllamaSessionContexts(max_sessions=session_contexts, max_context_tokens=1536)
         
         logger.info(f"OllamaService initialized: {base_url}, model={model}")
     
@@ -146,6 +159,7 @@ class OllamaService:
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
         stream: bool = False,
+        session_id: Optional[str] = None,
     ) -> str | AsyncIterator[str]:
         """
         Chat completion with message history.
@@ -155,10 +169,16 @@ class OllamaService:
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             stream: Stream response if True
+            session_id: Reuse the Ollama context of this conversation
             
         Returns:
             Generated response or async iterator
         """
+        if session_id and self.sessions is not None and not stream:
+            plan = self.sessions.prepare(session_id, messages)
+            if plan is not None:
+                return await self._session_chat(session_id, messages, plan, temperature, max_tokens)
+        
         payload = {
             "model": self.model,
             "messages": messages,
@@ -192,6 +212,51 @@ class OllamaService:
             logger.error(f"Ollama chat failed: {e}")
             raise
     
+    async def _session_chat(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        plan: tuple,
+        temperature: float,
+        max_tokens: Optional[int],
+    ) -> str:
+        """One chat turn via /api/generate, continuing the session's context."""
+        system, prompt, context = plan
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+                "num_ctx": 2048,
+                "num_thread": 8,
+            }
+        }
+        if system:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+        
+        try:
+            timeout = httpx.Timeout(300.0, connect=30.0)
+            response = await self.client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.sessions.invalidate(session_id)
+            logger.error(f"Ollama session chat failed: {e}")
+            raise
+        
+        reply = data.get("response", "")
+        self.sessions.update(session_id, messages, system, reply, data.get("context"))
+        return reply
+    
     async def _stream_chat(self, payload: Dict) -> AsyncIterator[str]:
         """Stream chat response chunks."""
         async with self.client.stream(
@@ -318,5 +383,6 @@ def get_ollama_service() -> OllamaService:
         _ollama_service = OllamaService(
             base_url=getattr(settings, 'OLLAMA_BASE_URL', 'http://localhost:11434'),
             model=getattr(settings, 'OLLAMA_MODEL', 'qwen2.5:8b'),
+            session_contexts=getattr(settings, 'OLLAMA_SESSION_CONTEXTS', 1024),
         )
     return _ollama_service
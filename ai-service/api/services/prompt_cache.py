@@ -0,0 +1,297 @@
+"""Prompt-prefix reuse for local LLMs.
+
+Tutor prompts start with a long, mostly constant system/persona block, and
+multi-turn chat resends the whole conversation every turn. Two caches keep
+that work from being redone:
+
+- ``PrefixKVCache``: past-key-values of common prefixes (the templated
+  system message) for Hugging Face models, in a byte-bounded LRU. The
+  ``GenerationScheduler`` prefills only the part of a prompt after a cached
+  prefix.
+- ``OllamaSessionContexts``: the ``context`` token array Ollama returns from
+  ``/api/generate``, kept per chat session, so the next turn sends only the
+  new user message and the server continues from its cached state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(text: Optional[str]) -> str:
+    return hashlib.sha1((text or "").strip().encode("utf-8")).hexdigest()
+
+
+def _publish(name: str, hit: bool, size: int) -> None:
+    try:
+        from api.services.telemetry import get_telemetry
+
+        telemetry = get_telemetry()
+        telemetry.increment_counter(f"{name}_hits" if hit else f"{name}_misses")
+        telemetry.set_gauge(f"{name}_size", size)
+    except Exception:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Hugging Face past-key-values
+# ----------------------------------------------------------------------
+
+@dataclass
+class CachedPrefix:
+    """Token ids of a prefix and its per-layer (key, value) tensors."""
+    ids: Tuple[int, ...]
+    past: Tuple[Tuple[Any, Any], ...]
+    nbytes: int
+
+
+class PrefixKVCache:
+    """
+    Byte-bounded LRU of prefix text -> past-key-values.
+
+    Entries hold legacy-format caches (a tuple of (key, value) per layer);
+    they are never modified in place, so one entry can seed any number of
+    requests.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        min_tokens: int = 32,
+        name: str = "prefix_cache",
+    ):
+        self.max_bytes = max(0, int(max_bytes))
+        self.min_tokens = max(1, min_tokens)
+        self.name = name
+
+        self._entries: "OrderedDict[str, CachedPrefix]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._tokens_reused = 0
+
+    def get(self, prefix: str) -> Optional[CachedPrefix]:
+        key = _digest(prefix)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._tokens_reused += len(entry.ids)
+            else:
+                self._misses += 1
+        _publish(self.name, entry is not None, self._bytes)
+        return entry
+
+    def put(self, prefix: str, ids, past) -> Optional[CachedPrefix]:
+        """Store a prefix; returns the entry, or None if it is too short or too large."""
+        if len(ids) < self.min_tokens:
+            return None
+        past = tuple((k, v) for k, v in past)
+        nbytes = sum(t.numel() * t.element_size() for layer in past for t in layer)
+        if nbytes > self.max_bytes:
+            return None
+
+        entry = CachedPrefix(ids=tuple(ids), past=past, nbytes=nbytes)
+        key = _digest(prefix)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = entry
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "tokens_reused": self._tokens_reused,
+        }
+
+
+# ----------------------------------------------------------------------
+# Ollama session context
+# ----------------------------------------------------------------------
+
+@dataclass
+class _SessionContext:
+    context: List[int]
+    system: Optional[str]  # as sent to /api/generate
+    system_hash: str
+    reply_hash: str
+    updated_at: float
+
+
+class OllamaSessionContexts:
+    """
+    Per-session Ollama ``context`` arrays.
+
+    A stored context is only reused when the incoming conversation continues
+    it: same system prompt, and the assistant message before the new user
+    turn is the reply that produced the context. The system prompt is sent
+    on every turn, since Ollama otherwise templates the Modelfile's SYSTEM
+    into the new turn.
+
+    A first turn (system, optional scripted assistant greeting, one user
+    message) starts a new context; the greeting is noted in the system prompt
+    since ``/api/generate`` only takes one prompt. Any other miss (edited history, another model, a session idle past the TTL, a
+    context close to ``num_ctx``) returns None so the caller sends the full
+    message list to ``/api/chat``; history is never flattened into a prompt.
+
+    Usage:
+        plan = sessions.prepare(session_id, messages)
+        if plan is None:
+            POST /api/chat {messages}
+        else:
+            system, prompt, context = plan
+            data = POST /api/generate {system, prompt, context}
+            sessions.update(session_id, messages, system, data["response"], data["context"])
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1024,
+        ttl_s: float = 1800.0,
+        max_context_tokens: int = 1536,
+        name: str = "ollama_context",
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_s = ttl_s
+        self.max_context_tokens = max_context_tokens
+        self.name = name
+
+        self._entries: "OrderedDict[str, _SessionContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+
+    def prepare(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+    ) -> Optional[Tuple[Optional[str], str, Optional[List[int]]]]:
+        """
+        Build (system, prompt, context) for ``/api/generate``.
+
+        Returns None when the conversation does not end with a user message
+        or has earlier turns that no stored context covers.
+        """
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else None
+        turns = messages[1:] if system is not None else list(messages)
+        if not turns or turns[-1].get("role") != "user":
+            return None
+        new_message = turns[-1].get("content", "")
+
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is not None and self._continues(entry, system, turns, new_message):
+            with self._lock:
+                self._entries[session_id] = entry
+                self._hits += 1
+            _publish(self.name, True, len(self._entries))
+            return entry.system, new_message, entry.context
+
+        with self._lock:
+            self._misses += 1
+        _publish(self.name, False, len(self._entries))
+        opening = turns[:-1]
+        if any(turn.get("role") != "assistant" for turn in opening):
+            return None
+        return _with_opening(system, opening), new_message, None
+
+    def update(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        sent_system: Optional[str],
+        reply: str,
+        context: Optional[List[int]],
+    ) -> None:
+        if not context:
+            self.invalidate(session_id)
+            return
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else None
+        entry = _SessionContext(
+            context=list(context),
+            system=sent_system,
+            system_hash=_digest(system),
+            reply_hash=_digest(reply),
+            updated_at=time.monotonic(),
+        )
+        with self._lock:
+            self._entries.pop(session_id, None)
+            self._entries[session_id] = entry
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "sessions": len(self._entries),
+            "max_sessions": self.max_sessions,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _continues(
+        self,
+        entry: _SessionContext,
+        system: Optional[str],
+        turns: List[Dict[str, str]],
+        new_message: str,
+    ) -> bool:
+        if time.monotonic() - entry.updated_at > self.ttl_s:
+            return False
+        if entry.system_hash != _digest(system):
+            return False
+        if len(turns) < 2 or turns[-2].get("role") != "assistant":
+            return False
+        if entry.reply_hash != _digest(turns[-2].get("content", "")):
+            return False
+        # Rough token estimate; past the budget Ollama would truncate the
+        # front of the context (the system prompt), so start over instead
+        return len(entry.context) + len(new_message) // 3 <= self.max_context_tokens
+
+
+def _with_opening(system: Optional[str], opening: List[Dict[str, str]]) -> Optional[str]:
+    """Note a scripted assistant greeting (sent before any user turn) in the system prompt."""
+    if not opening:
+        return system
+    lines = "\n".join(turn.get("content", "") for turn in opening)
+    note = f"You already opened this conversation with:\n{lines}"
+    return f"{system}\n\n{note}" if system else note
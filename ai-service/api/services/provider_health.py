@@ -0,0 +1,338 @@
+"""Provider health tracking with circuit breakers.
+
+One ``ProviderHealth`` registry is shared by every client of an upstream
+(Ollama, Gemini, the DL-Model API), so a failure seen by one caller
+fast-fails the others instead of each waiting for its own timeout:
+
+- closed: calls go through; ``failure_threshold`` consecutive failures open
+  the circuit
+- open: calls fail immediately with ``CircuitOpenError`` until
+  ``reset_timeout_s`` has passed
+- half-open: a single trial call (or a background probe) decides whether
+  the circuit closes again or re-opens
+
+Call latency is tracked as an EWMA so callers can pick the faster of two
+equivalent providers (``rank``). An EWMA with no new samples for
+``latency_max_age_s`` is forgotten, so a provider demoted by a few slow
+calls (e.g. an Ollama cold start) gets traffic again and is re-measured
+instead of staying demoted because it no longer sees any. A background task refreshes the cached
+health of registered probes, so request paths never have to probe.
+
+Usage:
+    health = get_provider_health()
+    health.register("ollama", probe=ollama.health_check)
+    result = await health.call("ollama", lambda: ollama.chat(...))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from api.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class _Circuit:
+    def __init__(
+        self,
+        name: str,
+        probe: Optional[Callable[[], Awaitable[bool]]],
+        failure_threshold: int,
+        reset_timeout_s: float,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        self.latency_ewma_ms: Optional[float] = None
+        self.latency_sampled_at = 0.0
+        self.last_checked = 0.0
+        self.last_error: Optional[str] = None
+
+        # Metrics
+        self.successes = 0
+        self.total_failures = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout_s:
+                return False
+            self.state = CircuitState.HALF_OPEN
+        # Half-open: let exactly one trial through (a lost trial expires)
+        now = time.monotonic()
+        if self.trial_in_flight and now - self.trial_started < self.reset_timeout_s:
+            return False
+        self.trial_in_flight = True
+        self.trial_started = now
+        return True
+
+
+class ProviderHealth:
+    """Registry of per-provider circuit breakers and latency EWMAs."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        refresh_interval_s: float = 15.0,
+        ewma_alpha: float = 0.2,
+        latency_max_age_s: float = 120.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.refresh_interval_s = refresh_interval_s
+        self.ewma_alpha = ewma_alpha
+        self.latency_max_age_s = latency_max_age_s
+
+        self._circuits: Dict[str, _Circuit] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def register(
+        self,
+        name: str,
+        probe: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> None:
+        """Register a provider (idempotent); probe is an async health check."""
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            self._circuits[name] = _Circuit(name, probe, self.failure_threshold, self.reset_timeout_s)
+        elif probe is not None and circuit.probe is None:
+            circuit.probe = probe
+        self._ensure_refresher()
+
+    def _circuit(self, name: str) -> _Circuit:
+        if name not in self._circuits:
+            self.register(name)
+        return self._circuits[name]
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    async def call(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn through the provider's circuit.
+
+        Raises CircuitOpenError without calling fn while the circuit is open.
+        """
+        self._ensure_refresher()
+        circuit = self._circuit(name)
+        if not circuit.allow():
+            circuit.rejected += 1
+            raise CircuitOpenError(f"{name} unavailable (circuit open)")
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            circuit.trial_in_flight = False
+            raise
+        except Exception as e:
+            self.record_failure(name, e)
+            raise
+        self.record_success(name, (time.monotonic() - started) * 1000)
+        return result
+
+    def allow(self, name: str) -> bool:
+        """Reserve a call slot; pair with record_success / record_failure."""
+        circuit = self._circuit(name)
+        allowed = circuit.allow()
+        if not allowed:
+            circuit.rejected += 1
+        return allowed
+
+    def record_success(self, name: str, latency_ms: Optional[float] = None) -> None:
+        circuit = self._circuit(name)
+        if circuit.state != CircuitState.CLOSED:
+            logger.info(f"[ProviderHealth] {name} recovered, closing circuit")
+        circuit.state = CircuitState.CLOSED
+        circuit.failures = 0
+        circuit.trial_in_flight = False
+        circuit.successes += 1
+        circuit.last_checked = time.monotonic()
+        if latency_ms is not None:
+            if circuit.latency_ewma_ms is None:
+                circuit.latency_ewma_ms = latency_ms
+            else:
+                circuit.latency_ewma_ms += self.ewma_alpha * (latency_ms - circuit.latency_ewma_ms)
+            circuit.latency_sampled_at = circuit.last_checked
+        self._publish(circuit)
+
+    def record_failure(self, name: str, error: Optional[BaseException] = None) -> None:
+        circuit = self._circuit(name)
+        circuit.failures += 1
+        circuit.total_failures += 1
+        circuit.trial_in_flight = False
+        circuit.last_checked = time.monotonic()
+        circuit.last_error = str(error) if error else None
+        if circuit.state == CircuitState.HALF_OPEN or circuit.failures >= circuit.failure_threshold:
+            if circuit.state != CircuitState.OPEN:
+                logger.warning(f"[ProviderHealth] {name} circuit opened: {error}")
+            circuit.state = CircuitState.OPEN
+            circuit.opened_at = time.monotonic()
+        self._publish(circuit)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def is_available(self, name: str) -> bool:
+        """Cached health: False while the circuit is open and not yet due for a trial."""
+        circuit = self._circuit(name)
+        if circuit.state == CircuitState.OPEN:
+            return time.monotonic() - circuit.opened_at >= circuit.reset_timeout_s
+        return True
+
+    def state(self, name: str) -> CircuitState:
+        return self._circuit(name).state
+
+    def latency(self, name: str) -> Optional[float]:
+        """Latency EWMA in ms, or None if unmeasured or stale."""
+        circuit = self._circuit(name)
+        if (
+            circuit.latency_ewma_ms is not None
+            and time.monotonic() - circuit.latency_sampled_at > self.latency_max_age_s
+        ):
+            # Stale: start over from the next real call
+            circuit.latency_ewma_ms = None
+        return circuit.latency_ewma_ms
+
+    def rank(self, names: Sequence[str], latency_margin: float = 1.5) -> List[str]:
+        """
+        Order providers for a request: available ones first, then by latency.
+
+        The caller's order is the preference; a later provider only moves
+        ahead when its EWMA is more than latency_margin times faster. Stale
+        EWMAs don't count, so a demoted provider is periodically retried.
+        """
+        available = [n for n in names if self.is_available(n)]
+        ranked: List[str] = []
+        for name in available:
+            latency = self.latency(name)
+            position = len(ranked)
+            while position > 0:
+                ahead = self.latency(ranked[position - 1])
+                if latency is None or ahead is None or ahead <= latency * latency_margin:
+                    break
+                position -= 1
+            ranked.insert(position, name)
+        return ranked + [n for n in names if n not in ranked]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "state": c.state.value,
+                "consecutive_failures": c.failures,
+                "latency_ewma_ms": round(c.latency_ewma_ms, 1) if c.latency_ewma_ms is not None else None,
+                "successes": c.successes,
+                "failures": c.total_failures,
+                "rejected": c.rejected,
+                "last_error": c.last_error,
+            }
+            for name, c in self._circuits.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def _ensure_refresher(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Registered outside the event loop; started on the next register/call
+            return
+        self._refresh_task = loop.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.refresh_interval_s, self.reset_timeout_s))
+            now = time.monotonic()
+            for circuit in list(self._circuits.values()):
+                if circuit.probe is None:
+                    continue
+                due = (
+                    circuit.state == CircuitState.OPEN
+                    and now - circuit.opened_at >= circuit.reset_timeout_s
+                ) or (
+                    circuit.state == CircuitState.CLOSED
+                    and now - circuit.last_checked >= self.refresh_interval_s
+                )
+                if due and circuit.allow():
+                    await self._probe(circuit)
+
+    async def _probe(self, circuit: _Circuit) -> None:
+        try:
+            healthy = await asyncio.wait_for(circuit.probe(), timeout=5.0)
+        except Exception as e:
+            self.record_failure(circuit.name, e)
+            return
+        if healthy:
+            # Probes don't count towards the latency EWMA
+            self.record_success(circuit.name)
+        else:
+            self.record_failure(circuit.name, RuntimeError("health probe failed"))
+
+    def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def _publish(self, circuit: _Circuit) -> None:
+        try:
+            from api.services.telemetry import get_telemetry
+
+            telemetry = get_telemetry()
+            state = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}[circuit.state]
+            telemetry.set_gauge(f"provider_{circuit.name}_circuit_state", state)
+            if circuit.latency_ewma_ms is not None:
+                telemetry.set_gauge(f"provider_{circuit.name}_latency_ms", circuit.latency_ewma_ms)
+        except Exception:
+            pass
+
+
+# Singleton instance
+_provider_health: Optional[ProviderHealth] = None
+
+
+def get_provider_health() -> ProviderHealth:
+    """Get the process-wide provider health registry."""
+    global _provider_health
+    if _provider_health is None:
+        _provider_health = ProviderHealth(
+            failure_threshold=getattr(settings, "PROVIDER_FAILURE_THRESHOLD", 3),
+            reset_timeout_s=getattr(settings, "PROVIDER_RESET_TIMEOUT_S", 30.0),
+            refresh_interval_s=getattr(settings, "PROVIDER_HEALTH_INTERVAL_S", 15.0),
+            latency_max_age_s=getattr(settings, "PROVIDER_LATENCY_MAX_AGE_S", 120.0),
+        )
+    return _provider_health
@@ -13,6 +13,8 @@ Architecture:
 - LoRA Adapter: Unified adapter for all tasks (80MB)
 - Inference: CPU/GPU with quantization support
 - Output: Structured JSON responses
+- Execution: dedicated LLMWorker thread (event loop never blocks on generate)
+- Batching: concurrent requests share one decode loop (GenerationScheduler)
 """
 
 from __future__ import annotations
@@ -21,7 +23,15 @@ import json
 import logging
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from api.services.generation_scheduler import GenerationScheduler
+from api.services.llm_worker import (
+    CancelToken,
+    LLMWorker,
+    hf_stopping_criteria,
+    hf_text_streamer,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +57,9 @@ class QwenEngine:
         device: str = "auto",
         load_in_8bit: bool = False,
         load_in_4bit: bool = False,
+        generation_timeout: float = 120.0,
+        continuous_batching: bool = True,
+        max_batch_size: int = 8,
     ):
         """
         Initialize Qwen engine.
@@ -57,17 +70,25 @@ class QwenEngine:
             device: "auto", "cpu", "cuda", or specific GPU id
             load_in_8bit: Use 8-bit quantization (saves memory)
             load_in_4bit: Use 4-bit quantization (saves more memory)
+            generation_timeout: Default per-request generation timeout (seconds)
+            continuous_batching: Batch concurrent requests between decode steps
+            max_batch_size: Maximum sequences decoded together
         """
         self.model_name = model_name
         self.adapter_path = adapter_path
         self.device = device
         self.load_in_8bit = load_in_8bit
         self.load_in_4bit = load_in_4bit
+        self.generation_timeout = generation_timeout
+        self.continuous_batching = continuous_batching
+        self.max_batch_size = max_batch_size
         
         # Model components (loaded lazily)
         self.model = None
         self.tokenizer = None
         self.is_loaded = False
+        self._worker = LLMWorker("qwen-engine")
+        self._scheduler: Optional[GenerationScheduler] = None
         
         logger.info(
             f"QwenEngine initialized: model={model_name}, "
@@ -89,50 +110,14 @@ class QwenEngine:
         logger.info(f"Loading Qwen model: {self.model_name}...")
         
         try:
-            from transformers import AutoTokenizer, AutoModelForCausalLM
-            import torch
-            
-            # Load tokenizer
-            logger.info("  Loading tokenizer...")
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_name,
-                trust_remote_code=True
-            )
-            
-            # Prepare loading arguments
-            kwargs = {
-                "trust_remote_code": True,
-                "device_map": self.device,
-            }
-            
-            # Add quantization if requested
-            if self.load_in_8bit:
-                kwargs["load_in_8bit"] = True
-                logger.info("  Using 8-bit quantization")
-            elif self.load_in_4bit:
-                kwargs["load_in_4bit"] = True
-                logger.info("  Using 4-bit quantization")
-            
-            # Load base model
-            logger.info("  Loading base model...")
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                **kwargs
-            )
-            
-            # Load LoRA adapter if provided
-            if self.adapter_path:
-                logger.info(f"  Loading LoRA adapter from {self.adapter_path}...")
-                from peft import PeftModel
-                
-                self.model = PeftModel.from_pretrained(
+            await self._worker.run(lambda token: self._load_sync())
+            if self.continuous_batching:
+                self._scheduler = GenerationScheduler(
                     self.model,
-                    self.adapter_path
+                    self.tokenizer,
+                    max_batch_size=self.max_batch_size,
+                    name="qwen_engine_generation",
                 )
-                logger.info("  LoRA adapter loaded successfully")
-            
-            # Set to eval mode
-            self.model.eval()
             
             self.is_loaded = True
             load_time = time.time() - start_time
@@ -142,6 +127,52 @@ class QwenEngine:
             logger.error(f"Failed to load Qwen model: {e}", exc_info=True)
             raise
     
+    def _load_sync(self) -> None:
+        """Load tokenizer, model and adapter (runs on the worker thread)."""
+        from transformers import AutoTokenizer, AutoModelForCausalLM
+        
+        # Load tokenizer
+        logger.info("  Loading tokenizer...")
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            self.model_name,
+            trust_remote_code=True
+        )
+        
+        # Prepare loading arguments
+        kwargs = {
+            "trust_remote_code": True,
+            "device_map": self.device,
+        }
+        
+        # Add quantization if requested
+        if self.load_in_8bit:
+            kwargs["load_in_8bit"] = True
+            logger.info("  Using 8-bit quantization")
+        elif self.load_in_4bit:
+            kwargs["load_in_4bit"] = True
+            logger.info("  Using 4-bit quantization")
+        
+        # Load base model
+        logger.info("  Loading base model...")
+        self.model = AutoModelForCausalLM.from_pretrained(
+            self.model_name,
+            **kwargs
+        )
+        
+        # Load LoRA adapter if provided
+        if self.adapter_path:
+            logger.info(f"  Loading LoRA adapter from {self.adapter_path}...")
+            from peft import PeftModel
+            
+            self.model = PeftModel.from_pretrained(
+                self.model,
+                self.adapter_path
+            )
+            logger.info("  LoRA adapter loaded successfully")
+        
+        # Set to eval mode
+        self.model.eval()
+    
     def _build_prompt(
         self,
         task: str,
@@ -292,6 +323,7 @@ Respond in JSON format:
         max_new_tokens: int = 512,
         temperature: float = 0.7,
         top_p: float = 0.9,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Generate response from Qwen model.
@@ -301,6 +333,7 @@ Respond in JSON format:
             max_new_tokens: Maximum tokens to generate
             temperature: Sampling temperature (0.0 = deterministic)
             top_p: Nucleus sampling threshold
+            timeout: Override the default generation timeout (seconds)
         
         Returns:
             Parsed JSON response
@@ -311,32 +344,20 @@ Respond in JSON format:
         start_time = time.time()
         
         try:
-            import torch
-            
-            # Tokenize input
-            inputs = self.tokenizer(
-                prompt,
-                return_tensors="pt",
-                truncation=True,
-                max_length=2048
-            ).to(self.model.device)
-            
-            # Generate
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
+            if self._scheduler is not None:
+                generated_text = await self._scheduler.generate(
+                    prompt,
                     max_new_tokens=max_new_tokens,
                     temperature=temperature,
                     top_p=top_p,
-                    do_sample=temperature > 0,
-                    pad_token_id=self.tokenizer.eos_token_id,
+                    timeout=timeout or self.generation_timeout,
+                    max_prompt_tokens=2048,
+                )
+            else:
+                generated_text = await self._worker.run(
+                    lambda token: self._generate_sync(prompt, max_new_tokens, temperature, top_p, token),
+                    timeout=timeout or self.generation_timeout,
                 )
-            
-            # Decode output
-            generated_text = self.tokenizer.decode(
-                outputs[0][inputs.input_ids.shape[1]:],
-                skip_special_tokens=True
-            )
             
             # Parse JSON response
             try:
@@ -360,6 +381,78 @@ Respond in JSON format:
             logger.error(f"Generation failed: {e}", exc_info=True)
             raise
     
+    async def stream_generate(
+        self,
+        prompt: str,
+        max_new_tokens: int = 512,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Stream raw generated text; stopping iteration cancels generation."""
+        if not self.is_loaded:
+            await self.initialize()
+        
+        if self._scheduler is not None:
+            pieces = self._scheduler.stream(
+                prompt,
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                timeout=timeout or self.generation_timeout,
+                max_prompt_tokens=2048,
+            )
+        else:
+            pieces = self._worker.stream(
+                lambda emit, token: self._generate_sync(prompt, max_new_tokens, temperature, top_p, token, emit),
+                timeout=timeout or self.generation_timeout,
+            )
+        async for piece in pieces:
+            yield piece
+    
+    def _generate_sync(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        token: CancelToken,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Tokenize, generate and decode (runs on the worker thread)."""
+        import torch
+        
+        # Tokenize input
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=2048
+        ).to(self.model.device)
+        
+        extra: Dict[str, Any] = {"stopping_criteria": hf_stopping_criteria(token)}
+        if emit is not None:
+            extra["streamer"] = hf_text_streamer(self.tokenizer, emit)
+        
+        # Generate
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                do_sample=temperature > 0,
+                pad_token_id=self.tokenizer.eos_token_id,
+                **extra,
+            )
+        token.raise_if_cancelled()
+        
+        # Decode output
+        return self.tokenizer.decode(
+            outputs[0][inputs.input_ids.shape[1]:],
+            skip_special_tokens=True
+        )
+    
     async def analyze(
         self,
         text: str,
@@ -389,6 +482,10 @@ Respond in JSON format:
     
     def unload(self) -> None:
         """Unload model to free memory."""
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+            self._scheduler = None
+        
         if self.model is not None:
             del self.model
             self.model = None
@@ -430,12 +527,14 @@ async def get_qwen_engine() -> QwenEngine:
         adapter_path = getattr(settings, "QWEN_ADAPTER_PATH", None)
         device = getattr(settings, "QWEN_DEVICE", "auto")
         load_in_8bit = getattr(settings, "QWEN_LOAD_IN_8BIT", False)
+        generation_timeout = getattr(settings, "QWEN_GENERATION_TIMEOUT", 120.0)
         
         _qwen_engine = QwenEngine(
             model_name=model_name,
             adapter_path=adapter_path,
             device=device,
-            load_in_8bit=load_in_8bit
+            load_in_8bit=load_in_8bit,
+            generation_timeout=generation_timeout,
         )
         
         await _qwen_engine.initialize()
@@ -15,8 +15,7 @@ import logging
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
-import numpy as np
-
+from api.core.config import settings
 from api.models.v3_schemas import (
     ExamplePair,
     RetrievalBundleV3,
@@ -26,6 +25,12 @@ from api.models.v3_schemas import (
 from api.services.embedding_service_v3 import EmbeddingServiceV3
 from api.services.graph_analytics import GraphAnalyticsService, get_graph_analytics
 from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+from api.services.vector_index import (
+    VectorIndex,
+    concept_index_text,
+    create_vector_index,
+    load_vector_index,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +42,8 @@ class RetrievalConfig:
     # Vector retrieval settings
     vector_top_k: int = 10
     min_similarity: float = 0.3
+    ann_backend: str = "auto"  # auto | hnsw | exact
+    ann_index_path: str = ""   # persist/load the concept index here
     
     # Centrality settings
     use_centrality_ranking: bool = True
@@ -71,13 +78,17 @@ class RetrievalServiceV3:
         config: Optional[RetrievalConfig] = None,
     ):
         self.kg = kg
-        self.config = config or RetrievalConfig()
+        self.config = config or RetrievalConfig(
+            ann_backend=getattr(settings, "ANN_INDEX_BACKEND", "auto"),
+            ann_index_path=getattr(settings, "ANN_INDEX_PATH", ""),
+        )
         self.embedder = EmbeddingServiceV3()
         self.analytics = get_graph_analytics(kg)
         
-        # Cache for embeddings
+        # Concept metadata + ANN index over concept embeddings
         self._concept_cache: Dict[str, Dict[str, str]] = {}
-        self._concept_embeddings: Dict[str, np.ndarray] = {}
+        self._concept_texts: Dict[str, str] = {}
+        self._index: Optional[VectorIndex] = None
         
         # Pre-compute analytics on init
         self._precompute_analytics()
@@ -117,7 +128,7 @@ class RetrievalServiceV3:
         kg_hits = await self.kg.expand(seed_nodes=seed_concepts, hops=1)
         
         # Step 2: Semantic retrieval
-        all_vector_hits = self._semantic_retrieval(
+        all_vector_hits = await self._semantic_retrieval(
             query,
             limit=self.config.vector_top_k,
         )
@@ -157,7 +168,7 @@ class RetrievalServiceV3:
             examples=examples,
         )
     
-    def _semantic_retrieval(
+    async def _semantic_retrieval(
         self,
         query: str,
         limit: int = 10,
@@ -172,30 +183,23 @@ class RetrievalServiceV3:
             return []
 
         self._refresh_concept_cache(concepts)
+        if self._index is None or not len(self._index):
+            return []
 
-        query_vec = self.embedder.embed_text(normalized)
+        query_vec = await self.embedder.aembed_text(normalized)
 
         scored: List[Tuple[str, float, str]] = []
-        for concept_id, meta in self._concept_cache.items():
-            concept_vec = self._concept_embeddings.get(concept_id)
-            if concept_vec is None:
-                continue
-                
-            # Cosine similarity
-            similarity = float(np.dot(query_vec, concept_vec))
-            
+        for concept_id, similarity in self._index.search(query_vec, k=limit):
             # Filter by minimum similarity
             if similarity < self.config.min_similarity:
                 continue
-                
+            meta = self._concept_cache.get(concept_id, {})
             snippet = meta.get("title", concept_id)
             scored.append((concept_id, similarity, snippet))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
         
         return [
             VectorHit(id=c_id, score=max(0.0, min(1.0, score)), snippet=snippet)
-            for c_id, score, snippet in scored[:limit]
+            for c_id, score, snippet in scored
         ]
     
     def _rank_by_centrality(
@@ -344,20 +348,65 @@ class RetrievalServiceV3:
         return examples
     
     def _refresh_concept_cache(self, concepts: Dict[str, Dict[str, str]]) -> None:
-        """Refresh cached concept embeddings."""
-        if concepts == self._concept_cache:
+        """
+        Sync the ANN index with the concept table.
+        
+        Only added/changed concepts are embedded; removed concepts are
+        deleted from the index. The index is loaded from / saved to
+        ``ann_index_path`` when configured.
+        """
+        if concepts is self._concept_cache or concepts == self._concept_cache:
             return
 
+        texts = {
+            concept_id: concept_index_text(concept_id, meta)
+            for concept_id, meta in concepts.items()
+        }
+
+        if self._index is None and self.config.ann_index_path:
+            self._index = load_vector_index(self.config.ann_index_path)
+            if self._index is not None:
+                # Texts are unknown for a loaded index: trust ids, re-embed new ones
+                self._concept_texts = {
+                    cid: texts[cid] for cid in self._index.ids() if cid in texts
+                }
+
+        removed = [cid for cid in self._concept_texts if cid not in texts]
+        if self._index is not None:
+            removed.extend(cid for cid in self._index.ids() if cid not in texts and cid not in removed)
+        changed = [cid for cid, text in texts.items() if self._concept_texts.get(cid) != text]
+
+        if changed:
+            embeddings = self.embedder.embed_texts([texts[cid] for cid in changed], persist=True)
+            if self._index is None or self._index.dim != embeddings.shape[1]:
+                self._index = create_vector_index(
+                    dim=int(embeddings.shape[1]),
+                    backend=self.config.ann_backend,
+                    capacity=max(1024, len(texts)),
+                )
+                # New index: make sure every concept gets added
+                if len(changed) != len(texts):
+                    changed = list(texts)
+                    embeddings = self.embedder.embed_texts([texts[cid] for cid in changed], persist=True)
+                removed = []
+            self._index.add(changed, embeddings)
+
+        if removed and self._index is not None:
+            self._index.remove(removed)
+
         self._concept_cache = concepts
-        texts = []
-        ids = []
-        for concept_id, meta in concepts.items():
-            text = f"{meta.get('title', concept_id)}. {meta.get('keywords', '')}".strip()
-            ids.append(concept_id)
-            texts.append(text)
+        self._concept_texts = texts
 
-        embeddings = self.embedder.embed_texts(texts)
-        self._concept_embeddings = {cid: emb for cid, emb in zip(ids, embeddings)}
+        if (changed or removed) and self._index is not None:
+            logger.info(
+                f"Concept index ({self._index.backend}): +{len(changed)} -{len(removed)}, "
+                f"{len(self._index)} total"
+            )
+            if self.config.ann_index_path:
+                try:
+                    self._index.save(self.config.ann_index_path)
+                except Exception as e:
+                    logger.warning(f"Failed to save concept index: {e}")
     
     def get_analytics_summary(self) -> Dict:
         """Get summary of graph analytics for debugging."""
@@ -6,6 +6,8 @@ Primary: Qwen (Ollama local) → Fallback: Gemini (Cloud)
 
 This gateway provides:
 - Automatic fallback when primary LLM fails
+- Circuit breakers (ProviderHealth): a provider that keeps failing is
+  skipped without a request until a half-open probe succeeds
 - Consistent interface for topic chat
 - Latency tracking and logging
 - Streaming support (future)
@@ -23,6 +25,7 @@ import google.generativeai as genai
 
 from api.core.config import settings
 from api.services.ollama_service import OllamaService
+from api.services.provider_health import CircuitOpenError, get_provider_health
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +47,13 @@ class LLMResponse:
     error: Optional[str] = None
 
 
+# ProviderHealth names; "ollama" is shared with OllamaQwenHandler
+_HEALTH_NAMES = {
+    LLMProvider.QWEN: "ollama",
+    LLMProvider.GEMINI: "gemini",
+}
+
+
 class TopicLLMGateway:
     """
     LLM Gateway for Topic-Based Conversations.
@@ -51,8 +61,8 @@ class TopicLLMGateway:
     Features:
     - Primary: Qwen via Ollama (faster, local, privacy)
     - Fallback: Gemini (higher quality, cloud)
-    - Automatic failover on errors
-    - Latency tracking
+    - Automatic failover on errors, fast-fail on open circuits
+    - Latency tracking (EWMA can promote a much faster fallback)
     
     Usage:
         gateway = TopicLLMGateway()
@@ -89,6 +99,7 @@ class TopicLLMGateway:
             base_url=settings.OLLAMA_BASE_URL,
             model=settings.OLLAMA_MODEL,
             timeout=settings.OLLAMA_TIMEOUT,
+            session_contexts=getattr(settings, "OLLAMA_SESSION_CONTEXTS", 1024),
         )
         
         # Initialize Gemini
@@ -97,6 +108,10 @@ class TopicLLMGateway:
             genai.configure(api_key=settings.GEMINI_API_KEY)
             self.gemini_model = genai.GenerativeModel('gemini-pro')
         
+        self.health = get_provider_health()
+        self.health.register(_HEALTH_NAMES[LLMProvider.QWEN], probe=self.ollama.health_check)
+        self.health.register(_HEALTH_NAMES[LLMProvider.GEMINI])
+        
         logger.info(
             f"TopicLLMGateway initialized: "
             f"primary={primary.value}, "
@@ -111,6 +126,7 @@ class TopicLLMGateway:
         conversation_history: Optional[List[Dict[str, str]]] = None,
         max_tokens: int = 512,
         force_provider: Optional[LLMProvider] = None,
+        session_id: Optional[str] = None,
     ) -> LLMResponse:
         """
         Generate a response for topic-based conversation.
@@ -121,66 +137,74 @@ class TopicLLMGateway:
             conversation_history: Previous messages [{"role": "user/assistant", "content": "..."}]
             max_tokens: Maximum tokens to generate
             force_provider: Force specific provider (skip fallback)
+            session_id: Chat session, lets Qwen continue its cached context
             
         Returns:
             LLMResponse with content, provider info, and metrics
         """
         history = conversation_history or []
-        provider = force_provider or self.primary
+        providers = self._provider_order(force_provider)
         
-        # Try primary provider
-        try:
-            if provider == LLMProvider.QWEN:
-                return await self._generate_qwen(
-                    system_prompt, user_message, history, max_tokens
-                )
-            else:
-                return await self._generate_gemini(
-                    system_prompt, user_message, history, max_tokens
-                )
-        except Exception as e:
-            logger.warning(f"Primary LLM ({provider.value}) failed: {e}")
-            
-            # Fallback if enabled
-            if self.enable_fallback and not force_provider:
-                fallback_provider = (
-                    LLMProvider.GEMINI if provider == LLMProvider.QWEN
-                    else LLMProvider.QWEN
+        last_error: Optional[Exception] = None
+        for attempt, provider in enumerate(providers):
+            if attempt:
+                logger.info(f"Falling back to {provider.value}")
+            try:
+                response = await self.health.call(
+                    _HEALTH_NAMES[provider],
+                    lambda: self._generate_with(
+                        provider, system_prompt, user_message, history, max_tokens, session_id
+                    ),
                 )
-                logger.info(f"Falling back to {fallback_provider.value}")
-                
-                try:
-                    if fallback_provider == LLMProvider.QWEN:
-                        response = await self._generate_qwen(
-                            system_prompt, user_message, history, max_tokens
-                        )
-                    else:
-                        response = await self._generate_gemini(
-                            system_prompt, user_message, history, max_tokens
-                        )
-                    
-                    response.fallback_used = True
-                    return response
-                    
-                except Exception as fallback_error:
-                    logger.error(f"Fallback also failed: {fallback_error}")
-                    return LLMResponse(
-                        content="I'm sorry, I'm having trouble responding right now. Please try again.",
-                        provider=fallback_provider,
-                        latency_ms=0,
-                        model_name="error",
-                        fallback_used=True,
-                        error=str(fallback_error)
-                    )
-            
-            # No fallback - return error
-            return LLMResponse(
-                content="I'm sorry, I'm having trouble responding right now. Please try again.",
-                provider=provider,
-                latency_ms=0,
-                model_name="error",
-                error=str(e)
+                response.fallback_used = provider != (force_provider or self.primary)
+                return response
+            except CircuitOpenError as e:
+                logger.info(f"Skipping {provider.value}: {e}")
+                last_error = e
+            except Exception as e:
+                logger.warning(f"LLM ({provider.value}) failed: {e}")
+                last_error = e
+        
+        failed = providers[-1] if providers else (force_provider or self.primary)
+        return LLMResponse(
+            content="I'm sorry, I'm having trouble responding right now. Please try again.",
+            provider=failed,
+            latency_ms=0,
+            model_name="error",
+            fallback_used=len(providers) > 1,
+            error=str(last_error) if last_error else "No LLM provider configured",
+        )
+    
+    def _provider_order(self, force_provider: Optional[LLMProvider]) -> List[LLMProvider]:
+        """Providers to try, best first: open circuits last, much faster fallback first."""
+        if force_provider:
+            return [force_provider]
+        candidates = [self.primary]
+        if self.enable_fallback:
+            candidates += [p for p in LLMProvider if p != self.primary]
+        candidates = [
+            p for p in candidates
+            if p != LLMProvider.GEMINI or self.gemini_model is not None
+        ]
+        by_name = {_HEALTH_NAMES[p]: p for p in candidates}
+        return [by_name[name] for name in self.health.rank(list(by_name))]
+    
+    async def _generate_with(
+        self,
+        provider: LLMProvider,
+        system_prompt: str,
+        user_message: str,
+        history: List[Dict[str, str]],
+        max_tokens: int,
+        session_id: Optional[str],
+    ) -> LLMResponse:
+        if provider == LLMProvider.QWEN:
+            return await self._generate_qwen(
+                system_prompt, user_message, history, max_tokens, session_id
             )
+        return await self._generate_gemini(
+            system_prompt, user_message, history, max_tokens
+        )
     
     async def _generate_qwen(
         self,
@@ -188,6 +212,7 @@ class TopicLLMGateway:
         user_message: str,
         history: List[Dict[str, str]],
         max_tokens: int,
+        session_id: Optional[str] = None,
     ) -> LLMResponse:
         """Generate response using Qwen via Ollama."""
         start_time = time.time()
@@ -205,16 +230,12 @@ class TopicLLMGateway:
         # Add current user message
         messages.append({"role": "user", "content": user_message})
         
-        # Check Ollama health
-        is_healthy = await self.ollama.health_check()
-        if not is_healthy:
-            raise ConnectionError("Ollama service not available")
-        
         # Generate response
         response = await self.ollama.chat(
             messages=messages,
             temperature=self.qwen_temperature,
             max_tokens=max_tokens,
+            session_id=session_id,
         )
         
         latency_ms = int((time.time() - start_time) * 1000)
@@ -262,7 +283,7 @@ Respond as your character. Include [💡 Tip] or [📘] notes if the user made e
             temperature=self.gemini_temperature,
         )
         
-        response = self.gemini_model.generate_content(
+        response = await self.gemini_model.generate_content_async(
             full_prompt,
             generation_config=generation_config
         )
@@ -277,19 +298,14 @@ Respond as your character. Include [💡 Tip] or [📘] notes if the user made e
         )
     
     async def health_check(self) -> Dict[str, bool]:
-        """Check health of all LLM providers."""
-        results = {}
-        
-        # Check Ollama
-        try:
-            results["qwen"] = await self.ollama.health_check()
-        except Exception:
-            results["qwen"] = False
-        
-        # Check Gemini
-        results["gemini"] = self.gemini_model is not None
-        
-        return results
+        """Cached health of all LLM providers (no request is made)."""
+        return {
+            "qwen": self.health.is_available(_HEALTH_NAMES[LLMProvider.QWEN]),
+            "gemini": (
+                self.gemini_model is not None
+                and self.health.is_available(_HEALTH_NAMES[LLMProvider.GEMINI])
+            ),
+        }
     
     def get_primary_provider(self) -> str:
         """Get the current primary provider name."""
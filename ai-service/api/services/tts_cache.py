@@ -0,0 +1,342 @@
+"""Shared TTS audio cache.
+
+One cache serves every synthesis path (StreamingTTSService, PiperHandler,
+TTSService). Entries are WAV bytes keyed by (voice, speaker, speed, any
+other synthesis parameters, normalised text):
+
+- memory tier: O(1) LRU (``OrderedDict``) bounded by total bytes
+- disk tier (optional): content-addressed ``.wav`` files, shared by workers
+  and kept across restarts; pruned oldest-first past ``disk_max_bytes``
+- Redis tier (optional): shared across hosts, entries expire after a TTL
+
+Lower-tier hits are promoted to memory. Hit/miss counters and the hit rate
+are published through ``TelemetryService``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from api.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds to skip Redis after a failed call
+_REDIS_RETRY_S = 30.0
+
+
+def normalise_text(text: str) -> str:
+    """Collapse whitespace and case; punctuation is kept since it shapes prosody."""
+    return " ".join((text or "").split()).lower()
+
+
+def voice_id(model: str) -> str:
+    """Stable voice name for a model path ("models/x/en_US-a.onnx" -> "en_US-a")."""
+    return os.path.splitext(os.path.basename(model or ""))[0] or "default"
+
+
+class TTSCache:
+    """Byte-bounded LRU cache for synthesized audio with optional disk/Redis tiers."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 512 * 1024,
+        max_text_chars: int = 100,
+        disk_dir: str = "",
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        redis_url: str = "",
+        redis_ttl_s: int = 7 * 24 * 3600,
+        name: str = "tts_cache",
+    ):
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entry_bytes = max(0, int(max_entry_bytes))
+        self.max_text_chars = max_text_chars
+        self.name = name
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._disk_dir = disk_dir
+        self._disk_max_bytes = disk_max_bytes
+        self._disk_bytes = 0
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+                self._disk_bytes = sum(
+                    entry.stat().st_size for entry in self._disk_files()
+                )
+            except OSError as e:
+                logger.warning(f"[TTSCache] Disk tier disabled: {e}")
+                self._disk_dir = ""
+
+        self._redis = None
+        self._redis_ttl_s = redis_ttl_s
+        self._redis_down_until = 0.0
+        if redis_url:
+            try:
+                import redis
+
+                self._redis = redis.Redis.from_url(
+                    redis_url,
+                    socket_timeout=0.25,
+                    socket_connect_timeout=0.25,
+                )
+            except Exception as e:
+                logger.warning(f"[TTSCache] Redis tier disabled: {e}")
+
+        # Metrics
+        self._hits = {"memory": 0, "disk": 0, "redis": 0}
+        self._misses = 0
+        self._evictions = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(
+        voice: str,
+        speaker: Optional[Union[int, str]],
+        speed: Optional[float],
+        text: str,
+        **params: float,
+    ) -> str:
+        """Key for one utterance; params are extra synthesis settings (noise_scale, ...)."""
+        raw = f"{voice_id(voice)}\x00{speaker if speaker is not None else ''}\x00{float(speed or 1.0):.3f}"
+        for name in sorted(params):
+            raw += f"\x00{name}={float(params[name]):.3f}"
+        raw += f"\x00{normalise_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        """Only short phrases repeat often enough to be worth caching."""
+        return bool(text and text.strip()) and len(text) <= self.max_text_chars
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, local_only: bool = False) -> Optional[bytes]:
+        """
+        Look up audio. With local_only, only the memory tier is checked and a
+        miss is not counted, so callers on the event loop can try memory first
+        and do the full (blocking) lookup in a worker thread.
+        """
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+        if audio is not None:
+            self._record("memory")
+            return audio
+        if local_only:
+            return None
+
+        tier = "disk"
+        audio = self._disk_get(key)
+        if audio is None:
+            tier = "redis"
+            audio = self._redis_get(key)
+            if audio is not None:
+                self._disk_put(key, audio)
+        if audio is None:
+            self._record(None)
+            return None
+
+        self._memory_put(key, audio)
+        self._record(tier)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio in every enabled tier."""
+        if not audio or len(audio) > self.max_entry_bytes:
+            return
+        self._memory_put(key, audio)
+        self._disk_put(key, audio)
+        self._redis_put(key, audio)
+
+    def clear(self) -> None:
+        """Clear the memory tier."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = sum(self._hits.values())
+        lookups = hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": dict(self._hits),
+            "misses": self._misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "disk_bytes": self._disk_bytes if self._disk_dir else None,
+            "redis": self._redis is not None,
+        }
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_put(self, key: str, audio: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = audio
+            self._bytes += len(audio)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self._disk_dir, key[:2], f"{key}.wav")
+
+    def _disk_files(self):
+        for shard in os.scandir(self._disk_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".wav"):
+                        yield entry
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self._disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # recency for pruning
+            return audio
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, audio: bytes) -> None:
+        if not self._disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+            self._disk_bytes += len(audio)
+        except OSError as e:
+            logger.debug(f"[TTSCache] Disk write failed: {e}")
+            return
+        if self._disk_bytes > self._disk_max_bytes:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove least recently used files until 90% of the disk budget."""
+        try:
+            files = sorted(
+                ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._disk_files()),
+            )
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        target = int(self._disk_max_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.debug(f"[TTSCache] Redis unavailable: {e}")
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_S
+
+    def _redis_get(self, key: str) -> Optional[bytes]:
+        if not self._redis_available():
+            return None
+        try:
+            return self._redis.get(f"{self.name}:{key}")
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+
+    def _redis_put(self, key: str, audio: bytes) -> None:
+        if not self._redis_available():
+            return
+        try:
+            self._redis.set(f"{self.name}:{key}", audio, ex=self._redis_ttl_s)
+        except Exception as e:
+            self._redis_failed(e)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _record(self, tier: Optional[str]) -> None:
+        if tier is None:
+            self._misses += 1
+        else:
+            self._hits[tier] += 1
+
+        try:
+            from api.services.telemetry import get_telemetry
+
+            telemetry = get_telemetry()
+            telemetry.increment_counter(f"{self.name}_{tier}_hits" if tier else f"{self.name}_misses")
+            hits = sum(self._hits.values())
+            telemetry.set_gauge(f"{self.name}_hit_rate", hits / (hits + self._misses))
+            telemetry.set_gauge(f"{self.name}_bytes", self._bytes)
+        except Exception:
+            pass
+
+
+# Singleton instance
+_tts_cache: Optional[TTSCache] = None
+_tts_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Get the process-wide TTS cache configured from settings."""
+    global _tts_cache
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                redis_url = ""
+                if getattr(settings, "TTS_CACHE_REDIS", False):
+                    redis_url = getattr(settings, "REDIS_URL", "")
+                _tts_cache = TTSCache(
+                    max_bytes=int(getattr(settings, "TTS_CACHE_MAX_MB", 64) * 1024 * 1024),
+                    max_entry_bytes=int(getattr(settings, "TTS_CACHE_MAX_ENTRY_KB", 512) * 1024),
+                    max_text_chars=getattr(settings, "TTS_CACHE_MAX_TEXT_CHARS", 100),
+                    disk_dir=getattr(settings, "TTS_CACHE_DIR", ""),
+                    disk_max_bytes=int(getattr(settings, "TTS_CACHE_DISK_MAX_MB", 512) * 1024 * 1024),
+                    redis_url=redis_url,
+                    redis_ttl_s=getattr(settings, "TTS_CACHE_REDIS_TTL_S", 7 * 24 * 3600),
+                )
+    return _tts_cache
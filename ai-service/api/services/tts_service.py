@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import io
 import logging
+import wave
 from typing import Optional
 
 from api.core.config import settings
+from api.services.tts_cache import TTSCache, get_tts_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +36,23 @@ class TTSService:
         return self._voice
 
     def synthesize(self, text: str) -> bytes:
+        cache = get_tts_cache()
+        key = None
+        if cache.cacheable(text):
+            key = TTSCache.make_key(settings.TTS_MODEL_PATH, settings.TTS_SPEAKER_ID, 1.0, text)
+            cached = cache.get(key)
+            if cached:
+                return cached
+
         voice = self._load_voice()
         wav_io = io.BytesIO()
-        voice.synthesize(text, wav_io, speaker_id=settings.TTS_SPEAKER_ID)
-        return wav_io.getvalue()
+        with wave.open(wav_io, "wb") as wav_file:
+            voice.synthesize(text, wav_file, speaker_id=settings.TTS_SPEAKER_ID)
+        audio = wav_io.getvalue()
+
+        if key is not None:
+            cache.put(key, audio)
+        return audio
 
 
 _tts_service: Optional[TTSService] = None
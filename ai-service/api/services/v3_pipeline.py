@@ -31,7 +31,7 @@ from api.models.v3_schemas import (
 from api.services.background_jobs_v3 import BackgroundJobsV3
 from api.services.diagnoser_v3 import DiagnoserV3
 from api.services.grounded_response_v3 import GroundedResponseV3
-from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+from api.services.kg_service_v3 import get_kg_service
 from api.services.retrieval_service_v3 import RetrievalConfig, RetrievalServiceV3
 from api.services.graph_analytics import get_graph_analytics
 
@@ -45,7 +45,7 @@ class V3Pipeline:
         self.learner_cache: Optional[LearnerProfileCache] = None
         self.conversation_cache: Optional[ConversationCache] = None
 
-        self.kg = KnowledgeGraphServiceV3()
+        self.kg = get_kg_service()
         self.diagnoser = DiagnoserV3()
         self.retrieval = RetrievalServiceV3(self.kg)
         self.grounded = GroundedResponseV3(self.kg)
@@ -0,0 +1,315 @@
+"""Pluggable nearest-neighbour index for embedding retrieval.
+
+Backends:
+- ``hnsw``:  approximate search via hnswlib (optional dependency)
+- ``exact``: brute-force NumPy matmul + argpartition (always available)
+
+Vectors are expected to be L2-normalised (``EmbeddingServiceV3`` returns
+normalised embeddings), so scores are cosine similarities. Both backends
+support incremental add/remove by string id and save/load to disk.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+
+def concept_index_text(concept_id: str, meta: Dict[str, str]) -> str:
+    """Text embedded for a KG concept (shared by retrieval and import)."""
+    return f"{meta.get('title', concept_id)}. {meta.get('keywords', '')}".strip()
+
+
+class VectorIndex(ABC):
+    """Id-addressed vector index returning (id, cosine similarity) pairs."""
+
+    backend: str = ""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert or replace vectors for ids."""
+
+    @abstractmethod
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove ids (unknown ids are ignored)."""
+
+    @abstractmethod
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return up to k (id, score) pairs, best first."""
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """All ids currently in the index."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, item: str) -> bool:
+        return item in set(self.ids())
+
+    # ------------------------------------------------------------------
+    # Persistence: <path>.meta.json + backend-specific data file
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def save(self, path: str) -> None:
+        ...
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict) -> None:
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = f"{path}.meta.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, f"{path}.meta.json")
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force index over a preallocated float32 matrix."""
+
+    backend = "exact"
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        super().__init__(dim)
+        self._matrix = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._active = np.zeros(max(1, capacity), dtype=bool)
+        self._row_ids: List[Optional[str]] = [None] * max(1, capacity)
+        self._row_of: Dict[str, int] = {}
+        self._free: List[int] = list(range(max(1, capacity) - 1, -1, -1))
+
+    def _grow(self, needed: int) -> None:
+        old = self._matrix.shape[0]
+        new = max(old * 2, old + needed)
+        matrix = np.zeros((new, self.dim), dtype=np.float32)
+        matrix[:old] = self._matrix
+        active = np.zeros(new, dtype=bool)
+        active[:old] = self._active
+        self._matrix = matrix
+        self._active = active
+        self._row_ids.extend([None] * (new - old))
+        self._free = list(range(new - 1, old - 1, -1)) + self._free
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        new_count = sum(1 for i in ids if i not in self._row_of)
+        if new_count > len(self._free):
+            self._grow(new_count - len(self._free))
+        for item_id, vector in zip(ids, vectors):
+            row = self._row_of.get(item_id)
+            if row is None:
+                row = self._free.pop()
+                self._row_of[item_id] = row
+                self._row_ids[row] = item_id
+                self._active[row] = True
+            self._matrix[row] = vector
+
+    def remove(self, ids: Sequence[str]) -> None:
+        for item_id in ids:
+            row = self._row_of.pop(item_id, None)
+            if row is None:
+                continue
+            self._active[row] = False
+            self._row_ids[row] = None
+            self._matrix[row] = 0.0
+            self._free.append(row)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if not self._row_of or k <= 0:
+            return []
+        scores = self._matrix @ np.asarray(query, dtype=np.float32)
+        scores[~self._active] = -np.inf
+        k = min(k, len(self._row_of))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._row_ids[r], float(scores[r])) for r in top.tolist()]
+
+    def ids(self) -> List[str]:
+        return list(self._row_of.keys())
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._row_of
+
+    def save(self, path: str) -> None:
+        ids = self.ids()
+        rows = [self._row_of[i] for i in ids]
+        self._write_meta(path, {"backend": self.backend, "dim": self.dim, "ids": ids})
+        with open(f"{path}.npy", "wb") as f:
+            np.save(f, self._matrix[rows] if rows else np.zeros((0, self.dim), dtype=np.float32))
+
+    @classmethod
+    def load(cls, path: str, meta: Dict) -> "ExactIndex":
+        vectors = np.load(f"{path}.npy")
+        index = cls(dim=int(meta["dim"]), capacity=max(1024, len(meta["ids"])))
+        if meta["ids"]:
+            index.add(meta["ids"], vectors)
+        return index
+
+
+class HNSWIndex(VectorIndex):
+    """Approximate index backed by hnswlib (inner-product space)."""
+
+    backend = "hnsw"
+
+    def __init__(
+        self,
+        dim: int,
+        capacity: int = 1024,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        if not HNSWLIB_AVAILABLE:
+            raise RuntimeError("hnswlib is not installed")
+        super().__init__(dim)
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="ip", dim=dim)
+        self._index.init_index(
+            max_elements=max(1, capacity),
+            ef_construction=ef_construction,
+            M=m,
+            allow_replace_deleted=True,
+        )
+        self._index.set_ef(ef_search)
+        self._label_of: Dict[str, int] = {}
+        self._id_of: Dict[int, str] = {}
+        self._next_label = 0
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self._index.get_current_count() + extra
+        capacity = self._index.get_max_elements()
+        if needed > capacity:
+            self._index.resize_index(max(capacity * 2, needed))
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        labels: List[int] = []
+        for item_id in ids:
+            label = self._label_of.get(item_id)
+            if label is None:
+                label = self._next_label
+                self._next_label += 1
+                self._label_of[item_id] = label
+                self._id_of[label] = item_id
+            labels.append(label)
+        self._ensure_capacity(len(labels))
+        self._index.add_items(vectors, np.asarray(labels, dtype=np.int64), replace_deleted=True)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        for item_id in ids:
+            label = self._label_of.pop(item_id, None)
+            if label is None:
+                continue
+            self._id_of.pop(label, None)
+            self._index.mark_deleted(label)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if not self._label_of or k <= 0:
+            return []
+        k = min(k, len(self._label_of))
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(np.asarray(query, dtype=np.float32), k=k)
+        # "ip" space returns 1 - dot product
+        return [
+            (self._id_of[int(label)], float(1.0 - dist))
+            for label, dist in zip(labels[0].tolist(), distances[0].tolist())
+            if int(label) in self._id_of
+        ]
+
+    def ids(self) -> List[str]:
+        return list(self._label_of.keys())
+
+    def __len__(self) -> int:
+        return len(self._label_of)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._label_of
+
+    def save(self, path: str) -> None:
+        self._write_meta(path, {
+            "backend": self.backend,
+            "dim": self.dim,
+            "labels": self._label_of,
+            "next_label": self._next_label,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+        })
+        self._index.save_index(f"{path}.hnsw")
+
+    @classmethod
+    def load(cls, path: str, meta: Dict) -> "HNSWIndex":
+        index = cls(
+            dim=int(meta["dim"]),
+            capacity=1,
+            m=meta.get("m", 16),
+            ef_construction=meta.get("ef_construction", 200),
+            ef_search=meta.get("ef_search", 64),
+        )
+        index._index = hnswlib.Index(space="ip", dim=index.dim)
+        index._index.load_index(f"{path}.hnsw", allow_replace_deleted=True)
+        index._index.set_ef(index.ef_search)
+        index._label_of = {k: int(v) for k, v in meta["labels"].items()}
+        index._id_of = {v: k for k, v in index._label_of.items()}
+        index._next_label = int(meta.get("next_label", len(index._label_of)))
+        return index
+
+
+def create_vector_index(dim: int, backend: str = "auto", capacity: int = 1024) -> VectorIndex:
+    """
+    Create an empty index.
+
+    Args:
+        dim: Vector dimension
+        backend: "auto" (hnsw if available), "hnsw" or "exact"
+        capacity: Initial capacity (both backends grow on demand)
+    """
+    backend = (backend or "auto").lower()
+    if backend in ("auto", "hnsw") and HNSWLIB_AVAILABLE:
+        return HNSWIndex(dim=dim, capacity=capacity)
+    if backend == "hnsw":
+        logger.warning("hnswlib not installed, falling back to exact vector index")
+    return ExactIndex(dim=dim, capacity=capacity)
+
+
+def load_vector_index(path: str) -> Optional[VectorIndex]:
+    """Load an index saved with ``VectorIndex.save``; None if missing/unreadable."""
+    meta_path = f"{path}.meta.json"
+    if not path or not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("backend") == HNSWIndex.backend:
+            if not HNSWLIB_AVAILABLE:
+                logger.warning("Saved index needs hnswlib; rebuilding instead")
+                return None
+            return HNSWIndex.load(path, meta)
+        return ExactIndex.load(path, meta)
+    except Exception as e:
+        logger.warning(f"Failed to load vector index {path}: {e}")
+        return None
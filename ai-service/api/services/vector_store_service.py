@@ -3,16 +3,29 @@ Vector Store Service
 
 Semantic vector search for concepts using sentence embeddings.
 Supports hybrid search (keyword + semantic).
+
+Concept embeddings are kept as one L2-normalised float32 matrix per concept
+pool, so a query is a single matmul plus ``argpartition`` for top-k.
+Matrices can be persisted to ``VECTOR_STORE_CACHE_DIR``.
 """
 
-import logging
-from typing import Any, Dict, List, Optional
 import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from pydantic import BaseModel, Field
 
+from api.core.config import settings
+from api.services.embedding_store import get_embedding_store
+
 logger = logging.getLogger(__name__)
 
+# Dimension of the pseudo-embeddings used when the model is unavailable
+FALLBACK_DIM = 128
+
 
 # ============================================================
 # MODELS
@@ -37,6 +50,115 @@ class SemanticMatch(BaseModel):
     match_type: str = "semantic"  # semantic, keyword, hybrid
 
 
+# ============================================================
+# CONCEPT MATRIX
+# ============================================================
+
+
+class ConceptMatrix:
+    """
+    Normalised embedding matrix plus sparse term index for a concept pool.
+
+    Keyword overlap is scored from a COO term index (concept row, term id),
+    so Jaccard scores for every concept come from one ``bincount``.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        concept_ids: List[str],
+        titles: List[str],
+        categories: List[str],
+        texts: List[str],
+        embeddings: np.ndarray,
+    ):
+        self.fingerprint = fingerprint
+        self.concept_ids = concept_ids
+        self.titles = titles
+        self.categories = categories
+        self.texts = texts
+        self.row_of: Dict[str, int] = {cid: i for i, cid in enumerate(concept_ids)}
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(len(concept_ids), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+        # Term index for keyword overlap
+        self.vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        terms: List[int] = []
+        for row, text in enumerate(texts):
+            for term in set(text.lower().split()):
+                term_id = self.vocab.setdefault(term, len(self.vocab))
+                rows.append(row)
+                terms.append(term_id)
+        self.term_rows = np.asarray(rows, dtype=np.int32)
+        self.term_ids = np.asarray(terms, dtype=np.int32)
+        self.term_counts = np.bincount(self.term_rows, minlength=len(concept_ids)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.concept_ids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.size else 0
+
+    def keyword_scores(self, query: str) -> np.ndarray:
+        """Jaccard overlap between query terms and every concept's terms."""
+        query_terms = set(query.lower().split())
+        scores = np.zeros(len(self.concept_ids), dtype=np.float32)
+        if not query_terms or not len(self.concept_ids):
+            return scores
+
+        known = [self.vocab[t] for t in query_terms if t in self.vocab]
+        if known:
+            hit = np.isin(self.term_ids, np.asarray(known, dtype=np.int32))
+            overlap = np.bincount(self.term_rows[hit], minlength=len(self.concept_ids)).astype(np.float32)
+        else:
+            overlap = scores
+        union = len(query_terms) + self.term_counts - overlap
+        np.divide(overlap, union, out=scores, where=union > 0)
+        return scores
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            fingerprint=np.asarray(self.fingerprint),
+            concept_ids=np.asarray(self.concept_ids, dtype=object),
+            titles=np.asarray(self.titles, dtype=object),
+            categories=np.asarray(self.categories, dtype=object),
+            texts=np.asarray(self.texts, dtype=object),
+            matrix=self.matrix,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ConceptMatrix":
+        data = np.load(path, allow_pickle=True)
+        return cls(
+            fingerprint=str(data["fingerprint"]),
+            concept_ids=data["concept_ids"].tolist(),
+            titles=data["titles"].tolist(),
+            categories=data["categories"].tolist(),
+            texts=data["texts"].tolist(),
+            embeddings=data["matrix"],
+        )
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, sorted descending."""
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
 # ============================================================
 # VECTOR STORE SERVICE
 # ============================================================
@@ -50,8 +172,20 @@ class VectorStoreService:
     Falls back to keyword matching when embeddings unavailable.
     """
 
-    def __init__(self):
-        self._embeddings_cache: Dict[str, List[float]] = {}
+    # Number of concept pools kept in memory (e.g. grammar + vocabulary)
+    MAX_MATRICES = 4
+    ENCODE_BATCH_SIZE = 256
+    MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._embeddings_cache: Dict[str, np.ndarray] = {}
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_size = int(getattr(settings, "EMBEDDING_QUERY_CACHE_SIZE", 2048))
+        self._matrices: Dict[str, ConceptMatrix] = {}
+        self._fingerprints: Dict[int, Tuple[List[Dict[str, Any]], int, str]] = {}
+        self._cache_dir = cache_dir if cache_dir is not None else getattr(
+            settings, "VECTOR_STORE_CACHE_DIR", ""
+        )
         self._model = None
         self._model_loaded = False
 
@@ -61,7 +195,7 @@ class VectorStoreService:
             try:
                 from sentence_transformers import SentenceTransformer
                 # Use a lightweight multilingual model
-                self._model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+                self._model = SentenceTransformer(self.MODEL_NAME)
                 self._model_loaded = True
                 logger.info("Loaded sentence transformer model")
             except ImportError:
@@ -84,37 +218,83 @@ class VectorStoreService:
         Returns:
             Embedding vector (384 dimensions for MiniLM)
         """
-        # Check cache first
-        cache_key = hashlib.md5(text.encode()).hexdigest()
-        if cache_key in self._embeddings_cache:
-            return self._embeddings_cache[cache_key]
-
-        model = self._get_model()
-        if model is None:
-            # Fallback: simple hash-based pseudo-embedding
-            return self._fallback_embedding(text)
-
-        try:
-            embedding = model.encode(text).tolist()
-            self._embeddings_cache[cache_key] = embedding
-            return embedding
-        except Exception as e:
-            logger.warning(f"Embedding generation failed: {e}")
-            return self._fallback_embedding(text)
+        return self._embed_many([text])[0][0].tolist()
+
+    def _embed_many(self, texts: Sequence[str], persist: bool = False) -> Tuple[np.ndarray, bool]:
+        """
+        Embed texts in one batch, reusing cached vectors.
+
+        Concept texts (``persist=True``) are shared through the on-disk
+        embedding store; query texts only go to a bounded in-process LRU.
+
+        Returns:
+            (vectors, fallback) - fallback is True for pseudo-embeddings,
+            which callers must not cache
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32), False
+
+        cache = self._embeddings_cache if persist else self._query_cache
+        found: Dict[str, np.ndarray] = {}
+        for text in texts:
+            vector = cache.get(text)
+            if vector is None and not persist:
+                vector = self._embeddings_cache.get(text)
+            if vector is not None:
+                found[text] = vector
+        missing = [t for t in dict.fromkeys(texts) if t not in found]
+
+        # Shared on-disk store (other workers / previous runs)
+        store = get_embedding_store(self.MODEL_NAME)
+        if store is not None and missing:
+            for text, vector in zip(missing, store.get_many(missing)):
+                if vector is not None:
+                    found[text] = vector
+            missing = [t for t in missing if t not in found]
+
+        if missing:
+            model = self._get_model()
+            vectors = None
+            if model is not None:
+                try:
+                    vectors = np.asarray(
+                        model.encode(missing, batch_size=self.ENCODE_BATCH_SIZE),
+                        dtype=np.float32,
+                    )
+                except Exception as e:
+                    logger.warning(f"Embedding generation failed: {e}")
+            if vectors is None:
+                # Fallback: pseudo-embeddings (not cached so a later model load wins)
+                return np.stack([self._fallback_embedding_array(t) for t in texts]), True
+            if persist and store is not None:
+                store.put_many(missing, vectors)
+            found.update(zip(missing, vectors))
+
+        for text in texts:
+            cache[text] = found[text]
+            if not persist:
+                self._query_cache.move_to_end(text)
+        if not persist:
+            while len(self._query_cache) > self._query_cache_size:
+                self._query_cache.popitem(last=False)
+        return np.stack([found[t] for t in texts]), False
 
     def _fallback_embedding(self, text: str) -> List[float]:
         """Generate pseudo-embedding when model unavailable."""
-        # Create a deterministic but naive embedding from text
-        import math
-        text_lower = text.lower()
-        dim = 128
-        embedding = []
-        for i in range(dim):
-            val = 0.0
-            for j, char in enumerate(text_lower):
-                val += (ord(char) * (i + 1) * (j + 1)) % 1000 / 1000.0
-            embedding.append(math.sin(val) * 0.5 + 0.5)
-        return embedding
+        return self._fallback_embedding_array(text).tolist()
+
+    @staticmethod
+    def _fallback_embedding_array(text: str, dim: int = FALLBACK_DIM) -> np.ndarray:
+        """Deterministic but naive embedding from character codes."""
+        codes = np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        if codes.size == 0:
+            return np.full(dim, 0.5, dtype=np.float32)
+        positions = np.arange(1, codes.size + 1, dtype=np.int64)
+        dims = np.arange(1, dim + 1, dtype=np.int64)
+        # val[i] = sum_j (ord(c_j) * (i+1) * (j+1)) % 1000 / 1000
+        products = np.outer(dims, codes * positions) % 1000
+        vals = products.sum(axis=1) / 1000.0
+        return (np.sin(vals) * 0.5 + 0.5).astype(np.float32)
 
     def cosine_similarity(
         self,
@@ -125,15 +305,133 @@ class VectorStoreService:
         if len(vec1) != len(vec2) or len(vec1) == 0:
             return 0.0
 
-        import math
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = math.sqrt(sum(a * a for a in vec1))
-        norm2 = math.sqrt(sum(b * b for b in vec2))
+        a = np.asarray(vec1, dtype=np.float32)
+        b = np.asarray(vec2, dtype=np.float32)
+        norm1 = float(np.linalg.norm(a))
+        norm2 = float(np.linalg.norm(b))
 
         if norm1 == 0 or norm2 == 0:
             return 0.0
 
-        return dot_product / (norm1 * norm2)
+        return float(np.dot(a, b) / (norm1 * norm2))
+
+    # --------------------------------------------------------
+    # Concept matrices
+    # --------------------------------------------------------
+
+    @staticmethod
+    def _concept_fields(concept: Dict[str, Any]) -> Tuple[str, str, str, str]:
+        concept_id = concept.get("concept_id", concept.get("id", ""))
+        title = concept.get("title", "")
+        category = concept.get("category", "")
+        return concept_id, title, category, f"{title} {category}"
+
+    def build_concept_matrix(self, concepts: List[Dict[str, Any]]) -> ConceptMatrix:
+        """
+        Get the embedding matrix for a concept pool.
+
+        Matrices are cached by a fingerprint of (id, text) pairs and, when
+        ``VECTOR_STORE_CACHE_DIR`` is set, persisted so restarts skip
+        re-encoding. The fingerprint is remembered per list object, so
+        repeated queries against the same pool do not re-hash it; pass a new
+        list when the pool changes. Matrices built from fallback
+        pseudo-embeddings are never cached.
+        """
+        fingerprint = self._pool_fingerprint(concepts)
+        matrix = self._matrices.get(fingerprint)
+        if matrix is not None:
+            return matrix
+
+        fields = [self._concept_fields(c) for c in concepts]
+        path = self._matrix_path(fingerprint)
+        if path and os.path.exists(path):
+            try:
+                matrix = ConceptMatrix.load(path)
+            except Exception as e:
+                logger.warning(f"Failed to load concept matrix {path}: {e}")
+                matrix = None
+            if matrix is not None and matrix.dim == FALLBACK_DIM:
+                # Written by an older build from pseudo-embeddings
+                matrix = None
+
+        if matrix is None:
+            texts = [f[3] for f in fields]
+            embeddings, fallback = self._embed_many(texts, persist=True)
+            matrix = ConceptMatrix(
+                fingerprint=fingerprint,
+                concept_ids=[f[0] for f in fields],
+                titles=[f[1] for f in fields],
+                categories=[f[2] for f in fields],
+                texts=texts,
+                embeddings=embeddings,
+            )
+            if fallback:
+                return matrix
+            if path:
+                try:
+                    os.makedirs(self._cache_dir, exist_ok=True)
+                    matrix.save(path)
+                except Exception as e:
+                    logger.warning(f"Failed to persist concept matrix: {e}")
+
+        if len(self._matrices) >= self.MAX_MATRICES:
+            self._matrices.pop(next(iter(self._matrices)))
+        self._matrices[fingerprint] = matrix
+        logger.info(f"Concept matrix ready: {len(matrix)} concepts x {matrix.dim} dims")
+        return matrix
+
+    def _pool_fingerprint(self, concepts: List[Dict[str, Any]]) -> str:
+        """SHA1 of (id, text) pairs, computed once per concept list object."""
+        entry = self._fingerprints.get(id(concepts))
+        if entry is not None and entry[0] is concepts and entry[1] == len(concepts):
+            return entry[2]
+
+        digest = hashlib.sha1()
+        for concept_id, _, _, text in (self._concept_fields(c) for c in concepts):
+            digest.update(concept_id.encode())
+            digest.update(b"\x00")
+            digest.update(text.encode())
+            digest.update(b"\x01")
+        fingerprint = digest.hexdigest()
+
+        if len(self._fingerprints) >= self.MAX_MATRICES:
+            self._fingerprints.pop(next(iter(self._fingerprints)))
+        # Keep the list alive so its id cannot be reused by another pool
+        self._fingerprints[id(concepts)] = (concepts, len(concepts), fingerprint)
+        return fingerprint
+
+    def _matrix_path(self, fingerprint: str) -> Optional[str]:
+        if not self._cache_dir:
+            return None
+        return os.path.join(self._cache_dir, f"concepts_{fingerprint[:16]}.npz")
+
+    def _query_vectors(self, queries: Sequence[str], dim: int) -> np.ndarray:
+        vectors = self._embed_many(queries)[0].astype(np.float32)
+        if vectors.shape[1] != dim:
+            # Model availability changed since the matrix was built
+            vectors = np.stack([self._fallback_embedding_array(q, dim) for q in queries])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _matches(
+        self,
+        matrix: ConceptMatrix,
+        scores: np.ndarray,
+        top_k: int,
+        match_type: str,
+    ) -> List[SemanticMatch]:
+        return [
+            SemanticMatch(
+                concept_id=matrix.concept_ids[i],
+                title=matrix.titles[i],
+                category=matrix.categories[i],
+                score=float(scores[i]),
+                match_type=match_type,
+            )
+            for i in _top_k(scores, top_k).tolist()
+            if np.isfinite(scores[i])
+        ]
 
     async def semantic_search(
         self,
@@ -152,30 +450,32 @@ class VectorStoreService:
         Returns:
             Top matching concepts
         """
-        if not concepts:
-            return []
-
-        query_embedding = self.generate_embedding(query)
+        results = await self.semantic_search_many([query], concepts, top_k)
+        return results[0] if results else []
 
-        results = []
-        for concept in concepts:
-            # Generate or retrieve concept embedding
-            concept_text = f"{concept.get('title', '')} {concept.get('category', '')}"
-            concept_embedding = self.generate_embedding(concept_text)
+    async def semantic_search_many(
+        self,
+        queries: List[str],
+        concepts: List[Dict[str, Any]],
+        top_k: int = 5,
+    ) -> List[List[SemanticMatch]]:
+        """
+        Search concepts for several queries with one batched encode + matmul.
 
-            score = self.cosine_similarity(query_embedding, concept_embedding)
+        Returns:
+            One top-k list per query, in query order
+        """
+        if not concepts or not queries:
+            return [[] for _ in queries]
 
-            results.append(SemanticMatch(
-                concept_id=concept.get("concept_id", concept.get("id", "")),
-                title=concept.get("title", ""),
-                category=concept.get("category", ""),
-                score=score,
-                match_type="semantic",
-            ))
+        matrix = self.build_concept_matrix(concepts)
+        query_vecs = self._query_vectors(queries, matrix.dim)
+        scores = query_vecs @ matrix.matrix.T
 
-        # Sort by score and return top k
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:top_k]
+        return [
+            self._matches(matrix, scores[row], top_k, "semantic")
+            for row in range(len(queries))
+        ]
 
     async def hybrid_search(
         self,
@@ -199,44 +499,12 @@ class VectorStoreService:
         if not concepts:
             return []
 
-        query_lower = query.lower()
-        query_terms = set(query_lower.split())
-
-        # Get semantic scores
-        semantic_results = await self.semantic_search(query, concepts, len(concepts))
-        semantic_scores = {r.concept_id: r.score for r in semantic_results}
-
-        # Calculate keyword scores
-        keyword_scores = {}
-        for concept in concepts:
-            concept_id = concept.get("concept_id", concept.get("id", ""))
-            text = f"{concept.get('title', '')} {concept.get('category', '')}".lower()
-            text_terms = set(text.split())
-
-            # Jaccard-like similarity
-            overlap = len(query_terms & text_terms)
-            total = len(query_terms | text_terms)
-            keyword_scores[concept_id] = overlap / total if total > 0 else 0.0
-
-        # Combine scores
-        results = []
-        for concept in concepts:
-            concept_id = concept.get("concept_id", concept.get("id", ""))
-            semantic = semantic_scores.get(concept_id, 0.0)
-            keyword = keyword_scores.get(concept_id, 0.0)
-
-            combined = (1 - keyword_weight) * semantic + keyword_weight * keyword
-
-            results.append(SemanticMatch(
-                concept_id=concept_id,
-                title=concept.get("title", ""),
-                category=concept.get("category", ""),
-                score=combined,
-                match_type="hybrid",
-            ))
-
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:top_k]
+        matrix = self.build_concept_matrix(concepts)
+        semantic = matrix.matrix @ self._query_vectors([query], matrix.dim)[0]
+        keyword = matrix.keyword_scores(query)
+
+        combined = (1 - keyword_weight) * semantic + keyword_weight * keyword
+        return self._matches(matrix, combined, top_k, "hybrid")
 
     async def find_related_concepts(
         self,
@@ -255,14 +523,20 @@ class VectorStoreService:
         Returns:
             Related concepts
         """
-        concept_text = f"{concept.get('title', '')} {concept.get('category', '')}"
-        
+        if not all_concepts:
+            return []
+
+        concept_id, _, _, concept_text = self._concept_fields(concept)
+
+        matrix = self.build_concept_matrix(all_concepts)
+        scores = matrix.matrix @ self._query_vectors([concept_text], matrix.dim)[0]
+
         # Filter out self
-        concept_id = concept.get("concept_id", concept.get("id", ""))
-        filtered = [c for c in all_concepts 
-                    if c.get("concept_id", c.get("id", "")) != concept_id]
+        self_row = matrix.row_of.get(concept_id)
+        if self_row is not None:
+            scores[self_row] = -np.inf
 
-        return await self.semantic_search(concept_text, filtered, top_k)
+        return self._matches(matrix, scores, top_k, "semantic")
 
 
 # ============================================================
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Recall@k / latency benchmark for the retrieval vector index.
+
+Compares the approximate backend (hnsw, if hnswlib is installed) against the
+exact NumPy path on the same vectors.
+
+Usage:
+    # Synthetic normalised vectors
+    python scripts/benchmark_ann.py --size 50000 --dim 384
+
+    # Real concept embeddings from a knowledge JSON (uses EmbeddingServiceV3)
+    python scripts/benchmark_ann.py --json-path data/knowledge_extended.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services.vector_index import (
+    HNSWLIB_AVAILABLE,
+    ExactIndex,
+    VectorIndex,
+    concept_index_text,
+    create_vector_index,
+)
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def synthetic_vectors(size: int, dim: int, queries: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    data = normalise(rng.standard_normal((size, dim)))
+    # Queries near existing points, like paraphrased learner input
+    picks = rng.integers(0, size, queries)
+    query_vecs = normalise(data[picks] + 0.3 * rng.standard_normal((queries, dim)) / np.sqrt(dim))
+    return [f"item:{i}" for i in range(size)], data, query_vecs
+
+
+def concept_vectors(json_path: str, queries: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    from api.services.embedding_service_v3 import EmbeddingServiceV3
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        concepts = json.load(f).get("concepts", [])
+
+    ids = [c["id"] for c in concepts]
+    texts = [concept_index_text(c["id"], c) for c in concepts]
+    embedder = EmbeddingServiceV3()
+    data = embedder.embed_texts(texts).astype(np.float32)
+    query_texts = [t.split(".")[0] for t in texts[:queries]]
+    return ids, data, embedder.embed_texts(query_texts).astype(np.float32)
+
+
+def timed_search(index: VectorIndex, queries: np.ndarray, k: int) -> Tuple[List[List[str]], List[float]]:
+    results: List[List[str]] = []
+    latencies: List[float] = []
+    for q in queries:
+        start = time.perf_counter()
+        hits = index.search(q, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([item_id for item_id, _ in hits])
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ANN vs exact vector search")
+    parser.add_argument("--size", type=int, default=50000, help="Synthetic vector count")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Top-k for recall")
+    parser.add_argument("--json-path", default="", help="Use real concept embeddings instead")
+    args = parser.parse_args()
+
+    if args.json_path:
+        ids, data, queries = concept_vectors(args.json_path, args.queries)
+    else:
+        ids, data, queries = synthetic_vectors(args.size, args.dim, args.queries)
+
+    exact = ExactIndex(dim=data.shape[1], capacity=len(ids))
+    start = time.perf_counter()
+    exact.add(ids, data)
+    exact_build = (time.perf_counter() - start) * 1000
+    truth, exact_lat = timed_search(exact, queries, args.k)
+
+    print("=" * 60)
+    print(f"{len(ids)} vectors x {data.shape[1]} dims, {len(queries)} queries, k={args.k}")
+    print("=" * 60)
+    print(
+        f"exact  build={exact_build:9.1f}ms  p50={statistics.median(exact_lat):7.3f}ms  "
+        f"mean={statistics.mean(exact_lat):7.3f}ms"
+    )
+
+    if not HNSWLIB_AVAILABLE:
+        print("hnswlib not installed - only the exact backend was measured")
+        return
+
+    ann = create_vector_index(dim=data.shape[1], backend="hnsw", capacity=len(ids))
+    start = time.perf_counter()
+    ann.add(ids, data)
+    ann_build = (time.perf_counter() - start) * 1000
+    approx, ann_lat = timed_search(ann, queries, args.k)
+
+    recall = statistics.mean(
+        len(set(a) & set(t)) / max(1, len(t)) for a, t in zip(approx, truth)
+    )
+    print(
+        f"hnsw   build={ann_build:9.1f}ms  p50={statistics.median(ann_lat):7.3f}ms  "
+        f"mean={statistics.mean(ann_lat):7.3f}ms  recall@{args.k}={recall:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
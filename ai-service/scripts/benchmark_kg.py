@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph benchmark for the GraphCAG kg_expand step.
+
+Compares:
+- legacy:  a fresh KnowledgeGraphServiceV3 per request (open DB, create
+           schema, seed curriculum) followed by kg_expand_node
+- shared:  the process-wide service from get_kg_service(), opened once
+
+Also compares seed-concept detection on a synthetic curriculum:
+- naive:   nested loop over every concept keyword (previous kg_expand_node)
+- matcher: compiled ConceptMatcher (one pass over the input)
+
+Usage:
+    python scripts/benchmark_kg.py [--iterations N] [--legacy-iterations N]
+                                   [--synthetic-concepts N]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.services import kg_service_v3
+from api.services.concept_matcher import ConceptMatcher
+from api.services.graph_cag.nodes_v2 import kg_expand_node
+from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+
+
+SAMPLE_INPUTS = [
+    "Yesterday I go to the market with my mother",
+    "He go to school every day",
+    "I have went to Paris last year",
+    "This phone is more better than the old one",
+    "If I will have time, I call you tomorrow",
+]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    p95_index = max(0, int(len(ordered) * 0.95) - 1)
+    return {
+        "mean": statistics.mean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[p95_index],
+    }
+
+
+def print_row(label: str, stats: Dict[str, float]) -> None:
+    print(
+        f"{label:<10} mean={stats['mean']:9.3f}ms  "
+        f"p50={stats['p50']:9.3f}ms  p95={stats['p95']:9.3f}ms"
+    )
+
+
+async def bench_legacy(workdir: Path, iterations: int) -> List[float]:
+    samples: List[float] = []
+    for i in range(iterations):
+        text = SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)]
+        start = time.perf_counter()
+        kg = KnowledgeGraphServiceV3(db_path=str(workdir / f"legacy_{i}"))
+        kg_service_v3._kg_service = kg
+        await kg_expand_node({"user_input": text})
+        samples.append((time.perf_counter() - start) * 1000)
+        kg.close()
+    return samples
+
+
+async def bench_shared(workdir: Path, iterations: int) -> List[float]:
+    kg_service_v3._kg_service = KnowledgeGraphServiceV3(db_path=str(workdir / "shared"))
+    # Warm-up (concept cache)
+    await kg_expand_node({"user_input": SAMPLE_INPUTS[0]})
+
+    samples: List[float] = []
+    for i in range(iterations):
+        text = SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)]
+        start = time.perf_counter()
+        await kg_expand_node({"user_input": text})
+        samples.append((time.perf_counter() - start) * 1000)
+    kg_service_v3.close_kg_service()
+    return samples
+
+
+def naive_seed_match(concepts: Dict[str, Dict[str, str]], text: str) -> List[str]:
+    user_text = text.lower()
+    seeds = []
+    for concept_id, meta in concepts.items():
+        for kw in meta.get("keywords", "").lower().split():
+            if kw in user_text:
+                seeds.append(concept_id)
+                break
+    return seeds
+
+
+def bench_matcher(concept_count: int, iterations: int) -> None:
+    rng = random.Random(42)
+    vocab = [f"word{i}" for i in range(concept_count * 4)]
+    concepts = {
+        f"concept:synthetic.{i}": {
+            "title": f"Synthetic {i}",
+            "keywords": " ".join(rng.sample(vocab, 6)),
+        }
+        for i in range(concept_count)
+    }
+
+    start = time.perf_counter()
+    matcher = ConceptMatcher(concepts)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    naive: List[float] = []
+    compiled: List[float] = []
+    for i in range(iterations):
+        text = " ".join(rng.sample(vocab, 12)) + " " + SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)]
+
+        start = time.perf_counter()
+        expected = naive_seed_match(concepts, text)
+        naive.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        got = matcher.match_keywords(text)
+        compiled.append((time.perf_counter() - start) * 1000)
+
+        assert got == expected, "matcher disagrees with naive loop"
+
+    print("=" * 60)
+    print(f"seed detection ({concept_count} concepts, build {build_ms:.1f}ms)")
+    print("=" * 60)
+    print_row("naive", summarize(naive))
+    print_row("matcher", summarize(compiled))
+
+
+async def run(iterations: int, legacy_iterations: int) -> None:
+    with tempfile.TemporaryDirectory(prefix="kg_bench_") as tmp:
+        workdir = Path(tmp)
+        legacy = await bench_legacy(workdir, legacy_iterations)
+        shared = await bench_shared(workdir, iterations)
+
+    print("=" * 60)
+    print("kg_expand_node latency")
+    print("=" * 60)
+    print_row("legacy", summarize(legacy))
+    print_row("shared", summarize(shared))
+    print(f"speedup (mean): {statistics.mean(legacy) / max(statistics.mean(shared), 1e-9):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KG expansion")
+    parser.add_argument("--iterations", type=int, default=500, help="Shared-path iterations")
+    parser.add_argument("--legacy-iterations", type=int, default=20, help="Legacy-path iterations")
+    parser.add_argument(
+        "--synthetic-concepts",
+        type=int,
+        default=10000,
+        help="Concept count for the seed-detection comparison (0 to skip)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations, args.legacy_iterations))
+    if args.synthetic_concepts > 0:
+        bench_matcher(args.synthetic_concepts, min(args.iterations, 200))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Import knowledge from JSON file to KuzuDB knowledge graph.
 
 Usage:
     python import_knowledge.py [--json-path PATH] [--db-path PATH] [--clear]
+                               [--ann-index PATH] [--ann-backend auto|hnsw|exact]
 
 Examples:
     # Import extended knowledge (default)
@@ -14,6 +15,9 @@ Examples:
     
     # Clear existing and import fresh
     python import_knowledge.py --clear
+    
+    # Import and prebuild the concept ANN index used by RetrievalServiceV3
+    python import_knowledge.py --ann-index ../data/ann/concepts
 """
 
 import json
@@ -185,6 +189,44 @@ def import_knowledge(json_path: str, db_path: str, clear_existing: bool = False)
     return stats
 
 
+def build_ann_index(db_path: str, index_path: str, backend: str = "auto") -> int:
+    """
+    Embed every concept in KuzuDB and save the retrieval ANN index.
+    
+    Point ANN_INDEX_PATH at index_path so the API loads it instead of
+    re-embedding the whole concept table on startup.
+    
+    Returns:
+        Number of indexed concepts
+    """
+    from api.services.embedding_service_v3 import EmbeddingServiceV3
+    from api.services.vector_index import concept_index_text, create_vector_index
+    
+    db = kuzu.Database(db_path)
+    conn = kuzu.Connection(db)
+    result = conn.execute("MATCH (c:Concept) RETURN c.id, c.title, c.keywords")
+    
+    ids = []
+    texts = []
+    while result.has_next():
+        concept_id, title, keywords = result.get_next()
+        ids.append(concept_id)
+        texts.append(concept_index_text(concept_id, {"title": title, "keywords": keywords or ""}))
+    
+    if not ids:
+        logger.warning("No concepts found, skipping ANN index build")
+        return 0
+    
+    logger.info(f"Embedding {len(ids)} concepts for ANN index...")
+    embeddings = EmbeddingServiceV3().embed_texts(texts, persist=True)
+    
+    index = create_vector_index(dim=int(embeddings.shape[1]), backend=backend, capacity=len(ids))
+    index.add(ids, embeddings)
+    index.save(index_path)
+    logger.info(f"Saved {index.backend} index with {len(index)} concepts to {index_path}")
+    return len(index)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Import knowledge to KuzuDB")
     parser.add_argument(
@@ -203,6 +245,18 @@ def main():
         help="Clear existing extended concepts before import"
     )
     
+    parser.add_argument(
+        "--ann-index",
+        default="",
+        help="Also build the concept ANN index at this path prefix"
+    )
+    parser.add_argument(
+        "--ann-backend",
+        default="auto",
+        choices=["auto", "hnsw", "exact"],
+        help="ANN index backend"
+    )
+    
     args = parser.parse_args()
     
     if not os.path.exists(args.json_path):
@@ -214,6 +268,9 @@ def main():
     if stats["errors"]:
         sys.exit(1)
     
+    if args.ann_index:
+        build_ann_index(args.db_path, args.ann_index, args.ann_backend)
+    
     sys.exit(0)
 
 
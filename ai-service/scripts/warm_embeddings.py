@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Pre-warm the on-disk embedding store (EMBEDDING_CACHE_DIR).
+
+Encodes every KG concept (and concepts from knowledge JSON files) once so API
+workers start with all vectors memory-mapped instead of re-encoding them.
+
+Usage:
+    python scripts/warm_embeddings.py [--json-path PATH ...] [--skip-kg]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.core.config import settings
+from api.services.embedding_service_v3 import EmbeddingServiceV3
+from api.services.embedding_store import get_embedding_store
+from api.services.vector_index import concept_index_text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 512
+
+
+def load_kg_concepts() -> Dict[str, Dict[str, str]]:
+    from api.services.kg_service_v3 import KnowledgeGraphServiceV3
+
+    kg = KnowledgeGraphServiceV3()
+    try:
+        return dict(kg.get_concepts())
+    finally:
+        kg.close()
+
+
+def load_json_concepts(path: str) -> Dict[str, Dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        c["id"]: {"title": c.get("title", ""), "keywords": c.get("keywords", "")}
+        for c in data.get("concepts", [])
+        if c.get("id")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the embedding store")
+    parser.add_argument(
+        "--json-path",
+        action="append",
+        default=[],
+        help="Knowledge JSON file(s) with a 'concepts' list (repeatable)"
+    )
+    parser.add_argument("--skip-kg", action="store_true", help="Do not read concepts from KuzuDB")
+    args = parser.parse_args()
+
+    if not settings.EMBEDDING_CACHE_DIR:
+        logger.error("EMBEDDING_CACHE_DIR is empty - nothing to warm")
+        sys.exit(1)
+
+    concepts: Dict[str, Dict[str, str]] = {}
+    if not args.skip_kg:
+        concepts.update(load_kg_concepts())
+    for path in args.json_path:
+        concepts.update(load_json_concepts(path))
+
+    texts: List[str] = [concept_index_text(cid, meta) for cid, meta in concepts.items()]
+    logger.info(f"Warming {len(texts)} concept embeddings into {settings.EMBEDDING_CACHE_DIR}")
+
+    embedder = EmbeddingServiceV3()
+    for start in range(0, len(texts), BATCH_SIZE):
+        embedder.embed_texts(texts[start:start + BATCH_SIZE], persist=True)
+
+    store = get_embedding_store(settings.EMBEDDING_MODEL)
+    logger.info(f"Embedding store now holds {len(store) if store else 0} vectors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Add materialized user_stats table
+
+Revision ID: add_user_stats_table
+Revises: 49b1f1d9b26c
+Create Date: 2026-10-16 10:00:00.000000
+
+Rows are built from the history tables on first read and kept current by
+the write paths, so no backfill is needed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_user_stats_table'
+down_revision: Union[str, None] = '49b1f1d9b26c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTERS = (
+    'courses_enrolled',
+    'courses_completed',
+    'course_xp',
+    'lessons_completed',
+    'lessons_attempted',
+    'perfect_scores',
+    'attempts_passed',
+    'words_learned',
+    'words_reviewed',
+    'words_mastered',
+    'achievements_unlocked',
+    'gems',
+)
+
+
+def upgrade() -> None:
+    """Create user_stats table."""
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in COUNTERS],
+        sa.Column('study_time_ms', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reconciled_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('ix_user_stats_reconciled_at', 'user_stats', ['reconciled_at'])
+
+
+def downgrade() -> None:
+    """Drop user_stats table."""
+    op.drop_index('ix_user_stats_reconciled_at', table_name='user_stats')
+    op.drop_table('user_stats')
@@ -48,6 +48,21 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Redis (rate limiting, token blacklist; optional - features degrade without it)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_PASSWORD: str | None = None
+    TOKEN_BLACKLIST_EXPIRE_HOURS: int = 24
+
+    # Authenticated user cache (Redis TTL; per-worker copies are bounded by the local TTL)
+    AUTH_CACHE_TTL_SECONDS: int = 300
+    AUTH_CACHE_LOCAL_TTL_SECONDS: int = 15
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # User stats reconciler (repairs drift in the materialized user_stats rows)
+    USER_STATS_RECONCILE_INTERVAL_SECONDS: int = 900
+    USER_STATS_MAX_AGE_HOURS: int = 24
+    USER_STATS_RECONCILE_BATCH: int = 200
+    
     # AI Service (optional)
     AI_SERVICE_URL: str = "http://localhost:8001/api/v1"
 
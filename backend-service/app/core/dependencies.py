@@ -14,6 +14,8 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.core.firebase_auth import verify_firebase_token, get_or_create_user_from_claims
+from app.core.token_blacklist import TokenBlacklist
+from app.core.user_cache import UserCache
 from app.models.user import User
 
 # HTTP Bearer token scheme
@@ -21,50 +23,77 @@ security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def _authenticate(token: str, db: AsyncSession) -> Optional[User]:
     """
-    Get current authenticated user from JWT token (REQUIRED).
-    
-    Usage in routes:
-        @router.get("/me")
-        async def get_me(current_user: User = Depends(get_current_user)):
-            return current_user
+    Resolve a bearer token to an active user, or None.
+
+    Users and verified Firebase claims are served from UserCache when
+    possible, so most requests do not touch the database.
     """
-    token = credentials.credentials
-    
+    if await TokenBlacklist.is_blacklisted(token):
+        return None
+
     # 1) Try local JWT (backward compatibility)
     payload = decode_token(token)
     if payload and (sub := payload.get("sub")):
         try:
             # Convert string to UUID for query
             user_id = uuid.UUID(sub) if isinstance(sub, str) else sub
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
+        except (ValueError, TypeError):
+            user_id = None  # Invalid UUID format, try Firebase next
+        if user_id is not None:
+            user = await UserCache.get_user(db, f"id:{user_id}")
+            if user is None:
+                result = await db.execute(select(User).where(User.id == user_id))
+                user = result.scalar_one_or_none()
+                if user:
+                    await UserCache.set_user(user)
             if user and user.is_active:
                 return user
-        except (ValueError, TypeError):
-            pass  # Invalid UUID format, try Firebase next
 
     # 2) Try Firebase ID token
-    claims = verify_firebase_token(token)
+    claims = await UserCache.get_claims(token)
+    if claims is None:
+        claims = verify_firebase_token(token)
+        if claims:
+            await UserCache.set_claims(token, claims)
     if claims:
-        try:
+        user = None
+        if email := claims.get("email"):
+            user = await UserCache.get_user(db, f"email:{email}")
+        if user is None:
+            # Raises ValueError for claims without an email
             user = await get_or_create_user_from_claims(db, claims)
-            if user and user.is_active:
-                return user
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token"
-            )
+            await UserCache.set_user(user)
+        if user.is_active:
+            return user
+
+    return None
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get current authenticated user from JWT token (REQUIRED).
     
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid authentication token"
-    )
+    Usage in routes:
+        @router.get("/me")
+        async def get_me(current_user: User = Depends(get_current_user)):
+            return current_user
+    """
+    try:
+        user = await _authenticate(credentials.credentials, db)
+    except ValueError:
+        user = None
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token"
+        )
+    return user
 
 
 async def get_current_user_optional(
@@ -73,7 +102,7 @@ async def get_current_user_optional(
 ) -> Optional[User]:
     """
     Get current authenticated user if token is provided (OPTIONAL).
-    Returns None if no token or invalid token.
+    Returns None if no token; a provided but invalid token is rejected.
     
     Usage in routes for public endpoints with optional auth:
         @router.get("/courses")
@@ -84,37 +113,18 @@ async def get_current_user_optional(
     if not credentials:
         return None
     
-    token = credentials.credentials
-    
-    # 1) Try local JWT
-    payload = decode_token(token)
-    if payload and (sub := payload.get("sub")):
-        try:
-            # Convert string to UUID for query
-            user_id = uuid.UUID(sub) if isinstance(sub, str) else sub
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if user and user.is_active:
-                return user
-        except (ValueError, TypeError):
-            pass  # Invalid UUID format, try Firebase next
+    try:
+        user = await _authenticate(credentials.credentials, db)
+    except ValueError:
+        user = None  # Invalid token
 
-    # 2) Try Firebase ID token
-    claims = verify_firebase_token(token)
-    if claims:
-        try:
-            user = await get_or_create_user_from_claims(db, claims)
-            if user and user.is_active:
-                return user
-        except ValueError:
-            pass  # Invalid token, return None
-    
-    # 3) Unauthorized
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid authentication credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
 
 
 async def get_current_active_user(
@@ -3,16 +3,17 @@ Middleware for Rate Limiting, Error Handling, and Request Logging
 Phase 1 & 5: System Reliability & Security
 """
 
+import math
 import time
 import logging
-from typing import Callable
-from collections import defaultdict
-from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
 
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.rate_limiter import RateLimit, RateLimiter
+from app.core.security import decode_token
 from app.schemas.common import ErrorResponse, ErrorDetail, RequestMeta, ErrorCodes
 
 logger = logging.getLogger(__name__)
@@ -20,96 +21,89 @@ logger = logging.getLogger(__name__)
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
-    Simple in-memory rate limiting middleware.
+    Distributed rate limiting middleware.
     Phase 1: Protect against spam and brute force attacks.
     
-    For production, consider using Redis for distributed rate limiting.
+    Limits are token buckets in Redis (see RateLimiter), shared by all
+    workers and keyed by user (local JWT subject) or client IP. Routes can
+    get their own limits by path prefix; without Redis each worker
+    enforces the limits locally.
     """
     
+    SKIP_PATHS = frozenset(["/health", "/api/v1/health"])
+    
     def __init__(
         self,
         app,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
+        route_limits: Optional[Dict[str, Tuple[int, int]]] = None,
     ):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        
-        # In-memory storage: {client_ip: [(timestamp, count), ...]}
-        self.request_counts_minute = defaultdict(list)
-        self.request_counts_hour = defaultdict(list)
+        self.limiter = RateLimiter(
+            RateLimit(requests_per_minute, requests_per_hour),
+            {
+                prefix: RateLimit(per_minute, per_hour)
+                for prefix, (per_minute, per_hour) in (route_limits or {}).items()
+            },
+        )
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Rate limit based on client IP."""
-        
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        """Rate limit based on user or client IP."""
         
         # Skip rate limiting for health check
-        if request.url.path in ["/health", "/api/v1/health"]:
+        if request.url.path in self.SKIP_PATHS:
             return await call_next(request)
         
-        # Current time
-        now = datetime.utcnow()
-        one_minute_ago = now - timedelta(minutes=1)
-        one_hour_ago = now - timedelta(hours=1)
-        
-        # Clean old entries
-        self.request_counts_minute[client_ip] = [
-            ts for ts in self.request_counts_minute[client_ip]
-            if ts > one_minute_ago
-        ]
-        self.request_counts_hour[client_ip] = [
-            ts for ts in self.request_counts_hour[client_ip]
-            if ts > one_hour_ago
-        ]
-        
-        # Check rate limits
-        minute_count = len(self.request_counts_minute[client_ip])
-        hour_count = len(self.request_counts_hour[client_ip])
-        
-        if minute_count >= self.requests_per_minute:
-            logger.warning(f"Rate limit exceeded (minute) for IP: {client_ip}")
-            return self._rate_limit_response(
-                f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
-            )
+        identity = self._identity(request)
+        allowed, retry_after, (minute_left, hour_left), limit = await self.limiter.hit(
+            request.url.path, identity
+        )
         
-        if hour_count >= self.requests_per_hour:
-            logger.warning(f"Rate limit exceeded (hour) for IP: {client_ip}")
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for {identity} on {request.url.path}")
+            window = "minute" if minute_left <= 0 else "hour"
+            count = limit.per_minute if window == "minute" else limit.per_hour
             return self._rate_limit_response(
-                f"Rate limit exceeded: {self.requests_per_hour} requests per hour"
+                f"Rate limit exceeded: {count} requests per {window}",
+                retry_after
             )
         
-        # Record request
-        self.request_counts_minute[client_ip].append(now)
-        self.request_counts_hour[client_ip].append(now)
-        
         # Add rate limit headers
         response = await call_next(request)
-        response.headers["X-RateLimit-Limit-Minute"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining-Minute"] = str(
-            self.requests_per_minute - minute_count - 1
-        )
-        response.headers["X-RateLimit-Limit-Hour"] = str(self.requests_per_hour)
-        response.headers["X-RateLimit-Remaining-Hour"] = str(
-            self.requests_per_hour - hour_count - 1
-        )
+        response.headers["X-RateLimit-Limit-Minute"] = str(limit.per_minute)
+        response.headers["X-RateLimit-Remaining-Minute"] = str(max(minute_left, 0))
+        response.headers["X-RateLimit-Limit-Hour"] = str(limit.per_hour)
+        response.headers["X-RateLimit-Remaining-Hour"] = str(max(hour_left, 0))
         
         return response
     
-    def _rate_limit_response(self, message: str) -> JSONResponse:
+    @staticmethod
+    def _identity(request: Request) -> str:
+        """User ID from a valid local access token, else client IP."""
+        authorization = request.headers.get("authorization")
+        if authorization and authorization[:7].lower() == "bearer ":
+            payload = decode_token(authorization[7:])
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+    
+    def _rate_limit_response(self, message: str, retry_after: float) -> JSONResponse:
         """Return standardized rate limit error response."""
+        retry_after_seconds = max(1, math.ceil(retry_after))
         error_response = ErrorResponse(
             error=ErrorDetail(
                 code=ErrorCodes.RATE_LIMITED,
                 message=message,
-                details={"retry_after_seconds": 60}
+                details={"retry_after_seconds": retry_after_seconds}
             )
         )
         return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content=error_response.model_dump(mode="json")
+            content=error_response.model_dump(mode="json"),
+            headers={"Retry-After": str(retry_after_seconds)}
         )
 
 
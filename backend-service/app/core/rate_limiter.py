@@ -0,0 +1,164 @@
+"""
+Distributed Rate Limiter
+
+Token buckets shared by every worker through Redis. One Lua script refills
+and takes a token from all of a request's buckets (per minute, per hour)
+atomically, using the Redis server clock, so N uvicorn workers enforce one
+limit instead of N.
+
+When Redis is unavailable the limiter falls back to in-process buckets
+(enforced per worker) held in a bounded LRU, so idle clients are evicted.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS: bucket keys; ARGV: capacity, window_seconds per key.
+# Returns {allowed, retry_after (string), remaining per key...}
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local retry = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = capacity / tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 't', 'ts')
+    local t = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    t = math.min(capacity, t + math.max(0, now - ts) * rate)
+    if t < 1 then
+        retry = math.max(retry, (1 - t) / rate)
+    end
+    tokens[i] = t
+end
+local allowed = 0
+if retry == 0 then allowed = 1 end
+local result = {allowed, tostring(retry)}
+for i = 1, #KEYS do
+    if allowed == 1 then tokens[i] = tokens[i] - 1 end
+    redis.call('HSET', KEYS[i], 't', tokens[i], 'ts', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(tonumber(ARGV[2 * i])))
+    result[#result + 1] = math.floor(tokens[i])
+end
+return result
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Request limits for one route group."""
+    per_minute: int
+    per_hour: int
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by route group and client identity.
+
+    Usage:
+        limiter = RateLimiter(RateLimit(60, 1000), {"/api/v1/auth/login": RateLimit(10, 100)})
+        allowed, retry_after, remaining = await limiter.hit(request.url.path, "ip:1.2.3.4")
+    """
+
+    PREFIX = "ratelimit:"
+    REDIS_RETRY_SECONDS = 5.0
+
+    def __init__(
+        self,
+        default: RateLimit,
+        route_limits: Optional[Dict[str, RateLimit]] = None,
+        max_local_keys: int = 10000,
+    ):
+        self.default = default
+        # Longest prefix first, so specific routes win
+        self.route_limits: List[Tuple[str, RateLimit]] = sorted(
+            (route_limits or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.max_local_keys = max_local_keys
+
+        self._script = None
+        self._script_client = None
+        self._redis_retry_at = 0.0
+
+        # Local fallback: key -> [tokens, updated_at]
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def limit_for(self, path: str) -> Tuple[str, RateLimit]:
+        """Route group (matched prefix or "default") and its limits."""
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "default", self.default
+
+    async def hit(self, path: str, identity: str) -> Tuple[bool, float, Tuple[int, int], RateLimit]:
+        """
+        Take one token from the identity's minute and hour buckets.
+
+        Returns (allowed, retry_after_seconds, (remaining_minute, remaining_hour), limit).
+        """
+        group, limit = self.limit_for(path)
+        key = f"{self.PREFIX}{group}:{identity}"
+        buckets = ((f"{key}:m", limit.per_minute, 60), (f"{key}:h", limit.per_hour, 3600))
+
+        result = await self._hit_redis(buckets)
+        if result is None:
+            result = self._hit_local(buckets)
+        allowed, retry_after, remaining = result
+        return allowed, retry_after, remaining, limit
+
+    async def _hit_redis(self, buckets: Sequence[Tuple[str, int, int]]):
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        client = await RedisClient.get_instance()
+        if client is None:
+            return None
+
+        try:
+            if self._script is None or self._script_client is not client:
+                self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                self._script_client = client
+            reply = await self._script(
+                keys=[key for key, _, _ in buckets],
+                args=[value for _, capacity, window in buckets for value in (capacity, window)],
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, using local limits: {e}")
+            self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+            return None
+
+        return bool(int(reply[0])), float(reply[1]), (int(reply[2]), int(reply[3]))
+
+    def _hit_local(self, buckets: Sequence[Tuple[str, int, int]]):
+        now = time.monotonic()
+        states = []
+        retry_after = 0.0
+        for key, capacity, window in buckets:
+            state = self._local.get(key)
+            if state is None:
+                state = [float(capacity), now]
+                self._local[key] = state
+                if len(self._local) > self.max_local_keys:
+                    self._local.popitem(last=False)
+            else:
+                self._local.move_to_end(key)
+                rate = capacity / window
+                state[0] = min(capacity, state[0] + (now - state[1]) * rate)
+            state[1] = now
+            if state[0] < 1:
+                retry_after = max(retry_after, (1 - state[0]) * window / capacity)
+            states.append(state)
+
+        allowed = retry_after == 0
+        if allowed:
+            for state in states:
+                state[0] -= 1
+        return allowed, retry_after, (int(states[0][0]), int(states[1][0]))
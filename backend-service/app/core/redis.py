@@ -3,9 +3,15 @@ Redis Client Module
 
 Provides async Redis client singleton with connection pooling.
 Used for token blacklist, caching, and session management.
+
+If Redis is unreachable at startup (or connect fails later), callers get
+None and fall back; the connection is retried in the background with
+exponential backoff, so shared state comes back without a restart.
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional
 import redis.asyncio as redis
 
@@ -30,35 +36,65 @@ class RedisClient:
         await RedisClient.close()
     """
     
+    RECONNECT_MIN_SECONDS = 1.0
+    RECONNECT_MAX_SECONDS = 60.0
+    CONNECT_TIMEOUT_SECONDS = 2.0
+    
     _instance: Optional[redis.Redis] = None
     _connected: bool = False
     
+    # Background reconnect (enabled between connect() and close())
+    _enabled: bool = False
+    _retry_at: float = 0.0
+    _retry_delay: float = RECONNECT_MIN_SECONDS
+    _reconnect_task: Optional[asyncio.Task] = None
+    
     @classmethod
     async def connect(cls) -> None:
-        """Initialize Redis connection pool."""
+        """Initialize Redis connection pool (retried in the background on failure)."""
         if cls._instance is not None:
             logger.warning("Redis already connected")
             return
         
+        cls._enabled = True
+        await cls._try_connect()
+    
+    @classmethod
+    async def _try_connect(cls) -> bool:
+        client = None
         try:
-            cls._instance = redis.from_url(
+            client = redis.from_url(
                 settings.REDIS_URL,
                 password=settings.REDIS_PASSWORD,
                 encoding="utf-8",
                 decode_responses=True,
+                socket_connect_timeout=cls.CONNECT_TIMEOUT_SECONDS,
             )
             # Test connection
-            await cls._instance.ping()
-            cls._connected = True
-            logger.info(f"Redis connected: {settings.REDIS_URL}")
-        except redis.ConnectionError as e:
-            logger.warning(f"Redis connection failed: {e}. Token blacklist will be disabled.")
-            cls._instance = None
-            cls._connected = False
+            await client.ping()
         except Exception as e:
-            logger.error(f"Unexpected Redis error: {e}")
-            cls._instance = None
-            cls._connected = False
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception:
+                    pass
+            cls._retry_at = time.monotonic() + cls._retry_delay
+            logger.warning(
+                f"Redis connection failed: {e}. Falling back to per-process state; "
+                f"retrying in {cls._retry_delay:.0f}s."
+            )
+            cls._retry_delay = min(cls._retry_delay * 2, cls.RECONNECT_MAX_SECONDS)
+            return False
+        
+        if not cls._enabled:
+            # close() was called while connecting
+            await client.close()
+            return False
+        cls._instance = client
+        cls._connected = True
+        cls._retry_delay = cls.RECONNECT_MIN_SECONDS
+        logger.info(f"Redis connected: {settings.REDIS_URL}")
+        return True
     
     @classmethod
     async def get_instance(cls) -> Optional[redis.Redis]:
@@ -66,13 +102,27 @@ class RedisClient:
         Get Redis client instance.
         
         Returns:
-            Redis client or None if not connected
+            Redis client or None if not connected (a reconnect is started
+            in the background when the backoff has elapsed)
         """
-        return cls._instance if cls._connected else None
+        if cls._connected:
+            return cls._instance
+        if (
+            cls._enabled
+            and time.monotonic() >= cls._retry_at
+            and (cls._reconnect_task is None or cls._reconnect_task.done())
+        ):
+            cls._reconnect_task = asyncio.create_task(cls._try_connect())
+        return None
     
     @classmethod
     async def close(cls) -> None:
         """Close Redis connection."""
+        cls._enabled = False
+        if cls._reconnect_task is not None and not cls._reconnect_task.done():
+            cls._reconnect_task.cancel()
+        cls._reconnect_task = None
+        cls._retry_delay = cls.RECONNECT_MIN_SECONDS
         if cls._instance is not None:
             try:
                 await cls._instance.close()
@@ -0,0 +1,225 @@
+"""
+Authenticated User Cache
+
+Two-tier cache (in-process LRU + Redis) for the authentication path, so
+get_current_user does not query Postgres or re-verify Firebase tokens on
+every request:
+
+- user snapshots: the User row's columns (minus the password hash), keyed
+  by user ID (local JWT subject) and by email (Firebase tokens map to users
+  by email); re-attached to the request's session without a query
+- verified Firebase claims, keyed by token hash until the token expires
+
+Entries are short-lived and invalidated on profile changes, deactivation
+and logout. The local tier has a shorter TTL because other workers cannot
+invalidate it.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+# Never cached; loaded on demand (see change-password)
+_EXCLUDED_COLUMNS = frozenset(["hashed_password"])
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    """Serialize the user's column values to a JSON-safe dict."""
+    data = {}
+    for attr in inspect(User).column_attrs:
+        if attr.key in _EXCLUDED_COLUMNS:
+            continue
+        value = getattr(user, attr.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        data[attr.key] = value
+    return data
+
+
+def _restore(snapshot: Dict[str, Any]) -> User:
+    """Build a detached User from a snapshot (as if loaded by a query)."""
+    values = {}
+    for attr in inspect(User).column_attrs:
+        if attr.key not in snapshot:
+            continue
+        value = snapshot[attr.key]
+        if value is not None:
+            if isinstance(attr.columns[0].type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif attr.key == "id":
+                value = uuid.UUID(value)
+        values[attr.key] = value
+
+    user = User(**values)
+    # Excluded columns are marked expired; changes still flush as UPDATEs
+    make_transient_to_detached(user)
+    return user
+
+
+class UserCache:
+    """
+    Authenticated user cache.
+
+    Usage:
+        user = await UserCache.get_user(db, f"id:{user_id}")
+        if user is None:
+            user = ...  # load from DB
+            await UserCache.set_user(user)
+
+        # After changing the user
+        await UserCache.invalidate_user(user)
+    """
+
+    USER_PREFIX = "auth:user:"
+    CLAIMS_PREFIX = "auth:claims:"
+
+    # key -> (expires_at monotonic, value)
+    _local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Users
+    # ------------------------------------------------------------------
+
+    @classmethod
+    async def get_user(cls, db: AsyncSession, key: str) -> Optional[User]:
+        """
+        Get a cached user attached to the session, or None.
+
+        Args:
+            db: The request's session
+            key: "id:<user_id>" or "email:<email>"
+        """
+        snapshot = await cls._get(cls.USER_PREFIX + key)
+        if snapshot is None:
+            return None
+        return await db.merge(_restore(snapshot), load=False)
+
+    @classmethod
+    async def set_user(cls, user: User) -> None:
+        """Cache a user under both its ID and email keys."""
+        snapshot = _snapshot(user)
+        await cls._set(
+            {cls.USER_PREFIX + key: snapshot for key in cls._user_keys(user)},
+            settings.AUTH_CACHE_TTL_SECONDS
+        )
+
+    @classmethod
+    async def invalidate_user(cls, user: User) -> None:
+        """Drop a user's cached snapshot (after profile changes or deactivation)."""
+        await cls._delete(*[cls.USER_PREFIX + key for key in cls._user_keys(user)])
+
+    @staticmethod
+    def _user_keys(user: User) -> Tuple[str, str]:
+        return f"id:{user.id}", f"email:{user.email}"
+
+    # ------------------------------------------------------------------
+    # Firebase claims
+    # ------------------------------------------------------------------
+
+    @classmethod
+    async def get_claims(cls, token: str) -> Optional[Dict[str, Any]]:
+        """Get verified Firebase claims for a token, or None."""
+        claims = await cls._get(cls._claims_key(token))
+        if claims is not None and claims.get("exp", 0) <= time.time():
+            return None
+        return claims
+
+    @classmethod
+    async def set_claims(cls, token: str, claims: Dict[str, Any]) -> None:
+        """Cache verified claims until the token expires."""
+        ttl = int(claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            await cls._set({cls._claims_key(token): claims}, ttl)
+
+    @classmethod
+    async def invalidate_token(cls, token: str) -> None:
+        """Drop cached claims for a token (on logout)."""
+        await cls._delete(cls._claims_key(token))
+
+    @classmethod
+    def _claims_key(cls, token: str) -> str:
+        return cls.CLAIMS_PREFIX + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    @classmethod
+    async def _get(cls, key: str) -> Optional[Dict[str, Any]]:
+        entry = cls._local.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                cls._local.move_to_end(key)
+                return entry[1]
+            cls._local.pop(key, None)
+
+        redis_client = await RedisClient.get_instance()
+        if redis_client is None:
+            return None
+        try:
+            raw = await redis_client.get(key)
+            ttl = await redis_client.ttl(key) if raw is not None else 0
+        except Exception as e:
+            logger.warning(f"User cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        cls._set_local(key, value, ttl)
+        return value
+
+    @classmethod
+    async def _set(cls, entries: Dict[str, Dict[str, Any]], ttl: int) -> None:
+        for key, value in entries.items():
+            cls._set_local(key, value, ttl)
+
+        redis_client = await RedisClient.get_instance()
+        if redis_client is None:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, value in entries.items():
+                pipe.setex(key, ttl, json.dumps(value))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"User cache write failed: {e}")
+
+    @classmethod
+    async def _delete(cls, *keys: str) -> None:
+        for key in keys:
+            cls._local.pop(key, None)
+
+        redis_client = await RedisClient.get_instance()
+        if redis_client is None:
+            return
+        try:
+            await redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"User cache invalidation failed: {e}")
+
+    @classmethod
+    def _set_local(cls, key: str, value: Dict[str, Any], ttl: int) -> None:
+        ttl = min(ttl, settings.AUTH_CACHE_LOCAL_TTL_SECONDS) if ttl > 0 else settings.AUTH_CACHE_LOCAL_TTL_SECONDS
+        cls._local[key] = (time.monotonic() + ttl, value)
+        cls._local.move_to_end(key)
+        while len(cls._local) > settings.AUTH_CACHE_MAX_ENTRIES:
+            cls._local.popitem(last=False)
@@ -5,8 +5,8 @@ Database operations for Course, Unit, and Lesson management.
 Supports filtering, pagination, and user-specific data (enrollment, progress).
 """
 
-from typing import List, Optional
-from sqlalchemy import select, func, and_, or_
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, func, and_, or_, exists
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
@@ -61,14 +61,7 @@ class CourseCRUD:
         count_query = select(func.count(Course.id))
         
         # Apply filters
-        filters = []
-        if published_only:
-            filters.append(Course.is_published == True)
-        if language:
-            filters.append(Course.language == language)
-        if level:
-            filters.append(Course.level == level)
-        
+        filters = CourseCRUD._course_filters(language, level, published_only)
         if filters:
             query = query.where(and_(*filters))
             count_query = count_query.where(and_(*filters))
@@ -84,6 +77,60 @@ class CourseCRUD:
         
         return list(courses), total
     
+    @staticmethod
+    async def get_courses_with_enrollment(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 20,
+        language: Optional[str] = None,
+        level: Optional[str] = None,
+        published_only: bool = True
+    ) -> tuple[List[tuple[Course, bool]], int]:
+        """
+        Same listing as get_courses, with the user's enrollment status
+        selected through an EXISTS subquery (no per-course lookups).
+        Returns ([(course, is_enrolled), ...], total_count).
+        """
+        is_enrolled = exists().where(
+            and_(
+                UserCourseProgress.user_id == user_id,
+                UserCourseProgress.course_id == Course.id
+            )
+        ).label("is_enrolled")
+        
+        query = select(Course, is_enrolled)
+        count_query = select(func.count(Course.id))
+        
+        filters = CourseCRUD._course_filters(language, level, published_only)
+        if filters:
+            query = query.where(and_(*filters))
+            count_query = count_query.where(and_(*filters))
+        
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        
+        query = query.order_by(Course.created_at.desc()).offset(skip).limit(limit)
+        result = await db.execute(query)
+        
+        return [(course, bool(enrolled)) for course, enrolled in result.all()], total
+    
+    @staticmethod
+    def _course_filters(
+        language: Optional[str],
+        level: Optional[str],
+        published_only: bool
+    ) -> list:
+        """Build WHERE clauses shared by the course listings."""
+        filters = []
+        if published_only:
+            filters.append(Course.is_published == True)
+        if language:
+            filters.append(Course.language == language)
+        if level:
+            filters.append(Course.level == level)
+        return filters
+    
     @staticmethod
     async def create_course(db: AsyncSession, course: CourseCreate) -> Course:
         """Create a new course."""
@@ -140,6 +187,29 @@ class CourseCRUD:
             )
         )
         return result.scalar_one_or_none() is not None
+    
+    @staticmethod
+    async def get_enrollment_map(
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        course_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, bool]:
+        """Enrollment status for many courses in one query: {course_id: is_enrolled}."""
+        course_ids = list(course_ids)
+        if not course_ids:
+            return {}
+        
+        result = await db.execute(
+            select(UserCourseProgress.course_id)
+            .where(
+                and_(
+                    UserCourseProgress.user_id == user_id,
+                    UserCourseProgress.course_id.in_(course_ids)
+                )
+            )
+        )
+        enrolled = set(result.scalars().all())
+        return {course_id: course_id in enrolled for course_id in course_ids}
 
 
 # =====================
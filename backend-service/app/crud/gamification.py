@@ -14,6 +14,7 @@ from app.models.gamification import (
     LeaderboardEntry, UserFollowing, ActivityFeed, ShopItem, UserInventory
 )
 from app.models.user import User
+from app.services.user_stats_service import UserStatsService
 
 
 # ============================================================================
@@ -93,6 +94,7 @@ class AchievementCRUD:
             achievement_id=achievement_id
         )
         db.add(user_achievement)
+        await UserStatsService.apply(db, user_id, achievements_unlocked=1)
         await db.commit()
         await db.refresh(user_achievement)
         return user_achievement
@@ -145,6 +147,7 @@ class WalletCRUD:
             description=description
         )
         db.add(transaction)
+        await UserStatsService.apply(db, user_id, gems=amount)
         await db.commit()
         await db.refresh(wallet)
         
@@ -179,6 +182,7 @@ class WalletCRUD:
             description=description
         )
         db.add(transaction)
+        await UserStatsService.apply(db, user_id, gems=-amount)
         await db.commit()
         await db.refresh(wallet)
         
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.progress import UserCourseProgress, LessonCompletion
 from app.models.course import Course, Unit, Lesson
+from app.services.user_stats_service import UserStatsService
 
 
 class ProgressCRUD:
@@ -67,11 +68,23 @@ class ProgressCRUD:
                 last_activity_at=datetime.utcnow()
             )
             db.add(progress)
+            await UserStatsService.apply(
+                db, user_id,
+                courses_enrolled=1,
+                courses_completed=int(progress_percentage >= 100),
+                course_xp=xp_earned
+            )
         else:
             # Update existing progress
+            was_completed = progress.progress_percentage >= 100
             progress.progress_percentage = progress_percentage
             progress.total_xp_earned += xp_earned
             progress.last_activity_at = datetime.utcnow()
+            await UserStatsService.apply(
+                db, user_id,
+                courses_completed=int(progress_percentage >= 100) - int(was_completed),
+                course_xp=xp_earned
+            )
         
         await db.commit()
         await db.refresh(progress)
@@ -125,6 +138,7 @@ class ProgressCRUD:
             # Update if new score is better
             if score > existing.best_score:
                 old_passed = existing.is_passed
+                old_perfect = existing.best_score == 100
                 existing.best_score = score
                 existing.is_passed = is_passed
                 existing.completed_at = datetime.utcnow()
@@ -133,6 +147,11 @@ class ProgressCRUD:
                 if is_passed and not old_passed:
                     xp_earned = lesson.xp_reward or 0
                 
+                await UserStatsService.apply(
+                    db, user_id,
+                    lessons_completed=int(is_passed) - int(old_passed),
+                    perfect_scores=int(existing.best_score == 100) - int(old_perfect)
+                )
                 await db.commit()
                 await db.refresh(existing)
                 return existing, xp_earned
@@ -154,6 +173,12 @@ class ProgressCRUD:
             if is_passed:
                 xp_earned = lesson.xp_reward or 0
             
+            await UserStatsService.apply(
+                db, user_id,
+                lessons_attempted=1,
+                lessons_completed=int(is_passed),
+                perfect_scores=int(score == 100)
+            )
             await db.commit()
             await db.refresh(completion)
             return completion, xp_earned
@@ -164,54 +189,63 @@ class ProgressCRUD:
         user_id: str,
         course_id: str
     ) -> Optional[dict]:
-        """Get detailed progress for a course including units"""
-        # Get course
+        """
+        Get detailed progress for a course including units.
+        
+        Two statements regardless of course size: course + enrollment, then
+        per-unit lesson totals and passed counts in one aggregate query.
+        """
+        # Get course together with the user's progress
         course_result = await db.execute(
-            select(Course).where(Course.id == course_id)
+            select(Course, UserCourseProgress)
+            .join(
+                UserCourseProgress,
+                and_(
+                    UserCourseProgress.course_id == Course.id,
+                    UserCourseProgress.user_id == user_id
+                )
+            )
+            .where(Course.id == course_id)
         )
-        course = course_result.scalar_one_or_none()
-        if not course:
+        row = course_result.first()
+        if not row:
             return None
+        course, progress = row
         
-        # Get user progress
-        progress = await ProgressCRUD.get_user_progress(db, user_id, course_id)
-        if not progress:
-            return None
-        
-        # Get units with lessons
+        # Per-unit totals: units LEFT JOIN lessons LEFT JOIN passed completions
+        # (at most one completion per user and lesson, so counts don't inflate)
         units_result = await db.execute(
-            select(Unit)
+            select(
+                Unit.id,
+                Unit.title,
+                func.count(Lesson.id).label('total_lessons'),
+                func.count(LessonCompletion.id).label('completed_lessons')
+            )
+            .select_from(Unit)
+            .outerjoin(Lesson, Lesson.unit_id == Unit.id)
+            .outerjoin(
+                LessonCompletion,
+                and_(
+                    LessonCompletion.lesson_id == Lesson.id,
+                    LessonCompletion.user_id == user_id,
+                    LessonCompletion.is_passed == True
+                )
+            )
             .where(Unit.course_id == course_id)
+            .group_by(Unit.id, Unit.title, Unit.order_index)
             .order_by(Unit.order_index)
         )
-        units = units_result.scalars().all()
         
-        units_progress = []
-        for unit in units:
-            # Get lessons for this unit
-            lessons_result = await db.execute(
-                select(Lesson)
-                .where(Lesson.unit_id == unit.id)
-                .order_by(Lesson.order_index)
-            )
-            lessons = lessons_result.scalars().all()
-            
-            # Count completed lessons in this unit
-            completed_count = 0
-            for lesson in lessons:
-                completion = await ProgressCRUD.get_lesson_completion(
-                    db, user_id, str(lesson.id)
-                )
-                if completion and completion.is_passed:
-                    completed_count += 1
-            
-            units_progress.append({
-                'unit_id': str(unit.id),
-                'unit_title': unit.title,
-                'total_lessons': len(lessons),
-                'completed_lessons': completed_count,
-                'progress_percentage': (completed_count / len(lessons) * 100) if lessons else 0
-            })
+        units_progress = [
+            {
+                'unit_id': str(unit_id),
+                'unit_title': title,
+                'total_lessons': total,
+                'completed_lessons': completed,
+                'progress_percentage': (completed / total * 100) if total else 0
+            }
+            for unit_id, title, total, completed in units_result.all()
+        ]
         
         return {
             'course': {
@@ -277,46 +311,14 @@ class ProgressCRUD:
         user_id: str
     ) -> dict:
         """Get comprehensive user statistics"""
-        # Total XP
-        total_xp = await ProgressCRUD.get_user_total_xp(db, user_id)
-        
-        # Courses enrolled
-        enrolled_result = await db.execute(
-            select(func.count(UserCourseProgress.id))
-            .where(UserCourseProgress.user_id == user_id)
-        )
-        courses_enrolled = enrolled_result.scalar() or 0
-        
-        # Courses completed (100% progress)
-        completed_result = await db.execute(
-            select(func.count(UserCourseProgress.id))
-            .where(
-                and_(
-                    UserCourseProgress.user_id == user_id,
-                    UserCourseProgress.progress_percentage >= 100
-                )
-            )
-        )
-        courses_completed = completed_result.scalar() or 0
-        
-        # Lessons completed
-        lessons_result = await db.execute(
-            select(func.count(LessonCompletion.id))
-            .where(
-                and_(
-                    LessonCompletion.user_id == user_id,
-                    LessonCompletion.is_passed == True
-                )
-            )
-        )
-        lessons_completed = lessons_result.scalar() or 0
+        stats = await UserStatsService.get(db, user_id)
         
         return {
-            'total_xp': total_xp,
-            'courses_enrolled': courses_enrolled,
-            'courses_completed': courses_completed,
-            'lessons_completed': lessons_completed,
+            'total_xp': stats.course_xp,
+            'courses_enrolled': stats.courses_enrolled,
+            'courses_completed': stats.courses_completed,
+            'lessons_completed': stats.lessons_completed,
             'current_streak': 0,  # TODO: Implement streak calculation
             'longest_streak': 0,  # TODO: Implement streak calculation
-            'achievements_unlocked': 0  # TODO: Implement achievements
+            'achievements_unlocked': stats.achievements_unlocked
         }
@@ -17,6 +17,7 @@ from app.models.vocabulary import (
     VocabularyDeckItem,
     VocabularyStatus
 )
+from app.services.user_stats_service import UserStatsService
 
 
 class VocabularyCRUD:
@@ -142,6 +143,7 @@ class VocabularyCRUD:
         )
         
         db.add(user_vocab)
+        await UserStatsService.apply(db, user_id, words_learned=1)
         await db.commit()
         await db.refresh(user_vocab)
         
@@ -261,6 +263,8 @@ class VocabularyCRUD:
             select(UserVocabulary).where(UserVocabulary.id == user_vocabulary_id)
         )
         user_vocab = result.scalar_one()
+        first_review = not user_vocab.total_reviews
+        was_mastered = user_vocab.status == VocabularyStatus.MASTERED
         
         # Calculate new SRS parameters
         new_ease, new_interval, new_reps, next_review = self.calculate_next_review(
@@ -304,6 +308,11 @@ class VocabularyCRUD:
         )
         
         db.add(review)
+        await UserStatsService.apply(
+            db, user_vocab.user_id,
+            words_reviewed=int(first_review),
+            words_mastered=int(user_vocab.status == VocabularyStatus.MASTERED) - int(was_mastered)
+        )
         await db.commit()
         await db.refresh(user_vocab)
         
@@ -10,8 +10,10 @@ Architecture: Clean Architecture
 - Middleware: Rate limiting, error handling, request logging
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -19,6 +21,7 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.redis import RedisClient
 from app.core.middleware import (
     RateLimitMiddleware,
     ErrorHandlerMiddleware,
@@ -41,6 +44,7 @@ from app.routes.challenges import router as challenges_router
 from app.routes.course_categories import router as course_categories_router
 from app.routes.proficiency import router as proficiency_router
 from app.schemas.common import ErrorResponse, ErrorDetail, ErrorCodes
+from app.services.user_stats_service import run_reconciler
 
 # Setup logging
 logging.basicConfig(
@@ -67,10 +71,23 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
     
+    # Redis (shared rate limits); limits fall back to per-worker while it is
+    # unreachable, and the connection is retried in the background
+    await RedisClient.connect()
+    
+    # Background repair of materialized user stats
+    reconciler = asyncio.create_task(run_reconciler(
+        interval_seconds=settings.USER_STATS_RECONCILE_INTERVAL_SECONDS,
+        max_age=timedelta(hours=settings.USER_STATS_MAX_AGE_HOURS),
+        batch_size=settings.USER_STATS_RECONCILE_BATCH,
+    ))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    reconciler.cancel()
+    await RedisClient.close()
     await close_db()
     logger.info("Shutdown complete")
 
@@ -153,10 +170,15 @@ app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(RequestIDMiddleware)
 
 # 6. Rate Limiting - Prevent abuse (Phase 1: Security)
+#    Shared across workers via Redis; tighter limits on credential endpoints
 app.add_middleware(
     RateLimitMiddleware,
     requests_per_minute=60,
-    requests_per_hour=1000
+    requests_per_hour=1000,
+    route_limits={
+        f"{settings.API_V1_PREFIX}/auth/login": (10, 100),
+        f"{settings.API_V1_PREFIX}/auth/register": (5, 50),
+    }
 )
 
 
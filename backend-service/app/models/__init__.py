@@ -29,6 +29,7 @@ from app.models.progress import (
     UserVocabKnowledge,
     DailyReviewSession,
     Streak,
+    UserStats,
 )
 
 # Gamification models (Phase 4)
@@ -78,6 +79,7 @@ __all__ = [
     "UserVocabKnowledge",
     "DailyReviewSession",
     "Streak",
+    "UserStats",
     # Gamification (Phase 4)
     "Achievement",
     "UserAchievement",
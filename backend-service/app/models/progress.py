@@ -5,7 +5,7 @@ Extended for Phase 3: Smart Learning Engine & Spaced Repetition
 
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, Integer, DateTime, Date, ForeignKey, Boolean, Float, JSON, Text, Index
+from sqlalchemy import String, Integer, BigInteger, DateTime, Date, ForeignKey, Boolean, Float, JSON, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -444,3 +444,54 @@ Index('idx_question_attempt_lesson', QuestionAttempt.lesson_attempt_id, Question
 Index('idx_vocab_knowledge_user_next_review', UserVocabKnowledge.user_id, UserVocabKnowledge.next_review_date)
 Index('idx_daily_review_user_date', DailyReviewSession.user_id, DailyReviewSession.review_date)
 Index('idx_daily_activity_week', DailyActivity.user_id, DailyActivity.activity_date)
+
+
+class UserStats(Base):
+    """
+    Materialized per-user aggregates for the profile and achievement checks.
+    
+    Kept current by the write paths (lesson complete, vocabulary review,
+    achievement unlock, gem changes) in the same transaction as the change;
+    UserStatsService reconciles it against the history tables.
+    """
+    
+    __tablename__ = "user_stats"
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    
+    # Courses (UserCourseProgress)
+    courses_enrolled: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    courses_completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    course_xp: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    
+    # Lessons (LessonCompletion)
+    lessons_completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    lessons_attempted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    perfect_scores: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    
+    # Learning sessions (finished LessonAttempt)
+    attempts_passed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    study_time_ms: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    
+    # Vocabulary (UserVocabulary)
+    words_learned: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    words_reviewed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    words_mastered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    
+    # Gamification
+    achievements_unlocked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    gems: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    
+    reconciled_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+    
+    def __repr__(self) -> str:
+        return f"<UserStats user={self.user_id} lessons={self.lessons_completed}>"
@@ -3,13 +3,17 @@ Authentication Routes
 """
 
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.core.dependencies import get_current_user, optional_security
+from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token, decode_token
+from app.core.token_blacklist import TokenBlacklist
+from app.core.user_cache import UserCache
 from app.models.user import User
 from app.schemas.auth import (
     RegisterRequest, LoginRequest, LoginResponse, RefreshTokenRequest, TokenResponse,
@@ -124,7 +128,6 @@ async def refresh_token(
     """
     Refresh access token using refresh token.
     """
-    from app.core.security import decode_token
     
     # Decode refresh token
     payload = decode_token(request.refresh_token)
@@ -186,13 +189,26 @@ async def get_current_user_via_auth(
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout():
+async def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
     """
     Logout user.
     
-    Note: JWT tokens are stateless. Client should discard the token.
-    For production, implement token blacklist with Redis.
+    Blacklists the bearer token until it expires (requires Redis) and drops
+    its cached Firebase claims. Client should discard the token as well.
     """
+    if credentials:
+        token = credentials.credentials
+        claims = decode_token(token) or await UserCache.get_claims(token) or {}
+        expires_at = datetime.utcfromtimestamp(claims["exp"]) if claims.get("exp") else None
+        await UserCache.invalidate_token(token)
+        if await TokenBlacklist.add(token, expires_at, user_id=claims.get("sub")):
+            return MessageResponse(
+                message="Logged out successfully",
+                detail="Token has been revoked."
+            )
+    
     return MessageResponse(
         message="Logged out successfully",
         detail="Token is still valid until expiration. Please discard it on client side."
@@ -304,7 +320,8 @@ async def change_password(
     
     Requires current password verification.
     """
-    # Verify current password
+    # Verify current password (not part of the cached user snapshot)
+    await db.refresh(current_user, ["hashed_password"])
     if not verify_password(request.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
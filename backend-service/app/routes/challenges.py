@@ -13,6 +13,7 @@ from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.user_cache import UserCache
 from app.models.user import User
 from app.models.progress import Streak, LessonCompletion
 from app.models.gamification import ChallengeRewardClaim
@@ -359,7 +360,8 @@ async def claim_challenge_reward(
     multiplier = await effects_service.get_xp_multiplier(current_user.id)
     boosted_xp = int(xp_reward * multiplier)
     
-    # Award XP
+    # Award XP (re-read total_xp: current_user may be a cached snapshot)
+    await db.refresh(current_user, ["total_xp"])
     current_user.total_xp = (current_user.total_xp or 0) + boosted_xp
     
     # Award gems if any
@@ -382,6 +384,7 @@ async def claim_challenge_reward(
     )
     db.add(claim)
     await db.commit()
+    await UserCache.invalidate_user(current_user)
     
     message = f"Challenge completed! +{boosted_xp} XP"
     if multiplier > 1.0:
@@ -458,7 +461,8 @@ async def claim_daily_bonus(
     multiplier = await effects_service.get_xp_multiplier(current_user.id)
     boosted_xp = int(bonus_xp * multiplier)
     
-    # Award XP
+    # Award XP (re-read total_xp: current_user may be a cached snapshot)
+    await db.refresh(current_user, ["total_xp"])
     current_user.total_xp = (current_user.total_xp or 0) + boosted_xp
     
     # Award gems
@@ -480,6 +484,7 @@ async def claim_daily_bonus(
     )
     db.add(claim)
     await db.commit()
+    await UserCache.invalidate_user(current_user)
     
     return ApiResponse(
         success=True,
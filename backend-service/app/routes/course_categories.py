@@ -133,8 +133,15 @@ async def get_courses_by_category(
         limit=page_size
     )
     
-    # Convert to response models
+    # Enrollment status for the whole page in one query
     from app.crud.course import CourseCRUD
+    enrollment = {}
+    if current_user:
+        enrollment = await CourseCRUD.get_enrollment_map(
+            db, current_user.id, [course.id for course in courses]
+        )
+    
+    # Convert to response models
     course_items = []
     for course in courses:
         item_dict = {
@@ -148,17 +155,10 @@ async def get_courses_by_category(
             "total_lessons": course.total_lessons,
             "total_xp": course.total_xp,
             "estimated_duration": course.estimated_duration,
-            "is_enrolled": None
+            "is_enrolled": enrollment.get(course.id) if current_user else None
         }
         
         item = CourseListItem(**item_dict)
-        
-        # Add enrollment status if user is authenticated
-        if current_user:
-            item.is_enrolled = await CourseCRUD.is_user_enrolled(
-                db, current_user.id, course.id
-            )
-        
         course_items.append(item)
     
     # Calculate pagination
@@ -14,6 +14,7 @@ from app.core.dependencies import get_current_user, get_current_user_optional
 from app.models.user import User
 from app.models.progress import UserCourseProgress
 from app.crud.course import CourseCRUD, UnitCRUD, LessonCRUD
+from app.services.user_stats_service import UserStatsService
 from app.schemas.course import (
     CourseResponse,
     CourseListItem,
@@ -53,18 +54,31 @@ async def get_courses(
     Returns enrollment status if user is authenticated.
     """
     skip = (page - 1) * page_size
-    courses, total = await CourseCRUD.get_courses(
-        db,
-        skip=skip,
-        limit=page_size,
-        language=language,
-        level=level,
-        published_only=True
-    )
+    if current_user:
+        # Enrollment status comes from the listing query itself
+        rows, total = await CourseCRUD.get_courses_with_enrollment(
+            db,
+            user_id=current_user.id,
+            skip=skip,
+            limit=page_size,
+            language=language,
+            level=level,
+            published_only=True
+        )
+    else:
+        courses, total = await CourseCRUD.get_courses(
+            db,
+            skip=skip,
+            limit=page_size,
+            language=language,
+            level=level,
+            published_only=True
+        )
+        rows = [(course, None) for course in courses]
     
     # Convert to response models
     course_items = []
-    for course in courses:
+    for course, is_enrolled in rows:
         item_dict = {
             "id": course.id,
             "title": course.title,
@@ -76,17 +90,10 @@ async def get_courses(
             "total_lessons": course.total_lessons,
             "total_xp": course.total_xp,
             "estimated_duration": course.estimated_duration,
-            "is_enrolled": None
+            "is_enrolled": is_enrolled
         }
         
         item = CourseListItem(**item_dict)
-        
-        # Add enrollment status if user is authenticated
-        if current_user:
-            item.is_enrolled = await CourseCRUD.is_user_enrolled(
-                db, current_user.id, course.id
-            )
-        
         course_items.append(item)
     
     # Calculate pagination
@@ -143,7 +150,7 @@ async def get_enrolled_courses(
             UserCourseProgress.user_id == current_user.id,
             Course.is_published == True
         )
-        .order_by(UserCourseProgress.last_accessed.desc())
+        .order_by(UserCourseProgress.last_activity_at.desc())
         .offset(skip)
         .limit(page_size)
     )
@@ -311,6 +318,7 @@ async def enroll_in_course(
         progress_percentage=0.0
     )
     db.add(progress)
+    await UserStatsService.apply(db, current_user.id, courses_enrolled=1)
     await db.commit()
     await db.refresh(progress)
     
@@ -35,6 +35,7 @@ from app.schemas.progress import (
 from app.schemas.course import LessonContentResponse, Exercise, ExerciseOption
 from app.schemas.response import ApiResponse
 from app.services import check_achievements_for_user
+from app.services.user_stats_service import UserStatsService
 
 router = APIRouter(prefix="/learning", tags=["Learning Sessions"])
 
@@ -445,6 +446,11 @@ async def complete_lesson(
     # Complete
     attempt.finished_at = datetime.utcnow()
     attempt.passed = attempt.score >= 70.0
+    await UserStatsService.apply(
+        db, current_user.id,
+        attempts_passed=int(attempt.passed),
+        study_time_ms=attempt.time_spent_ms or 0
+    )
     
     # Stars
     if attempt.score >= 90:
@@ -9,10 +9,9 @@ from datetime import datetime, timedelta
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.user_cache import UserCache
 from app.models.user import User
-from app.models.progress import UserProgress, LessonAttempt, Streak
-from app.models.gamification import UserAchievement, UserWallet
-from app.models.vocabulary import UserVocabulary
+from app.models.progress import LessonAttempt, Streak
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.common import MessageResponse, ApiResponse
 from app.schemas.level import (
@@ -24,6 +23,7 @@ from app.schemas.level import (
     XPAwardResponse
 )
 from app.services.level_service import LevelService
+from app.services.user_stats_service import UserStatsService
 
 router = APIRouter()
 
@@ -58,6 +58,7 @@ async def update_current_user_profile(
         setattr(current_user, field, value)
     
     await db.commit()
+    await UserCache.invalidate_user(current_user)
     await db.refresh(current_user)
     
     return current_user
@@ -75,6 +76,7 @@ async def delete_current_user(
     """
     current_user.is_active = False
     await db.commit()
+    await UserCache.invalidate_user(current_user)
     
     return MessageResponse(
         message="Account deactivated successfully",
@@ -156,31 +158,8 @@ async def get_user_stats(
     # Calculate level status
     level_status = LevelService.calculate_level_status(current_user.total_xp)
     
-    # Get course stats
-    courses_query = select(func.count(UserProgress.id)).where(
-        UserProgress.user_id == current_user.id
-    )
-    courses_enrolled = (await db.execute(courses_query)).scalar() or 0
-    
-    completed_query = select(func.count(UserProgress.id)).where(
-        UserProgress.user_id == current_user.id,
-        UserProgress.status == "completed"
-    )
-    courses_completed = (await db.execute(completed_query)).scalar() or 0
-    
-    # Get lesson stats
-    lessons_query = select(func.count(LessonAttempt.id)).where(
-        LessonAttempt.user_id == current_user.id,
-        LessonAttempt.passed == True
-    )
-    lessons_completed = (await db.execute(lessons_query)).scalar() or 0
-    
-    # Get study time (sum of all lesson attempts in ms, convert to minutes)
-    study_time_query = select(func.sum(LessonAttempt.time_spent_ms)).where(
-        LessonAttempt.user_id == current_user.id
-    )
-    total_study_time = (await db.execute(study_time_query)).scalar() or 0
-    total_study_time = int(total_study_time / 60000) if total_study_time else 0  # ms to minutes
+    # Aggregates come from the materialized user_stats row
+    stats = await UserStatsService.get(db, current_user.id)
     
     # Get streak info
     streak_query = select(Streak).where(Streak.user_id == current_user.id)
@@ -190,45 +169,21 @@ async def get_user_stats(
     current_streak = streak.current_streak if streak else 0
     longest_streak = streak.longest_streak if streak else 0
     
-    # Get vocabulary stats
-    vocab_learned_query = select(func.count(UserVocabulary.id)).where(
-        UserVocabulary.user_id == current_user.id
-    )
-    words_learned = (await db.execute(vocab_learned_query)).scalar() or 0
-    
-    vocab_mastered_query = select(func.count(UserVocabulary.id)).where(
-        UserVocabulary.user_id == current_user.id,
-        UserVocabulary.mastery_level >= 4  # Assuming 4+ is "mastered"
-    )
-    words_mastered = (await db.execute(vocab_mastered_query)).scalar() or 0
-    
-    # Get achievements count
-    achievements_query = select(func.count(UserAchievement.id)).where(
-        UserAchievement.user_id == current_user.id
-    )
-    achievements_unlocked = (await db.execute(achievements_query)).scalar() or 0
-    
-    # Get gems
-    wallet_query = select(UserWallet).where(UserWallet.user_id == current_user.id)
-    wallet_result = await db.execute(wallet_query)
-    wallet = wallet_result.scalar_one_or_none()
-    total_gems = wallet.gems_balance if wallet else 0
-    
     return ApiResponse(
         success=True,
         data=UserStatsResponse(
             total_xp=current_user.total_xp,
             level=level_status,
-            courses_enrolled=courses_enrolled,
-            courses_completed=courses_completed,
-            lessons_completed=lessons_completed,
-            total_study_time=total_study_time,
+            courses_enrolled=stats.courses_enrolled,
+            courses_completed=stats.courses_completed,
+            lessons_completed=stats.attempts_passed,
+            total_study_time=stats.study_time_ms // 60000,  # ms to minutes
             current_streak=current_streak,
             longest_streak=longest_streak,
-            words_learned=words_learned,
-            words_mastered=words_mastered,
-            achievements_unlocked=achievements_unlocked,
-            total_gems=total_gems
+            words_learned=stats.words_learned,
+            words_mastered=stats.words_mastered,
+            achievements_unlocked=stats.achievements_unlocked,
+            total_gems=stats.gems
         ),
         message="User stats retrieved successfully"
     )
@@ -332,6 +287,8 @@ async def award_xp(
     base_amount = xp_data.amount
     boosted_amount = int(base_amount * multiplier)
     
+    # Re-read XP and level: current_user may be a cached snapshot
+    await db.refresh(current_user, ["total_xp", "level"])
     old_xp = current_user.total_xp
     new_xp = old_xp + boosted_amount
     
@@ -345,6 +302,7 @@ async def award_xp(
         current_user.level = new_level_status.current_tier.code
     
     await db.commit()
+    await UserCache.invalidate_user(current_user)
     await db.refresh(current_user)
     
     # Calculate new level status
@@ -13,9 +13,9 @@ from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.gamification import Achievement, UserAchievement
-from app.models.progress import UserCourseProgress, LessonCompletion, Streak
-from app.models.vocabulary import UserVocabulary, VocabularyStatus
+from app.models.progress import Streak
 from app.models.user import User
+from app.services.user_stats_service import UserStatsService
 
 
 # Mapping of triggers to achievement condition types
@@ -130,44 +130,24 @@ class AchievementCheckerService:
     ) -> Dict[str, Any]:
         """
         Fetch user statistics needed for achievement evaluation.
-        Only fetches stats relevant to the condition_types if provided.
+        Counters come from the materialized user_stats row; the streak is
+        only fetched when relevant to condition_types (or all are checked).
         """
-        stats = {}
-        
-        # Determine which stats to fetch
-        fetch_all = condition_types is None
-        need_lessons = fetch_all or "lesson_complete" in condition_types or "course_complete" in condition_types
-        need_streak = fetch_all or "reach_streak" in condition_types
-        need_vocab = fetch_all or "vocab_mastered" in condition_types or "vocab_reviewed" in condition_types
-        need_xp = fetch_all or "xp_earned" in condition_types
-        need_quiz = fetch_all or "perfect_score" in condition_types or "quiz_complete" in condition_types
-        need_voice = fetch_all or "voice_practice" in condition_types
-        
-        # Fetch lesson completion count
-        if need_lessons:
-            result = await self.db.execute(
-                select(func.count(LessonCompletion.id)).where(
-                    and_(
-                        LessonCompletion.user_id == user_id,
-                        LessonCompletion.is_passed == True
-                    )
-                )
-            )
-            stats["lessons_completed"] = result.scalar() or 0
-            
-            # Count completed courses (progress_percentage >= 100)
-            result = await self.db.execute(
-                select(func.count(UserCourseProgress.id)).where(
-                    and_(
-                        UserCourseProgress.user_id == user_id,
-                        UserCourseProgress.progress_percentage >= 100
-                    )
-                )
-            )
-            stats["courses_completed"] = result.scalar() or 0
+        row = await UserStatsService.get(self.db, user_id)
+        stats = {
+            "lessons_completed": row.lessons_completed,
+            "courses_completed": row.courses_completed,
+            "vocab_mastered": row.words_mastered,
+            "vocab_reviewed": row.words_reviewed,
+            "total_xp": row.course_xp,
+            "perfect_scores": row.perfect_scores,
+            "quiz_completed": row.lessons_attempted,
+            # Note: Voice practices not tracked separately yet, return 0 for now
+            "voice_practices": 0,
+        }
         
         # Fetch streak from Streak model
-        if need_streak:
+        if condition_types is None or "reach_streak" in condition_types:
             result = await self.db.execute(
                 select(Streak.current_streak, Streak.longest_streak).where(Streak.user_id == user_id)
             )
@@ -179,65 +159,6 @@ class AchievementCheckerService:
                 stats["current_streak"] = 0
                 stats["longest_streak"] = 0
         
-        # Fetch vocabulary mastered
-        if need_vocab:
-            # Count words with status MASTERED
-            result = await self.db.execute(
-                select(func.count(UserVocabulary.id)).where(
-                    and_(
-                        UserVocabulary.user_id == user_id,
-                        UserVocabulary.status == VocabularyStatus.MASTERED
-                    )
-                )
-            )
-            stats["vocab_mastered"] = result.scalar() or 0
-            
-            # Count total reviewed
-            result = await self.db.execute(
-                select(func.count(UserVocabulary.id)).where(
-                    and_(
-                        UserVocabulary.user_id == user_id,
-                        UserVocabulary.total_reviews > 0
-                    )
-                )
-            )
-            stats["vocab_reviewed"] = result.scalar() or 0
-        
-        # Fetch XP (sum from all user course progress)
-        if need_xp:
-            result = await self.db.execute(
-                select(func.coalesce(func.sum(UserCourseProgress.total_xp_earned), 0)).where(
-                    UserCourseProgress.user_id == user_id
-                )
-            )
-            stats["total_xp"] = result.scalar() or 0
-        
-        # Fetch perfect scores and quiz completions
-        if need_quiz:
-            # Count perfect score lessons (best_score == 100)
-            result = await self.db.execute(
-                select(func.count(LessonCompletion.id)).where(
-                    and_(
-                        LessonCompletion.user_id == user_id,
-                        LessonCompletion.best_score == 100
-                    )
-                )
-            )
-            stats["perfect_scores"] = result.scalar() or 0
-            
-            # Total quiz/lesson completions
-            result = await self.db.execute(
-                select(func.count(LessonCompletion.id)).where(
-                    LessonCompletion.user_id == user_id
-                )
-            )
-            stats["quiz_completed"] = result.scalar() or 0
-        
-        # Fetch voice practice count 
-        # Note: Voice practices not tracked separately yet, return 0 for now
-        if need_voice:
-            stats["voice_practices"] = 0
-        
         return stats
     
     async def _evaluate_condition(
@@ -309,6 +230,7 @@ class AchievementCheckerService:
             unlocked_at=datetime.utcnow()
         )
         self.db.add(user_achievement)
+        await UserStatsService.apply(self.db, user_id, achievements_unlocked=1)
         
         # Note: XP reward is tracked via UserCourseProgress.total_xp_earned
         # Achievement XP is already part of the achievement record for display
@@ -0,0 +1,219 @@
+"""
+User Stats Service
+
+Materialized per-user aggregates in the user_stats table.
+
+Write paths apply deltas with apply() inside their own transaction, so a
+row is only ever changed together with the history rows it summarizes.
+Readers call get(), which builds a missing row from the history tables.
+A background reconciler periodically recomputes rows to repair drift
+(e.g. writes that landed while a row was being created).
+
+Usage:
+    await UserStatsService.apply(db, user_id, words_learned=1)
+    stats = await UserStatsService.get(db, user_id)
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from uuid import UUID
+
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gamification import UserAchievement, UserWallet
+from app.models.progress import UserCourseProgress, LessonCompletion, LessonAttempt, UserStats
+from app.models.vocabulary import UserVocabulary, VocabularyStatus
+
+logger = logging.getLogger(__name__)
+
+
+# Counters maintained on UserStats
+STAT_FIELDS = (
+    "courses_enrolled",
+    "courses_completed",
+    "course_xp",
+    "lessons_completed",
+    "lessons_attempted",
+    "perfect_scores",
+    "attempts_passed",
+    "study_time_ms",
+    "words_learned",
+    "words_reviewed",
+    "words_mastered",
+    "achievements_unlocked",
+    "gems",
+)
+
+
+class UserStatsService:
+    """Read, update and reconcile the user_stats row."""
+
+    @staticmethod
+    async def get(db: AsyncSession, user_id: UUID) -> UserStats:
+        """Get the user's stats row, building it from history if missing."""
+        result = await db.execute(
+            select(UserStats).where(UserStats.user_id == user_id)
+        )
+        stats = result.scalar_one_or_none()
+        if stats:
+            return stats
+
+        values = await UserStatsService.compute(db, user_id)
+        stats = UserStats(user_id=user_id, reconciled_at=datetime.utcnow(), **values)
+        try:
+            async with db.begin_nested():
+                db.add(stats)
+        except IntegrityError:
+            # Created concurrently by another request
+            result = await db.execute(
+                select(UserStats).where(UserStats.user_id == user_id)
+            )
+            stats = result.scalar_one()
+        return stats
+
+    @staticmethod
+    async def apply(db: AsyncSession, user_id: UUID, **deltas: int) -> None:
+        """
+        Add deltas to the user's counters in the caller's transaction.
+
+        No-op while the row does not exist yet; get() builds it from
+        history, which then already includes this change.
+        """
+        unknown = set(deltas) - set(STAT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown user stats fields: {', '.join(sorted(unknown))}")
+        values = {
+            field: getattr(UserStats, field) + delta
+            for field, delta in deltas.items()
+            if delta
+        }
+        if not values:
+            return
+
+        await db.execute(
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(**values, updated_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    async def compute(db: AsyncSession, user_id: UUID) -> Dict[str, int]:
+        """Recompute all counters from the history tables (one statement)."""
+        def count(model, *conditions):
+            return (
+                select(func.count(model.id))
+                .where(and_(model.user_id == user_id, *conditions))
+                .scalar_subquery()
+            )
+
+        def total(column, model, *conditions):
+            return (
+                select(func.coalesce(func.sum(column), 0))
+                .where(and_(model.user_id == user_id, *conditions))
+                .scalar_subquery()
+            )
+
+        columns = {
+            "courses_enrolled": count(UserCourseProgress),
+            "courses_completed": count(UserCourseProgress, UserCourseProgress.progress_percentage >= 100),
+            "course_xp": total(UserCourseProgress.total_xp_earned, UserCourseProgress),
+            "lessons_completed": count(LessonCompletion, LessonCompletion.is_passed == True),
+            "lessons_attempted": count(LessonCompletion),
+            "perfect_scores": count(LessonCompletion, LessonCompletion.best_score == 100),
+            "attempts_passed": count(
+                LessonAttempt, LessonAttempt.finished_at.isnot(None), LessonAttempt.passed == True
+            ),
+            "study_time_ms": total(
+                LessonAttempt.time_spent_ms, LessonAttempt, LessonAttempt.finished_at.isnot(None)
+            ),
+            "words_learned": count(UserVocabulary),
+            "words_reviewed": count(UserVocabulary, UserVocabulary.total_reviews > 0),
+            "words_mastered": count(UserVocabulary, UserVocabulary.status == VocabularyStatus.MASTERED),
+            "achievements_unlocked": count(UserAchievement),
+            "gems": total(UserWallet.gems, UserWallet),
+        }
+        result = await db.execute(
+            select(*[column.label(name) for name, column in columns.items()])
+        )
+        row = result.one()
+        return {name: int(getattr(row, name) or 0) for name in STAT_FIELDS}
+
+    @staticmethod
+    async def reconcile(db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+        """
+        Recompute the user's row and overwrite drifted counters.
+
+        The row is locked first, so concurrent apply() calls either commit
+        before the recompute (and are counted by it) or wait and add their
+        delta on top. Returns {field: (stored, actual)} for drifted fields.
+        Caller commits.
+        """
+        result = await db.execute(
+            select(UserStats).where(UserStats.user_id == user_id).with_for_update()
+        )
+        stats = result.scalar_one_or_none()
+        values = await UserStatsService.compute(db, user_id)
+
+        if stats is None:
+            db.add(UserStats(user_id=user_id, reconciled_at=datetime.utcnow(), **values))
+            return {}
+
+        drift = {
+            field: (getattr(stats, field), value)
+            for field, value in values.items()
+            if getattr(stats, field) != value
+        }
+        for field, value in values.items():
+            setattr(stats, field, value)
+        stats.reconciled_at = datetime.utcnow()
+        return drift
+
+    @staticmethod
+    async def reconcile_stale(
+        db: AsyncSession,
+        max_age: timedelta,
+        limit: int = 200
+    ) -> int:
+        """Reconcile the least recently reconciled rows older than max_age. Returns rows drifted."""
+        cutoff = datetime.utcnow() - max_age
+        result = await db.execute(
+            select(UserStats.user_id)
+            .where(UserStats.reconciled_at < cutoff)
+            .order_by(UserStats.reconciled_at)
+            .limit(limit)
+        )
+        user_ids: List[UUID] = list(result.scalars().all())
+
+        drifted = 0
+        for user_id in user_ids:
+            drift = await UserStatsService.reconcile(db, user_id)
+            await db.commit()
+            if drift:
+                drifted += 1
+                logger.warning(f"Repaired user_stats drift for {user_id}: {drift}")
+        return drifted
+
+
+async def run_reconciler(
+    interval_seconds: float,
+    max_age: timedelta,
+    batch_size: int = 200
+) -> None:
+    """Background loop reconciling stale user_stats rows."""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                drifted = await UserStatsService.reconcile_stale(db, max_age, batch_size)
+            if drifted:
+                logger.info(f"User stats reconciler repaired {drifted} rows")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"User stats reconciliation failed: {e}")
@@ -0,0 +1,68 @@
+"""
+Tests for CourseCRUD
+Bulk enrollment lookups used by the course listings
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.course import CourseCRUD
+from app.models.course import Course
+from app.models.progress import UserCourseProgress
+from app.models.user import User
+
+
+async def create_courses(db_session: AsyncSession, count: int) -> list[Course]:
+    """Create published courses"""
+    courses = [
+        Course(title=f"Course {i+1}", language="en", level="A1", is_published=True)
+        for i in range(count)
+    ]
+    db_session.add_all(courses)
+    await db_session.commit()
+    return courses
+
+
+@pytest.mark.asyncio
+class TestEnrollmentLookup:
+    """Test enrollment status for course listings"""
+
+    async def test_get_enrollment_map(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test enrollment map marks only enrolled courses"""
+        courses = await create_courses(db_session, 3)
+        db_session.add(UserCourseProgress(user_id=test_user.id, course_id=courses[1].id))
+        await db_session.commit()
+
+        enrollment = await CourseCRUD.get_enrollment_map(
+            db_session, test_user.id, [course.id for course in courses]
+        )
+
+        assert enrollment == {
+            courses[0].id: False,
+            courses[1].id: True,
+            courses[2].id: False
+        }
+        assert await CourseCRUD.get_enrollment_map(db_session, test_user.id, []) == {}
+
+    async def test_get_courses_with_enrollment(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test the listing matches get_courses and per-course enrollment checks"""
+        courses = await create_courses(db_session, 4)
+        for course in courses[:2]:
+            db_session.add(UserCourseProgress(user_id=test_user.id, course_id=course.id))
+        await db_session.commit()
+
+        rows, total = await CourseCRUD.get_courses_with_enrollment(db_session, test_user.id, limit=10)
+        listed, listed_total = await CourseCRUD.get_courses(db_session, limit=10)
+
+        assert total == listed_total == 4
+        assert [course.id for course, _ in rows] == [course.id for course in listed]
+        for course, is_enrolled in rows:
+            assert is_enrolled == await CourseCRUD.is_user_enrolled(db_session, test_user.id, course.id)
@@ -0,0 +1,153 @@
+"""
+Tests for ProgressCRUD
+Course progress breakdown correctness and query count
+"""
+
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.progress import ProgressCRUD
+from app.models.course import Course, Unit, Lesson
+from app.models.progress import UserCourseProgress, LessonCompletion
+from app.models.user import User
+
+
+@contextmanager
+def count_statements(engine):
+    """Count SQL statements sent through the engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def create_course(
+    db_session: AsyncSession,
+    user: User,
+    units: int,
+    lessons_per_unit: int,
+    passed_per_unit: int
+) -> Course:
+    """Create an enrolled course; the first passed_per_unit lessons of each unit are passed"""
+    course = Course(
+        title=f"Course {units}x{lessons_per_unit}",
+        language="en",
+        level="beginner",
+        is_published=True,
+        total_lessons=units * lessons_per_unit
+    )
+    db_session.add(course)
+    await db_session.flush()
+
+    for i in range(units):
+        unit = Unit(course_id=course.id, title=f"Unit {i+1}", order_index=i)
+        db_session.add(unit)
+        await db_session.flush()
+
+        for j in range(lessons_per_unit):
+            lesson = Lesson(
+                course_id=course.id,
+                unit_id=unit.id,
+                title=f"Unit {i+1} - Lesson {j+1}",
+                order_index=j,
+                lesson_type="vocabulary",
+                content={}
+            )
+            db_session.add(lesson)
+            await db_session.flush()
+
+            if j < passed_per_unit + 1:
+                # One extra completion per unit that did not pass
+                db_session.add(LessonCompletion(
+                    user_id=user.id,
+                    lesson_id=lesson.id,
+                    is_passed=j < passed_per_unit,
+                    best_score=90 if j < passed_per_unit else 40
+                ))
+
+    db_session.add(UserCourseProgress(user_id=user.id, course_id=course.id))
+    await db_session.commit()
+    return course
+
+
+@pytest.mark.asyncio
+class TestCourseProgressDetail:
+    """Test ProgressCRUD.get_course_progress_detail"""
+
+    async def test_units_progress(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test per-unit totals and passed counts"""
+        course = await create_course(db_session, test_user, units=3, lessons_per_unit=4, passed_per_unit=2)
+
+        detail = await ProgressCRUD.get_course_progress_detail(
+            db_session, str(test_user.id), str(course.id)
+        )
+
+        assert detail["course"]["course_id"] == str(course.id)
+        assert [u["unit_title"] for u in detail["units_progress"]] == ["Unit 1", "Unit 2", "Unit 3"]
+        for unit in detail["units_progress"]:
+            assert unit["total_lessons"] == 4
+            assert unit["completed_lessons"] == 2
+            assert unit["progress_percentage"] == 50
+
+    async def test_empty_unit(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test a unit without lessons is listed with zero progress"""
+        course = await create_course(db_session, test_user, units=1, lessons_per_unit=0, passed_per_unit=0)
+
+        detail = await ProgressCRUD.get_course_progress_detail(
+            db_session, str(test_user.id), str(course.id)
+        )
+
+        assert len(detail["units_progress"]) == 1
+        unit = detail["units_progress"][0]
+        assert unit["unit_title"] == "Unit 1"
+        assert unit["total_lessons"] == 0
+        assert unit["completed_lessons"] == 0
+        assert unit["progress_percentage"] == 0
+
+    async def test_not_enrolled(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_course: Course
+    ):
+        """Test None is returned without an enrollment"""
+        detail = await ProgressCRUD.get_course_progress_detail(
+            db_session, str(test_user.id), str(test_course.id)
+        )
+
+        assert detail is None
+
+    async def test_statement_count_constant_in_course_size(
+        self,
+        db_engine,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test the number of statements does not grow with units or lessons"""
+        small = await create_course(db_session, test_user, units=1, lessons_per_unit=1, passed_per_unit=1)
+        large = await create_course(db_session, test_user, units=12, lessons_per_unit=10, passed_per_unit=3)
+
+        with count_statements(db_engine) as small_statements:
+            await ProgressCRUD.get_course_progress_detail(db_session, str(test_user.id), str(small.id))
+        with count_statements(db_engine) as large_statements:
+            detail = await ProgressCRUD.get_course_progress_detail(db_session, str(test_user.id), str(large.id))
+
+        assert len(detail["units_progress"]) == 12
+        assert len(large_statements) == len(small_statements)
+        assert len(large_statements) <= 2
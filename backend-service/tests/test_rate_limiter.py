@@ -0,0 +1,50 @@
+"""
+Tests for RateLimiter
+Local fallback buckets (Redis not connected in tests)
+"""
+
+import pytest
+
+from app.core.rate_limiter import RateLimit, RateLimiter
+
+
+@pytest.mark.asyncio
+class TestRateLimiter:
+    """Test token-bucket rate limiting without Redis"""
+
+    async def test_limit_enforced_per_identity(self):
+        """Test requests beyond the minute limit are rejected"""
+        limiter = RateLimiter(RateLimit(per_minute=3, per_hour=100))
+
+        results = [await limiter.hit("/api/v1/courses", "ip:1.2.3.4") for _ in range(4)]
+
+        assert [allowed for allowed, _, _, _ in results] == [True, True, True, False]
+        assert results[2][2] == (0, 97)
+        assert 0 < results[3][1] <= 20
+
+        allowed, _, _, _ = await limiter.hit("/api/v1/courses", "ip:5.6.7.8")
+        assert allowed is True
+
+    async def test_route_limits(self):
+        """Test route prefixes get their own buckets and limits"""
+        limiter = RateLimiter(
+            RateLimit(per_minute=60, per_hour=1000),
+            {"/api/v1/auth/login": RateLimit(per_minute=1, per_hour=10)}
+        )
+
+        first = await limiter.hit("/api/v1/auth/login", "ip:1.2.3.4")
+        second = await limiter.hit("/api/v1/auth/login", "ip:1.2.3.4")
+        other = await limiter.hit("/api/v1/courses", "ip:1.2.3.4")
+
+        assert first[0] is True and first[3].per_minute == 1
+        assert second[0] is False
+        assert other[0] is True and other[3].per_minute == 60
+
+    async def test_idle_clients_evicted(self):
+        """Test the local fallback keeps a bounded number of buckets"""
+        limiter = RateLimiter(RateLimit(per_minute=60, per_hour=1000), max_local_keys=10)
+
+        for i in range(50):
+            await limiter.hit("/api/v1/courses", f"ip:10.0.0.{i}")
+
+        assert len(limiter._local) == 10
@@ -0,0 +1,67 @@
+"""
+Tests for RedisClient
+Background reconnect after a failed startup connection
+"""
+
+import pytest
+
+from app.core import redis as redis_module
+from app.core.redis import RedisClient
+
+
+class FakeRedis:
+    """Client whose ping fails until the server is 'up'"""
+
+    def __init__(self, server):
+        self.server = server
+
+    async def ping(self):
+        if not self.server["up"]:
+            raise ConnectionError("connection refused")
+        return True
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = {"up": False, "clients": 0}
+
+    def from_url(*args, **kwargs):
+        server["clients"] += 1
+        return FakeRedis(server)
+
+    monkeypatch.setattr(redis_module.redis, "from_url", from_url)
+    monkeypatch.setattr(RedisClient, "RECONNECT_MIN_SECONDS", 0.0)
+    monkeypatch.setattr(RedisClient, "_retry_delay", 0.0)
+    yield server
+
+
+@pytest.mark.asyncio
+class TestRedisClient:
+    """Test lazy reconnection"""
+
+    async def test_reconnects_after_failed_startup(self, fake_server):
+        """Test a failed startup connection is retried once Redis is back"""
+        try:
+            await RedisClient.connect()
+            assert await RedisClient.get_instance() is None
+
+            fake_server["up"] = True
+            assert await RedisClient.get_instance() is None  # reconnect started
+            await RedisClient._reconnect_task
+
+            assert await RedisClient.get_instance() is not None
+            assert fake_server["clients"] == 2
+        finally:
+            await RedisClient.close()
+
+    async def test_no_reconnect_after_close(self, fake_server):
+        """Test closing stops background reconnects"""
+        await RedisClient.connect()
+        await RedisClient.close()
+
+        fake_server["up"] = True
+        assert await RedisClient.get_instance() is None
+        assert RedisClient._reconnect_task is None
@@ -0,0 +1,98 @@
+"""
+Tests for UserCache
+Local tier only (Redis not connected in tests)
+"""
+
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.user_cache import UserCache
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    UserCache._local.clear()
+    yield
+    UserCache._local.clear()
+
+
+@pytest.mark.asyncio
+class TestUserCache:
+    """Test the authenticated user cache"""
+
+    async def test_cached_user_attached_without_query(
+        self,
+        db_engine,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test a cached user is attached to the session without a SELECT"""
+        await UserCache.set_user(test_user)
+        db_session.expunge_all()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            user = await UserCache.get_user(db_session, f"id:{test_user.id}")
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+        assert statements == []
+        assert user in db_session
+        assert user.id == test_user.id
+        assert user.email == test_user.email
+        assert user.created_at == test_user.created_at
+        assert await UserCache.get_user(db_session, f"email:{test_user.email}") is user
+
+    async def test_changes_to_cached_user_are_saved(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test a cached user can be updated and its password hash loaded"""
+        password_hash = test_user.hashed_password
+        await UserCache.set_user(test_user)
+        db_session.expunge_all()
+
+        user = await UserCache.get_user(db_session, f"id:{test_user.id}")
+        user.display_name = "Renamed"
+        await db_session.commit()
+        await db_session.refresh(user, ["hashed_password"])
+
+        db_session.expunge_all()
+        result = await db_session.execute(select(User).where(User.id == test_user.id))
+        stored = result.scalar_one()
+        assert stored.display_name == "Renamed"
+        assert user.hashed_password == password_hash
+
+    async def test_invalidate_user(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test invalidation drops both the ID and email entries"""
+        await UserCache.set_user(test_user)
+        await UserCache.invalidate_user(test_user)
+
+        assert await UserCache.get_user(db_session, f"id:{test_user.id}") is None
+        assert await UserCache.get_user(db_session, f"email:{test_user.email}") is None
+
+    async def test_claims_cached_until_expiry(self):
+        """Test Firebase claims are only cached while the token is valid"""
+        claims = {"sub": "firebase-uid", "email": "a@example.com", "exp": int(time.time()) + 3600}
+        await UserCache.set_claims("valid-token", claims)
+        await UserCache.set_claims("expired-token", {**claims, "exp": int(time.time()) - 1})
+
+        assert await UserCache.get_claims("valid-token") == claims
+        assert await UserCache.get_claims("expired-token") is None
+
+        await UserCache.invalidate_token("valid-token")
+        assert await UserCache.get_claims("valid-token") is None
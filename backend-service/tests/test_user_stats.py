@@ -0,0 +1,76 @@
+"""
+Tests for UserStatsService
+Incremental user_stats maintenance and drift reconciliation
+"""
+
+import pytest
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.gamification import WalletCRUD
+from app.crud.progress import ProgressCRUD
+from app.models.course import Lesson
+from app.models.user import User
+from app.services.user_stats_service import UserStatsService
+
+
+@pytest.mark.asyncio
+class TestUserStats:
+    """Test the materialized user stats row"""
+
+    async def test_row_built_from_history(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_lesson: Lesson
+    ):
+        """Test a missing row is computed from the history tables"""
+        await ProgressCRUD.mark_lesson_complete(db_session, test_user.id, test_lesson.id, score=100)
+
+        stats = await UserStatsService.get(db_session, test_user.id)
+
+        assert stats.lessons_completed == 1
+        assert stats.lessons_attempted == 1
+        assert stats.perfect_scores == 1
+
+    async def test_write_paths_keep_row_current(
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_lesson: Lesson
+    ):
+        """Test deltas applied by write paths match a full recompute"""
+        await UserStatsService.get(db_session, test_user.id)
+        await db_session.commit()
+
+        await ProgressCRUD.mark_lesson_complete(db_session, test_user.id, test_lesson.id, score=50)
+        await ProgressCRUD.mark_lesson_complete(db_session, test_user.id, test_lesson.id, score=100)
+        await WalletCRUD.add_gems(db_session, test_user.id, 30, source="test")
+        await WalletCRUD.spend_gems(db_session, test_user.id, 10, source="test")
+
+        stats = await UserStatsService.get(db_session, test_user.id)
+        await db_session.refresh(stats)
+
+        assert stats.lessons_completed == 1
+        assert stats.lessons_attempted == 1
+        assert stats.perfect_scores == 1
+        assert stats.gems == 20
+        computed = await UserStatsService.compute(db_session, test_user.id)
+        assert {field: getattr(stats, field) for field in computed} == computed
+
+    async def test_reconcile_repairs_drift(
+        self,
+        db_session: AsyncSession,
+        test_user: User
+    ):
+        """Test the reconciler overwrites drifted counters"""
+        stats = await UserStatsService.get(db_session, test_user.id)
+        stats.gems = 99
+        stats.reconciled_at = stats.reconciled_at - timedelta(days=2)
+        await db_session.commit()
+
+        drifted = await UserStatsService.reconcile_stale(db_session, max_age=timedelta(days=1))
+
+        assert drifted == 1
+        await db_session.refresh(stats)
+        assert stats.gems == 0
@@ -1,16 +1,62 @@
 """
 Chat Tool - Chat with AI tutor (Qwen or Gemini)
+
+Each model sits behind a circuit breaker: while the requested model keeps
+failing, requests go straight to the other one instead of waiting for it.
 """
 
 import logging
 from typing import Any, Dict
 
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.config import Config
+
 logger = logging.getLogger(__name__)
 
 # Global handlers (lazy loaded)
 _qwen_handler = None
 _gemini_handler = None
 
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _breaker(model: str) -> CircuitBreaker:
+    if model not in _breakers:
+        config = Config()
+        _breakers[model] = CircuitBreaker(
+            model,
+            failure_threshold=config.get("features.circuit_breaker.failure_threshold", 3),
+            reset_timeout_s=config.get("features.circuit_breaker.reset_timeout_s", 30.0),
+        )
+    return _breakers[model]
+
+
+async def _chat(model: str, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one chat call on the given model (loads its handler on first use)"""
+    global _qwen_handler, _gemini_handler
+    
+    if model == "qwen":
+        if _qwen_handler is None:
+            logger.info("Loading Qwen handler...")
+            from handlers.qwen import QwenHandler
+            _qwen_handler = QwenHandler()
+            await _qwen_handler.load()
+        
+        return await _qwen_handler.chat(
+            message=message,
+            context=context,
+        )
+    
+    if _gemini_handler is None:
+        logger.info("Loading Gemini handler...")
+        from handlers.gemini import GeminiHandler
+        _gemini_handler = GeminiHandler()
+    
+    return await _gemini_handler.chat(
+        message=message,
+        context=context,
+    )
+
 
 async def execute(args: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -27,8 +73,6 @@ async def execute(args: Dict[str, Any]) -> Dict[str, Any]:
         suggestions: Learning suggestions
         model_used: Which model was used
     """
-    global _qwen_handler, _gemini_handler
-    
     message = args.get("message", "")
     context = args.get("context", {})
     model = args.get("model", "qwen")
@@ -36,50 +80,39 @@ async def execute(args: Dict[str, Any]) -> Dict[str, Any]:
     if not message:
         return {"error": "Message is required"}
     
+    if model not in ("qwen", "gemini"):
+        return {"error": f"Unknown model: {model}"}
+    
     logger.info(f"Chat request: model={model}, message_len={len(message)}")
     
-    try:
-        # Select and load model
-        if model == "qwen":
-            if _qwen_handler is None:
-                logger.info("Loading Qwen handler...")
-                from handlers.qwen import QwenHandler
-                _qwen_handler = QwenHandler()
-                await _qwen_handler.load()
-            
-            response = await _qwen_handler.chat(
-                message=message,
-                context=context,
-            )
-        
-        elif model == "gemini":
-            if _gemini_handler is None:
-                logger.info("Loading Gemini handler...")
-                from handlers.gemini import GeminiHandler
-                _gemini_handler = GeminiHandler()
-            
-            response = await _gemini_handler.chat(
-                message=message,
-                context=context,
-            )
-        
-        else:
-            return {"error": f"Unknown model: {model}"}
+    # An open circuit raises CircuitOpenError at once, so the fallback runs without delay
+    fallback = "gemini" if model == "qwen" else "qwen"
+    error: Exception = CircuitOpenError(f"{model} unavailable")
+    for used in (model, fallback):
+        try:
+            response = await _breaker(used).call(lambda: _chat(used, message, context))
+        except CircuitOpenError as e:
+            error = e
+            continue
+        except Exception as e:
+            logger.error(f"Chat execution error ({used}): {e}", exc_info=True)
+            error = e
+            continue
         
         return {
             "response": response.get("text", ""),
             "confidence": response.get("confidence", 0.95),
             "suggestions": response.get("suggestions", []),
-            "model_used": model,
+            "model_used": used,
+            "fallback_used": used != model,
             "context_used": bool(context),
         }
     
-    except Exception as e:
-        logger.error(f"Chat execution error: {e}", exc_info=True)
-        return {
-            "error": str(e),
-            "model": model,
-        }
+    return {
+        "error": str(error),
+        "model": model,
+        "circuits": {name: breaker.to_dict() for name, breaker in _breakers.items()},
+    }
 
 
 async def cleanup():
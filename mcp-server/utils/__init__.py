@@ -1,6 +1,7 @@
 """Utils package"""
 
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 from .config import Config
 from .logger import setup_logger
 
-__all__ = ["Config", "setup_logger"]
+__all__ = ["CircuitBreaker", "CircuitOpenError", "Config", "setup_logger"]
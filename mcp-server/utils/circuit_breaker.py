@@ -0,0 +1,100 @@
+"""Circuit breaker for model providers
+
+Same policy as the AI service's ProviderHealth (the MCP server runs as its
+own process): after ``failure_threshold`` consecutive failures the circuit
+opens and calls fail fast; after ``reset_timeout_s`` one half-open trial
+decides whether it closes again. Call latency is tracked as an EWMA.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Per-provider circuit breaker with latency EWMA"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        ewma_alpha: float = 0.2,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.ewma_alpha = ewma_alpha
+
+        self.state = "closed"  # closed | open | half_open
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started: Optional[float] = None
+        self.latency_ewma_ms: Optional[float] = None
+
+    @property
+    def available(self) -> bool:
+        """False while open and not yet due for a trial"""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= self.reset_timeout_s
+        return True
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if now - self.opened_at < self.reset_timeout_s:
+                return False
+            self.state = "half_open"
+        # Half-open: one trial at a time (a lost trial expires)
+        if self.trial_started is not None and now - self.trial_started < self.reset_timeout_s:
+            return False
+        self.trial_started = now
+        return True
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} unavailable (circuit open)")
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success((time.monotonic() - started) * 1000)
+        return result
+
+    def record_success(self, latency_ms: Optional[float] = None) -> None:
+        if self.state != "closed":
+            logger.info(f"{self.name} recovered, closing circuit")
+        self.state = "closed"
+        self.failures = 0
+        self.trial_started = None
+        if latency_ms is not None:
+            if self.latency_ewma_ms is None:
+                self.latency_ewma_ms = latency_ms
+            else:
+                self.latency_ewma_ms += self.ewma_alpha * (latency_ms - self.latency_ewma_ms)
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        self.failures += 1
+        self.trial_started = None
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"{self.name} circuit opened: {error}")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 1) if self.latency_ewma_ms is not None else None,
+        }